@@ -1,11 +1,135 @@
+from django.conf import settings
 from django.contrib import admin
-from .models import User, Building, Service, Order, OrderHistory, Client, Category, Review
+from django.core.paginator import Paginator
+from django.db.models import QuerySet
+from django.utils.functional import cached_property
 
+from .models import Building, Service, Order, OrderHistory, Client, Category, Review, CapacityRule
+from .orders import bulk_change_status
+from .pagination import estimated_count
+from .transactions import immediate_write
 
-admin.site.register(Review)
-admin.site.register(Category)
-admin.site.register(Building)
-admin.site.register(Service)
-admin.site.register(Order)
-admin.site.register(OrderHistory)
-admin.site.register(Client)
\ No newline at end of file
+
+# ===================
+# ЧОҢ ТАБЛИЦАЛАР ҮЧҮН ЖАЛПЫ
+# ===================
+class EstimatedCountPaginator(Paginator):
+    """Ар бир беттеги COUNT(*) ордуна болжолдуу сан (config/pagination.py: кэш, PostgreSQL'де reltuples)."""
+
+    @cached_property
+    def count(self):
+        if isinstance(self.object_list, QuerySet):
+            return estimated_count(self.object_list)
+        return super().count
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """Миллиондогон сап: болжолдуу сан, чыпкасыз жалпы санды эсептебейт, FK'лар - тизме эмес, id талаасы.
+
+    date_hierarchy'нин жылдары/айлары MIN/MAX'тан (templates/admin/config/change_list.html, admin_tags).
+    """
+
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    date_hierarchy_from_bounds = True
+    list_per_page = 50
+
+
+# ===================
+# ЗАКАЗДАР
+# ===================
+@immediate_write
+def _change_status_batch(ids, status, changed_by):
+    orders = (Order.objects.filter(pk__in=ids).exclude(status=status)
+              .only('id', 'status', 'user_id', 'building_id', 'service_id', 'created_at'))
+    orders = list(orders)
+    return len(bulk_change_status(orders, {order.pk: status for order in orders}, changed_by=changed_by))
+
+
+def status_action(status, label):
+    """Тандалган заказдардын статусу: API'дин PATCH /api/orders/bulk/'ундагыдай, тарых бир bulk_create менен.
+
+    "Баарын тандоо" миллиондогон сапты камтышы мүмкүн - ORDERS_BULK_MAX'тан бөлүп, ар бөлүгү өз транзакциясында.
+    """
+
+    def change_status(modeladmin, request, queryset):
+        ids = list(queryset.exclude(status=status).order_by('pk').values_list('pk', flat=True))
+        size = settings.ORDERS_BULK_MAX
+        changed = sum(_change_status_batch(ids[start:start + size], status, request.user)
+                      for start in range(0, len(ids), size))
+        modeladmin.message_user(request, f"{changed} заказдын статусу: {label}")
+
+    change_status.__name__ = f'mark_{status.lower()}'
+    change_status.short_description = f"Статусу: {label}"
+    change_status.allowed_permissions = ('change',)
+    return change_status
+
+
+@admin.register(Order)
+class OrderAdmin(LargeTableAdmin):
+    list_display = ('id', 'user', 'service', 'building', 'date', 'time', 'status', 'created_at')
+    list_select_related = ('user', 'service', 'building')
+    # order_building_status_idx: имарат + статус; created_at - order_created_keyset_idx
+    list_filter = ('status', 'building')
+    date_hierarchy = 'created_at'
+    ordering = ('-created_at', '-id')
+    search_fields = ('=id',)
+    raw_id_fields = ('user', 'service')
+    autocomplete_fields = ('building',)
+    actions = [status_action(status, label) for status, label in Order.STATUS_CHOICES]
+
+
+@admin.register(OrderHistory)
+class OrderHistoryAdmin(LargeTableAdmin):
+    list_display = ('id', 'order_label', 'old_status', 'new_status', 'changed_by', 'change_date')
+    list_select_related = ('changed_by',)
+    date_hierarchy = 'change_date'  # history_changed_keyset_idx
+    ordering = ('-change_date', '-id')
+    search_fields = ('=order__id',)
+    raw_id_fields = ('order', 'changed_by')
+
+    @admin.display(description="Заказ", ordering='order_id')
+    def order_label(self, obj):
+        # Order.__str__ заказды жүктөйт - id тарыхтын өзүндө бар
+        return f"Заказ #{obj.order_id}"
+
+
+@admin.register(Review)
+class ReviewAdmin(LargeTableAdmin):
+    # Review.__str__ колдонуучуну жана кызматты окуйт - тизмеде алар бир JOIN менен келет
+    list_display = ('id', 'service', 'user', 'rating', 'created_at')
+    list_select_related = ('service', 'user')
+    ordering = ('-id',)
+    raw_id_fields = ('service', 'user')
+
+
+# ===================
+# КАТАЛОГ
+# ===================
+@admin.register(Building)
+class BuildingAdmin(admin.ModelAdmin):
+    list_display = ('name', 'address')
+    search_fields = ('name', 'address')
+
+
+@admin.register(Category)
+class CategoryAdmin(admin.ModelAdmin):
+    search_fields = ('name',)
+
+
+@admin.register(Service)
+class ServiceAdmin(admin.ModelAdmin):
+    list_display = ('name', 'category', 'building', 'price', 'rating_avg')
+    list_select_related = ('category', 'building')
+    search_fields = ('name',)
+    autocomplete_fields = ('category', 'building')
+
+
+@admin.register(CapacityRule)
+class CapacityRuleAdmin(admin.ModelAdmin):
+    list_display = ('__str__', 'slot_minutes', 'capacity')
+    list_select_related = ('service', 'building')
+    autocomplete_fields = ('service', 'building')
+
+
+admin.site.register(Client)
@@ -0,0 +1,378 @@
+from datetime import date, datetime, time, timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import Coalesce, TruncDate, TruncHour
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from .models import Building, DailyRollup, HourlyRollup, Order, OrderHistory, Review, Service
+from .tasks import task
+
+# ===================
+# АНАЛИТИКА: КҮНДҮК ЖАНА СААТТЫК ЖЫЙЫНТЫКТАР
+# ===================
+# Отчёттор Order/OrderHistory/Review'ду эч качан сканербейт - DailyRollup/HourlyRollup гана окулат.
+# Сигналдар (config/signals.py) жана bulk жолдор өзгөрүүнү (+/-) булак сабы менен бир транзакцияда кезекке
+# кошот (analytics.apply_rollups тапшырмасы) - статус өзгөртүү бир INSERT менен бүтөт, жыйынтыктарды воркер жазат.
+# bulk_create/update() сигналсыз өтөт - андан кийин `manage.py rebuild_rollups` (күн бөлүктөрү параллель).
+# Кызмат башка имаратка көчсө же имарат өчүрүлсө (заказдар сигналсыз NULL болот), жыйынтыктар эски
+# имараттын id'синде калат - rebuild_rollups аларды булакка ылайык кайра бөлөт.
+
+NO_BUILDING = 0
+DAILY_FIELDS = ('orders_created', 'orders_done', 'completion_time', 'reviews', 'rating_sum')
+HOURLY_FIELDS = ('orders_created', 'orders_done')
+
+
+def local_day(moment):
+    return timezone.localtime(moment).date()
+
+
+def local_hour(moment):
+    return timezone.localtime(moment).replace(minute=0, second=0, microsecond=0)
+
+
+def day_start(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+# ===================
+# ИНКРЕМЕНТТИК ЖАҢЫЛОО
+# ===================
+def _bump(model, keys, deltas):
+    """Бир сапка deltas кошот: адатта бир UPDATE, сап жок болсо INSERT."""
+    deltas = {field: value for field, value in deltas.items() if value}
+    if not deltas:
+        return
+    updates = {field: F(field) + value for field, value in deltas.items()}
+    if model.objects.filter(**keys).update(**updates):
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(**keys, **deltas)
+    except IntegrityError:
+        # Параллель транзакция ошол эле сапты биринчи түздү
+        model.objects.filter(**keys).update(**updates)
+
+
+def _encode(deltas):
+    # JSON үчүн: completion_time (timedelta) - микросекунддар
+    return {field: value // timedelta(microseconds=1) if isinstance(value, timedelta) else value
+            for field, value in deltas.items()}
+
+
+def _decode(deltas):
+    return {field: timedelta(microseconds=value) if field == 'completion_time' else value
+            for field, value in deltas.items()}
+
+
+class RollupBatch:
+    """Бир нече окуянын өзгөрүүлөрүн топтойт: apply() ар бир ачкычка бир жолу гана жазат, enqueue() аны
+    тапшырма катары кезекке кошот."""
+
+    def __init__(self):
+        self.daily = {}
+        self.hourly = {}
+
+    def _add(self, moment, building_id, service_id, daily, hourly):
+        building_id = building_id or NO_BUILDING
+        for rows, key, deltas in ((self.daily, (local_day(moment), building_id, service_id), daily),
+                                  (self.hourly, (local_hour(moment), building_id), hourly)):
+            row = rows.setdefault(key, {})
+            for field, value in (deltas or {}).items():
+                row[field] = row[field] + value if field in row else value
+        return self
+
+    def order(self, created_at, building_id, service_id, sign=1):
+        return self._add(created_at, building_id, service_id, {'orders_created': sign}, {'orders_created': sign})
+
+    def completion(self, change_date, created_at, building_id, service_id, sign=1):
+        """OrderHistory(new_status='DONE') сабы: change_date'тин күнүнө/саатына эсептелет."""
+        return self._add(change_date, building_id, service_id,
+                         {'orders_done': sign, 'completion_time': (change_date - created_at) * sign},
+                         {'orders_done': sign})
+
+    def review(self, created_at, building_id, service_id, rating, sign=1):
+        return self._add(created_at, building_id, service_id, {'reviews': sign, 'rating_sum': rating * sign}, None)
+
+    def payload(self):
+        return {
+            'daily': [[day.isoformat(), building_id, service_id, _encode(deltas)]
+                      for (day, building_id, service_id), deltas in self.daily.items()],
+            'hourly': [[hour.isoformat(), building_id, _encode(deltas)]
+                       for (hour, building_id), deltas in self.hourly.items()],
+        }
+
+    @classmethod
+    def from_payload(cls, daily, hourly):
+        batch = cls()
+        batch.daily = {(date.fromisoformat(day), building_id, service_id): _decode(deltas)
+                       for day, building_id, service_id, deltas in daily}
+        batch.hourly = {(datetime.fromisoformat(hour), building_id): _decode(deltas)
+                        for hour, building_id, deltas in hourly}
+        return batch
+
+    def enqueue(self, key=None):
+        if self.daily or self.hourly:
+            apply_rollups.enqueue(key=key, **self.payload())
+
+    def apply(self):
+        with transaction.atomic():
+            for (day, building_id, service_id), deltas in self.daily.items():
+                _bump(DailyRollup, {'day': day, 'building_id': building_id, 'service_id': service_id}, deltas)
+            for (hour, building_id), deltas in self.hourly.items():
+                _bump(HourlyRollup, {'hour': hour, 'building_id': building_id}, deltas)
+
+
+@task(name='analytics.apply_rollups')
+def apply_rollups(daily, hourly):
+    RollupBatch.from_payload(daily, hourly).apply()
+
+
+def event_key(kind, pk, moment):
+    """Окуянын idempotency ачкычы: убакыт кошулат - SQLite'те өчүрүлгөн саптын id'си кайра берилиши мүмкүн."""
+    return f'rollup-{kind}:{pk}:{moment.timestamp()}'
+
+
+def record_order(created_at, building_id, service_id, sign=1, key=None):
+    RollupBatch().order(created_at, building_id, service_id, sign).enqueue(key)
+
+
+def record_completion(change_date, created_at, building_id, service_id, sign=1, key=None):
+    RollupBatch().completion(change_date, created_at, building_id, service_id, sign).enqueue(key)
+
+
+def record_review(created_at, building_id, service_id, rating, sign=1, key=None):
+    RollupBatch().review(created_at, building_id, service_id, rating, sign).enqueue(key)
+
+
+def move_order(order_id, created_at, before, after):
+    """Заказдын имараты/кызматы өзгөрдү: before/after - (building_id, service_id)."""
+    batch = RollupBatch().order(created_at, *before, sign=-1).order(created_at, *after)
+    done = OrderHistory.objects.filter(order_id=order_id, new_status='DONE').values_list('change_date', flat=True)
+    for change_date in done:
+        batch.completion(change_date, created_at, *before, sign=-1).completion(change_date, created_at, *after)
+    batch.enqueue()
+
+
+# ===================
+# БУЛАКТАН ЭСЕПТӨӨ (толтуруу жана текшерүү)
+# ===================
+def compute_rollups(start, end):
+    """[start, end) күндөрү үчүн булак таблицалардан так жыйынтык.
+
+    ({(day, building_id, service_id): {талаа: маани}}, {(hour, building_id): {талаа: маани}}) кайтарат.
+    """
+    since, until = day_start(start), day_start(end)
+    daily, hourly = {}, {}
+
+    def add(day, hour, building_id, service_id, **values):
+        row = daily.setdefault((day, building_id, service_id), _empty(DAILY_FIELDS))
+        for field, value in values.items():
+            row[field] += value
+        if hour is not None:
+            row = hourly.setdefault((hour, building_id), _empty(HOURLY_FIELDS))
+            for field in HOURLY_FIELDS:
+                row[field] += values.get(field, 0)
+
+    orders = (Order.objects.filter(created_at__gte=since, created_at__lt=until)
+              .values(day=TruncDate('created_at'), hour=TruncHour('created_at'),
+                      building_key=Coalesce('building_id', NO_BUILDING), service_key=F('service_id'))
+              .annotate(count=Count('id')).order_by())
+    for row in orders:
+        add(row['day'], row['hour'], row['building_key'], row['service_key'], orders_created=row['count'])
+
+    done = (OrderHistory.objects.filter(new_status='DONE', change_date__gte=since, change_date__lt=until)
+            .values(day=TruncDate('change_date'), hour=TruncHour('change_date'),
+                    building_key=Coalesce('order__building_id', NO_BUILDING), service_key=F('order__service_id'))
+            .annotate(count=Count('id'), duration=Sum(F('change_date') - F('order__created_at'))).order_by())
+    for row in done:
+        add(row['day'], row['hour'], row['building_key'], row['service_key'],
+            orders_done=row['count'], completion_time=row['duration'])
+
+    reviews = (Review.objects.filter(created_at__gte=since, created_at__lt=until)
+               .values(day=TruncDate('created_at'), building_key=Coalesce('service__building_id', NO_BUILDING),
+                       service_key=F('service_id'))
+               .annotate(count=Count('id'), rating=Sum('rating')).order_by())
+    for row in reviews:
+        add(row['day'], None, row['building_key'], row['service_key'],
+            reviews=row['count'], rating_sum=row['rating'])
+    return daily, hourly
+
+
+def _empty(fields):
+    return {field: timedelta() if field == 'completion_time' else 0 for field in fields}
+
+
+def stored_rollups(start, end):
+    """Сакталган жыйынтыктар compute_rollups'тун форматында (бош саптар кошулбайт)."""
+    since, until = day_start(start), day_start(end)
+    daily = {(row.pop('day'), row.pop('building_id'), row.pop('service_id')): row
+             for row in DailyRollup.objects.filter(day__gte=start, day__lt=end)
+             .values('day', 'building_id', 'service_id', *DAILY_FIELDS)}
+    hourly = {(row.pop('hour'), row.pop('building_id')): row
+              for row in HourlyRollup.objects.filter(hour__gte=since, hour__lt=until)
+              .values('hour', 'building_id', *HOURLY_FIELDS)}
+    empty_daily, empty_hourly = _empty(DAILY_FIELDS), _empty(HOURLY_FIELDS)
+    return ({key: row for key, row in daily.items() if row != empty_daily},
+            {key: row for key, row in hourly.items() if row != empty_hourly})
+
+
+def write_rollups(start, end, daily, hourly, batch_size=2000):
+    """[start, end) бөлүгүн толугу менен алмаштырат."""
+    with transaction.atomic():
+        DailyRollup.objects.filter(day__gte=start, day__lt=end).delete()
+        HourlyRollup.objects.filter(hour__gte=day_start(start), hour__lt=day_start(end)).delete()
+        DailyRollup.objects.bulk_create([
+            DailyRollup(day=day, building_id=building_id, service_id=service_id, **values)
+            for (day, building_id, service_id), values in daily.items()
+        ], batch_size=batch_size)
+        HourlyRollup.objects.bulk_create([
+            HourlyRollup(hour=hour, building_id=building_id, **values)
+            for (hour, building_id), values in hourly.items()
+        ], batch_size=batch_size)
+    return len(daily), len(hourly)
+
+
+def drift(start, end, computed=None):
+    """Булакка дал келбеген саптар: [(таблица, ачкыч, сакталганы, болушу керек), ...]."""
+    daily, hourly = computed or compute_rollups(start, end)
+    stored_daily, stored_hourly = stored_rollups(start, end)
+    found = []
+    for table, stored, expected in (('daily', stored_daily, daily), ('hourly', stored_hourly, hourly)):
+        for key in sorted(stored.keys() | expected.keys()):
+            if stored.get(key) != expected.get(key):
+                found.append((table, key, stored.get(key), expected.get(key)))
+    return found
+
+
+def source_range():
+    """Булак таблицалардагы биринчи жана акыркы күн (индекстер боюнча MIN/MAX) же None."""
+    moments = [value for queryset, field in ((Order.objects, 'created_at'),
+                                             (OrderHistory.objects, 'change_date'),
+                                             (Review.objects, 'created_at'))
+               for value in (queryset.order_by(field).values_list(field, flat=True).first(),
+                             queryset.order_by(f'-{field}').values_list(field, flat=True).first())
+               if value is not None]
+    if not moments:
+        return None
+    return local_day(min(moments)), local_day(max(moments)) + timedelta(days=1)
+
+
+def partitions(start, end, days):
+    while start < end:
+        yield start, min(start + timedelta(days=days), end)
+        start += timedelta(days=days)
+
+
+def rebuild_partition(start, end):
+    daily, hourly = compute_rollups(start, end)
+    return write_rollups(start, end, daily, hourly)
+
+
+# ===================
+# ОТЧЁТ
+# ===================
+DEFAULT_DAYS = 30
+REPORT_PARAMS = ('building', 'period', 'date_from', 'date_to')  # сурамдын GET параметрлери
+MAX_DAYS = {'day': 366, 'hour': 31}
+
+
+class ReportError(ValueError):
+    pass
+
+
+def can_view_reports(user):
+    return user.is_staff or user.role == 'ADMIN' or (user.role == 'MANAGER' and user.managed_building_id is not None)
+
+
+def report_params(user, building=None, period=None, date_from=None, date_to=None):
+    """Сурамдын параметрлери -> report() аргументтери. Менеджер өз имаратынын гана отчётун көрөт."""
+    period = period or 'day'
+    if period not in MAX_DAYS:
+        raise ReportError(f"Белгисиз мезгил: {period}")
+    today = timezone.localdate()
+    dates = []
+    for raw, default in ((date_from, None), (date_to, today)):
+        try:
+            # parse_date: формат туура эмес - None, жок күн (2026-02-30) - ValueError
+            value = parse_date(raw) if raw else default
+        except ValueError:
+            value = None
+        if raw and value is None:
+            raise ReportError(f"Дата туура эмес: {raw}")
+        dates.append(value)
+    date_to = dates[1]
+    date_from = dates[0] or date_to - timedelta(days=DEFAULT_DAYS - 1)
+    if date_from > date_to:
+        raise ReportError("date_from date_to'дон кийин")
+    if (date_to - date_from).days >= MAX_DAYS[period]:
+        raise ReportError(f"'{period}' отчёту эң көп {MAX_DAYS[period]} күн")
+
+    if not (user.is_staff or user.role == 'ADMIN'):
+        building_id = user.managed_building_id
+    elif building in (None, ''):
+        building_id = None
+    else:
+        try:
+            building_id = int(building)
+        except ValueError:
+            raise ReportError(f"Имарат туура эмес: {building}")
+    return {'date_from': date_from, 'date_to': date_to, 'building_id': building_id, 'period': period}
+
+
+def _ratio(numerator, denominator, digits=2):
+    return round(numerator / denominator, digits) if denominator else None
+
+
+def _totals(row):
+    done = row['orders_done']
+    return {
+        'orders_created': row['orders_created'],
+        'orders_done': done,
+        'avg_completion_hours': _ratio(row['completion_time'].total_seconds() / 3600, done) if done else None,
+        'reviews': row['reviews'],
+        'rating_avg': _ratio(row['rating_sum'], row['reviews']),
+    }
+
+
+def _sums(fields):
+    return {field: Sum(field) for field in fields}
+
+
+def report(date_from, date_to, building_id=None, period='day', top=10):
+    """[date_from, date_to] күндөрү үчүн отчёт: мезгил боюнча катар, имараттар жана эң көп заказ алган кызматтар."""
+    end = date_to + timedelta(days=1)
+    daily = DailyRollup.objects.filter(day__gte=date_from, day__lt=end)
+    if building_id is not None:
+        daily = daily.filter(building_id=building_id)
+
+    if period == 'hour':
+        hourly = HourlyRollup.objects.filter(hour__gte=day_start(date_from), hour__lt=day_start(end))
+        if building_id is not None:
+            hourly = hourly.filter(building_id=building_id)
+        series = [{'period': timezone.localtime(row['hour']).isoformat(), 'orders_created': row['orders_created'],
+                   'orders_done': row['orders_done']}
+                  for row in hourly.values('hour').annotate(**_sums(HOURLY_FIELDS)).order_by('hour')]
+    else:
+        series = [{'period': row['day'].isoformat(), **_totals(row)}
+                  for row in daily.values('day').annotate(**_sums(DAILY_FIELDS)).order_by('day')]
+
+    buildings = list(daily.values('building_id').annotate(**_sums(DAILY_FIELDS)).order_by('-orders_created'))
+    services = list(daily.values('service_id').annotate(**_sums(DAILY_FIELDS)).order_by('-orders_created')[:top])
+    # Аталыштар гана каталогдон (id боюнча) - заказдар окулбайт
+    building_names = dict(Building.objects.filter(pk__in=[row['building_id'] for row in buildings])
+                          .values_list('id', 'name'))
+    service_names = dict(Service.objects.filter(pk__in=[row['service_id'] for row in services])
+                         .values_list('id', 'name'))
+    return {
+        'period': period,
+        'date_from': date_from.isoformat(),
+        'date_to': date_to.isoformat(),
+        'building': building_id,
+        'series': series,
+        'buildings': [{'id': row['building_id'], 'name': building_names.get(row['building_id']), **_totals(row)}
+                      for row in buildings],
+        'services': [{'id': row['service_id'], 'name': service_names.get(row['service_id']), **_totals(row)}
+                     for row in services],
+    }
@@ -3,3 +3,12 @@ from django.apps import AppConfig
 
 class ConfigConfig(AppConfig):
     name = 'config'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+
+        from . import signals  # noqa: F401 - сигналдарды каттоо
+        from . import db_routers  # noqa: F401 - check_pin_cache'ти каттоо
+        from .instrumentation import install_wrapper
+
+        connection_created.connect(install_wrapper, dispatch_uid='config.instrumentation')
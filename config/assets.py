@@ -0,0 +1,293 @@
+import gzip
+import json
+import mimetypes
+import os
+import re
+from collections import namedtuple
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import FileResponse, HttpResponse, HttpResponseNotModified
+from django.utils.http import http_date
+
+from . import tailwind
+
+# ===================
+# СТАТИКАЛЫК АКТИВДЕР
+# ===================
+# Браузерде Tailwind CDN компилятору жана шрифт/иконка CDN'дери жок: `build_assets` шаблондордо колдонулган
+# класстардан бир кичирейтилген CSS бандл (static/build/app.css) курат, collectstatic файлдардын
+# аттарына хэш кошуп (manifest) gzip/brotli көчүрмөлөрүн жазат, StaticFilesMiddleware аларды процесстин
+# ичинен (gunicorn'дун астында да) узак кэш баш саптары менен берет.
+#
+# Вендордогу шрифттер/иконкалар (static/vendor, репого файл катары салынат):
+#   inter/inter-<салмак>.woff2            -> @font-face (font-display: swap); жок болсо системалык шрифт
+#   fontawesome/css/all.min.css, webfonts -> колдонулган иконкалар гана бандлга; жок болсо ASSETS_ICONS_CDN
+
+BUNDLE = 'app.css'
+COMPRESSIBLE = ('.css', '.js', '.svg', '.json', '.txt', '.map', '.html', '.xml', '.ttf', '.eot', '.otf')
+FA_STYLES = {'fa-solid': 'fa-solid-900', 'fas': 'fa-solid-900', 'fa-regular': 'fa-regular-400',
+             'far': 'fa-regular-400', 'fa-brands': 'fa-brands-400', 'fab': 'fa-brands-400'}
+
+
+def minify(css):
+    """Комментарийлер жана ашыкча боштуктар (өз жана вендордогу CSS үчүн - жөнөкөй, саптарга тийбейт)."""
+    css = re.sub(r'/\*.*?\*/', '', css, flags=re.S)
+    css = re.sub(r'\s+', ' ', css)
+    css = re.sub(r'\s*([{};,>])\s*', r'\1', css)
+    css = re.sub(r':\s+', ':', css)
+    return css.replace(';}', '}').strip()
+
+
+def template_classes():
+    """Шаблондордогу бардык класс-талапкерлер (tailwind.candidates)."""
+    classes = set()
+    for directory in settings.ASSETS_TEMPLATE_DIRS:
+        for path in sorted(Path(directory).rglob('*.html')):
+            classes |= tailwind.candidates(path.read_text(encoding='utf-8'))
+    return classes
+
+
+# ===================
+# ВЕНДОР: ШРИФТТЕР ЖАНА ИКОНКАЛАР
+# ===================
+def font_faces(vendor_dir):
+    faces = []
+    for path in sorted((Path(vendor_dir) / 'inter').glob('inter-*.woff2')):
+        weight = path.stem.rsplit('-', 1)[1]
+        faces.append(f"@font-face{{font-family:'Inter';font-style:normal;font-weight:{weight};font-display:swap;"
+                     f"src:url(../vendor/inter/{path.name}) format('woff2')}}")
+    return ''.join(faces)
+
+
+def _blocks(css):
+    """Жогорку деңгээлдеги (прелюдия, ичи) блоктор; @media/@keyframes ичиндегилер бүтүн калат."""
+    blocks, depth, start, prelude = [], 0, 0, ''
+    for index, char in enumerate(css):
+        if char == '{':
+            if depth == 0:
+                prelude, start = css[start:index].strip(), index + 1
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if depth == 0:
+                blocks.append((prelude, css[start:index]))
+                start = index + 1
+    return blocks
+
+
+def _fa_classes(selector):
+    return re.findall(r'\.(fa[\w-]*)', selector)
+
+
+def purge_icons(css, used):
+    """Font Awesome CSS'тен колдонулган иконкалардын эрежелери гана; шрифттер - колдонулган стилдердики."""
+    stems = {FA_STYLES[name] for name in used if name in FA_STYLES}
+    kept, keyframes = [], []
+    for prelude, body in _blocks(minify(css)):
+        if prelude.startswith('@font-face'):
+            if any(stem in body for stem in stems):
+                kept.append(f'{prelude}{{{body}}}')
+        elif prelude.startswith('@keyframes'):
+            keyframes.append((prelude.split()[1], f'{prelude}{{{body}}}'))
+        elif prelude.startswith('@'):
+            inner = purge_icons(body, used)
+            if inner:
+                kept.append(f'{prelude}{{{inner}}}')
+        else:
+            selectors = [selector for selector in prelude.split(',')
+                         if all(name in used for name in _fa_classes(selector))]
+            if selectors:
+                kept.append(f'{",".join(selectors)}{{{body}}}')
+    result = ''.join(kept)
+    # Анимациялар (fa-spin ж.б.) колдонулган эрежелер сураса гана
+    return ''.join(block for name, block in keyframes if re.search(rf'\b{re.escape(name)}\b', result)) + result
+
+
+def icon_css(vendor_dir, classes):
+    path = Path(vendor_dir) / 'fontawesome' / 'css' / 'all.min.css'
+    if not path.exists():
+        return ''
+    used = {name for name in classes if name.startswith('fa')} | {'fa'}
+    css = purge_icons(path.read_text(encoding='utf-8'), used)
+    return css.replace('../webfonts/', '../vendor/fontawesome/webfonts/')
+
+
+def build_bundle():
+    """(css, Tailwind тааныбаган класстар). Ирети: шрифттер, preflight, өз стилдер, иконкалар, утилиталар."""
+    classes = template_classes()
+    utilities, unknown = tailwind.build(classes)
+    base = Path(settings.ASSETS_BASE_CSS).read_text(encoding='utf-8')
+    css = (font_faces(settings.ASSETS_VENDOR_DIR) + tailwind.PREFLIGHT + minify(base)
+           + icon_css(settings.ASSETS_VENDOR_DIR, classes) + utilities)
+    return css + '\n', unknown
+
+
+# ===================
+# COLLECTSTATIC: ХЭШ + GZIP/BROTLI
+# ===================
+def brotli_module():
+    try:
+        import brotli
+    except ImportError:
+        return None
+    return brotli
+
+
+def compress_file(path):
+    """path.gz жана (brotli орнотулган болсо) path.br - 5%тен кем кичирейсе жазылбайт."""
+    with open(path, 'rb') as source:
+        data = source.read()
+    variants = {'.gz': gzip.compress(data, 9, mtime=0)}
+    brotli = brotli_module()
+    if brotli is not None:
+        variants['.br'] = brotli.compress(data, quality=11)
+    written = []
+    for suffix, compressed in variants.items():
+        if len(compressed) < len(data) * 0.95:
+            with open(path + suffix, 'wb') as target:
+                target.write(compressed)
+            written.append(suffix)
+        elif os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    return written
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Хэштелген аттар (staticfiles.json) + тексттик файлдардын .gz/.br көчүрмөлөрү."""
+
+    def stored_name(self, name):
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            # collectstatic иштей элек (тесттер, жаңы клон) же manifest'те жок - хэшсиз жол
+            return name
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        for name in sorted(set(paths) | set(self.hashed_files.values())):
+            if name.endswith(COMPRESSIBLE) and self.exists(name):
+                compress_file(self.path(name))
+
+
+# ===================
+# ПРОЦЕССТИН ИЧИНДЕГИ СТАТИКА СЕРВЕРИ
+# ===================
+StaticFile = namedtuple('StaticFile', 'path size mtime content_type etag immutable encodings')
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+
+def scan_static(root):
+    """STATIC_ROOT -> {аты: StaticFile}. Хэштелген аттар (manifest'теги) - immutable."""
+    root = Path(root)
+    if not root.is_dir():
+        return {}
+    try:
+        hashed = set(json.loads((root / 'staticfiles.json').read_text())['paths'].values())
+    except (OSError, ValueError, KeyError):
+        hashed = set()
+    files = {}
+    for directory, _, names in os.walk(root):
+        for filename in names:
+            if filename.endswith(('.gz', '.br')):
+                continue
+            path = os.path.join(directory, filename)
+            name = Path(path).relative_to(root).as_posix()
+            stat = os.stat(path)
+            content_type, _ = mimetypes.guess_type(filename)
+            content_type = content_type or 'application/octet-stream'
+            if content_type.startswith('text/') or content_type in ('application/javascript', 'application/json'):
+                content_type += '; charset=utf-8'
+            encodings = {coding: (path + suffix, os.path.getsize(path + suffix))
+                         for coding, suffix in ENCODINGS if os.path.exists(path + suffix)}
+            files[name] = StaticFile(path, stat.st_size, stat.st_mtime, content_type,
+                                     f'{stat.st_size:x}-{int(stat.st_mtime):x}', name in hashed, encodings)
+    return files
+
+
+def accepted_encodings(header):
+    accepted = set()
+    for part in header.split(','):
+        coding, _, params = part.partition(';')
+        if re.fullmatch(r'\s*q=0(\.0*)?\s*', params):
+            continue
+        accepted.add(coding.strip().lower())
+    return accepted
+
+
+class StaticFilesMiddleware:
+    """STATIC_URL астындагы GET/HEAD: STATIC_ROOT'тон, Accept-Encoding боюнча .br/.gz, ETag/304 менен.
+
+    Хэштелген файлдар - бир жылдык `immutable` кэш, калгандары - ASSETS_MAX_AGE_UNHASHED. Файлдардын тизмеси
+    процесс башталганда бир жолу окулат (collectstatic'тен кийин воркерлер кайра башталат); DEBUG'та жок файл
+    кайра изделет, табылбаса сурам ары өтөт (runserver'дин статикасы).
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.ASSETS_SERVE:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.prefix = '/' + settings.STATIC_URL.lstrip('/')
+        self.files = scan_static(settings.STATIC_ROOT)
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        return self.serve(request) or self.get_response(request)
+
+    async def __acall__(self, request):
+        # Файл ачуу жана stat гана - event loop'ту кармабайт; файлдын ичин FileResponse агым менен берет
+        return self.serve(request) or await self.get_response(request)
+
+    def lookup(self, name):
+        entry = self.files.get(name)
+        if entry is None and settings.DEBUG:
+            self.files = scan_static(settings.STATIC_ROOT)
+            entry = self.files.get(name)
+        return entry
+
+    def serve(self, request):
+        if request.method not in ('GET', 'HEAD') or not request.path.startswith(self.prefix):
+            return None
+        entry = self.lookup(request.path[len(self.prefix):])
+        if entry is None:
+            return None
+        path, size, coding = entry.path, entry.size, None
+        accepted = accepted_encodings(request.headers.get('Accept-Encoding', ''))
+        for name, _ in ENCODINGS:
+            if name in accepted and name in entry.encodings:
+                (path, size), coding = entry.encodings[name], name
+                break
+        etag = f'"{entry.etag}-{coding}"' if coding else f'"{entry.etag}"'
+        max_age = settings.ASSETS_MAX_AGE if entry.immutable else settings.ASSETS_MAX_AGE_UNHASHED
+        headers = {
+            'ETag': etag,
+            'Last-Modified': http_date(entry.mtime),
+            'Cache-Control': f'public, max-age={max_age}' + (', immutable' if entry.immutable else ''),
+        }
+        if entry.encodings:
+            headers['Vary'] = 'Accept-Encoding'
+        if etag in re.findall(r'"[^"]*"', request.headers.get('If-None-Match', '')):
+            response = HttpResponseNotModified()
+        elif request.method == 'HEAD':
+            response = HttpResponse(content_type=entry.content_type)
+            response['Content-Length'] = size
+        else:
+            response = FileResponse(open(path, 'rb'), content_type=entry.content_type,
+                                    filename=os.path.basename(entry.path))
+        for header, value in headers.items():
+            response[header] = value
+        if coding and response.status_code == 200:
+            response['Content-Encoding'] = coding
+        return response
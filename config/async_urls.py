@@ -0,0 +1,21 @@
+from django.urls import include, path
+
+from . import async_views
+
+# ===================
+# ASYNC URL'ЛАР (ASGI)
+# ===================
+# ASYNC_READ_VIEWS=1 болгондо ROOT_URLCONF ушул модуль болот: окуу жолдору async view'лорго, калганы
+# (жана ушул эле жолдордогу жазуу/browsable API) servic.urls'ка өтөт. Аттар (name) servic.urls'та калат.
+urlpatterns = [
+    path('', async_views.home),
+    path('service/<int:pk>/', async_views.service_detail),
+    path('dashboard/', async_views.dashboard),
+    path('api/services/', async_views.service_list),
+    path('api/services/<int:pk>/', async_views.service_detail_api),
+    path('api/buildings/', async_views.building_list),
+    path('api/buildings/<int:pk>/', async_views.building_detail),
+    path('api/orders/', async_views.order_list),
+    path('api/orders/<int:pk>/', async_views.order_detail),
+    path('', include('servic.urls')),
+]
@@ -0,0 +1,223 @@
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.views import redirect_to_login
+from django.http import Http404, HttpResponse
+from django.shortcuts import aget_object_or_404, render
+from django.template.loader import render_to_string
+from django.utils.cache import patch_vary_headers
+from django.utils.safestring import mark_safe
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import exceptions, status
+
+from . import views
+from .auth_cache import acached_token
+from .caching import acached_for_user, adashboard_orders
+from .conditional import catalog_condition, catalog_validators, not_modified, patch_catalog_headers, set_validators
+from .db_routers import is_pinned, replica_reads
+from .fast_serializers import FastJSONRenderer
+from .images import DerivativeIndex
+from .live import current_cursor
+from .models import Category, Order, Service
+from .pagination import KeysetPagination
+from .querysets import optimize_for_serializer
+from .search import search_services
+from .serializers import BuildingSerializer, OrderSerializer, ServiceSerializer, srcset_sources
+
+# ===================
+# ASYNC ОКУУ VIEW'ЛОРУ
+# ===================
+# ASGI (uvicorn) астында окуу гана жолдору агымды бөгөбөйт: ORM async (aiterator/aget/acount) аркылуу.
+# Жазуу аракеттери (POST/PUT/DELETE) жана browsable API синхрондуу view'лорго өткөрүлөт.
+# config/async_urls.py бул view'лорду негизги URL'лардын алдына коёт (ASYNC_READ_VIEWS=1, servic/asgi.py).
+
+
+def async_login_required(view):
+    """login_required'дын async версиясы: колдонуучу request.auser() менен бир жолу жүктөлөт.
+
+    request.user да алмаштырылат - шаблондор (base.html) аны синхрондуу окуйт.
+    """
+    @wraps(view)
+    async def inner(request, *args, **kwargs):
+        request.user = await request.auser()
+        if not request.user.is_authenticated:
+            return redirect_to_login(request.get_full_path())
+        return await view(request, *args, **kwargs)
+    return inner
+
+
+# ===================
+# HTML
+# ===================
+@async_login_required
+@catalog_condition('category', 'service')
+async def home(request):
+    services = Service.objects.all()
+    search_query = request.GET.get('search')
+    if search_query:
+        services = search_services(services, search_query)
+    category_id = request.GET.get('category')
+    if category_id:
+        services = services.filter(category_id=category_id)
+
+    services = [service async for service in services]
+    derivatives = await DerivativeIndex.aload(service.image.name for service in services)
+    return render(request, 'home.html', {
+        'categories': Category.objects.all(), 'services': services, 'derivatives': derivatives,
+    })
+
+
+@async_login_required
+async def service_detail(request, pk):
+    if request.method != 'GET':
+        # Пикир жазуу синхрондуу view'дө калат
+        return await sync_to_async(views.service_detail)(request, pk)
+    service = await aget_object_or_404(Service, pk=pk)
+    reviews = [review async for review in service.reviews.select_related('user').order_by('-created_at')]
+    return render(request, 'service_detail.html', {'service': service, 'reviews': reviews})
+
+
+@async_login_required
+async def dashboard(request):
+    user = request.user
+
+    async def render_rows():
+        cursor = str(await sync_to_async(current_cursor)())
+        return cursor, render_to_string('order_rows.html', {'orders': await adashboard_orders(user)})
+
+    cursor, order_rows = await acached_for_user('order_rows', user, render_rows)
+    return render(request, 'orders.html', {'order_rows': mark_safe(order_rows), 'live_cursor': cursor})
+
+
+# ===================
+# API (list / retrieve)
+# ===================
+class AsyncReadEndpoint:
+    """DRF ViewSet'тин list/retrieve'ин async кайталайт: ошол эле serializer, пагинация жана JSON.
+
+    Аутентификация DRF'тегидей: адегенде `Authorization: Token ...`, анан сессия. Уруксат - IsAuthenticated.
+    """
+
+    renderer = FastJSONRenderer()
+
+    def __init__(self, viewset, serializer_class, catalog_tables=()):
+        self.viewset = viewset
+        self.serializer_class = serializer_class
+        self.catalog_tables = catalog_tables
+        self.sync_list = viewset.as_view({'get': 'list', 'post': 'create'})
+        self.sync_detail = viewset.as_view({
+            'get': 'retrieve', 'put': 'update', 'patch': 'partial_update', 'delete': 'destroy',
+        })
+
+    def get_queryset(self, user):
+        return optimize_for_serializer(self.viewset.queryset.all(), self.serializer_class)
+
+    def filter_list(self, request, queryset):
+        return queryset
+
+    def get_keyset_ordering(self, request):
+        return self.viewset.keyset_ordering
+
+    # ----- жардамчылар -----
+    async def authenticate(self, request):
+        header = request.headers.get('Authorization', '')
+        keyword, _, key = header.partition(' ')
+        if keyword == 'Token':
+            found = await acached_token(key.strip())
+            if found is None or not found[0].is_active:
+                raise exceptions.AuthenticationFailed("Invalid token.")
+            return found[0]
+        user = await request.auser()
+        return user if user.is_authenticated else None
+
+    def json(self, data, status_code=200, headers=None):
+        response = HttpResponse(self.renderer.render(data), status=status_code,
+                                content_type='application/json', headers=headers)
+        patch_vary_headers(response, ['Accept'])
+        return response
+
+    @staticmethod
+    def wants_browsable_api(request):
+        accept = request.headers.get('Accept', '')
+        return request.GET.get('format') == 'api' or ('text/html' in accept and 'application/json' not in accept)
+
+    async def handle(self, request, sync_view, action, **kwargs):
+        if request.method != 'GET' or self.wants_browsable_api(request):
+            return await sync_to_async(sync_view)(request, **kwargs)
+        try:
+            user = await self.authenticate(request)
+        except exceptions.AuthenticationFailed as exc:
+            return self.json({'detail': exc.detail}, status.HTTP_401_UNAUTHORIZED, {'WWW-Authenticate': 'Token'})
+        if user is None:
+            return self.json({'detail': exceptions.NotAuthenticated.default_detail}, status.HTTP_403_FORBIDDEN)
+        request.user = user
+
+        etag = timestamp = None
+        if self.catalog_tables:
+            etag, last_modified = await sync_to_async(catalog_validators)(request, self.catalog_tables, ('json',))
+            response, timestamp = not_modified(request, etag, last_modified)
+            if response is not None:
+                return patch_catalog_headers(request, set_validators(response, etag, timestamp))
+
+        # ReplicaReadMixin'деги эреже: жакында жазган колдонуучу негизги базадан окуйт
+        with replica_reads(not await sync_to_async(is_pinned)(user)):
+            try:
+                data = await action(request, user, **kwargs)
+            except Http404 as exc:
+                return self.json({'detail': exceptions.NotFound(*exc.args).detail}, status.HTTP_404_NOT_FOUND)
+            except exceptions.APIException as exc:
+                return self.json({'detail': exc.detail}, exc.status_code)
+        response = self.json(data)
+        if self.catalog_tables:
+            response = patch_catalog_headers(request, set_validators(response, etag, timestamp))
+        return response
+
+    async def serialize(self, request, instance, many=False):
+        serializer = self.serializer_class(instance, many=many, context={'request': request})
+        items = instance if many else [instance]
+        child = serializer.child if many else serializer
+        serializer.context['derivative_index'] = await DerivativeIndex.aload(srcset_sources(child, items))
+        return serializer.data
+
+    # ----- аракеттер -----
+    async def list_action(self, request, user):
+        queryset = self.filter_list(request, self.get_queryset(user))
+        paginator = KeysetPagination()
+        paginator.get_ordering = lambda view: self.get_keyset_ordering(request)
+        rows = await paginator.apaginate_queryset(queryset, request)
+        return paginator.get_paginated_data(await self.serialize(request, rows, many=True))
+
+    async def retrieve_action(self, request, user, pk):
+        return await self.serialize(request, await aget_object_or_404(self.get_queryset(user), pk=pk))
+
+    def as_views(self):
+        @csrf_exempt
+        async def list_view(request):
+            return await self.handle(request, self.sync_list, self.list_action)
+
+        @csrf_exempt
+        async def detail_view(request, pk):
+            return await self.handle(request, self.sync_detail, self.retrieve_action, pk=pk)
+
+        return list_view, detail_view
+
+
+class ServiceEndpoint(AsyncReadEndpoint):
+    def filter_list(self, request, queryset):
+        return search_services(queryset, request.GET.get('search'))
+
+    def get_keyset_ordering(self, request):
+        # ServiceViewSet'тегидей: издөө натыйжалары ылайыктуулук боюнча, биринчи бет гана
+        if request.GET.get('search', '').strip():
+            return None
+        return super().get_keyset_ordering(request)
+
+
+class OrderEndpoint(AsyncReadEndpoint):
+    def get_queryset(self, user):
+        return optimize_for_serializer(Order.objects.visible_to(user), self.serializer_class)
+
+
+service_list, service_detail_api = ServiceEndpoint(views.ServiceViewSet, ServiceSerializer, ('service',)).as_views()
+building_list, building_detail = AsyncReadEndpoint(views.BuildingViewSet, BuildingSerializer, ('building',)).as_views()
+order_list, order_detail = OrderEndpoint(views.OrderViewSet, OrderSerializer).as_views()
@@ -0,0 +1,291 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from functools import partial
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.core import checks
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.signals import setting_changed
+from django.db import transaction
+from django.dispatch import receiver
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+from .metrics import AUTH_CACHE_REQUESTS
+
+# ===================
+# АУТЕНТИФИКАЦИЯ КЭШИ
+# ===================
+# Ар бир сурамда сессиядан колдонуучуну (AuthenticationMiddleware -> backend.get_user) жана
+# `Authorization: Token ...` ачкычын (TokenAuthentication) табуу базага бирден сурам болчу. Эми:
+#   - сессиялар cached_db (SESSION_ENGINE, жалпы кэш болсо) - окуу кэштен;
+#   - колдонуучу (role, managed_building_id ж.б. бардык талаалары) жана токен -> колдонуучу процесстин
+#     ичиндеги LRU'да AUTH_CACHE_TTL секунд сакталат.
+# Колдонуучу (роль, сырсөз, is_active ...) өзгөргөндө же токен өчүрүлгөндө жазуу бул процесстин LRU'сунан
+# дароо чыгат жана AUTH_CACHE_ALIAS кэшине жаңы "белги" жазылат: башка воркерлер ар бир кэштеги жазууну
+# колдонордон мурун белгини салыштырат (бир cache.get_many, базага эмес). AUTH_CACHE_ALIAS=None - белгисиз,
+# башка воркерлерде жазуу TTL бүткөнчө эскирген бойдон калышы мүмкүн. AUTH_CACHE_TTL=0 - кэш өчүк (locmem
+# кэште демейки ушундай; кол менен күйгүзүлсө - config.W001 эскертүүсү).
+# Сигналсыз өзгөртүүлөр (QuerySet.update, raw SQL) үчүн auth_cache.invalidate('users', pk) чакырыңыз.
+
+class LRUCache:
+    """Потокко коопсуз LRU: эң көп maxsize жазуу, ар бири ttl секунд жашайт."""
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.data = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            item = self.data.get(key)
+            if item is None:
+                return None
+            value, expires = item
+            if expires < time.monotonic():
+                del self.data[key]
+                return None
+            self.data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self.lock:
+            self.data[key] = (value, time.monotonic() + self.ttl)
+            self.data.move_to_end(key)
+            while len(self.data) > self.maxsize:
+                self.data.popitem(last=False)
+
+    def pop(self, key):
+        with self.lock:
+            self.data.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.data.clear()
+
+    def __len__(self):
+        return len(self.data)
+
+
+_state = {'users': None, 'tokens': None}
+_TOKEN_USER = [field.attname for field in Token._meta.concrete_fields].index('user_id')
+
+
+@receiver(setting_changed)
+def _reset_state(setting, **kwargs):
+    if setting.startswith('AUTH_CACHE_'):
+        _state['users'] = _state['tokens'] = None
+
+
+def enabled():
+    return settings.AUTH_CACHE_TTL > 0
+
+
+SESSION_CACHE_ENGINES = ('django.contrib.sessions.backends.cache', 'django.contrib.sessions.backends.cached_db')
+
+
+@checks.register(checks.Tags.security)
+def check_stamp_cache(app_configs, **kwargs):
+    """Белгилер locmem'де болсо, бир воркердеги өзгөрүүнү (токен, сырсөз, роль) башкалары TTL бою көрбөйт."""
+    if not enabled() or settings.AUTH_CACHE_ALIAS is None:
+        return []
+    if not isinstance(caches[settings.AUTH_CACHE_ALIAS], LocMemCache):
+        return []
+    return [checks.Warning(
+        "AUTH_CACHE_ALIAS locmem кэшине карайт: бир нече воркерде жокко чыгарылган токен же сырсөз "
+        f"AUTH_CACHE_TTL ({settings.AUTH_CACHE_TTL} сек) бою башка воркерлерде иштей берет.",
+        hint="CACHE_BACKEND=redis же file коюңуз, же бир процесс болсо гана AUTH_CACHE_TTL'ди калтырыңыз.",
+        id='config.W001',
+    )]
+
+
+@checks.register(checks.Tags.security)
+def check_session_cache(app_configs, **kwargs):
+    """Сессия locmem'де болсо, бир воркерде чыгып кеткен (logout, flush, cycle_key) сессия башкаларында калат."""
+    if settings.SESSION_ENGINE not in SESSION_CACHE_ENGINES:
+        return []
+    if not isinstance(caches[settings.SESSION_CACHE_ALIAS], LocMemCache):
+        return []
+    return [checks.Warning(
+        f"SESSION_ENGINE={settings.SESSION_ENGINE} locmem кэшине карайт: бир нече воркерде чыгып кеткен "
+        "сессия башка воркерлердин кэшинде CACHE_TIMEOUT бою иштей берет.",
+        hint="CACHE_BACKEND=redis же file коюңуз, же SESSION_ENGINE=django.contrib.sessions.backends.db.",
+        id='config.W002',
+    )]
+
+
+def _lru(name):
+    if _state[name] is None:
+        _state[name] = LRUCache(settings.AUTH_CACHE_SIZE, settings.AUTH_CACHE_TTL)
+    return _state[name]
+
+
+def clear():
+    for name in _state:
+        if _state[name] is not None:
+            _state[name].clear()
+
+
+# ----- воркерлер аралык белгилер -----
+def _stamp_key(kind, key):
+    return f'auth-cache:{kind}:{key}'
+
+
+def _stamps(*keys):
+    if settings.AUTH_CACHE_ALIAS is None:
+        return {}
+    return caches[settings.AUTH_CACHE_ALIAS].get_many(keys)
+
+
+def _publish(*keys):
+    # Белги TTL жашайт: андан эски жергиликтүү жазуулар баары бир мөөнөтү бүтүп чыгат
+    if settings.AUTH_CACHE_ALIAS is not None:
+        stamp = os.urandom(8).hex()
+        caches[settings.AUTH_CACHE_ALIAS].set_many(dict.fromkeys(keys, stamp), settings.AUTH_CACHE_TTL)
+
+
+# ----- снимоктор -----
+def _snapshot(instance):
+    return tuple(getattr(instance, field.attname) for field in instance._meta.concrete_fields)
+
+
+def _restore(model, db, values):
+    """Ар бир сурамга жаңы объект: view request.user'ди өзгөртсө да кэш бузулбайт."""
+    return model.from_db(db, [field.attname for field in model._meta.concrete_fields], values)
+
+
+def _peek(name, lookup, stamp_key):
+    """(белги, (db, маанилер) же None). Белги базадан окулганга чейин алынат: ортодо жарыяланган белги
+    кийинки сурамда жазууну эскиртет. Белгилер кэши синхрондуу окулат - locmem/redis'те бир нече мкс."""
+    stamp = _stamps(stamp_key).get(stamp_key)
+    entry = _lru(name).get(lookup)
+    if entry is not None and entry[0] == stamp:
+        AUTH_CACHE_REQUESTS.inc(kind=name, result='hit')
+        return stamp, entry[1]
+    AUTH_CACHE_REQUESTS.inc(kind=name, result='miss')
+    return stamp, None
+
+
+def _store(name, lookup, stamp, instance):
+    if instance is None:
+        return None
+    found = (instance._state.db, _snapshot(instance))
+    _lru(name).set(lookup, (stamp, found))
+    return found
+
+
+def _user(found):
+    return _restore(get_user_model(), *found) if found is not None else None
+
+
+def _load_user(user_id):
+    return get_user_model()._default_manager.filter(pk=user_id).first()
+
+
+async def _aload_user(user_id):
+    return await get_user_model()._default_manager.filter(pk=user_id).afirst()
+
+
+def cached_user(user_id, load=_load_user):
+    """user_id боюнча колдонуучу же None. load(user_id) - кэште жок болсо базадан окуйт."""
+    if not enabled():
+        return load(user_id)
+    stamp, found = _peek('users', user_id, _stamp_key('users', user_id))
+    if found is None:
+        found = _store('users', user_id, stamp, load(user_id))
+    return _user(found)
+
+
+async def acached_user(user_id, load=_aload_user):
+    """cached_user'дин async версиясы: load - корутина кайтарат."""
+    if not enabled():
+        return await load(user_id)
+    stamp, found = _peek('users', user_id, _stamp_key('users', user_id))
+    if found is None:
+        found = _store('users', user_id, stamp, await load(user_id))
+    return _user(found)
+
+
+def _with_user(found, user):
+    if found is None or user is None:
+        return None
+    token = _restore(Token, *found)
+    token.user = user
+    return user, token
+
+
+def cached_token(key):
+    """Токен ачкычы -> (колдонуучу, токен) же None. Колдонуучу cached_user аркылуу (ошол эле жазуу)."""
+    if not enabled():
+        token = Token.objects.select_related('user').filter(key=key).first()
+        return (token.user, token) if token is not None else None
+    stamp, found = _peek('tokens', key, _stamp_key('tokens', key))
+    if found is None:
+        found = _store('tokens', key, stamp, Token.objects.filter(key=key).first())
+    if found is None:
+        return None
+    return _with_user(found, cached_user(found[1][_TOKEN_USER]))
+
+
+async def acached_token(key):
+    """cached_token'дун async версиясы (config/async_views.py)."""
+    if not enabled():
+        token = await Token.objects.select_related('user').filter(key=key).afirst()
+        return (token.user, token) if token is not None else None
+    stamp, found = _peek('tokens', key, _stamp_key('tokens', key))
+    if found is None:
+        found = _store('tokens', key, stamp, await Token.objects.filter(key=key).afirst())
+    if found is None:
+        return None
+    return _with_user(found, await acached_user(found[1][_TOKEN_USER]))
+
+
+# ===================
+# DJANGO ЖАНА DRF АУТЕНТИФИКАЦИЯСЫ
+# ===================
+class CachedModelBackend(ModelBackend):
+    """ModelBackend, бирок сессиядагы колдонуучу (ар бир сурамда) кэштен. Кирүү (authenticate) өзгөрбөйт."""
+
+    def get_user(self, user_id):
+        user = cached_user(user_id)
+        return user if user is not None and self.user_can_authenticate(user) else None
+
+    async def aget_user(self, user_id):
+        user = await acached_user(user_id)
+        return user if user is not None and self.user_can_authenticate(user) else None
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """DRF TokenAuthentication: `Authorization: Token ...` кэш аркылуу, каталары ошол эле."""
+
+    def authenticate_credentials(self, key):
+        found = cached_token(key)
+        if found is None:
+            raise exceptions.AuthenticationFailed(_('Invalid token.'))
+        if not found[0].is_active:
+            raise exceptions.AuthenticationFailed(_('User inactive or deleted.'))
+        return found
+
+
+# ===================
+# ЖАРАКСЫЗ КЫЛУУ (config/signals.py)
+# ===================
+def _drop(name, key):
+    if _state[name] is not None:
+        _state[name].pop(key)
+    _publish(_stamp_key(name, key))
+
+
+def invalidate(name, key):
+    """name: 'users' | 'tokens'. Азыр жана commit'тен кийин дагы бир жолу: транзакция бүткөнчө эски
+    маалыматты окуган сурам аны кайра кэштесе да, commit'тен кийинки белги аны эскиртет."""
+    _drop(name, key)
+    transaction.on_commit(partial(_drop, name, key))
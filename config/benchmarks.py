@@ -0,0 +1,105 @@
+import random
+import statistics
+import time
+from contextlib import contextmanager
+
+from django.db import transaction
+
+# Бенчмарктар үчүн кыргыз/орус сөздөрү
+WORDS = (
+    "электрик сантехник тазалоо оңдоо зым розетка кран түтүк эшик терезе боёо шыбак "
+    "ремонт уборка электрика сантехника покраска монтаж замена установка диагностика "
+    "кондиционер жылытуу газ котел плитка паркет люстра счетчик канализация чатыр"
+).split()
+SYLLABLES = "ка ла ма на ра та са бе ге де ке ле ме не ре те зы кы мы ны ры ты ду ку лу му ну ру ту бо го до ко".split()
+
+
+class _Rollback(Exception):
+    pass
+
+
+@contextmanager
+def scratch_transaction():
+    """Блоктун ичинде түзүлгөн маалыматтар аягында өчүрүлөт (ROLLBACK)."""
+    try:
+        with transaction.atomic():
+            yield
+            raise _Rollback
+    except _Rollback:
+        pass
+
+
+@contextmanager
+def explicit_timestamps(model, *fields):
+    """auto_now/auto_now_add талааларына bulk_create'те өз маанилерибизди жазууга уруксат берет.
+
+    bulk_update менен кайра жазгандан алда канча арзан (миллиондогон сапта маанилүү). Бир агымдуу
+    management командалары үчүн гана - талаанын абалы процесс боюнча жалпы.
+    """
+    saved = [(field, field.auto_now, field.auto_now_add) for field in map(model._meta.get_field, fields)]
+    for field, _, _ in saved:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def random_word(rng):
+    # Реалдуу тексттегидей: белгилүү сөздөр сейрек, калганы кокус муундардан түзүлөт
+    if rng.random() < 0.05:
+        return rng.choice(WORDS)
+    return ''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+
+
+def random_text(rng, words):
+    return ' '.join(random_word(rng) for _ in range(words))
+
+
+def make_rng(seed=42):
+    return random.Random(seed)
+
+
+def measure(func, repeat):
+    """func'ту repeat жолу чакырып, ар биринин узактыгын (секунд) кайтарат."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(samples):
+    """Миллисекунддагы жыйынтык: mean, p50, p95, p99."""
+    return {
+        'mean_ms': statistics.fmean(samples) * 1000,
+        'p50_ms': percentile(samples, 50) * 1000,
+        'p95_ms': percentile(samples, 95) * 1000,
+        'p99_ms': percentile(samples, 99) * 1000,
+    }
+
+
+def compare_results(baseline, current, threshold=0.2, metric='p50_ms', floor_ms=1.0):
+    """Базалык натыйжа менен салыштырат: metric threshold'дон көп жайласа же SQL сурамдар көбөйсө - регрессия.
+
+    floor_ms: мындан кичине айырма ызы-чуу катары эсептелет. (ачкыч, метрика, мурун, азыр) тизмесин кайтарат.
+    """
+    regressions = []
+    for key, result in current.items():
+        before = baseline.get(key)
+        if before is None:
+            continue
+        if result[metric] > before[metric] * (1 + threshold) and result[metric] - before[metric] > floor_ms:
+            regressions.append((key, metric, before[metric], result[metric]))
+        if result.get('queries') is not None and before.get('queries') is not None \
+                and result['queries'] > before['queries']:
+            regressions.append((key, 'queries', before['queries'], result['queries']))
+    return regressions
@@ -0,0 +1,207 @@
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+from .metrics import CACHE_REQUESTS
+from .models import Order
+
+# ===================
+# DASHBOARD КЭШИ
+# ===================
+# Ачкычтар версиялуу: dashboard<формат>:<аталыш>:<роль>:<чөйрө>:v<чөйрөнүн версиясы>.<каталогдун версиясы>
+# Заказ өзгөргөндө анын чөйрөлөрүнүн (all, building:<id>, user:<id>) гана версиясы көбөйөт - калган
+# имараттардын кэши тийбейт. Эски ачкычтар өчүрүлбөйт, TTL менен өзү чыгып кетет.
+#
+# Версиялар фрагменттер менен бир кэште - кысылганда (MAX_ENTRIES) же TTL'де чыгып кетиши мүмкүн. Жок
+# версия 0'дөн же 1'ден эмес, time.time_ns()'тен башталат: эски версиядагы фрагмент кайра "жанбайт".
+#
+# Эскертүү: locmem ар бир процесске өзүнчө - бир нече воркерде CACHE_BACKEND=file же redis колдонуңуз,
+# антпесе бир процесстеги жазуу башка процесстердин кэшин жаңыртпайт.
+
+KEY_FORMAT = 2  # маанилердин түзүлүшү өзгөргөндө көбөйөт (2: order_rows = (SSE курсору, html))
+CATALOG_SCOPE = 'catalog'  # Имарат/кызмат аталыштары - бардык фрагменттерге таасир этет
+STATS_NAMES = ('order_rows', 'orders')
+
+
+def get_cache():
+    return caches[settings.DASHBOARD_CACHE_ALIAS]
+
+
+def dashboard_scope(user):
+    """dashboard view'дагыдай (is_staff эске алынбайт): админ - бардыгы, менеджер - өз имараты,
+    калгандар - өз заказдары."""
+    if user.role == 'ADMIN':
+        return 'all'
+    if user.role == 'MANAGER':
+        return f'building:{user.managed_building_id}'
+    return f'user:{user.pk}'
+
+
+def scope_filter(scope):
+    if scope == 'all':
+        return {}
+    kind, value = scope.split(':')
+    return {f'{kind}_id': None if value == 'None' else int(value)}
+
+
+def order_scopes(building_id, user_id):
+    return {'all', f'building:{building_id}', f'user:{user_id}'}
+
+
+def _version_key(scope):
+    return f'dashboard-ver:{scope}'
+
+
+def _stats_key(name, outcome):
+    return f'dashboard-stats:{name}:{outcome}'
+
+
+def _incr(cache, key, start=1):
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # Ачкыч жок (же TTL менен чыгып кеткен) - биринчи жолу түзүлөт
+        if not cache.add(key, start, None):
+            return cache.incr(key)
+        return start
+
+
+async def _aincr(cache, key, start=1):
+    try:
+        return await cache.aincr(key)
+    except ValueError:
+        if not await cache.aadd(key, start, None):
+            return await cache.aincr(key)
+        return start
+
+
+def _versions(cache, keys):
+    versions = cache.get_many(keys)
+    missing = [key for key in keys if key not in versions]
+    if missing:
+        # add() - башка процесс ошол эле учурда түзсө, анын мааниси калат
+        for key in missing:
+            cache.add(key, time.time_ns(), None)
+        versions.update(cache.get_many(missing))
+    return versions
+
+
+async def _aversions(cache, keys):
+    versions = await cache.aget_many(keys)
+    missing = [key for key in keys if key not in versions]
+    if missing:
+        for key in missing:
+            await cache.aadd(key, time.time_ns(), None)
+        versions.update(await cache.aget_many(missing))
+    return versions
+
+
+def _format_key(name, user, scope, versions):
+    return 'dashboard{}:{}:{}:{}:v{}.{}'.format(
+        KEY_FORMAT, name, user.role, scope,
+        versions.get(_version_key(scope), 0), versions.get(_version_key(CATALOG_SCOPE), 0),
+    )
+
+
+def cache_key(name, user):
+    scope = dashboard_scope(user)
+    return _format_key(name, user, scope, _versions(get_cache(), [_version_key(scope), _version_key(CATALOG_SCOPE)]))
+
+
+async def acache_key(name, user):
+    scope = dashboard_scope(user)
+    versions = await _aversions(get_cache(), [_version_key(scope), _version_key(CATALOG_SCOPE)])
+    return _format_key(name, user, scope, versions)
+
+
+def cached_for_user(name, user, compute):
+    """compute() натыйжасын колдонуучунун чөйрөсү боюнча кэштейт жана hit/miss эсептейт."""
+    cache = get_cache()
+    key = cache_key(name, user)
+    value = cache.get(key)
+    if value is None:
+        _incr(cache, _stats_key(name, 'misses'))
+        CACHE_REQUESTS.inc(name=name, result='miss')
+        value = compute()
+        cache.set(key, value, settings.DASHBOARD_CACHE_TIMEOUT)
+    else:
+        _incr(cache, _stats_key(name, 'hits'))
+        CACHE_REQUESTS.inc(name=name, result='hit')
+    return value
+
+
+async def acached_for_user(name, user, compute):
+    """cached_for_user'дин async версиясы: compute - корутина кайтарган функция."""
+    cache = get_cache()
+    key = await acache_key(name, user)
+    value = await cache.aget(key)
+    if value is None:
+        await _aincr(cache, _stats_key(name, 'misses'))
+        CACHE_REQUESTS.inc(name=name, result='miss')
+        value = await compute()
+        await cache.aset(key, value, settings.DASHBOARD_CACHE_TIMEOUT)
+    else:
+        await _aincr(cache, _stats_key(name, 'hits'))
+        CACHE_REQUESTS.inc(name=name, result='hit')
+    return value
+
+
+def _dashboard_rows(user):
+    return (Order.objects.filter(**scope_filter(dashboard_scope(user)))
+            .order_by('-created_at', '-id')
+            .values('id', 'status', 'building__name', 'service__name'))
+
+
+def dashboard_orders(user):
+    """Dashboard таблицасынын саптары (сөздүктөр) - building/service аталыштары бир JOIN менен."""
+    return cached_for_user('orders', user, lambda: list(_dashboard_rows(user)))
+
+
+async def adashboard_orders(user):
+    async def compute():
+        return [row async for row in _dashboard_rows(user)]
+    return await acached_for_user('orders', user, compute)
+
+
+# ===================
+# ИНВАЛИДАЦИЯ
+# ===================
+def invalidate_scopes(scopes):
+    """Транзакция commit болгондон кийин версияларды көбөйтөт - эски маалымат жаңы ачкычка жазылбайт."""
+    scopes = set(scopes)
+
+    def bump():
+        cache = get_cache()
+        for scope in scopes:
+            _incr(cache, _version_key(scope), start=time.time_ns())
+
+    transaction.on_commit(bump)
+
+
+def invalidate_order(building_id, user_id):
+    invalidate_scopes(order_scopes(building_id, user_id))
+
+
+def invalidate_catalog():
+    invalidate_scopes([CATALOG_SCOPE])
+
+
+# ===================
+# СТАТИСТИКА
+# ===================
+def cache_stats():
+    cache = get_cache()
+    values = cache.get_many([_stats_key(name, outcome) for name in STATS_NAMES for outcome in ('hits', 'misses')])
+    stats = {}
+    for name in STATS_NAMES:
+        hits = values.get(_stats_key(name, 'hits'), 0)
+        misses = values.get(_stats_key(name, 'misses'), 0)
+        total = hits + misses
+        stats[name] = {'hits': hits, 'misses': misses, 'hit_ratio': round(hits / total, 4) if total else None}
+    return stats
+
+
+def reset_cache_stats():
+    get_cache().delete_many([_stats_key(name, outcome) for name in STATS_NAMES for outcome in ('hits', 'misses')])
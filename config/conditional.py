@@ -0,0 +1,123 @@
+import hashlib
+from functools import wraps
+from inspect import iscoroutinefunction
+
+from asgiref.sync import sync_to_async
+from django.contrib.messages import get_messages
+from django.db.models import F
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+from django.views.decorators.http import condition
+
+from .models import CatalogVersion
+
+
+# ===================
+# ВЕРСИЯЛАР
+# ===================
+# Ар бир каталог таблицасынын (building, category, service) версиясы CatalogVersion'до сакталат.
+# Версия маалымат менен бир транзакцияда көбөйөт, ошондуктан бир нече процессте да ETag туура болот,
+# өчүрүү да эске алынат (max(updated_at) өчүрүлгөн сапты көрбөйт).
+def bump_catalog_version(*names):
+    now = timezone.now()
+    updated = CatalogVersion.objects.filter(name__in=names).update(version=F('version') + 1, changed_at=now)
+    if updated < len(names):
+        for name in names:
+            CatalogVersion.objects.get_or_create(name=name, defaults={'version': 1, 'changed_at': now})
+
+
+def _has_pending_messages(request):
+    # Билдирүүлөр бир жолу көрсөтүлөт - алар бар болсо 304 кайтарылбайт (len() аларды "окулду" деп белгилебейт)
+    return len(get_messages(request)) > 0
+
+
+def catalog_validators(request, names, extra=()):
+    """(etag, last_modified) - payload сериализацияланбай, бир кичине сурам менен. Сурамда бир жолу эсептелет."""
+    memo = request.__dict__.setdefault('_catalog_validators', {})
+    key = (tuple(names), tuple(extra))
+    if key not in memo:
+        if _has_pending_messages(request):
+            memo[key] = (None, None)
+        else:
+            rows = list(CatalogVersion.objects.filter(name__in=names).order_by('name')
+                        .values_list('name', 'version', 'changed_at'))
+            # Барак колдонуучуга жана CSRF токенине да көз каранды (base.html)
+            variant = (request.user.pk, request.META.get('CSRF_COOKIE', ''))
+            raw = repr(([(name, version) for name, version, _ in rows], tuple(extra), variant))
+            last_modified = max((changed_at for _, _, changed_at in rows), default=None)
+            memo[key] = ('"%s"' % hashlib.md5(raw.encode()).hexdigest(), last_modified)
+    return memo[key]
+
+
+# ===================
+# HTTP БАШ САПТАРЫ
+# ===================
+def patch_catalog_headers(request, response):
+    """Жооп колдонуучуга тиешелүү: жеке кэште сакталат, бирок ар бир жолу валидатор менен текшерилет."""
+    if request.method in ('GET', 'HEAD'):
+        patch_cache_control(response, private=True, no_cache=True)
+        # Токен менен кирген клиенттин жообу Authorization'го, браузердики сессия cookie'сине көз каранды
+        patch_vary_headers(response, ['Authorization'] if 'HTTP_AUTHORIZATION' in request.META else ['Cookie'])
+    return response
+
+
+def catalog_condition(*names):
+    """HTML view'лор үчүн: Django'нун condition() декоратору + Cache-Control/Vary. Async view'лорду да колдойт."""
+    def decorator(view):
+        conditional_view = condition(
+            etag_func=lambda request, *args, **kwargs: catalog_validators(request, names)[0],
+            last_modified_func=lambda request, *args, **kwargs: catalog_validators(request, names)[1],
+        )(view)
+
+        if iscoroutinefunction(view):
+            @wraps(view)
+            async def ainner(request, *args, **kwargs):
+                # condition() валидаторлорду синхрондуу чакырат - алдын ала эсептелип, request'те сакталат
+                await sync_to_async(catalog_validators)(request, names)
+                return patch_catalog_headers(request, await conditional_view(request, *args, **kwargs))
+            return ainner
+
+        @wraps(view)
+        def inner(request, *args, **kwargs):
+            return patch_catalog_headers(request, conditional_view(request, *args, **kwargs))
+        return inner
+    return decorator
+
+
+def not_modified(request, etag, last_modified):
+    """(304 жооп же None, timestamp) - If-None-Match / If-Modified-Since текшерүүсү."""
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+    return get_conditional_response(request, etag=etag, last_modified=timestamp), timestamp
+
+
+def set_validators(response, etag, timestamp):
+    if etag and response.status_code in (200, 304):
+        response.headers.setdefault('ETag', etag)
+        if timestamp:
+            response.headers.setdefault('Last-Modified', http_date(timestamp))
+    return response
+
+
+# ===================
+# VIEWSET MIXIN
+# ===================
+class ConditionalGetMixin:
+    """list/retrieve: If-None-Match / If-Modified-Since дал келсе, 304 Not Modified (queryset аткарылбайт)."""
+
+    catalog_tables = ()
+
+    def conditional_response(self, request, handler, *args, **kwargs):
+        # JSON жана browsable API жооптору ар башка
+        etag, last_modified = catalog_validators(request, self.catalog_tables,
+                                                 extra=(request.accepted_renderer.format,))
+        response, timestamp = not_modified(request, etag, last_modified)
+        if response is None:
+            response = handler(request, *args, **kwargs)
+        return patch_catalog_headers(request, set_validators(response, etag, timestamp))
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(request, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(request, super().retrieve, *args, **kwargs)
@@ -0,0 +1,137 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core import checks
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import connections
+
+REPLICA_ALIAS = 'replica'
+
+# Учурдагы сурам репликадан окуй алабы (view тарабынан коюлат)
+_use_replica = ContextVar('use_replica', default=False)
+
+
+def replica_configured():
+    # Реплика негизги база менен бир эле базага караса (мис. тесттердеги TEST MIRROR), өзүнчө туташуунун кереги жок
+    if REPLICA_ALIAS not in settings.DATABASES:
+        return False
+    replica, primary = connections[REPLICA_ALIAS].settings_dict, connections['default'].settings_dict
+    return (replica['NAME'], replica.get('HOST')) != (primary['NAME'], primary.get('HOST'))
+
+
+@contextmanager
+def replica_reads(enabled=True):
+    """Блоктун ичиндеги окуулар репликага кетет (эгер конфигурацияланган болсо)."""
+    token = _use_replica.set(enabled)
+    try:
+        yield
+    finally:
+        _use_replica.reset(token)
+
+
+# ===================
+# READ-YOUR-WRITES
+# ===================
+def _pin_key(user_id):
+    return f'db-pin:{user_id}'
+
+
+def pin_to_primary(user):
+    """Жазуудан кийин колдонуучунун окуулары бир аз убакыт негизги базадан болот (репликанын кечигүүсү)."""
+    if user is not None and user.is_authenticated:
+        cache.set(_pin_key(user.pk), True, settings.DATABASE_REPLICA_PIN_SECONDS)
+
+
+def is_pinned(user):
+    return user is not None and user.is_authenticated and cache.get(_pin_key(user.pk)) is not None
+
+
+async def apin_to_primary(user):
+    if user is not None and user.is_authenticated:
+        await cache.aset(_pin_key(user.pk), True, settings.DATABASE_REPLICA_PIN_SECONDS)
+
+
+@checks.register(checks.Tags.caches)
+def check_pin_cache(app_configs, **kwargs):
+    """Бекитүү демейки кэште: ал воркерлерге жалпы болбосо, жазуудан кийинки окуу башка воркерде репликадан."""
+    if not replica_configured() or not isinstance(caches['default'], (LocMemCache, DummyCache)):
+        return []
+    return [checks.Error(
+        "Реплика конфигурацияланган, бирок демейки кэш воркерлерге жалпы эмес: жазуудан кийинки бекитүү "
+        "(ReplicaPinMiddleware) башка воркерлерде көрүнбөйт, колдонуучу өзүнүн жазуусун көрбөй калат.",
+        hint="CACHE_BACKEND=redis же file коюңуз.",
+        id='config.E001',
+    )]
+
+
+class ReplicaPinMiddleware:
+    """Ийгиликтүү POST/PUT/PATCH/DELETE'тен кийин колдонуучуну негизги базага бекитет."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    @staticmethod
+    def should_pin(request, response):
+        return request.method not in ('GET', 'HEAD', 'OPTIONS') and response.status_code < 400 and replica_configured()
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        response = self.get_response(request)
+        if self.should_pin(request, response):
+            pin_to_primary(getattr(request, 'user', None))
+        return response
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        if self.should_pin(request, response) and hasattr(request, 'auser'):
+            # request.user'дин lazy объекти async'те базага бара албайт
+            await apin_to_primary(await request.auser())
+        return response
+
+
+# ===================
+# РОУТЕР
+# ===================
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if _use_replica.get() and replica_configured():
+            return REPLICA_ALIAS
+        return 'default'
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Реплика негизги базанын көчүрмөсү - байланыштар бир эле маалыматка тиешелүү
+        return True
+
+
+class ReplicaReadMixin:
+    """ViewSet'тин окуу гана аракеттери (list/retrieve) репликадан окуйт.
+
+    Колдонуучу жакында жазуу жасаган болсо (is_pinned), окуу негизги базадан болот.
+    """
+
+    replica_actions = ('list', 'retrieve')
+
+    def dispatch(self, request, *args, **kwargs):
+        # Ката болсо да (finalize_response чакырылбаса да) белги кийинки сурамга өтпөйт
+        token = _use_replica.set(False)
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        finally:
+            _use_replica.reset(token)
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        _use_replica.set(self.action in self.replica_actions and not is_pinned(request.user))
@@ -0,0 +1,108 @@
+import csv
+import json
+from datetime import datetime, timedelta
+
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from .models import Order, OrderHistory, order_scope
+
+CHUNK_SIZE = 2000
+
+ORDER_COLUMNS = (
+    'id', 'created_at', 'date', 'time', 'status', 'user_id', 'user__username',
+    'service_id', 'service__name', 'building_id', 'building__name', 'comment',
+)
+HISTORY_COLUMNS = (
+    'id', 'order_id', 'old_status', 'new_status', 'changed_by_id', 'changed_by__username', 'change_date',
+    'order__building_id',
+)
+FORMATS = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+class ExportError(ValueError):
+    pass
+
+
+# ===================
+# QUERYSET'ТЕР
+# ===================
+def export_queryset(dataset, user=None, building=None, status=None, date_from=None, date_to=None):
+    """Жалпак кортеждерди (values_list) кайтарат. user берилсе, OrderViewSet сыяктуу ролго жараша чектелет."""
+    if dataset == 'orders':
+        queryset, columns, prefix = Order.objects.all(), ORDER_COLUMNS, ''
+        date_field, status_field = 'created_at', 'status'
+    elif dataset == 'history':
+        queryset, columns, prefix = OrderHistory.objects.all(), HISTORY_COLUMNS, 'order__'
+        date_field, status_field = 'change_date', 'new_status'
+    else:
+        raise ExportError(f"Белгисиз маалымат топтому: {dataset}")
+
+    if user is not None:
+        queryset = queryset.filter(order_scope(user, prefix))
+    filters = {}
+    if building:
+        try:
+            filters[f'{prefix}building_id'] = int(building)
+        except (TypeError, ValueError):
+            raise ExportError(f"Имарат туура эмес: {building}") from None
+    if status:
+        filters[status_field] = status
+    # __date ордуна күндүн чектери колдонулат - мамычадагы индекс иштей берет
+    for lookup, raw, shift in (('gte', date_from, 0), ('lt', date_to, 1)):
+        if raw:
+            try:
+                # parse_date: формат туура эмес - None, жок күн (2026-02-30) - ValueError
+                value = raw if hasattr(raw, 'year') else parse_date(str(raw))
+            except ValueError:
+                value = None
+            if value is None:
+                raise ExportError(f"Дата туура эмес: {raw}")
+            start = datetime.combine(value + timedelta(days=shift), datetime.min.time())
+            filters[f'{date_field}__{lookup}'] = timezone.make_aware(start)
+    # id боюнча ирет - индекс колдонулат жана натыйжа туруктуу болот
+    return queryset.filter(**filters).order_by('id').values_list(*columns), columns
+
+
+# ===================
+# ФОРМАТТАР
+# ===================
+def _plain(value):
+    if value is None:
+        return ''
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return value
+
+
+class _Echo:
+    """csv.writer үчүн: жазылган сапты буферге сактабай, ошол замат кайтарат."""
+
+    def write(self, value):
+        return value
+
+
+def iter_csv(rows, columns):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(columns)
+    for row in rows:
+        yield writer.writerow([_plain(value) for value in row])
+
+
+def iter_ndjson(rows, columns):
+    dumps = json.JSONEncoder(ensure_ascii=False).encode
+    for row in rows:
+        yield dumps({column: (value.isoformat() if hasattr(value, 'isoformat') else value)
+                     for column, value in zip(columns, row)}) + '\n'
+
+
+def iter_export(fmt, queryset, columns, chunk_size=CHUNK_SIZE):
+    """Сервер тараптагы курсор (.iterator) аркылуу саптарды бөлүк-бөлүк агым катары чыгарат."""
+    if fmt not in FORMATS:
+        raise ExportError(f"Белгисиз формат: {fmt}")
+    rows = queryset.iterator(chunk_size=chunk_size)
+    encoder = iter_csv if fmt == 'csv' else iter_ndjson
+    return encoder(rows, columns)
@@ -0,0 +1,213 @@
+from functools import lru_cache, partial
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+from rest_framework.renderers import JSONRenderer
+from rest_framework.settings import api_settings
+
+from .images import DerivativeIndex
+from .querysets import _model_field
+from .serializers import DisplayField, FormatField, ImageSrcsetField
+
+try:
+    import orjson
+except ImportError:  # DRF'тин json.dumps'у - натыйжа ошол эле, жайыраак
+    orjson = None
+
+# ===================
+# ТИЗМЕЛЕР ҮЧҮН ТЕЗ СЕРИАЛИЗАЦИЯ
+# ===================
+# ModelSerializer ар бир сапка модель объекти, ар бир талаага get_attribute + to_representation чакырат.
+# Тизмелерде (list) анын ордуна serializer классы бир жолу Python функциясына "компиляцияланат":
+# queryset.values_list(...) кортежи -> dict, талаалардын ирети жана маанилери DRF'тикиндей (байт-байтына бирдей
+# JSON - тесттер текшерет). Көпчүлүк талаалар (int, str, bool, float, choice, FK id) кортежден түз алынат,
+# калгандары (дата, Decimal ...) ошол эле DRF талаасынын to_representation'у аркылуу.
+#
+# Колдоого алынбаган serializer (SerializerMethodField, source='a.b', көп байланыштар ...) кадимки жол менен
+# иштейт - compile_serializer None кайтарат.
+
+# Кортеждеги маани DRF'тин to_representation'унан өзгөрбөй чыгат (str -> str(v), int -> int(v) ж.б.)
+IDENTITY_FIELDS = (
+    serializers.IntegerField, serializers.CharField, serializers.EmailField, serializers.SlugField,
+    serializers.URLField, serializers.FloatField, serializers.BooleanField, serializers.ReadOnlyField,
+)
+
+
+class Unsupported(Exception):
+    pass
+
+
+def _same(value):
+    return value
+
+
+def _iso_datetime(value, tz):
+    # DateTimeField.to_representation (ISO 8601) - убакыт алкагы ар бир маани үчүн эмес, бетке бир жолу алынат
+    value = value.astimezone(tz).isoformat()
+    return value[:-6] + 'Z' if value.endswith('+00:00') else value
+
+
+class CompiledSerializer:
+    """columns: values_list'ке жолдор; function(row, srcsets, absolute, tz) -> dict; sources: srcset мамычалары."""
+
+    def __init__(self, columns, function, sources):
+        self.columns = columns
+        self.function = function
+        self.sources = sources
+
+    def rows(self, queryset, extra=()):
+        """Сериализацияга керек мамычалар + extra (мис. курсордун талаалары) - аттуу кортеждер."""
+        names = list(self.columns)
+        names += [name for name in (*extra, *queryset.query.extra_select) if name not in names]
+        return queryset.prefetch_related(None).values_list(*names, named=True)
+
+    def serialize(self, rows, request=None):
+        build_url = request.build_absolute_uri if request is not None else None
+        srcsets = None
+        if self.sources:
+            # SrcsetListSerializer'дегидей: беттеги бардык сүрөттөрдүн көчүрмөлөрү бир сурам менен
+            index = DerivativeIndex(row[position] for row in rows for position in self.sources)
+            srcsets = partial(index.srcsets, build_url=build_url)
+        function, absolute, tz = self.function, build_url or _same, timezone.get_current_timezone()
+        return [function(row, srcsets, absolute, tz) for row in rows]
+
+
+class _Compiler:
+    def __init__(self):
+        self.columns = []
+        self.namespace = {}
+        self.sources = []
+
+    def column(self, path):
+        if path not in self.columns:
+            self.columns.append(path)
+        return f'row[{self.columns.index(path)}]'
+
+    def bind(self, value):
+        name = f'_f{len(self.namespace)}'
+        self.namespace[name] = value
+        return name
+
+    def serializer(self, serializer, prefix=''):
+        model = serializer.Meta.model
+        items = [f'{name!r}: {self.field(field, model, prefix)}'
+                 for name, field in serializer.fields.items() if not field.write_only]
+        return '{' + ', '.join(items) + '}'
+
+    def field(self, field, model, prefix):
+        columns = getattr(field, 'columns', None)
+        if columns:
+            # Модельдин @property'си: талаа кайсы мамычаларды окуй турганын өзү билдирет
+            values = ', '.join(self.column(prefix + name) for name in columns)
+            return f'{self.bind(field.from_columns)}({values})'
+        if field.source == '*' or '.' in field.source:
+            raise Unsupported(field.field_name)
+        model_field = _model_field(model, field.source)
+        if model_field is None or not model_field.concrete or model_field.many_to_many:
+            raise Unsupported(field.field_name)
+
+        if isinstance(field, serializers.BaseSerializer):
+            if not isinstance(field, serializers.ModelSerializer) or not model_field.is_relation:
+                raise Unsupported(field.field_name)
+            key = self.column(prefix + field.source)
+            return f'(None if {key} is None else {self.serializer(field, f"{prefix}{field.source}__")})'
+
+        value = self.column(prefix + field.source)
+        if isinstance(field, ImageSrcsetField):
+            self.sources.append(self.columns.index(prefix + field.source))
+            return f'(srcsets({value}) if {value} else None)'
+        if isinstance(field, serializers.FileField):
+            if not getattr(field, 'use_url', api_settings.UPLOADED_FILES_USE_URL):
+                return f'({value} or None)'
+            return f'(absolute({self.bind(model_field.storage.url)}({value})) if {value} else None)'
+        if isinstance(field, serializers.PrimaryKeyRelatedField) and field.pk_field is None:
+            return value
+        if model_field.is_relation:
+            raise Unsupported(field.field_name)
+
+        if type(field) in IDENTITY_FIELDS or (
+                type(field) is serializers.ChoiceField and all(isinstance(key, str) for key in field.choices)):
+            return value
+        if type(field) is serializers.BigIntegerField and not getattr(
+                field, 'coerce_to_string', getattr(api_settings, 'COERCE_BIGINT_TO_STRING', False)):
+            return value
+        if type(field) is serializers.DateTimeField and self.iso_datetime(field):
+            expression = f'{self.bind(_iso_datetime)}({value}, tz)'
+        elif isinstance(field, DisplayField):
+            expression = f'{self.bind(field.labels.get)}({value}, {value})'
+        elif isinstance(field, FormatField):
+            expression = f'{self.bind(field.template.format)}({value})'
+        else:
+            expression = f'{self.bind(field.to_representation)}({value})'
+        return f'(None if {value} is None else {expression})' if model_field.null else expression
+
+    @staticmethod
+    def iso_datetime(field):
+        # Базадан aware datetime келет (USE_TZ), талаанын өз убакыт алкагы жок
+        output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+        return (settings.USE_TZ and not hasattr(field, 'timezone') and isinstance(output_format, str)
+                and output_format.lower() == ISO_8601)
+
+
+@lru_cache(maxsize=None)
+def compile_serializer(serializer_class):
+    """Serializer классы -> CompiledSerializer (бир жолу), колдоого алынбаса None."""
+    compiler = _Compiler()
+    try:
+        body = compiler.serializer(serializer_class())
+    except Unsupported:
+        return None
+    source = f'def row_to_dict(row, srcsets, absolute, tz):\n    return {body}\n'
+    exec(compile(source, f'<{serializer_class.__name__} fast path>', 'exec'), compiler.namespace)
+    return CompiledSerializer(tuple(compiler.columns), compiler.namespace['row_to_dict'], tuple(compiler.sources))
+
+
+# ===================
+# VIEWSET MIXIN
+# ===================
+class FastListMixin:
+    """list: JSON сурамдарда компиляцияланган сериализация (API_FAST_SERIALIZERS). Browsable API, колдоого
+    алынбаган serializer же пагинациясыз view - кадимки ListModelMixin.list."""
+
+    def get_compiled_serializer(self, request):
+        if not settings.API_FAST_SERIALIZERS or request.accepted_renderer.format != 'json':
+            return None
+        return compile_serializer(self.get_serializer_class())
+
+    def list(self, request, *args, **kwargs):
+        compiled = self.get_compiled_serializer(request)
+        if compiled is None or self.paginator is None:
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+        # Курсор (KeysetPagination.encode_cursor) саптын ушул талааларын окуйт
+        ordering = self.paginator.get_ordering(self) if hasattr(self.paginator, 'get_ordering') else None
+        extra = [name.lstrip('-') for name in ordering or ()]
+        page = self.paginate_queryset(compiled.rows(queryset, extra))
+        return self.get_paginated_response(compiled.serialize(page, request))
+
+
+# ===================
+# JSON РЕНДЕРЕР
+# ===================
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer'дин натыйжасы, бирок orjson менен (орнотулган болсо). Дата/Decimal ж.б. DRF'тин
+    JSONEncoder'и аркылуу - формат ошол эле; indent, ASCII же NaN сураган учурлар - DRF'тин өзү.
+
+    Айырма: 1e-5'тен кичине же 1e16'дан чоң float'тор экспонента менен башкача жазылат (1e-05 / 1e-5) -
+    API'деги float'тор (rating_avg) 0..5 аралыгында.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (orjson is None or data is None or self.ensure_ascii or not self.compact or not self.strict
+                or self.get_indent(accepted_media_type, renderer_context or {}) is not None):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            content = orjson.dumps(data, default=self.encoder_class().default,
+                                   option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME)
+        except (orjson.JSONEncodeError, TypeError, ValueError):
+            # 64 биттен чоң сандар, NaN ж.б. - DRF ката же туура натыйжа берет
+            return super().render(data, accepted_media_type, renderer_context)
+        # DRF'тегидей: JavaScript'ке коопсуз
+        return content.replace('\u2028'.encode(), b'\\u2028').replace('\u2029'.encode(), b'\\u2029')
+
@@ -0,0 +1,85 @@
+from .models import Order, OrderHistory, Review
+
+# ===================
+# ЫСЫК СУРАМДАР
+# ===================
+# Ар бир сурам view'дөгү чыныгы сурамдын көчүрмөсү. check_query_plans бул тизмедеги ар бир сурамдын
+# EXPLAIN планын текшерет, bench_indexes алардын ылдамдыгын индекс менен жана индекссиз өлчөйт.
+#
+# Ар бир элемент: (аталышы, queryset түзүүчү функция). Функция мисал маанилерди (building_id ж.б.) алат.
+
+
+def manager_dashboard(building_id, **_):
+    # dashboard / OrderViewSet: менеджер өз имаратынын заказдарын көрөт
+    return Order.objects.filter(building_id=building_id).order_by('-created_at')
+
+
+def manager_dashboard_by_status(building_id, status='NEW', **_):
+    return Order.objects.filter(building_id=building_id, status=status).order_by('-created_at')
+
+
+def manager_orders_page(building_id, **_):
+    # /api/orders/ менеджер үчүн - keyset пагинациянын биринчи бети
+    return Order.objects.filter(building_id=building_id).order_by('-created_at', '-id')[:50]
+
+
+def client_orders(user_id, **_):
+    return Order.objects.filter(user_id=user_id).order_by('-created_at')
+
+
+def client_orders_page(user_id, **_):
+    return Order.objects.filter(user_id=user_id).order_by('-created_at', '-id')[:50]
+
+
+def order_history(order_id, **_):
+    # order_detail
+    return OrderHistory.objects.filter(order_id=order_id).order_by('-change_date')
+
+
+def service_reviews(service_id, **_):
+    # service_detail
+    return Review.objects.filter(service_id=service_id).order_by('-created_at')
+
+
+HOT_QUERIES = (
+    ('manager_dashboard', manager_dashboard),
+    ('manager_dashboard_by_status', manager_dashboard_by_status),
+    ('manager_orders_page', manager_orders_page),
+    ('client_orders', client_orders),
+    ('client_orders_page', client_orders_page),
+    ('order_history', order_history),
+    ('service_reviews', service_reviews),
+)
+
+# Индекс колдонбогон толук сканерлөөнү билдирген белгилер
+FULL_SCAN_MARKERS = {
+    'sqlite': lambda line: ' SCAN ' in f' {line} ' and 'SEARCH' not in line,
+    'postgresql': lambda line: 'Seq Scan' in line,
+}
+SORT_MARKERS = {
+    'sqlite': lambda line: 'USE TEMP B-TREE FOR ORDER BY' in line,
+    'postgresql': lambda line: line.lstrip().startswith('->  Sort') or line.lstrip().startswith('Sort '),
+}
+
+
+def explain(queryset):
+    """Сурамдын планын саптар түрүндө кайтарат (PostgreSQL'де seq scan өчүрүлөт - кичине таблицаларда да
+    индекс бар-жогу көрүнсүн)."""
+    from django.db import connections, transaction
+
+    connection = connections[queryset.db]
+    if connection.vendor == 'postgresql':
+        with transaction.atomic(using=queryset.db):
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+            plan = queryset.explain()
+    else:
+        plan = queryset.explain()
+    return plan.splitlines()
+
+
+def check_plan(lines, vendor):
+    """(full_scans, sorts) - пландагы көйгөйлүү саптар."""
+    full_scan = FULL_SCAN_MARKERS.get(vendor, lambda line: False)
+    sort = SORT_MARKERS.get(vendor, lambda line: False)
+    return [line for line in lines if full_scan(line)], [line for line in lines if sort(line)]
@@ -0,0 +1,146 @@
+import hashlib
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.urls import reverse
+from PIL import Image, ImageOps, features
+
+from .models import ImageDerivative
+
+# ===================
+# ФОРМАТТАР ЖАНА ӨЛЧӨМДӨР
+# ===================
+# Браузер тандай турган тартипте: эң кичинеси биринчи (<picture> ичиндеги <source> ирети)
+FORMATS = {
+    'avif': {'pil': 'AVIF', 'mime': 'image/avif', 'feature': 'avif'},
+    'webp': {'pil': 'WEBP', 'mime': 'image/webp', 'feature': 'webp'},
+}
+
+
+def enabled_formats():
+    """Pillow колдогон форматтар гана (AVIF үчүн libavif керек)."""
+    return tuple(fmt for fmt in settings.IMAGE_DERIVATIVE_FORMATS
+                 if fmt in FORMATS and features.check(FORMATS[fmt]['feature']))
+
+
+def widths():
+    return tuple(sorted(settings.IMAGE_DERIVATIVE_WIDTHS))
+
+
+# Көчүрмө ушул папкалардагы жүктөлгөн сүрөттөр үчүн гана түзүлөт (upload_to)
+SOURCE_DIRS = ('services/', 'categories/', 'buildings/')
+
+
+def is_source(name):
+    return bool(name) and name.startswith(SOURCE_DIRS) and '..' not in name
+
+
+# ===================
+# ТҮЗҮҮ
+# ===================
+def render_derivative(data, width, fmt):
+    """Баштапкы сүрөттүн байттарынан кичирейтилген көчүрмө: (байттар, туурасы, бийиктиги). Чоңойтулбайт."""
+    with Image.open(BytesIO(data)) as image:
+        image = ImageOps.exif_transpose(image)
+        if image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGBA' if 'transparency' in image.info or image.mode in ('LA', 'P') else 'RGB')
+        if image.width > width:
+            image = image.resize((width, max(1, round(image.height * width / image.width))), Image.LANCZOS)
+        output = BytesIO()
+        image.save(output, FORMATS[fmt]['pil'], quality=settings.IMAGE_DERIVATIVE_QUALITY)
+        return output.getvalue(), image.width, image.height
+
+
+def derivative_name(content, width, fmt):
+    # Аты мазмундан алынат - файл өзгөрбөйт, ошондуктан узак мөөнөткө кэштелсе болот
+    return f'derivatives/{width}/{hashlib.sha256(content).hexdigest()[:20]}.{fmt}'
+
+
+def build_derivatives(source, bucket_widths, formats, storage=None):
+    """Бир сүрөт үчүн бардык өлчөм/формат көчүрмөлөрүн файлга жазат. Базага тийбейт (процесс пулу үчүн).
+
+    ImageDerivative талааларынын сөздүктөрүн кайтарат.
+    """
+    storage = storage or default_storage
+    with storage.open(source, 'rb') as handle:
+        data = handle.read()
+    rows = []
+    for fmt in formats:
+        for bucket in bucket_widths:
+            content, width, height = render_derivative(data, bucket, fmt)
+            name = derivative_name(content, width, fmt)
+            if not storage.exists(name):
+                name = storage.save(name, ContentFile(content))
+            rows.append({'source': source, 'bucket': bucket, 'format': fmt, 'name': name,
+                         'width': width, 'height': height})
+    return rows
+
+
+def record_derivatives(rows):
+    ImageDerivative.objects.bulk_create(
+        [ImageDerivative(**row) for row in rows],
+        update_conflicts=True, unique_fields=['source', 'bucket', 'format'],
+        update_fields=['name', 'width', 'height'],
+    )
+
+
+def find_derivative(source, bucket, fmt):
+    return ImageDerivative.objects.filter(source=source, bucket=bucket, format=fmt).first()
+
+
+def get_or_create_derivative(source, bucket, fmt):
+    """Биринчи сурамда түзүлөт (lazy), кийинкилеринде таблицадан алынат."""
+    derivative = find_derivative(source, bucket, fmt)
+    if derivative is None:
+        record_derivatives(build_derivatives(source, [bucket], [fmt]))
+        derivative = ImageDerivative.objects.get(source=source, bucket=bucket, format=fmt)
+    return derivative
+
+
+# ===================
+# SRCSET
+# ===================
+class DerivativeIndex:
+    """Бир беттеги бардык сүрөттөрдүн көчүрмөлөрү - бир сурам менен жүктөлөт, андан кийин O(1) издөө."""
+
+    def __init__(self, sources=(), rows=None):
+        if rows is None:
+            queryset = self.rows_queryset(sources)
+            rows = list(queryset) if queryset is not None else []
+        self.names = {row[:3]: row[3:] for row in rows}
+
+    @staticmethod
+    def rows_queryset(sources):
+        sources = {str(source) for source in sources if source}
+        if not sources:
+            return None
+        return (ImageDerivative.objects.filter(source__in=sources, format__in=enabled_formats())
+                .values_list('source', 'format', 'bucket', 'name', 'width'))
+
+    @classmethod
+    async def aload(cls, sources):
+        queryset = cls.rows_queryset(sources)
+        return cls(rows=[row async for row in queryset] if queryset is not None else [])
+
+    def srcset(self, source, fmt, build_url=None):
+        """srcset сабы (url 160w, url 320w, ...) - даяр эмес көчүрмөлөр lazy URL аркылуу түзүлөт."""
+        source = str(source)
+        entries, seen = [], set()
+        for bucket in widths():
+            found = self.names.get((source, fmt, bucket))
+            if found:
+                name, width = found
+                url = default_storage.url(name)
+            else:
+                width = bucket
+                url = reverse('image_derivative', args=[fmt, bucket, source])
+            if width in seen:
+                continue
+            seen.add(width)
+            entries.append(f'{build_url(url) if build_url else url} {width}w')
+        return ', '.join(entries)
+
+    def srcsets(self, source, build_url=None):
+        return {fmt: self.srcset(source, fmt, build_url) for fmt in enabled_formats()}
@@ -0,0 +1,297 @@
+import json
+import logging
+import random
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import caches
+
+logger = logging.getLogger(__name__)
+
+# ===================
+# SQL ЧОГУЛТУУЧУ
+# ===================
+# Ар бир туташууга бир жолу execute_wrapper коюлат (connection_created, config/apps.py). Сурам үлгүгө
+# түшпөсө, ContextVar бош - wrapper түз execute'ту чакырат, башка эч нерсе жасалбайт.
+# ContextVar sync_to_async агымдарына да өтөт, ошондуктан async view'лордун сурамдары да эсептелет.
+_collector = ContextVar('query_collector', default=None)
+
+
+class QueryTimer:
+    """Саны жана жалпы убакыт гана (config/metrics.py ар бир сурамда колдонот)."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.seconds += time.perf_counter() - start
+
+
+class QueryCollector(QueryTimer):
+    def __init__(self):
+        super().__init__()
+        self.by_sql = defaultdict(lambda: [0, 0.0])  # sql -> [саны, убакыты]
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.count += 1
+            self.seconds += elapsed
+            # SQL параметрсиз (%s) - бирдей сап = ошол эле сурам башка маанилер менен (N+1 белгиси)
+            entry = self.by_sql[sql]
+            entry[0] += 1
+            entry[1] += elapsed
+
+    @property
+    def duplicates(self):
+        return sum(count - 1 for count, _ in self.by_sql.values() if count > 1)
+
+    def top(self, limit):
+        ranked = sorted(self.by_sql.items(), key=lambda item: item[1][1], reverse=True)[:limit]
+        return [{'sql': sql[:500], 'count': count, 'ms': round(seconds * 1000, 2)}
+                for sql, (count, seconds) in ranked]
+
+
+def record_query(execute, sql, params, many, context):
+    collector = _collector.get()
+    if collector is None:
+        return execute(sql, params, many, context)
+    return collector(execute, sql, params, many, context)
+
+
+class QueryTiming:
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.elapsed = 0.0
+
+
+@contextmanager
+def timed_queries():
+    """Блоктун убактысы жана андагы SQL. Үлгүгө түшкөн сурамда QueryCollector мурунтан коюлган - ошол колдонулат."""
+    timing = QueryTiming()
+    timer = _collector.get()
+    token = None
+    if timer is None:
+        timer = QueryTimer()
+        token = _collector.set(timer)
+    count, seconds = timer.count, timer.seconds
+    start = time.perf_counter()
+    try:
+        yield timing
+    finally:
+        timing.elapsed = time.perf_counter() - start
+        timing.count = timer.count - count
+        timing.seconds = timer.seconds - seconds
+        if token is not None:
+            _collector.reset(token)
+
+
+def install_wrapper(sender, connection, **kwargs):
+    # Кайра туташканда (CONN_MAX_AGE) ошол эле wrapper экинчи жолу кошулбайт
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+# ===================
+# ГИСТОГРАММАЛАР
+# ===================
+# Ар бир view үчүн кечигүү чакалары (ms). Процессте топтолуп, INSTRUMENTATION_FLUSH_SECONDS сайын кэшке
+# incr менен кошулат - бир нече воркердин натыйжалары бириктирилет, ар бир сурам кэшке барбайт.
+BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+FIELDS = ('count', 'sum_ms', 'db_ms', 'queries', 'duplicates', 'slow') + tuple(f'le_{edge}' for edge in BUCKETS_MS)
+VIEWS_KEY = 'instr:views'
+
+
+def _key(view, field):
+    return f'instr:{view}:{field}'
+
+
+def get_cache():
+    return caches[settings.INSTRUMENTATION_CACHE_ALIAS]
+
+
+class HistogramBuffer:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pending = defaultdict(Counter)
+        self.flushed_at = time.monotonic()
+
+    def add(self, view, duration_ms, collector, slow):
+        with self.lock:
+            counts = self.pending[view]
+            counts['count'] += 1
+            counts['sum_ms'] += round(duration_ms)
+            counts['db_ms'] += round(collector.seconds * 1000)
+            counts['queries'] += collector.count
+            counts['duplicates'] += 1 if collector.duplicates else 0
+            counts['slow'] += 1 if slow else 0
+            for edge in BUCKETS_MS:
+                if duration_ms <= edge:
+                    counts[f'le_{edge}'] += 1
+                    break
+            due = time.monotonic() - self.flushed_at >= settings.INSTRUMENTATION_FLUSH_SECONDS
+        if due:
+            self.flush()
+
+    def flush(self):
+        with self.lock:
+            pending, self.pending = self.pending, defaultdict(Counter)
+            self.flushed_at = time.monotonic()
+        if not pending:
+            return
+        cache = get_cache()
+        views = set(cache.get(VIEWS_KEY) or ())
+        if not views.issuperset(pending):
+            cache.set(VIEWS_KEY, sorted(views | set(pending)), None)
+        for view, counts in pending.items():
+            for field, value in counts.items():
+                if value:
+                    _incr(cache, _key(view, field), value)
+
+
+def _incr(cache, key, delta):
+    try:
+        cache.incr(key, delta)
+    except ValueError:
+        if not cache.add(key, delta, None):
+            cache.incr(key, delta)
+
+
+buffer = HistogramBuffer()
+
+
+def view_histograms():
+    """{view: {count, mean_ms, mean_db_ms, mean_queries, duplicate_requests, slow, buckets}} - бардык процесстер."""
+    buffer.flush()
+    cache = get_cache()
+    views = cache.get(VIEWS_KEY) or []
+    values = cache.get_many([_key(view, field) for view in views for field in FIELDS])
+    histograms = {}
+    for view in views:
+        data = {field: values.get(_key(view, field), 0) for field in FIELDS}
+        count = data['count']
+        if not count:
+            continue
+        # Чакалар кумулятивдүү (Prometheus'тагыдай): le_100 - 100ms же андан тез бүткөн сурамдар
+        buckets, running = {}, 0
+        for edge in BUCKETS_MS:
+            running += data[f'le_{edge}']
+            buckets[str(edge)] = running
+        buckets['+Inf'] = count
+        histograms[view] = {
+            'count': count,
+            'mean_ms': round(data['sum_ms'] / count, 2),
+            'mean_db_ms': round(data['db_ms'] / count, 2),
+            'mean_queries': round(data['queries'] / count, 2),
+            'duplicate_requests': data['duplicates'],
+            'slow': data['slow'],
+            'buckets': buckets,
+        }
+    return histograms
+
+
+def reset_view_histograms():
+    buffer.flush()
+    cache = get_cache()
+    views = cache.get(VIEWS_KEY) or []
+    cache.delete_many([_key(view, field) for view in views for field in FIELDS] + [VIEWS_KEY])
+
+
+# ===================
+# MIDDLEWARE
+# ===================
+def view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unresolved'
+    return match.view_name or match.route or 'unnamed'
+
+
+class QueryInstrumentationMiddleware:
+    """INSTRUMENTATION_SAMPLE_RATE үлүшүндөгү сурамдар үчүн: SQL саны, DB убактысы жана кайталанган SQL.
+
+    Server-Timing баш сабы кошулат, жай сурамдар (INSTRUMENTATION_SLOW_MS) JSON катары логго жазылат,
+    view боюнча гистограммалар /api/instrumentation/ аркылуу көрүнөт. Үлгү 0 болсо - бир гана салыштыруу.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    @staticmethod
+    def sampled():
+        rate = settings.INSTRUMENTATION_SAMPLE_RATE
+        return rate > 0 and (rate >= 1 or random.random() < rate)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self.sampled():
+            return self.get_response(request)
+        collector = QueryCollector()
+        token = _collector.set(collector)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _collector.reset(token)
+        return self.finish(request, response, collector, start)
+
+    async def __acall__(self, request):
+        if not self.sampled():
+            return await self.get_response(request)
+        collector = QueryCollector()
+        token = _collector.set(collector)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _collector.reset(token)
+        return self.finish(request, response, collector, start)
+
+    def finish(self, request, response, collector, start):
+        # StreamingHttpResponse'тун денеси кийин окулат - андагы сурамдар бул жерде эсептелбейт
+        duration_ms = (time.perf_counter() - start) * 1000
+        db_ms = collector.seconds * 1000
+        duplicates = collector.duplicates
+        timing = [f'total;dur={duration_ms:.1f}', f'db;dur={db_ms:.1f};desc="{collector.count} queries"']
+        if duplicates:
+            timing.append(f'dup;desc="{duplicates} duplicated"')
+        response.headers['Server-Timing'] = ', '.join(timing)
+
+        view = view_name(request)
+        slow = duration_ms >= settings.INSTRUMENTATION_SLOW_MS
+        if slow:
+            logger.warning(json.dumps({
+                'event': 'slow_request',
+                'method': request.method,
+                'path': request.path,
+                'view': view,
+                'status': response.status_code,
+                'duration_ms': round(duration_ms, 2),
+                'db_ms': round(db_ms, 2),
+                'queries': collector.count,
+                'duplicates': duplicates,
+                'top_sql': collector.top(settings.INSTRUMENTATION_TOP_SQL),
+            }, ensure_ascii=False))
+        buffer.add(view, duration_ms, collector, slow)
+        return response
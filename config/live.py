@@ -0,0 +1,331 @@
+import asyncio
+import json
+import re
+import threading
+import time
+from collections import namedtuple
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.handlers.asgi import ASGIRequest
+from django.db import transaction
+from django.db.models import Max
+from django.http import HttpResponse, HttpResponseForbidden, StreamingHttpResponse
+from django.template.loader import render_to_string
+from django.utils.module_loading import import_string
+
+from .caching import dashboard_scope, scope_filter
+from .models import Order, OrderHistory
+
+# ===================
+# ЖАНДУУ АГЫМ (SSE, /live/orders/)
+# ===================
+# Заказдар панели кайра жүктөлбөйт: жазуулар commit'тен кийин broker'ге жарыяланат, ал ачык SSE
+# агымдарына таратат, orders.html сапты ордунда алмаштырат. Окуянын id'си - курсор "<тарых id>.<заказ id>":
+# кайра туташканда браузер аны Last-Event-ID катары жиберет жана өткөрүп жиберилген окуялар базадан
+# (OrderHistory.id / Order.id боюнча) кайра окулат. Өчүрүлгөн заказдар кайра окулбайт - алар жандуу гана.
+#
+# ASGI астында агым LIVE_STREAM_SECONDS ачык турат. WSGI астында воркерди кармабаш үчүн кайра окуу
+# гана жиберилет да, агым жабылат - браузер LIVE_POLL_RETRY_MS'тен кийин курсор менен кайра сурайт.
+
+class Cursor(namedtuple('Cursor', 'history order')):
+    def __str__(self):
+        return f'{self.history}.{self.order}'
+
+
+_CURSOR_RE = re.compile(r'^(\d+)\.(\d+)$')
+RESYNC = object()  # кезек толду же broker үзүлдү - агым жабылат, браузер курсор менен кайра туташат
+
+
+def parse_cursor(value):
+    match = _CURSOR_RE.match((value or '').strip())
+    return Cursor(int(match[1]), int(match[2])) if match else None
+
+
+def current_cursor():
+    return Cursor(OrderHistory.objects.aggregate(last=Max('id'))['last'] or 0,
+                  Order.objects.aggregate(last=Max('id'))['last'] or 0)
+
+
+def advance(cursor, event):
+    return Cursor(max(cursor.history, event.get('history_id') or 0),
+                  max(cursor.order, event['order_id'] if event['kind'] == 'created' else 0))
+
+
+def is_seen(cursor, event):
+    if event['kind'] == 'created':
+        return event['order_id'] <= cursor.order
+    if event['kind'] == 'status':
+        return event['history_id'] <= cursor.history
+    return False
+
+
+def in_scope(event, scope):
+    # dashboard'дагы чөйрө: админ - бардыгы, менеджер - өз имараты, калгандар - өз заказдары
+    if scope == 'all':
+        return True
+    kind, value = scope.split(':')
+    return str(event[f'{kind}_id']) == value
+
+
+# ===================
+# ОКУЯЛАР
+# ===================
+def render_row(row):
+    """order_rows.html'дин бир сабы - dashboard'дагы белгилөө менен бирдей."""
+    return render_to_string('order_rows.html', {'orders': [row]}).strip()
+
+
+def _event(kind, row, building_id, user_id, history_id=None, old_status=None, status=None):
+    return {
+        'kind': kind, 'order_id': row['id'], 'building_id': building_id, 'user_id': user_id,
+        'history_id': history_id, 'old_status': old_status, 'status': status or row['status'],
+        'html': render_row(row),
+    }
+
+
+def created_events(orders):
+    rows = orders.values('id', 'status', 'building_id', 'user_id', 'building__name', 'service__name')
+    return [_event('created', row, row['building_id'], row['user_id']) for row in rows]
+
+
+def status_events(histories):
+    rows = histories.values('id', 'old_status', 'new_status', 'order_id', 'order__status', 'order__building_id',
+                            'order__user_id', 'order__building__name', 'order__service__name')
+    return [
+        _event('status', {'id': row['order_id'], 'status': row['order__status'],
+                          'building__name': row['order__building__name'],
+                          'service__name': row['order__service__name']},
+               row['order__building_id'], row['order__user_id'], history_id=row['id'],
+               old_status=row['old_status'], status=row['new_status'])
+        for row in rows
+    ]
+
+
+def replay(scope, cursor, limit=None):
+    """Курсордон кийинки окуялар (чөйрө боюнча). Өтө көп болсо - None (бетти жаңыртуу керек)."""
+    limit = limit or settings.LIVE_REPLAY_LIMIT
+    filters = scope_filter(scope)
+    orders = Order.objects.filter(pk__gt=cursor.order, **filters).order_by('id')
+    histories = (OrderHistory.objects.filter(pk__gt=cursor.history, **{f'order__{name}': value
+                                                                       for name, value in filters.items()})
+                 .order_by('id'))
+    # id боюнча PK диапазону - LIMIT менен; жаңы заказдар алардын статус өзгөрүүлөрүнөн мурун жиберилет
+    created = created_events(orders[:limit + 1])
+    changed = status_events(histories[:limit + 1 - len(created)]) if len(created) <= limit else []
+    if len(created) + len(changed) > limit:
+        return None
+    return created + changed
+
+
+# ===================
+# BROKER
+# ===================
+class LocalSubscription:
+    """Бир SSE агымынын кезеги. put() каалаган агымдан чакырылат, get() агымдын event loop'унда."""
+
+    def __init__(self, broker):
+        self.broker = broker
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(settings.LIVE_QUEUE_SIZE)
+
+    def put(self, event):
+        try:
+            self.loop.call_soon_threadsafe(self._put, event)
+        except RuntimeError:
+            # Loop жабылган - агым бүттү
+            self.close()
+
+    def _put(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Окуучу жай: калганын таштап, кайра туташтырабыз (курсор менен базадан окулат)
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESYNC)
+
+    async def get(self, timeout):
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class LocalBroker:
+    """Процесстин ичиндеги pub/sub: жазуу ушул процесстин агымдарына гана жетет (бир воркер, тесттер)."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.subscriptions = set()
+
+    def listening(self):
+        return bool(self.subscriptions)
+
+    def publish(self, event):
+        self.fanout(event)
+
+    def fanout(self, event):
+        with self.lock:
+            subscriptions = list(self.subscriptions)
+        for subscription in subscriptions:
+            subscription.put(event)
+
+    def subscribe(self):
+        subscription = LocalSubscription(self)
+        with self.lock:
+            self.subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            self.subscriptions.discard(subscription)
+
+
+class RedisBroker(LocalBroker):
+    """Бир нече воркер: PUBLISH бардык процесстерге жетет; ар бир процессте бир угуучу агым жергиликтүү
+    агымдарга таратат (туташуу ар бир SSE үчүн эмес, процесске бирөө)."""
+
+    def __init__(self):
+        super().__init__()
+        try:
+            import redis
+        except ImportError as exc:
+            raise ImproperlyConfigured("LIVE_BROKER=redis үчүн `redis` пакети керек") from exc
+        self.redis = redis
+        self.client = redis.Redis.from_url(settings.LIVE_REDIS_URL)
+        self.channel = settings.LIVE_REDIS_CHANNEL
+        self.listener = None
+
+    def listening(self):
+        return True  # угуучулар башка процесстерде болушу мүмкүн
+
+    def publish(self, event):
+        self.client.publish(self.channel, json.dumps(event, ensure_ascii=False))
+
+    def subscribe(self):
+        with self.lock:
+            if self.listener is None or not self.listener.is_alive():
+                self.listener = threading.Thread(target=self.listen, name='live-redis', daemon=True)
+                self.listener.start()
+        return super().subscribe()
+
+    def listen(self):
+        while True:
+            try:
+                pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                for message in pubsub.listen():
+                    self.fanout(json.loads(message['data']))
+            except self.redis.ConnectionError:
+                # Үзүлүү учурундагы окуялар жоголду - агымдар курсор менен кайра туташат
+                self.fanout(RESYNC)
+                time.sleep(1)
+
+
+BROKERS = {'local': LocalBroker, 'redis': RedisBroker}
+_broker = None
+
+
+def get_broker():
+    """settings.LIVE_BROKER: local | redis | класстын толук жолу."""
+    global _broker
+    if _broker is None:
+        path = settings.LIVE_BROKER
+        _broker = (BROKERS.get(path) or import_string(path))()
+    return _broker
+
+
+def _publish_on_commit(build):
+    def publish():
+        broker = get_broker()
+        if broker.listening():
+            for event in build():
+                broker.publish(event)
+    transaction.on_commit(publish)
+
+
+def publish_created(order_ids):
+    _publish_on_commit(lambda: created_events(Order.objects.filter(pk__in=order_ids).order_by('id')))
+
+
+def publish_status(history_ids):
+    _publish_on_commit(lambda: status_events(OrderHistory.objects.filter(pk__in=history_ids).order_by('id')))
+
+
+def publish_deleted(order_id, building_id, user_id):
+    event = {'kind': 'deleted', 'order_id': order_id, 'building_id': building_id, 'user_id': user_id}
+    _publish_on_commit(lambda: [event])
+
+
+# ===================
+# SSE VIEW
+# ===================
+def sse(data=None, event=None, id=None, retry=None, comment=None):
+    lines = []
+    if comment is not None:
+        lines.append(f': {comment}')
+    if retry is not None:
+        lines.append(f'retry: {retry}')
+    if id is not None:
+        lines.append(f'id: {id}')
+    if event is not None:
+        lines.append(f'event: {event}')
+    if data is not None:
+        lines.append(f'data: {json.dumps(data, ensure_ascii=False)}')
+    return '\n'.join(lines) + '\n\n'
+
+
+async def event_stream(scope, cursor, live):
+    # Адегенде жазылабыз, анан базадан окуйбуз - ортодогу окуялар жоголбойт (кайталанса is_seen чыпкалайт)
+    subscription = get_broker().subscribe() if live else None
+    try:
+        yield sse(retry=settings.LIVE_RETRY_MS if live else settings.LIVE_POLL_RETRY_MS, id=cursor)
+        events = await sync_to_async(replay)(scope, cursor)
+        if events is None:
+            yield sse({'cursor': str(await sync_to_async(current_cursor)())}, event='reset')
+            return
+        for event in events:
+            cursor = advance(cursor, event)
+            yield sse(event, event='order', id=cursor)
+        if not live:
+            return
+        deadline = time.monotonic() + settings.LIVE_STREAM_SECONDS
+        while time.monotonic() < deadline:
+            event = await subscription.get(settings.LIVE_HEARTBEAT_SECONDS)
+            if event is RESYNC:
+                return
+            if event is None:
+                yield sse(comment='ping')  # проксилер туташууну жаппасын
+            elif in_scope(event, scope) and not is_seen(cursor, event):
+                cursor = advance(cursor, event)
+                yield sse(event, event='order', id=cursor)
+    finally:
+        if subscription is not None:
+            subscription.close()
+
+
+async def order_events(request):
+    """text/event-stream: `order` окуялары (created/status/deleted, сап HTML менен) жана `reset`.
+
+    Курсор: Last-Event-ID (EventSource өзү жиберет) же ?cursor= (бет түзүлгөндөгү абал).
+    """
+    user = await request.auser()
+    if not user.is_authenticated:
+        return HttpResponseForbidden()
+    cursor = parse_cursor(request.headers.get('Last-Event-ID') or request.GET.get('cursor'))
+    if cursor is None:
+        cursor = await sync_to_async(current_cursor)()
+    stream = event_stream(dashboard_scope(user), cursor, live=isinstance(request, ASGIRequest))
+    if isinstance(request, ASGIRequest):
+        response = StreamingHttpResponse(stream, content_type='text/event-stream')
+    else:
+        # WSGI: агым кармалбайт - кайра окуу бир жооп болуп кетет
+        response = HttpResponse(''.join([chunk async for chunk in stream]), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # nginx агымды буферлебесин
+    return response
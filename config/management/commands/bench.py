@@ -0,0 +1,283 @@
+import http.client
+import json
+import logging
+import resource
+import threading
+import time
+
+import django
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.core.servers.basehttp import ThreadedWSGIServer, WSGIRequestHandler, get_internal_wsgi_application
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import NoReverseMatch, URLResolver, get_resolver, reverse
+from django.utils import timezone
+from django.utils.encoding import iri_to_uri
+from drf_spectacular.drainage import GENERATOR_STATS
+
+from config.benchmarks import compare_results, summarize
+from config.models import Building, Order, OrderHistory, Review, Service, User
+from config.models import Client as ClientRecord
+
+# pk параметри бар URL'лор үчүн үлгү объект: колдонуучуга көрүнгөн биринчи сап
+OBJECT_URLS = {
+    'service_detail': lambda user: Service.objects.all(),
+    'service-detail': lambda user: Service.objects.all(),
+    'building-detail': lambda user: Building.objects.all(),
+    'order_detail': lambda user: Order.objects.visible_to(user),
+    'order_edit': lambda user: Order.objects.visible_to(user),
+    'order_delete': lambda user: Order.objects.visible_to(user),  # GET - ырастоо барагы гана
+    'order-detail': lambda user: Order.objects.visible_to(user),
+    'orderhistory-detail': lambda user: OrderHistory.objects.all(),
+    'client_detail': lambda user: ClientRecord.objects.all(),
+    'client_edit': lambda user: ClientRecord.objects.all(),
+    'user-detail': lambda user: User.objects.all(),
+    'manager-detail': lambda user: User.objects.filter(role='MANAGER'),
+    'client-detail': lambda user: User.objects.filter(role='USER'),
+}
+# GET менен да маалыматты өзгөрткөн же өзүнчө бенчмаркы бар жолдор
+SKIP_URLS = {'logout', 'update_status', 'image_derivative', 'export', 'admin:logout', 'admin:view_on_site',
+             'admin:autocomplete'}
+# API астындагы HTML барактар
+HTML_URLS = {'swagger-ui', 'redoc'}
+# Кошумча сурамдар (издөө, чоң бет)
+VARIANTS = (
+    ('home', '?search=кран'),
+    ('service-list', '?search=кран'),
+    ('order-list', '?page_size=200'),
+)
+
+
+class QuietRequestHandler(WSGIRequestHandler):
+    # Баш саптар жана тело өзүнчө жазылат - Nagle+delayed ACK ар бир жоопко ~40ms кошпосун
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+
+class Command(BaseCommand):
+    help = ("config/urls.py'дагы жана API роутериндеги бардык GET жолдорун ар бир ролдун колдонуучусу менен "
+            "Django test client жана чыныгы HTTP сервер аркылуу өлчөйт. Кечигүү перцентилдери, SQL сурамдардын "
+            "саны жана RSS чокусу JSON'го жазылат; --baseline менен мурунку натыйжа салыштырылат. "
+            "Маалымат үчүн адегенде seed_perf иштетиңиз.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--warmup', type=int, default=2)
+        parser.add_argument('--modes', nargs='+', choices=['client', 'http'], default=['client', 'http'])
+        parser.add_argument('--users', nargs='+', help="Колдонуучу аттары (демейки: ар бир ролдун биринчиси)")
+        parser.add_argument('--match', help="Жолдун ичинде ушул сап барлары гана өлчөнөт")
+        parser.add_argument('--exclude', nargs='+', default=[], help="Ушул саптар бар жолдор өткөрүлөт")
+        parser.add_argument('--output', default='bench-results.json')
+        parser.add_argument('--baseline', help="Салыштыруу үчүн мурунку JSON")
+        parser.add_argument('--threshold', type=float, default=0.2, help="Уруксат берилген жайлоо (0.2 = 20%%)")
+        # p50 туруктуураак; p95/p99 аз кайталоодо бир GC паузасынан эле секирип кетет
+        parser.add_argument('--metric', choices=['p50_ms', 'p95_ms', 'p99_ms'], default='p50_ms')
+        parser.add_argument('--fail-on-regression', action='store_true')
+
+    def handle(self, *args, **options):
+        users = self.get_users(options['users'])
+        if not users:
+            raise CommandError("Колдонуучу табылган жок - адегенде seed_perf иштетиңиз")
+
+        server = self.start_server() if 'http' in options['modes'] else None
+        # 4xx жооптордун логу жана схема генераторунун эскертүүлөрү натыйжаларды басып калбасын
+        logging.disable(logging.WARNING)
+        try:
+            with GENERATOR_STATS.silence():
+                results = self.run(users, server, options)
+        finally:
+            logging.disable(logging.NOTSET)
+            if server:
+                server.shutdown()
+                server.server_close()
+
+        report = {'meta': self.meta(options), 'peak_rss_mb': round(peak_rss_mb(), 1), 'results': results}
+        with open(options['output'], 'w', encoding='utf-8') as handle:
+            json.dump(report, handle, ensure_ascii=False, indent=2, sort_keys=True)
+        self.stdout.write(f"Натыйжалар: {options['output']} ({len(results)} өлчөө)")
+        if options['baseline']:
+            self.compare(options)
+
+    def run(self, users, server, options):
+        results = {}
+        for user in users:
+            client = Client()
+            client.force_login(user)
+            for name, url in self.urls(user):
+                if options['match'] and options['match'] not in url:
+                    continue
+                if any(part in url for part in options['exclude']):
+                    continue
+                for mode in options['modes']:
+                    measure = self.measure_client if mode == 'client' else self.measure_http
+                    result = measure(client, server, name, url, options['warmup'], options['repeat'])
+                    result.update(mode=mode, role=user.role, url=url, name=name, peak_rss_mb=round(peak_rss_mb(), 1))
+                    results[f'{mode} {user.role} {url}'] = result
+                    self.report(result)
+        return results
+
+    # ----- колдонуучулар жана жолдор -----
+    @staticmethod
+    def get_users(usernames):
+        if usernames:
+            return list(User.objects.filter(username__in=usernames).order_by('role', 'pk'))
+        users = [User.objects.filter(role=role, is_active=True).order_by('pk').first()
+                 for role, _ in User.ROLE_CHOICES]
+        return [user for user in users if user is not None]
+
+    def urls(self, user):
+        """(URL аты, жол) - ар бир аталыш бир жолу, параметрлер үлгү объекттерден толтурулат."""
+        seen = set()
+        for name, params in iter_patterns(get_resolver().url_patterns):
+            if name in SKIP_URLS or 'format' in params:
+                continue
+            if name.startswith('admin:') and not (user.is_staff and admin_page(name)):
+                continue
+            kwargs = self.sample_kwargs(name, params, user)
+            if kwargs is None:
+                continue
+            try:
+                url = reverse(name, kwargs=kwargs)
+            except NoReverseMatch:
+                continue
+            if url not in seen:
+                seen.add(url)
+                yield name, url
+        for name, query in VARIANTS:
+            yield name, iri_to_uri(reverse(name) + query)
+
+    @staticmethod
+    def sample_kwargs(name, params, user):
+        if not params:
+            return {}
+        if name in OBJECT_URLS and params == {'pk'}:
+            queryset = OBJECT_URLS[name](user)
+        elif name.startswith('admin:') and params == {'object_id'}:
+            # admin:config_order_change -> config.Order
+            app_label, model_name = name.removeprefix('admin:').rsplit('_', 1)[0].split('_', 1)
+            queryset = apps.get_model(app_label, model_name)._default_manager.all()
+        else:
+            return None
+        pk = queryset.order_by('pk').values_list('pk', flat=True).first()
+        if pk is None:
+            return None
+        return {param: str(pk) for param in params}
+
+    # ----- өлчөө -----
+    @staticmethod
+    def headers(name, url):
+        if url.startswith('/api/') and name not in HTML_URLS:
+            return {'Accept': 'application/json'}
+        return {'Accept': 'text/html'}
+
+    def measure_client(self, client, server, name, url, warmup, repeat):
+        headers = self.headers(name, url)
+
+        def fetch():
+            response = client.get(url, headers=headers)
+            if response.streaming:
+                b''.join(response.streaming_content)
+            return response
+
+        for _ in range(warmup):
+            fetch()
+        samples, queries = [], []
+        for _ in range(repeat):
+            with CaptureQueriesContext(connection) as context:
+                start = time.perf_counter()
+                response = fetch()
+                samples.append(time.perf_counter() - start)
+            queries.append(len(context))
+        return dict(summarize(samples), status=response.status_code, queries=max(queries))
+
+    def measure_http(self, client, server, name, url, warmup, repeat):
+        headers = dict(self.headers(name, url), Cookie=f'{settings.SESSION_COOKIE_NAME}='
+                                                 f'{client.cookies[settings.SESSION_COOKIE_NAME].value}')
+        host, port = server.server_address[:2]
+        conn = http.client.HTTPConnection(host, port, timeout=60)
+
+        def fetch():
+            conn.request('GET', url, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            if response.getheader('Connection', '').lower() == 'close':
+                conn.close()
+            return response
+
+        try:
+            for _ in range(warmup):
+                fetch()
+            samples = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                response = fetch()
+                samples.append(time.perf_counter() - start)
+        finally:
+            conn.close()
+        # Сурамдар сервердин агымдарында аткарылат - алардын саны client режиминде гана эсептелет
+        return dict(summarize(samples), status=response.status, queries=None)
+
+    @staticmethod
+    def start_server():
+        server = ThreadedWSGIServer(('127.0.0.1', 0), QuietRequestHandler, allow_reuse_address=True)
+        server.set_app(get_internal_wsgi_application())
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+    # ----- отчёт -----
+    def report(self, result):
+        self.stdout.write(
+            f"{result['mode']:<6} {result['role']:<7} {result['status']} {result['url'][:60]:<60} "
+            f"p50 {result['p50_ms']:8.2f} ms  p95 {result['p95_ms']:8.2f} ms  "
+            f"сурам {result['queries'] if result['queries'] is not None else '-':>4}  RSS {result['peak_rss_mb']} MB"
+        )
+
+    @staticmethod
+    def meta(options):
+        return {
+            'created_at': timezone.now().isoformat(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'repeat': options['repeat'],
+            'rows': {model.__name__: model.objects.count()
+                     for model in (Building, Service, User, Order, OrderHistory, Review)},
+        }
+
+    def compare(self, options):
+        with open(options['baseline'], encoding='utf-8') as handle:
+            baseline = json.load(handle)['results']
+        with open(options['output'], encoding='utf-8') as handle:
+            current = json.load(handle)['results']
+        regressions = compare_results(baseline, current, options['threshold'], options['metric'])
+        for key, metric, before, after in regressions:
+            self.stdout.write(self.style.WARNING(f"РЕГРЕССИЯ {key}: {metric} {before:.2f} -> {after:.2f}"))
+        if not regressions:
+            self.stdout.write(self.style.SUCCESS(f"Регрессия жок ({len(current)} өлчөө, босого {options['threshold']:.0%})"))
+        elif options['fail_on_regression']:
+            raise CommandError(f"{len(regressions)} регрессия табылды")
+
+
+def iter_patterns(patterns, namespace='', params=frozenset()):
+    """URL дарагынан (толук аты, параметрлердин аттары) - include() ичиндегилер да."""
+    for pattern in patterns:
+        names = set(getattr(pattern.pattern, 'converters', {})) | set(pattern.pattern.regex.groupindex)
+        if isinstance(pattern, URLResolver):
+            inner = f'{namespace}{pattern.namespace}:' if pattern.namespace else namespace
+            yield from iter_patterns(pattern.url_patterns, inner, params | names)
+        elif pattern.name:
+            yield f'{namespace}{pattern.name}', params | names
+
+
+def admin_page(name):
+    # Админдин башкы барагы, тизмелер жана түзөтүү барактары
+    return name == 'admin:index' or name.endswith(('_changelist', '_change'))
+
+
+def peak_rss_mb():
+    # Linux'та ru_maxrss килобайт менен
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
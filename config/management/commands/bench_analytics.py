@@ -0,0 +1,82 @@
+import os
+import time
+from datetime import timedelta
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from config.analytics import day_start, record_order, report, source_range
+from config.benchmarks import measure, scratch_transaction, summarize
+from config.models import Order, OrderHistory, Review
+
+
+class Command(BaseCommand):
+    help = ("Отчёттун кечигүүсүн салыштырат: булак таблицалардан түз GROUP BY (live, күндүк катар гана) жана "
+            "DailyRollup'тан толук отчёт (катар + имараттар + кызматтар). Инкременттик жаңылоонун баасы жана rebuild_rollups'тун 1/N воркер менен "
+            "убактысы да өлчөнөт. Маалымат үчүн адегенде seed_perf иштетиңиз (ал жыйынтыктарды да толтурат).")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, nargs='+', default=[7, 30, 365])
+        parser.add_argument('--repeat', type=int, default=10)
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+        parser.add_argument('--skip-backfill', action='store_true')
+
+    def handle(self, *args, **options):
+        bounds = source_range()
+        if bounds is None:
+            raise CommandError("Заказ жок - адегенде seed_perf иштетиңиз")
+        date_to = bounds[1] - timedelta(days=1)
+        building_id = Order.objects.exclude(building=None).values_list('building_id', flat=True).first()
+
+        self.stdout.write(f"Заказдар: {Order.objects.count()}, акыркы күн {date_to}")
+        for days in options['days']:
+            date_from = date_to - timedelta(days=days - 1)
+            for scope, building in (('баары', None), (f'имарат {building_id}', building_id)):
+                def live():
+                    return live_series(date_from, date_to, building)
+
+                def rollup():
+                    return report(date_from, date_to, building_id=building)
+
+                for label, func in (('live', live), ('rollup', rollup)):
+                    stats = summarize(measure(func, options['repeat']))
+                    self.stdout.write(f"{days:>4} күн  {scope:<14} {label:<7} p50={stats['p50_ms']:9.2f}ms "
+                                      f"p95={stats['p95_ms']:9.2f}ms")
+
+        self.measure_writes(building_id, options['repeat'] * 100)
+        if not options['skip_backfill']:
+            for workers in sorted({1, max(1, options['workers'])}):
+                start = time.perf_counter()
+                call_command('rebuild_rollups', workers=workers, verbosity=0, stdout=self.stdout)
+                self.stdout.write(f"rebuild_rollups {workers} воркер: {time.perf_counter() - start:.2f}s")
+
+    def measure_writes(self, building_id, count):
+        # Бир заказдын түзүлүшүнө сигнал кошкон иш: күндүк + сааттык сапка UPDATE
+        service_id = Order.objects.values_list('service_id', flat=True).first()
+        now = timezone.now()
+        with scratch_transaction():
+            samples = measure(lambda: record_order(now, building_id, service_id), count)
+        stats = summarize(samples)
+        self.stdout.write(f"record_order: p50={stats['p50_ms']:.3f}ms p95={stats['p95_ms']:.3f}ms")
+
+
+def live_series(date_from, date_to, building_id=None):
+    """report()'тун күндүк катары булак таблицалардан түз GROUP BY менен (салыштыруу үчүн)."""
+    since, until = day_start(date_from), day_start(date_to + timedelta(days=1))
+    orders = Order.objects.filter(created_at__gte=since, created_at__lt=until)
+    done = OrderHistory.objects.filter(new_status='DONE', change_date__gte=since, change_date__lt=until)
+    reviews = Review.objects.filter(created_at__gte=since, created_at__lt=until)
+    if building_id is not None:
+        orders = orders.filter(building_id=building_id)
+        done = done.filter(order__building_id=building_id)
+        reviews = reviews.filter(service__building_id=building_id)
+    return (
+        list(orders.values(day=TruncDate('created_at')).annotate(count=Count('id')).order_by('day')),
+        list(done.values(day=TruncDate('change_date'))
+             .annotate(count=Count('id'), duration=Sum(F('change_date') - F('order__created_at'))).order_by('day')),
+        list(reviews.values(day=TruncDate('created_at')).annotate(count=Count('id'), rating=Sum('rating'))
+             .order_by('day')),
+    )
@@ -0,0 +1,169 @@
+import asyncio
+import os
+import resource
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.authtoken.models import Token
+
+from config.benchmarks import summarize
+from config.models import User
+
+SERVERS = {
+    # WSGI: ар бир суроо-талаа воркердин бир агымын ээлейт
+    'wsgi': lambda port, workers: [
+        'gunicorn', 'servic.wsgi:application', '--bind', f'127.0.0.1:{port}', '--workers', str(workers),
+        '--worker-class', 'sync', '--log-level', 'warning',
+    ],
+    # ASGI: окуу жолдору async view'лор аркылуу (servic/asgi.py ASYNC_READ_VIEWS=1 коёт)
+    'asgi': lambda port, workers: [
+        'uvicorn', 'servic.asgi:application', '--host', '127.0.0.1', '--port', str(port),
+        '--workers', str(workers), '--log-level', 'warning', '--no-access-log',
+    ],
+}
+
+
+class Command(BaseCommand):
+    help = ("gunicorn (sync воркерлер, WSGI) менен uvicorn'ду (ASGI) бирдей жолдордо салыштырат: "
+            "50/200/1000 параллелдүү туташууда сурам/с жана p99. Көчүрмө базада иштетиңиз - "
+            "бенчмарк колдонуучусу жана токени түзүлөт.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--servers', nargs='+', choices=sorted(SERVERS), default=['wsgi', 'asgi'])
+        parser.add_argument('--concurrency', type=int, nargs='+', default=[50, 200, 1000])
+        parser.add_argument('--paths', nargs='+', default=['/api/services/', '/api/buildings/', '/api/orders/'])
+        parser.add_argument('--seconds', type=float, default=15)
+        parser.add_argument('--workers', type=int, default=4)
+        parser.add_argument('--port', type=int, default=8765)
+
+    def handle(self, *args, **options):
+        binaries = [SERVERS[name](options['port'], options['workers'])[0] for name in options['servers']]
+        missing = [binary for binary in binaries if not shutil.which(binary)]
+        if missing:
+            raise CommandError(f"Орнотулган эмес: {', '.join(missing)} (pip install gunicorn uvicorn)")
+        soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+        needed = max(options['concurrency']) + 64
+        if soft < needed:
+            # 1000 туташуу үчүн ачык файлдардын чеги жетиштүү болушу керек
+            resource.setrlimit(resource.RLIMIT_NOFILE, (min(needed, hard), hard))
+
+        user, _ = User.objects.get_or_create(username='bench-asgi', defaults={'role': 'ADMIN'})
+        token, _ = Token.objects.get_or_create(user=user)
+        headers = {'Authorization': f'Token {token.key}', 'Accept': 'application/json'}
+
+        for name in options['servers']:
+            process = self.start(name, options)
+            try:
+                for concurrency in options['concurrency']:
+                    result = asyncio.run(load(options['port'], options['paths'], headers, concurrency,
+                                              options['seconds']))
+                    self.report(name, concurrency, result, options['seconds'])
+            finally:
+                process.send_signal(signal.SIGTERM)
+                process.wait(timeout=30)
+
+    def start(self, name, options):
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE=os.environ.get('DJANGO_SETTINGS_MODULE', 'servic.settings'))
+        process = subprocess.Popen(SERVERS[name](options['port'], options['workers']),
+                                   cwd=settings.BASE_DIR, env=env, stdout=sys.stdout, stderr=sys.stderr)
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise CommandError(f"{name} сервери иштебей калды (код {process.returncode})")
+            try:
+                socket.create_connection(('127.0.0.1', options['port']), timeout=0.5).close()
+                return process
+            except OSError:
+                time.sleep(0.2)
+        process.kill()
+        raise CommandError(f"{name} сервери 30 секундда ачылган жок")
+
+    def report(self, name, concurrency, result, seconds):
+        samples, errors = result['samples'], result['errors']
+        if not samples:
+            self.stdout.write(f"{name:<4} c={concurrency:<5} ийгиликтүү жооп жок (ката {errors})")
+            return
+        stats = summarize(samples)
+        self.stdout.write(
+            f"{name:<4} c={concurrency:<5} {len(samples) / seconds:9.1f} сурам/с  "
+            f"p50 {stats['p50_ms']:8.1f} ms  p99 {stats['p99_ms']:8.1f} ms  ката {errors}"
+        )
+
+
+# ===================
+# HTTP КЛИЕНТ
+# ===================
+# Стандарттык китепкана гана: ар бир туташуу keep-alive менен сурамдарды удаама-удаа жиберет.
+async def read_response(reader):
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("Сервер туташууну жапты")
+    status = int(status_line.split()[1])
+    length, chunked, close = None, False, False
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        name, value = name.strip().lower(), value.strip().lower()
+        if name == 'content-length':
+            length = int(value)
+        elif name == 'transfer-encoding' and 'chunked' in value:
+            chunked = True
+        elif name == 'connection' and value == 'close':
+            close = True
+    if chunked:
+        while True:
+            size = int((await reader.readline()).split(b';')[0], 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    elif length is not None:
+        await reader.readexactly(length)
+    else:
+        await reader.read()
+        close = True
+    return status, close
+
+
+async def connection_loop(port, requests, deadline, result):
+    reader = writer = None
+    index = 0
+    while time.monotonic() < deadline:
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            start = time.perf_counter()
+            writer.write(requests[index % len(requests)])
+            await writer.drain()
+            status, close = await read_response(reader)
+            elapsed = time.perf_counter() - start
+            index += 1
+            if status == 200:
+                result['samples'].append(elapsed)
+            else:
+                result['errors'] += 1
+        except (OSError, ConnectionError, asyncio.IncompleteReadError, ValueError, IndexError):
+            result['errors'] += 1
+            close = True
+            await asyncio.sleep(0.05)
+        if close and writer is not None:
+            writer.close()
+            reader = writer = None
+    if writer is not None:
+        writer.close()
+
+
+async def load(port, paths, headers, concurrency, seconds):
+    extra = ''.join(f'{name}: {value}\r\n' for name, value in headers.items())
+    requests = [f'GET {path} HTTP/1.1\r\nHost: 127.0.0.1:{port}\r\n{extra}\r\n'.encode() for path in paths]
+    result = {'samples': [], 'errors': 0}
+    deadline = time.monotonic() + seconds
+    await asyncio.gather(*(connection_loop(port, requests, deadline, result) for _ in range(concurrency)))
+    return result
@@ -0,0 +1,84 @@
+from importlib import import_module
+
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+from rest_framework.request import Request
+
+from config import auth_cache
+from config.auth_cache import CachedTokenAuthentication
+from config.benchmarks import measure, scratch_transaction, summarize
+from config.models import User
+
+# (аталыш, SESSION_ENGINE, backend) - мурдагы жана азыркы жөндөөлөр
+SESSION_SETUPS = (
+    ('db + ModelBackend', 'django.contrib.sessions.backends.db', 'django.contrib.auth.backends.ModelBackend'),
+    ('cached_db + CachedModelBackend', 'django.contrib.sessions.backends.cached_db',
+     'config.auth_cache.CachedModelBackend'),
+)
+
+
+class Command(BaseCommand):
+    help = ("Бир сурамдагы аутентификациянын баасы (мкс жана SQL сурамдар): сессия (SessionMiddleware + "
+            "AuthenticationMiddleware, request.user.role окулат) жана `Authorization: Token`. Мурдагы жөндөөлөр "
+            "(db сессиялар, ModelBackend, TokenAuthentication) азыркылар (cached_db, config/auth_cache.py) "
+            "менен салыштырылат. Түзүлгөн сессиялар жана токен аягында өчүрүлөт.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=2000)
+        parser.add_argument('--username', help="демейки - биринчи колдонуучу")
+
+    def handle(self, *args, **options):
+        users = User.objects.order_by('pk')
+        user = (users.filter(username=options['username']) if options['username'] else users).first()
+        if user is None:
+            raise CommandError("Колдонуучу жок - адегенде seed_perf иштетиңиз")
+        repeat = options['repeat']
+        factory = RequestFactory()
+        # locmem'де кэш демейки өчүк (servic/settings.py) - бенчмарк аны бир процессте өлчөйт
+        ttl = settings.AUTH_CACHE_TTL or 60
+        self.stdout.write(f"{user.username} ({user.role}), {repeat} сурам, AUTH_CACHE_TTL={ttl}")
+        auth_cache.clear()
+
+        with scratch_transaction(), override_settings(AUTH_CACHE_TTL=ttl):
+            for label, engine, backend in SESSION_SETUPS:
+                with override_settings(SESSION_ENGINE=engine, AUTHENTICATION_BACKENDS=[backend]):
+                    store = import_module(engine).SessionStore()
+                    store.update({SESSION_KEY: str(user.pk), BACKEND_SESSION_KEY: backend,
+                                  HASH_SESSION_KEY: user.get_session_auth_hash()})
+                    store.save()
+                    sessions = SessionMiddleware(lambda request: None)
+                    authentication = AuthenticationMiddleware(lambda request: None)
+
+                    def session_request():
+                        request = factory.get('/')
+                        request.COOKIES[settings.SESSION_COOKIE_NAME] = store.session_key
+                        sessions.process_request(request)
+                        authentication.process_request(request)
+                        return request.user.role
+
+                    self.report(f'сессия: {label}', session_request, repeat)
+
+            key = Token.objects.get_or_create(user=user)[0].key
+            for label, authenticator in (('TokenAuthentication', TokenAuthentication()),
+                                         ('CachedTokenAuthentication', CachedTokenAuthentication())):
+                def token_request():
+                    request = Request(factory.get('/', HTTP_AUTHORIZATION=f'Token {key}'))
+                    return authenticator.authenticate(request)[0].role
+
+                self.report(f'токен: {label}', token_request, repeat)
+
+    def report(self, label, func, repeat):
+        if func() is None:  # биринчи сурам кэшти толтурат
+            raise CommandError(f"{label}: колдонуучу табылган жок")
+        with CaptureQueriesContext(connection) as context:
+            stats = summarize(measure(func, repeat))
+        self.stdout.write(f"{label:<44} mean={stats['mean_ms'] * 1000:8.1f}мкс p50={stats['p50_ms'] * 1000:8.1f}мкс "
+                          f"p99={stats['p99_ms'] * 1000:8.1f}мкс  SQL/сурам={len(context) / repeat:.2f}")
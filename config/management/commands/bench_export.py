@@ -0,0 +1,58 @@
+import resource
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+
+from config.benchmarks import make_rng, scratch_transaction
+from config.exports import export_queryset, iter_export
+from config.models import Building, Order, OrderHistory, Service, User
+
+
+class Command(BaseCommand):
+    help = ("Экспорттун эс тутумун жана ылдамдыгын өлчөйт: саптардын саны өскөндө эс тутумдун чокусу "
+            "туруктуу калышы керек. Маалыматтар транзакция ичинде түзүлүп, аягында өчүрүлөт.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, nargs='+', default=[100_000, 1_000_000, 5_000_000])
+        parser.add_argument('--format', dest='fmt', choices=['csv', 'ndjson'], default='csv')
+        parser.add_argument('--batch-size', type=int, default=10_000)
+
+    def handle(self, *args, **options):
+        rng = make_rng()
+        with scratch_transaction():
+            building = Building.objects.create(name="Бенчмарк", address="-")
+            service = Service.objects.create(building=building, name="Бенчмарк", description="-", price=1)
+            user = User.objects.create(username='bench-export', role='USER')
+            created = 0
+            for size in sorted(options['rows']):
+                while created < size:
+                    count = min(options['batch_size'], size - created)
+                    orders = Order.objects.bulk_create([
+                        Order(user=user, service=service, building=building, date='2026-01-01', time='10:00',
+                              status=rng.choice(['NEW', 'IN_PROGRESS', 'DONE']), comment="бенчмарк")
+                        for _ in range(count)
+                    ])
+                    OrderHistory.objects.bulk_create([
+                        OrderHistory(order=order, old_status='NEW', new_status=order.status) for order in orders
+                    ])
+                    created += count
+                for dataset in ('orders', 'history'):
+                    self.report(dataset, size, options['fmt'])
+
+    def report(self, dataset, size, fmt):
+        queryset, columns = export_queryset(dataset)
+        tracemalloc.start()
+        start = time.perf_counter()
+        rows = written = 0
+        for chunk in iter_export(fmt, queryset, columns):
+            written += len(chunk)
+            rows += 1
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        self.stdout.write(
+            f"{dataset:<8} {size:>9} сап: {elapsed:7.2f}s, {rows / elapsed:10.0f} сап/с, "
+            f"{written / 1e6:8.1f} MB, Python эс тутум чокусу {peak / 1e6:6.2f} MB, maxrss {max_rss:7.1f} MB"
+        )
@@ -0,0 +1,82 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.utils import timezone
+
+from config.benchmarks import make_rng, measure, scratch_transaction, summarize
+from config.hot_queries import HOT_QUERIES
+from config.models import Building, Order, OrderHistory, Review, Service, User
+
+# Бул бенчмарк текшерген индекстер (0012_order_composite_indexes)
+COMPOSITE_INDEXES = (
+    'order_building_status_idx', 'order_building_created_idx', 'order_user_created_idx',
+    'history_order_changed_idx', 'review_service_created_idx',
+)
+
+
+class Command(BaseCommand):
+    help = ("Ысык сурамдардын ылдамдыгын курама индекстер менен жана аларсыз салыштырат. "
+            "Маалыматтар транзакция ичинде түзүлүп, аягында өчүрүлөт (индекстер да калыбына келет).")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--orders', type=int, default=200_000)
+        parser.add_argument('--buildings', type=int, default=50)
+        parser.add_argument('--users', type=int, default=2000)
+        parser.add_argument('--repeat', type=int, default=50)
+        parser.add_argument('--batch-size', type=int, default=10_000)
+
+    def handle(self, *args, **options):
+        rng = make_rng()
+        with scratch_transaction():
+            args = self.seed(rng, options)
+            after = self.run(args, options['repeat'])
+            # SQLite schema_editor транзакция ичинде иштебейт, ошондуктан түз DROP INDEX (ROLLBACK калыбына келтирет)
+            with connection.cursor() as cursor:
+                for name in COMPOSITE_INDEXES:
+                    cursor.execute(f'DROP INDEX {connection.ops.quote_name(name)}')
+            before = self.run(args, options['repeat'])
+
+        self.stdout.write(f"{'сурам':<30} {'индекссиз p50':>14} {'индекс p50':>11} {'ылдамдоо':>9}")
+        for name, _ in HOT_QUERIES:
+            speedup = before[name]['p50_ms'] / max(after[name]['p50_ms'], 1e-6)
+            self.stdout.write(
+                f"{name:<30} {before[name]['p50_ms']:12.2f}ms {after[name]['p50_ms']:9.2f}ms {speedup:8.1f}x"
+            )
+
+    def seed(self, rng, options):
+        buildings = Building.objects.bulk_create(
+            [Building(name=f"Имарат {i}", address="-") for i in range(options['buildings'])]
+        )
+        services = Service.objects.bulk_create(
+            [Service(building=rng.choice(buildings), name=f"Кызмат {i}", description="-", price=1) for i in range(100)]
+        )
+        users = User.objects.bulk_create([User(username=f'bench-{i}') for i in range(options['users'])])
+        now = timezone.now()
+        created = 0
+        while created < options['orders']:
+            count = min(options['batch_size'], options['orders'] - created)
+            orders = Order.objects.bulk_create([
+                Order(user=rng.choice(users), service=rng.choice(services), building=rng.choice(buildings),
+                      date=now.date(), time=now.time(), status=rng.choice(['NEW', 'IN_PROGRESS', 'DONE']))
+                for _ in range(count)
+            ])
+            # auto_now_add бирдей убакыт берет - реалдуу таралуу үчүн жылдырабыз
+            for order in orders:
+                order.created_at = now - timedelta(minutes=rng.randint(0, 525_600))
+            Order.objects.bulk_update(orders, ['created_at'], batch_size=2000)
+            OrderHistory.objects.bulk_create([
+                OrderHistory(order=order, old_status='NEW', new_status=order.status) for order in orders
+            ])
+            created += count
+        Review.objects.bulk_create([
+            Review(service=rng.choice(services), user=rng.choice(users), rating=rng.randint(1, 5), comment="-")
+            for _ in range(options['orders'] // 10)
+        ])
+        return {
+            'building_id': buildings[0].id, 'user_id': users[0].id,
+            'order_id': orders[0].id, 'service_id': services[0].id,
+        }
+
+    def run(self, args, repeat):
+        return {name: summarize(measure(lambda: list(build(**args)), repeat)) for name, build in HOT_QUERIES}
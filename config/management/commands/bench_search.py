@@ -0,0 +1,58 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from config.benchmarks import make_rng, measure, random_text, scratch_transaction, summarize
+from config.models import Building, Category, Service
+from config.search import IcontainsSearchBackend, get_search_backend
+
+QUERIES = ('электрик', 'сантехн', 'оңдоо кран', 'замена счетчик', 'котел')
+
+
+class Command(BaseCommand):
+    help = ("Издөөнүн ылдамдыгын эски icontains жолу менен салыштырат. "
+            "Маалыматтар транзакция ичинде түзүлүп, аягында өчүрүлөт - бош базада иштетиңиз.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        backend = get_search_backend()
+        rng = make_rng()
+        with scratch_transaction():
+            building = Building.objects.create(name="Бенчмарк", address="-")
+            categories = [Category.objects.create(name=word) for word in ('Электр', 'Сантехника', 'Тазалоо')]
+            created = 0
+            for size in sorted(options['sizes']):
+                while created < size:
+                    count = min(options['batch_size'], size - created)
+                    Service.objects.bulk_create([
+                        Service(building=building, category=rng.choice(categories),
+                                name=random_text(rng, 2), description=random_text(rng, 12), price=100)
+                        for _ in range(count)
+                    ])
+                    created += count
+                # bulk_create сигнал жибербейт, ошондуктан индексти толук кайра түзөбүз
+                backend.rebuild()
+                self.report(size, backend, options['repeat'])
+
+    def report(self, size, backend, repeat):
+        self.stdout.write(f"\n=== {size} кызмат ({type(backend).__name__}) ===")
+        for query in QUERIES:
+            def legacy():
+                # Мурунку home view: бүт сап менен LIKE
+                list(Service.objects.filter(Q(name__icontains=query) | Q(description__icontains=query))
+                     .values_list('id', flat=True))
+
+            def indexed():
+                list(backend.search(Service.objects.all(), query).values_list('id', flat=True))
+
+            def tokens():
+                list(IcontainsSearchBackend().search(Service.objects.all(), query).values_list('id', flat=True))
+
+            for label, func in (('icontains', legacy), ('icontains/tokens', tokens), ('index', indexed)):
+                stats = summarize(measure(func, repeat))
+                self.stdout.write(
+                    f"{query:<16} {label:<17} p50={stats['p50_ms']:8.2f}ms p95={stats['p95_ms']:8.2f}ms"
+                )
@@ -0,0 +1,69 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+
+from config.fast_serializers import FastJSONRenderer, compile_serializer
+from config.models import Order, OrderHistory, Service
+from config.querysets import optimize_for_serializer
+from config.serializers import OrderHistorySerializer, OrderSerializer, ServiceSerializer
+
+DATASETS = {
+    'orders': (Order, OrderSerializer, ('-created_at', '-id')),
+    'history': (OrderHistory, OrderHistorySerializer, ('-change_date', '-id')),
+    'services': (Service, ServiceSerializer, ('-created_at', '-id')),
+}
+
+
+class Command(BaseCommand):
+    help = ("Тизмелердин сериализациясы (сап/с): DRF ModelSerializer жана компиляцияланган serializer "
+            "(config/fast_serializers.py), JSON - json.dumps (JSONRenderer) жана orjson (FastJSONRenderer). "
+            "Натыйжалар байт-байтына салыштырылат. Бар маалыматтар окулат - адегенде seed_perf.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=100_000)
+        parser.add_argument('--datasets', nargs='+', choices=sorted(DATASETS), default=['orders', 'history'])
+
+    def handle(self, *args, **options):
+        request = Request(RequestFactory().get('/api/'))
+        for dataset in options['datasets']:
+            model, serializer_class, ordering = DATASETS[dataset]
+            queryset = model.objects.order_by(*ordering)[:options['rows']]
+            rows = queryset.count()
+            if not rows:
+                raise CommandError(f"{dataset}: маалымат жок - адегенде seed_perf иштетиңиз")
+            compiled = compile_serializer(serializer_class)
+
+            def drf():
+                serializer = serializer_class(optimize_for_serializer(queryset, serializer_class), many=True,
+                                              context={'request': request})
+                return serializer.data
+
+            def fast():
+                return compiled.serialize(list(compiled.rows(queryset)), request)
+
+            self.stdout.write(f"{dataset}: {rows} сап")
+            outputs = {}
+            for label, func in (('ModelSerializer', drf), ('compiled', fast)):
+                data, elapsed = self.timed(func)
+                self.line(f'{label} (SQL + dict)', rows, elapsed)
+                for renderer in (JSONRenderer(), FastJSONRenderer()):
+                    content, elapsed = self.timed(renderer.render, data)
+                    self.line(f'  + {type(renderer).__name__}', rows, elapsed, len(content))
+                    outputs[label, type(renderer).__name__] = content
+            same = len(set(outputs.values())) == 1
+            self.stdout.write(f"  JSON бирдей: {'ооба' if same else 'ЖОК'}")
+            if not same:
+                raise CommandError(f"{dataset}: натыйжалар айырмаланат")
+
+    @staticmethod
+    def timed(func, *args):
+        start = time.perf_counter()
+        result = func(*args)
+        return result, time.perf_counter() - start
+
+    def line(self, label, rows, elapsed, size=None):
+        suffix = f", {size / 1e6:7.1f} MB" if size is not None else ''
+        self.stdout.write(f"  {label:<30} {elapsed:7.2f}s {rows / elapsed:10.0f} сап/с{suffix}")
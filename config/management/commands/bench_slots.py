@@ -0,0 +1,91 @@
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.models import Count
+from django.utils import timezone
+
+from config.benchmarks import measure, summarize
+from config.models import Order, Service, User
+from config.orders import create_order_record
+from config.scheduling import SlotError, free_slots, load_schedule
+
+
+def try_reserve(service_id, building_id, user_id, day, start):
+    # Бөлөк процесс (gunicorn воркериндей): баары бир эле слотту алууга аракет кылат
+    service = Service.objects.select_related('building').get(pk=service_id)
+    try:
+        order = create_order_record(User.objects.get(pk=user_id), service, service.building, day, start)
+    except SlotError:
+        return None
+    finally:
+        connections.close_all()
+    return order.pk
+
+
+class Command(BaseCommand):
+    help = ("Бош слотторду издөөнүн кечигүүсү (эң көп заказы бар кызмат+имарат, бир ай): bisect индекси жана "
+            "салыштыруу үчүн ар бир слотко COUNT(*). Акырында бир нече процесс бир слотту бир убакта алууга "
+            "аракет кылат - бирөө гана ийгиликтүү болушу керек. Маалымат үчүн адегенде seed_perf иштетиңиз.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=31)
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--processes', type=int, default=8)
+
+    def handle(self, *args, **options):
+        busiest = (Order.objects.exclude(building=None).values('service_id', 'building_id')
+                   .annotate(orders=Count('id')).order_by('-orders').first())
+        if busiest is None:
+            raise CommandError("Заказ жок - адегенде seed_perf иштетиңиз")
+        service_id, building_id = busiest['service_id'], busiest['building_id']
+        first = (Order.objects.filter(service_id=service_id, building_id=building_id)
+                 .order_by('date').values_list('date', flat=True).first())
+        after = timezone.make_aware(datetime.combine(first, datetime.min.time()))
+        days = options['days']
+        in_month = Order.objects.filter(service_id=service_id, building_id=building_id,
+                                        date__range=(first, first + timedelta(days=days - 1))).count()
+        self.stdout.write(f"Заказдар: {Order.objects.count()}; кызмат {service_id} / имарат {building_id}: "
+                          f"{busiest['orders']} заказ, {days} күндө {in_month}")
+
+        def first_ten():
+            return free_slots(service_id, building_id, after=after, count=10, days=days)
+
+        def whole_month():
+            return free_slots(service_id, building_id, after=after, count=10 ** 6, days=days)
+
+        def count_per_slot():
+            # Индекссиз жол: ар бир слотко өзүнчө сурам (кесилишүүлөр эске алынбайт - ошого карабай жай)
+            schedule, slots = load_schedule(service_id, building_id), []
+            for offset in range(days):
+                day = first + timedelta(days=offset)
+                rule = schedule.rule(day)
+                for start in (rule.starts() if rule else ()):
+                    taken = Order.objects.filter(service_id=service_id, building_id=building_id, date=day,
+                                                 time__hour=start // 60, time__minute=start % 60).count()
+                    if taken < rule.capacity:
+                        slots.append((day, start))
+            return slots
+
+        self.stdout.write(f"{len(whole_month())} бош слот {days} күндө")
+        for label, func, repeat in (('free_slots(count=10)', first_ten, options['repeat']),
+                                    (f'free_slots({days} күн)', whole_month, options['repeat']),
+                                    ('COUNT(*) ар бир слотко', count_per_slot, max(1, options['repeat'] // 10))):
+            stats = summarize(measure(func, repeat))
+            self.stdout.write(f"{label:<26} p50={stats['p50_ms']:9.2f}ms p95={stats['p95_ms']:9.2f}ms")
+
+        self.race(service_id, building_id, options['processes'])
+
+    def race(self, service_id, building_id, processes):
+        far = timezone.make_aware(datetime(timezone.now().year + 50, 1, 1))
+        slot = free_slots(service_id, building_id, after=far, count=1)[0]
+        user_id = User.objects.values_list('pk', flat=True).first()
+        # Ата процесстин туташуулары fork'ко өтпөсүн
+        connections.close_all()
+        args = [service_id, building_id, user_id, slot['date'], slot['time']]
+        with ProcessPoolExecutor(processes) as pool:
+            created = [pk for pk in pool.map(try_reserve, *[[arg] * processes for arg in args]) if pk]
+        self.stdout.write(f"{processes} процесс бир слотко ({slot['date']} {slot['time']:%H:%M}, "
+                          f"сыйымдуулугу {slot['free']}): {len(created)} заказ түзүлдү")
+        Order.objects.filter(pk__in=created).delete()
@@ -0,0 +1,109 @@
+import os
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection, connections
+
+from config.models import Building, Order, OrderHistory, Service, User
+from config.orders import change_order_status, create_order_record
+
+PROFILES = {
+    # Мурунку абал: демейки журнал режими, autocommit жазуулар, кайталоосуз
+    'before': {},
+    'after': settings.SQLITE_PERFORMANCE_OPTIONS,
+}
+
+
+class Command(BaseCommand):
+    help = ("SQLite'ка N жазуучу жана M окуучу агым менен жүк берип, өткөрүү жөндөмүн жана "
+            "'database is locked' каталарын профилдер боюнча салыштырат (убактылуу файлдарда).")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--writers', type=int, default=4)
+        parser.add_argument('--readers', type=int, default=8)
+        parser.add_argument('--seconds', type=float, default=10)
+        parser.add_argument('--profiles', nargs='+', choices=sorted(PROFILES), default=['before', 'after'])
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError("Бул бенчмарк SQLite үчүн гана")
+        base = dict(connections.settings['default'])
+        with tempfile.TemporaryDirectory() as tmp:
+            try:
+                for profile in options['profiles']:
+                    self.use_database(base, os.path.join(tmp, f'{profile}.sqlite3'), PROFILES[profile])
+                    call_command('migrate', verbosity=0)
+                    stats = self.run(profile, options)
+                    self.stdout.write(
+                        f"{profile:<7} жазуу {stats['writes'] / options['seconds']:8.1f}/с "
+                        f"(кулпу катасы {stats['write_errors']}), "
+                        f"окуу {stats['reads'] / options['seconds']:8.1f}/с (кулпу катасы {stats['read_errors']})"
+                    )
+            finally:
+                self.use_database(base, base['NAME'], base.get('OPTIONS', {}))
+
+    def use_database(self, base, name, options):
+        connections['default'].close()
+        connections.settings['default'] = dict(base, NAME=name, OPTIONS=dict(options))
+        del connections['default']
+
+    def run(self, profile, options):
+        building = Building.objects.create(name="Бенчмарк", address="-")
+        service = Service.objects.create(building=building, name="Бенчмарк", description="-", price=1)
+        user = User.objects.create(username='bench-writer', role='MANAGER', managed_building=building)
+        stats = {'writes': 0, 'write_errors': 0, 'reads': 0, 'read_errors': 0}
+        lock = threading.Lock()
+        deadline = time.monotonic() + options['seconds']
+
+        def count(key):
+            with lock:
+                stats[key] += 1
+
+        def write_legacy():
+            # Мурунку create_order + update_order_status: эки өзүнчө autocommit жазуу
+            order = Order.objects.create(user=user, service=service, building=building,
+                                         date='2026-01-01', time='10:00', status='NEW')
+            order.status = 'DONE'
+            order.save()
+            OrderHistory.objects.create(order=order, old_status='NEW', new_status='DONE', changed_by=user)
+
+        def write_new():
+            order = create_order_record(user, service, building)
+            change_order_status(order, 'DONE', changed_by=user)
+
+        write = write_legacy if profile == 'before' else write_new
+
+        def writer():
+            try:
+                while time.monotonic() < deadline:
+                    try:
+                        write()
+                        count('writes')
+                    except OperationalError:
+                        count('write_errors')
+            finally:
+                connection.close()
+
+        def reader():
+            try:
+                while time.monotonic() < deadline:
+                    try:
+                        # dashboard: менеджердин имаратындагы заказдар
+                        list(Order.objects.filter(building=building).order_by('-created_at')[:200])
+                        count('reads')
+                    except OperationalError:
+                        count('read_errors')
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=writer) for _ in range(options['writers'])]
+        threads += [threading.Thread(target=reader) for _ in range(options['readers'])]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return stats
@@ -0,0 +1,77 @@
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory
+from rest_framework.throttling import SimpleRateThrottle
+
+from config.models import Building
+from config.throttling import FileBackend, MemoryBackend, SlidingWindow, SQLiteBackend, TokenBucket
+
+
+class CacheRateThrottle(SimpleRateThrottle):
+    """Салыштыруу үчүн: DRF'тин демейки (кэштеги тизме) чектөөсү."""
+
+    rate = '1000/h'  # тизмеде 1000 убакыт белгиси - баасы чекке жараша өсөт
+
+    def get_cache_key(self, request, view):
+        return f'bench-throttle:{request.META["REMOTE_ADDR"]}'
+
+
+def hammer(path, attempts):
+    # Бөлөк процесс (gunicorn воркериндей): бир ачкычка attempts жолу
+    backend = FileBackend(path, slots=1024)
+    algorithm = SlidingWindow(100, 3600)
+    return sum(not backend.update('shared', algorithm, time.time()) for _ in range(attempts))
+
+
+class Command(BaseCommand):
+    help = ("Бир чектөө текшерүүсүнүн баасы (мкс): memory, file (mmap), sqlite backend'дери, DRF'тин кэштеги "
+            "чектөөсү жана салыштыруу үчүн бир SQL сурам. Акырында бир нече процесс бир mmap файлды бөлүшкөндө "
+            "чек так сакталарын текшерет (100/саат чек, процесстерге 4x көп аракет).")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=20000)
+        parser.add_argument('--keys', type=int, default=1000)
+        parser.add_argument('--processes', type=int, default=4)
+
+    def handle(self, *args, **options):
+        count, keys = options['count'], options['keys']
+        with tempfile.TemporaryDirectory() as directory:
+            backends = {
+                'memory': MemoryBackend(),
+                'file': FileBackend(os.path.join(directory, 'throttle.db'), slots=1 << 16),
+                'sqlite': SQLiteBackend(os.path.join(directory, 'throttle.sqlite3')),
+            }
+            for name, backend in backends.items():
+                for label, algorithm in (('token', TokenBucket(10 ** 9, 60)), ('sliding', SlidingWindow(10 ** 9, 60))):
+                    start = time.perf_counter()
+                    for i in range(count):
+                        backend.update(f'ip:{i % keys}', algorithm, time.time())
+                    self.report(f'{name} {label}', start, count)
+
+            request = RequestFactory().post('/api/register/')
+            throttle = CacheRateThrottle()
+            start = time.perf_counter()
+            for _ in range(count):
+                throttle.allow_request(request, None)
+            self.report('DRF SimpleRateThrottle (locmem)', start, count)
+            cache.delete('bench-throttle:127.0.0.1')
+
+            start = time.perf_counter()
+            for _ in range(count // 10):
+                Building.objects.filter(pk=1).exists()
+            self.report('SQL: Building.exists()', start, count // 10)
+
+            processes = options['processes']
+            path = os.path.join(directory, 'shared.db')
+            with ProcessPoolExecutor(processes) as pool:
+                allowed = sum(pool.map(hammer, [path] * processes, [100] * processes))
+            self.stdout.write(f"{processes} процесс x 100 аракет, чек 100/саат: {allowed} уруксат")
+
+    def report(self, label, start, count):
+        elapsed = time.perf_counter() - start
+        self.stdout.write(f"{label:<34} {elapsed / count * 1e6:8.2f} мкс/текшерүү")
@@ -0,0 +1,36 @@
+import gzip
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from config.assets import BUNDLE, brotli_module, build_bundle
+
+
+class Command(BaseCommand):
+    help = ("static/build/app.css'ти курат: шаблондордо колдонулган Tailwind класстары, preflight, "
+            "static/css/base.css жана вендордогу шрифттер/иконкалар - бир кичирейтилген файл. Деплойдо андан "
+            "кийин collectstatic (хэш + gzip/brotli). --check: файл шаблондорго дал келбесе ката (CI үчүн).")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--check', action='store_true')
+
+    def handle(self, *args, **options):
+        css, unknown = build_bundle()
+        path = Path(settings.ASSETS_BUILD_DIR) / BUNDLE
+        if options['check']:
+            if not path.exists() or path.read_text(encoding='utf-8') != css:
+                raise CommandError(f"{path} эскирген - `python manage.py build_assets` иштетиңиз")
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(css, encoding='utf-8')
+
+        data = css.encode()
+        sizes = [f"{len(data)} байт", f"gzip {len(gzip.compress(data, 9))}"]
+        brotli = brotli_module()
+        if brotli is not None:
+            sizes.append(f"brotli {len(brotli.compress(data, quality=11))}")
+        self.stdout.write(f"{path}: {', '.join(sizes)}")
+        if options['verbosity'] > 1:
+            # Tailwind эмес сөздөр (Bootstrap класстары, шаблон тегдери ж.б.) - жаңы утилита кошулбаганын текшерүү
+            self.stdout.write("Тааныбаган: " + ' '.join(sorted(unknown)))
@@ -0,0 +1,60 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import django
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from config.images import build_derivatives, enabled_formats, is_source, record_derivatives, widths
+from config.models import Building, Category, ImageDerivative, Service
+
+
+class Command(BaseCommand):
+    help = "Бар болгон сүрөттөрдүн бардык өлчөм/формат көчүрмөлөрүн процесс пулу менен алдын ала түзөт"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+        parser.add_argument('--force', action='store_true', help="Даяр көчүрмөлөрдү да кайра түзөт")
+
+    def sources(self):
+        names = set()
+        for model in (Service, Category, Building):
+            names.update(model.objects.exclude(image='').exclude(image=None).values_list('image', flat=True))
+        return sorted(name for name in names if is_source(name))
+
+    def handle(self, *args, **options):
+        formats, buckets = enabled_formats(), widths()
+        if not formats:
+            raise CommandError("Pillow IMAGE_DERIVATIVE_FORMATS'тагы бир да форматты колдобойт")
+        sources = self.sources()
+        if not options['force']:
+            # Бардык өлчөм/формат көчүрмөлөрү даяр болгон сүрөттөр өткөрүлөт
+            expected = len(formats) * len(buckets)
+            done = {}
+            for source in ImageDerivative.objects.filter(
+                    source__in=sources, format__in=formats, bucket__in=buckets).values_list('source', flat=True):
+                done[source] = done.get(source, 0) + 1
+            sources = [source for source in sources if done.get(source, 0) < expected]
+        sources = [source for source in sources if default_storage.exists(source)]
+        if not sources:
+            self.stdout.write("Түзө турган сүрөт жок")
+            return
+
+        # Воркерлер базага тийбейт; ата процесстин туташуулары fork'ко өтпөсүн
+        connections.close_all()
+        created = failed = 0
+        with ProcessPoolExecutor(max_workers=max(1, options['workers']), initializer=django.setup) as pool:
+            futures = {pool.submit(build_derivatives, source, buckets, formats): source for source in sources}
+            for future in as_completed(futures):
+                try:
+                    rows = future.result()
+                except Exception as exc:
+                    failed += 1
+                    self.stderr.write(f"{futures[future]}: {exc}")
+                    continue
+                record_derivatives(rows)
+                created += len(rows)
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(sources) - failed} сүрөт, {created} көчүрмө ({', '.join(formats)}); ката: {failed}"
+        ))
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from config.hot_queries import HOT_QUERIES, check_plan, explain
+
+SAMPLE_ARGS = {'building_id': 1, 'user_id': 1, 'order_id': 1, 'service_id': 1}
+
+
+class Command(BaseCommand):
+    help = "Ысык сурамдардын EXPLAIN планын текшерет: толук сканерлөө болсо ката менен бүтөт"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--strict', action='store_true',
+                            help="Индекс аркылуу иреттелбеген (өзүнчө сорттолгон) сурамдарды да ката деп эсептөө")
+
+    def handle(self, *args, **options):
+        failures = []
+        for name, build in HOT_QUERIES:
+            lines = explain(build(**SAMPLE_ARGS))
+            full_scans, sorts = check_plan(lines, connection.vendor)
+            problems = full_scans + (sorts if options['strict'] else [])
+            status = self.style.ERROR('FAIL') if problems else self.style.SUCCESS('OK')
+            self.stdout.write(f"{status} {name}")
+            for line in lines:
+                self.stdout.write(f"    {line}")
+            if problems:
+                failures.append(name)
+        if failures:
+            raise CommandError(f"Толук сканерлөө: {', '.join(failures)}")
@@ -0,0 +1,44 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from config.exports import ExportError, FORMATS, export_queryset, iter_export
+from config.models import User
+
+
+class Command(BaseCommand):
+    help = "Заказдарды же алардын тарыхын CSV/NDJSON түрүндө агым менен экспорттойт (эс тутум туруктуу)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('dataset', choices=['orders', 'history'])
+        parser.add_argument('--format', dest='fmt', choices=sorted(FORMATS), default='csv')
+        parser.add_argument('--output', '-o', help="Файл (көрсөтүлбөсө stdout)")
+        parser.add_argument('--as-user', help="Ушул колдонуучунун ролу боюнча чектөө (username)")
+        parser.add_argument('--building', type=int)
+        parser.add_argument('--status')
+        parser.add_argument('--date-from')
+        parser.add_argument('--date-to')
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        user = None
+        if options['as_user']:
+            user = User.objects.filter(username=options['as_user']).first()
+            if user is None:
+                raise CommandError(f"Колдонуучу табылган жок: {options['as_user']}")
+        try:
+            queryset, columns = export_queryset(
+                options['dataset'], user=user, building=options['building'], status=options['status'],
+                date_from=options['date_from'], date_to=options['date_to'],
+            )
+            stream = iter_export(options['fmt'], queryset, columns, chunk_size=options['chunk_size'])
+        except ExportError as exc:
+            raise CommandError(str(exc))
+
+        out = open(options['output'], 'w', encoding='utf-8', newline='') if options['output'] else sys.stdout
+        try:
+            for chunk in stream:
+                out.write(chunk)
+        finally:
+            if out is not sys.stdout:
+                out.close()
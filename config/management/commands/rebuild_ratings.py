@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from config.ratings import find_drift, rebuild_summaries
+
+
+class Command(BaseCommand):
+    help = "Service.rating_* жыйынтыктарын Review таблицасынан кайра эсептейт же айырманы текшерет"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--check', action='store_true',
+                            help="Эч нерсе жазбайт, айырма табылса ката менен бүтөт")
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        if options['check']:
+            drifted = find_drift()
+            for service, expected in drifted:
+                self.stdout.write(
+                    f"#{service.id}: stored count={service.rating_count} sum={service.rating_sum}, "
+                    f"expected count={expected['rating_count']} sum={expected['rating_sum']}"
+                )
+            if drifted:
+                raise CommandError(f"{len(drifted)} кызматтын рейтинги туура эмес")
+            self.stdout.write(self.style.SUCCESS("Бардык рейтингдер туура"))
+            return
+
+        fixed = rebuild_summaries(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"{fixed} кызматтын рейтинги оңдолду"))
@@ -0,0 +1,71 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from config.analytics import compute_rollups, drift, partitions, source_range, write_rollups
+
+
+class Command(BaseCommand):
+    help = ("DailyRollup/HourlyRollup жыйынтыктарын Order, OrderHistory жана Review'дан кайра эсептейт. "
+            "Мезгил күн бөлүктөрүнө бөлүнөт; бөлүктөр процесс пулунда параллель эсептелип, ар бири өз "
+            "транзакциясында алмаштырылат. --check эч нерсе жазбайт.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', type=date.fromisoformat, help="Биринчи күн (демейки: эң эски жазуу)")
+        parser.add_argument('--end', type=date.fromisoformat, help="Акыркы күн, кошо (демейки: эң жаңы жазуу)")
+        parser.add_argument('--partition-days', type=int, default=7)
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+        parser.add_argument('--check', action='store_true',
+                            help="Эч нерсе жазбайт, айырма табылса ката менен бүтөт")
+
+    def handle(self, *args, **options):
+        bounds = source_range()
+        if bounds is None and not (options['start'] and options['end']):
+            self.stdout.write("Булак таблицалар бош")
+            return
+        start = options['start'] or bounds[0]
+        end = date.fromordinal(options['end'].toordinal() + 1) if options['end'] else bounds[1]
+        if start >= end:
+            raise CommandError("--start --end'ден кийин")
+
+        found, daily_rows, hourly_rows = [], 0, 0
+        for (part_start, part_end), computed in self.computed(start, end, options):
+            if options['check']:
+                found.extend(drift(part_start, part_end, computed))
+                continue
+            daily, hourly = write_rollups(part_start, part_end, *computed)
+            daily_rows += daily
+            hourly_rows += hourly
+            if options['verbosity'] > 1:
+                self.stdout.write(f"  {part_start} - {part_end}: {daily} күндүк, {hourly} сааттык сап")
+
+        if options['check']:
+            for table, key, stored, expected in found[:50]:
+                self.stdout.write(f"{table} {key}: сакталган {stored}, болушу керек {expected}")
+            if found:
+                raise CommandError(f"{len(found)} жыйынтык сабы булакка дал келбейт")
+            self.stdout.write(self.style.SUCCESS(f"Жыйынтыктар туура ({start} - {end})"))
+            return
+        self.stdout.write(self.style.SUCCESS(
+            f"{start} - {end}: {daily_rows} күндүк, {hourly_rows} сааттык сап"
+        ))
+
+    @staticmethod
+    def computed(start, end, options):
+        """((бөлүк), compute_rollups натыйжасы) - бөлүктөр бүткөн тартипте."""
+        parts = list(partitions(start, end, max(1, options['partition_days'])))
+        workers = min(max(1, options['workers']), len(parts))
+        if workers == 1:
+            for part in parts:
+                yield part, compute_rollups(*part)
+            return
+        # Воркерлер окуйт гана, жазуу ата процессте; ата процесстин туташуулары fork'ко өтпөсүн
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=workers, initializer=django.setup) as pool:
+            futures = {pool.submit(compute_rollups, *part): part for part in parts}
+            for future in as_completed(futures):
+                yield futures[future], future.result()
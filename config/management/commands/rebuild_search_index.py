@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from config.search import get_search_backend
+
+
+class Command(BaseCommand):
+    help = "Кызматтардын издөө индексин толугу менен кайра түзөт (bulk импорттон кийин)"
+
+    def handle(self, *args, **options):
+        total = get_search_backend().rebuild()
+        self.stdout.write(self.style.SUCCESS(f"{total} кызмат индекстелди"))
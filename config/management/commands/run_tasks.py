@@ -0,0 +1,44 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from config.models import Task
+from config.tasks import run_due_tasks
+
+
+class Command(BaseCommand):
+    help = "Фондогу тапшырмалардын воркери: кезектеги Task саптарын агымдар пулу менен аткарат"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=4)
+        parser.add_argument('--batch', type=int, default=100, help="Бир айлампада алынуучу тапшырмалар")
+        parser.add_argument('--sleep', type=float, default=1.0, help="Кезек бош болгондо күтүү (секунд)")
+        parser.add_argument('--once', action='store_true', help="Кезек бошогончо аткарып, чыгып кетет")
+        parser.add_argument('--keep-days', type=int, default=7, help="Бүткөн тапшырмалар канча күн сакталат")
+
+    def handle(self, *args, **options):
+        self.purge(options['keep_days'])
+        total = 0
+        with ThreadPoolExecutor(max_workers=max(1, options['threads'])) as pool:
+            try:
+                while True:
+                    done = run_due_tasks(limit=options['batch'], executor=pool)
+                    total += done
+                    if done:
+                        continue
+                    if options['once']:
+                        break
+                    time.sleep(options['sleep'])
+            except KeyboardInterrupt:
+                pass
+        self.stdout.write(self.style.SUCCESS(f"{total} тапшырма аткарылды"))
+
+    def purge(self, keep_days):
+        deleted, _ = Task.objects.filter(
+            status='DONE', finished_at__lt=timezone.now() - timedelta(days=keep_days),
+        ).delete()
+        if deleted:
+            self.stdout.write(f"{deleted} эски тапшырма өчүрүлдү")
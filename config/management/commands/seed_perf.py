@@ -0,0 +1,180 @@
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from config.analytics import partitions, rebuild_partition, source_range
+from config.benchmarks import WORDS, explicit_timestamps, make_rng, random_text
+from config.caching import CATALOG_SCOPE, invalidate_scopes
+from config.conditional import bump_catalog_version
+from config.models import Building, Category, Client, Order, OrderHistory, Review, Service, User
+from config.ratings import rebuild_summaries
+from config.search import get_search_backend
+
+# Заказдын акыркы статусуна чейинки жол - ар бир өтүү OrderHistory'дө бир сап
+STATUS_PATHS = {
+    'NEW': [],
+    'IN_PROGRESS': [('NEW', 'IN_PROGRESS')],
+    'DONE': [('NEW', 'IN_PROGRESS'), ('IN_PROGRESS', 'DONE')],
+}
+STATUS_WEIGHTS = (('NEW', 2), ('IN_PROGRESS', 3), ('DONE', 5))
+ICONS = ('fa-bolt', 'fa-faucet', 'fa-broom', 'fa-paint-roller', 'fa-tools', 'fa-wind')
+
+
+class Command(BaseCommand):
+    help = ("Бенчмарктар үчүн реалдуу маалымат түзөт: имараттар, категориялар, кызматтар, ар бир ролдогу "
+            "колдонуучулар, статус тарыхы менен заказдар жана пикирлер. --orders 1000дөн 10 000 000го чейин; "
+            "калган таблицалардын көлөмү андан эсептелет. Бош (же көчүрмө) базада иштетиңиз.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--orders', type=int, default=10_000)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--prefix', default='perf',
+                            help="Колдонуучу аттарынын башы (perf-admin-0, perf-manager-3 ...)")
+        parser.add_argument('--password', default='perf-pass', help="Бардык түзүлгөн колдонуучулардын сырсөзү")
+
+    def handle(self, *args, **options):
+        if not connection.features.can_return_rows_from_bulk_insert:
+            raise CommandError("bulk_create id кайтарышы керек (SQLite 3.35+ же PostgreSQL)")
+        prefix = options['prefix']
+        if User.objects.filter(username__startswith=f'{prefix}-').exists():
+            raise CommandError(f"'{prefix}-' колдонуучулары мурунтан бар - башка --prefix же бош база колдонуңуз")
+
+        self.rng = make_rng(options['seed'])
+        self.batch_size = options['batch_size']
+        self.verbosity = options['verbosity']
+        self.now = timezone.now()
+        sizes = self.sizes(options['orders'])
+        started = time.perf_counter()
+
+        with transaction.atomic():
+            categories = self.seed_categories(sizes['categories'])
+            buildings = self.seed_buildings(sizes['buildings'])
+            services = self.seed_services(sizes['services'], buildings, categories)
+            managers, users = self.seed_users(prefix, make_password(options['password']), sizes, buildings)
+            Client.objects.bulk_create([
+                Client(first_name=random_text(self.rng, 1), last_name=random_text(self.rng, 1),
+                       phone=f'+996{700000000 + i}', email=f'{prefix}-client-{i}@example.kg')
+                for i in range(sizes['clients'])
+            ], batch_size=self.batch_size)
+        self.seed_orders(sizes['orders'], services, managers, users)
+        self.seed_reviews(sizes['reviews'], services, users)
+
+        # bulk_create сигналдарды чакырбайт - жыйынтыктар, аналитика, издөө индекси жана кэш версиялары кайра эсептелет
+        rebuild_summaries()
+        get_search_backend().rebuild()
+        for start, end in partitions(*source_range(), days=30):
+            rebuild_partition(start, end)
+        bump_catalog_version('building', 'category', 'service')
+        invalidate_scopes(['all', CATALOG_SCOPE])
+
+        if not self.verbosity:
+            return
+        elapsed = time.perf_counter() - started
+        summary = ', '.join(f'{name} {count}' for name, count in sizes.items())
+        self.stdout.write(self.style.SUCCESS(f"Түзүлдү ({elapsed:.1f}s): {summary}"))
+
+    @staticmethod
+    def sizes(orders):
+        buildings = min(5000, max(5, orders // 2000))
+        return {
+            'categories': len(WORDS) // 2,
+            'buildings': buildings,
+            'services': buildings * 4,
+            'admins': 3,
+            'managers': buildings,
+            'users': max(50, orders // 20),
+            'clients': max(20, orders // 100),
+            'orders': orders,
+            'reviews': orders // 10,
+        }
+
+    def past(self, days=365):
+        return self.now - timedelta(seconds=self.rng.randint(0, days * 86400))
+
+    def seed_categories(self, count):
+        return Category.objects.bulk_create([
+            Category(name=WORDS[i].capitalize(), icon=ICONS[i % len(ICONS)]) for i in range(count)
+        ])
+
+    def seed_buildings(self, count):
+        with explicit_timestamps(Building, 'created_at'):
+            return Building.objects.bulk_create([
+                Building(name=f"{random_text(self.rng, 2).title()} {i}",
+                         address=f"Бишкек, {random_text(self.rng, 1)} көч. {i}", created_at=self.past(3 * 365))
+                for i in range(count)
+            ], batch_size=self.batch_size)
+
+    def seed_services(self, count, buildings, categories):
+        with explicit_timestamps(Service, 'created_at'):
+            return Service.objects.bulk_create([
+                Service(building=self.rng.choice(buildings), category=self.rng.choice(categories),
+                        name=f"{random_text(self.rng, 2).capitalize()} {i}", description=random_text(self.rng, 30),
+                        price=Decimal(self.rng.randint(5, 500) * 100), created_at=self.past(2 * 365))
+                for i in range(count)
+            ], batch_size=self.batch_size)
+
+    def seed_users(self, prefix, password, sizes, buildings):
+        def make(role, i, **fields):
+            return User(username=f'{prefix}-{role.lower()}-{i}', password=password, role=role,
+                        email=f'{prefix}-{role.lower()}-{i}@example.kg', created_at=self.past(2 * 365), **fields)
+
+        # Админдер admin панелине да кире алат (bench анын барактарын да өлчөйт)
+        users = [make('ADMIN', i, is_staff=True, is_superuser=True) for i in range(sizes['admins'])]
+        users += [make('MANAGER', i, managed_building=building) for i, building in enumerate(buildings)]
+        users += [make('USER', i) for i in range(sizes['users'])]
+        with explicit_timestamps(User, 'created_at'):
+            users = User.objects.bulk_create(users, batch_size=self.batch_size)
+        managers = {user.managed_building_id: user.pk for user in users if user.role == 'MANAGER'}
+        return managers, [user.pk for user in users if user.role == 'USER']
+
+    def seed_orders(self, total, services, managers, users):
+        statuses, weights = zip(*STATUS_WEIGHTS)
+        service_rows = [(service.pk, service.building_id) for service in services]
+        created = 0
+        while created < total:
+            count = min(self.batch_size, total - created)
+            orders, history = [], []
+            for _ in range(count):
+                service_id, building_id = self.rng.choice(service_rows)
+                created_at = self.past()
+                orders.append(Order(
+                    user_id=self.rng.choice(users), service_id=service_id, building_id=building_id,
+                    date=(created_at + timedelta(days=self.rng.randint(0, 14))).date(),
+                    time=f'{self.rng.randint(8, 19):02d}:{self.rng.choice(("00", "30"))}',
+                    status=self.rng.choices(statuses, weights)[0], created_at=created_at,
+                    comment=random_text(self.rng, 8) if self.rng.random() < 0.3 else None,
+                ))
+            with transaction.atomic(), explicit_timestamps(Order, 'created_at'), \
+                    explicit_timestamps(OrderHistory, 'change_date'):
+                orders = Order.objects.bulk_create(orders)
+                for order in orders:
+                    change_date = order.created_at
+                    for old, new in STATUS_PATHS[order.status]:
+                        change_date += timedelta(hours=self.rng.randint(1, 72))
+                        history.append(OrderHistory(order_id=order.pk, old_status=old, new_status=new,
+                                                    changed_by_id=managers[order.building_id],
+                                                    change_date=change_date))
+                OrderHistory.objects.bulk_create(history)
+            created += count
+            if self.verbosity > 1:
+                self.stdout.write(f"  заказдар: {created}/{total}")
+
+    def seed_reviews(self, total, services, users):
+        service_ids = [service.pk for service in services]
+        created = 0
+        while created < total:
+            count = min(self.batch_size, total - created)
+            with explicit_timestamps(Review, 'created_at'):
+                Review.objects.bulk_create([
+                    Review(service_id=self.rng.choice(service_ids), user_id=self.rng.choice(users),
+                           rating=self.rng.choices(range(1, 6), (1, 1, 2, 4, 6))[0],
+                           comment=random_text(self.rng, 12), created_at=self.past())
+                    for _ in range(count)
+                ])
+            created += count
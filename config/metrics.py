@@ -0,0 +1,327 @@
+import glob
+import json
+import mmap
+import os
+import struct
+import threading
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core import checks
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse, HttpResponseForbidden
+from django.utils.crypto import constant_time_compare
+from django.views.decorators.csrf import csrf_exempt
+
+from .instrumentation import timed_queries, view_name
+
+# ===================
+# САКТОО (процесс боюнча)
+# ===================
+# Ар бир процесс өз файлына жазат (METRICS_DIR/<pid>.db, mmap) - кулпу процесстин ичинде гана керек.
+# /metrics бардык файлдарды окуп, маанилерди кошот: ORM'го да, башка процесстерге да тийбейт.
+# Өлгөн воркердин файлы калат - эсептегичтер монотондуу бойдон калат (прометейдин multiprocess режими
+# сыяктуу). Деплойдо METRICS_DIR тазаланат. METRICS_DIR жок болсо (dev, тесттер) - процесстин эс тутуму.
+
+_HEADER = 8  # колдонулган байттардын саны (int32) + толуктоо
+
+
+class MemoryValues:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.values = {}
+
+    def add(self, key, amount):
+        with self.lock:
+            self.values[key] = self.values.get(key, 0.0) + amount
+
+    def items(self):
+        with self.lock:
+            return list(self.values.items())
+
+
+class MmapValues:
+    """Жазуу: [int32 ачкычтын узундугу][ачкыч, 8ге толукталат][float64 маани]. Жаңы ачкыч аягына кошулат."""
+
+    initial_size = 1 << 16
+
+    def __init__(self, path):
+        self.lock = threading.Lock()
+        self.file = open(path, 'a+b')
+        size = os.fstat(self.file.fileno()).st_size
+        if size < _HEADER:
+            self.file.truncate(self.initial_size)
+            size = self.initial_size
+        self.map = mmap.mmap(self.file.fileno(), size)
+        self.used = struct.unpack_from('i', self.map, 0)[0] or _HEADER
+        self.positions = {key: position for key, _, position in iter_entries(self.map, self.used)}
+
+    def _append(self, key):
+        encoded = key.encode()
+        padding = (8 - (4 + len(encoded)) % 8) % 8
+        entry = struct.pack(f'i{len(encoded) + padding}sd', len(encoded), encoded, 0.0)
+        while self.used + len(entry) > len(self.map):
+            size = len(self.map) * 2
+            self.map.close()
+            self.file.truncate(size)
+            self.map = mmap.mmap(self.file.fileno(), size)
+        self.map[self.used:self.used + len(entry)] = entry
+        self.used += len(entry)
+        # Адегенде жазуу, анан өлчөм - окуучу толук эмес жазууну көрбөйт
+        struct.pack_into('i', self.map, 0, self.used)
+        self.positions[key] = self.used - 8
+        return self.positions[key]
+
+    def add(self, key, amount):
+        with self.lock:
+            position = self.positions.get(key)
+            if position is None:
+                position = self._append(key)
+            value = struct.unpack_from('d', self.map, position)[0]
+            struct.pack_into('d', self.map, position, value + amount)
+
+    def items(self):
+        with self.lock:
+            return [(key, value) for key, value, _ in iter_entries(self.map, self.used)]
+
+
+def iter_entries(data, used):
+    position = _HEADER
+    while position < used:
+        length = struct.unpack_from('i', data, position)[0]
+        key = bytes(data[position + 4:position + 4 + length]).decode()
+        position += 4 + length + (8 - (4 + length) % 8) % 8
+        yield key, struct.unpack_from('d', data, position)[0], position
+        position += 8
+
+
+def read_file(path):
+    with open(path, 'rb') as handle:
+        data = handle.read()
+    if len(data) < _HEADER:
+        return []
+    used = struct.unpack_from('i', data, 0)[0]
+    return [(key, value) for key, value, _ in iter_entries(data, min(used, len(data)))]
+
+
+_storage = {'pid': None, 'values': None}
+_storage_lock = threading.Lock()
+
+
+def values():
+    """Учурдагы процесстин сактагычы (fork'тон кийин жаңы файл ачылат)."""
+    pid = os.getpid()
+    if _storage['pid'] != pid:
+        with _storage_lock:
+            if _storage['pid'] != pid:
+                directory = settings.METRICS_DIR
+                _storage['values'] = MmapValues(os.path.join(directory, f'{pid}.db')) if directory else MemoryValues()
+                _storage['pid'] = pid
+    return _storage['values']
+
+
+def collected_items():
+    directory = settings.METRICS_DIR
+    if not directory:
+        return values().items()
+    items = []
+    for path in sorted(glob.glob(os.path.join(directory, '*.db'))):
+        items.extend(read_file(path))
+    return items
+
+
+# ===================
+# МЕТРИКАЛАР
+# ===================
+_registry = {}
+
+
+class Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._keys = {}
+        _registry[name] = self
+
+    def key(self, sample, labels):
+        # json.dumps ар бир жолу эмес - ачкычтар эстеп калынат
+        cache_key = (sample, labels)
+        key = self._keys.get(cache_key)
+        if key is None:
+            key = self._keys[cache_key] = json.dumps([sample, labels], ensure_ascii=False)
+        return key
+
+    def label_values(self, labels):
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        values().add(self.key(self.name, self.label_values(labels)), amount)
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=()):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        label_values = self.label_values(labels)
+        storage = values()
+        # Чака кумулятивдүү эмес сакталат (бир гана жазуу), /metrics'те кумулятивдүү болот
+        bucket = next((str(edge) for edge in self.buckets if value <= edge), '+Inf')
+        storage.add(self.key(f'{self.name}_bucket:{bucket}', label_values), 1)
+        storage.add(self.key(f'{self.name}_sum', label_values), value)
+        storage.add(self.key(f'{self.name}_count', label_values), 1)
+
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DB_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+# Статуста туруу: мүнөттөн бир нече күнгө чейин
+STATUS_BUCKETS = (60, 300, 900, 3600, 4 * 3600, 12 * 3600, 86400, 3 * 86400, 7 * 86400, 30 * 86400)
+
+REQUESTS = Counter('http_requests_total', "HTTP сурамдар", ('view', 'method', 'status'))
+REQUEST_SECONDS = Histogram('http_request_duration_seconds', "Сурамдын узактыгы", ('view',), LATENCY_BUCKETS)
+REQUEST_DB_SECONDS = Histogram('http_request_db_seconds', "Бир сурамдагы SQL убактысы", ('view',), DB_BUCKETS)
+DB_QUERIES = Counter('db_queries_total', "SQL сурамдар", ('view',))
+CACHE_REQUESTS = Counter('dashboard_cache_requests_total', "Dashboard кэши", ('name', 'result'))
+AUTH_CACHE_REQUESTS = Counter('auth_cache_requests_total', "Колдонуучу/токен кэши", ('kind', 'result'))
+ORDERS_CREATED = Counter('orders_created_total', "Түзүлгөн заказдар", ('building',))
+STATUS_TRANSITIONS = Counter('order_status_transitions_total', "Статус өтүүлөрү", ('building', 'from', 'to'))
+THROTTLED = Counter('throttled_requests_total', "Чектелген (429) сурамдар", ('scope',))
+TIME_IN_STATUS = Histogram('order_time_in_status_seconds', "Заказдын мурунку статуста турган убактысы",
+                           ('building', 'status'), STATUS_BUCKETS)
+
+
+def building_label(building_id):
+    return building_id if building_id is not None else 'none'
+
+
+def record_transition(building_id, old_status, new_status, seconds):
+    """OrderHistory окуясы: өтүү + мурунку статуста канча турганы. Топтоп жазуучулар (bulk) да чакырат."""
+    building = building_label(building_id)
+    STATUS_TRANSITIONS.inc(building=building, **{'from': old_status, 'to': new_status})
+    if seconds is not None:
+        TIME_IN_STATUS.observe(max(seconds, 0.0), building=building, status=old_status)
+
+
+# ===================
+# ЭКСПОЗИЦИЯ
+# ===================
+def _escape(value):
+    return value.replace('\\', r'\\').replace('\n', r'\n').replace('"', r'\"')
+
+
+def _labels(names, label_values, extra=()):
+    pairs = [*zip(names, label_values), *extra]
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(str(value))}"' for name, value in pairs) + '}'
+
+
+def _number(value):
+    return repr(float(value)) if value != int(value) else f'{value:.1f}'
+
+
+def exposition():
+    """Prometheus text format 0.0.4 - бардык процесстердин маанилери кошулат."""
+    totals = {}
+    for key, value in collected_items():
+        totals[key] = totals.get(key, 0.0) + value
+    samples = {}
+    for key, value in totals.items():
+        sample, label_values = json.loads(key)
+        samples[(sample, tuple(label_values))] = value
+
+    lines = []
+    for name, metric in sorted(_registry.items()):
+        lines.append(f'# HELP {name} {metric.documentation}')
+        lines.append(f'# TYPE {name} {metric.kind}')
+        if metric.kind == 'counter':
+            for (sample, label_values), value in sorted(samples.items()):
+                if sample == name:
+                    lines.append(f'{name}{_labels(metric.labelnames, label_values)} {_number(value)}')
+            continue
+        label_sets = sorted({label_values for (sample, label_values) in samples if sample == f'{name}_count'})
+        for label_values in label_sets:
+            cumulative = 0.0
+            for edge in [*map(str, metric.buckets), '+Inf']:
+                cumulative += samples.get((f'{name}_bucket:{edge}', label_values), 0.0)
+                lines.append(f'{name}_bucket{_labels(metric.labelnames, label_values, [("le", edge)])} '
+                             f'{_number(cumulative)}')
+            for suffix in ('_sum', '_count'):
+                lines.append(f'{name}{suffix}{_labels(metric.labelnames, label_values)} '
+                             f'{_number(samples.get((name + suffix, label_values), 0.0))}')
+    return '\n'.join(lines) + '\n'
+
+
+@csrf_exempt
+def metrics_view(request):
+    # Prometheus `Authorization: Bearer <METRICS_TOKEN>` жиберет; токенсиз - DEBUG'та гана (трафик, каталар,
+    # кезек - ачык болбошу керек). Сессия текшерилбейт: scrape ORM'го тийбейт
+    token = settings.METRICS_TOKEN
+    if token:
+        allowed = constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {token}')
+    else:
+        allowed = settings.DEBUG
+    if not allowed:
+        return HttpResponseForbidden()
+    return HttpResponse(exposition(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+@checks.register(checks.Tags.security, deploy=True)
+def check_metrics_token(app_configs, **kwargs):
+    if not settings.METRICS_ENABLED or settings.METRICS_TOKEN or settings.DEBUG:
+        return []
+    return [checks.Warning(
+        "METRICS_TOKEN коюлган эмес: /metrics бардык сурамдарга 403 кайтарат.",
+        hint="METRICS_TOKEN коюп, Prometheus'тун scrape конфигурациясына `Authorization: Bearer <token>` кошуңуз.",
+        id='config.W003',
+    )]
+
+
+# ===================
+# MIDDLEWARE
+# ===================
+class MetricsMiddleware:
+    """Ар бир сурам: саны, узактыгы, SQL убактысы (config/instrumentation.py'деги execute_wrapper аркылуу)."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with timed_queries() as timer:
+            response = self.get_response(request)
+        self.record(request, response, timer)
+        return response
+
+    async def __acall__(self, request):
+        with timed_queries() as timer:
+            response = await self.get_response(request)
+        self.record(request, response, timer)
+        return response
+
+    @staticmethod
+    def record(request, response, timer):
+        view = view_name(request)
+        REQUESTS.inc(view=view, method=request.method, status=response.status_code)
+        REQUEST_SECONDS.observe(timer.elapsed, view=view)
+        REQUEST_DB_SECONDS.observe(timer.seconds, view=view)
+        DB_QUERIES.inc(timer.count, view=view)
+
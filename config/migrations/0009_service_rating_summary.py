@@ -0,0 +1,69 @@
+# Generated by Django 6.0.1 on 2026-10-18 10:12
+
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+
+
+def fill_rating_summary(apps, schema_editor):
+    Service = apps.get_model('config', 'Service')
+    Review = apps.get_model('config', 'Review')
+    rows = Review.objects.values('service_id').annotate(
+        rating_count=Count('id'),
+        rating_sum=Sum('rating'),
+        **{f'rating_{star}': Count('id', filter=Q(rating=star)) for star in range(1, 6)},
+    )
+    for row in rows:
+        service_id = row.pop('service_id')
+        row['rating_avg'] = row['rating_sum'] / row['rating_count']
+        Service.objects.filter(pk=service_id).update(**row)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('config', '0008_alter_review_options_alter_category_icon_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='service',
+            name='rating_1',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='service',
+            name='rating_2',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='service',
+            name='rating_3',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='service',
+            name='rating_4',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='service',
+            name='rating_5',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='service',
+            name='rating_avg',
+            field=models.FloatField(default=0.0, editable=False, verbose_name='Орточо рейтинг'),
+        ),
+        migrations.AddField(
+            model_name='service',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Пикирлер саны'),
+        ),
+        migrations.AddField(
+            model_name='service',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(fill_rating_summary, migrations.RunPython.noop),
+    ]
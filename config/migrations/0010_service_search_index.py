@@ -0,0 +1,33 @@
+# Generated by Django 6.0.1 on 2026-10-18 11:40
+
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    # PostgreSQL'де tsvector сурам учурунда түзүлөт (config.search.PostgresSearchBackend)
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS config_service_fts USING fts5("
+            "name, description, category, tokenize = 'unicode61 remove_diacritics 2')"
+        )
+        schema_editor.execute(
+            "INSERT INTO config_service_fts (rowid, name, description, category) "
+            "SELECT s.id, s.name, s.description, COALESCE(c.name, '') "
+            "FROM config_service s LEFT JOIN config_category c ON c.id = s.category_id"
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute("DROP TABLE IF EXISTS config_service_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('config', '0009_service_rating_summary'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
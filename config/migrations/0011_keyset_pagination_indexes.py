@@ -0,0 +1,33 @@
+# Generated by Django 6.0.1 on 2026-10-18 13:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('config', '0010_service_search_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='building',
+            index=models.Index(fields=['-created_at', '-id'], name='building_created_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['-created_at', '-id'], name='order_created_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='orderhistory',
+            index=models.Index(fields=['-change_date', '-id'], name='history_changed_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='service',
+            index=models.Index(fields=['-created_at', '-id'], name='service_created_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['-created_at', '-id'], name='user_created_keyset_idx'),
+        ),
+    ]
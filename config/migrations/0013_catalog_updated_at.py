@@ -0,0 +1,50 @@
+# Generated by Django 6.0.1 on 2026-10-18 17:49
+
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import F
+
+CATALOG_TABLES = ('building', 'category', 'service')
+
+
+def fill_updated_at(apps, schema_editor):
+    # Бар болгон жазуулар үчүн эң жакын маани - түзүлгөн убакыт
+    for model_name in ('Building', 'Service'):
+        apps.get_model('config', model_name).objects.update(updated_at=F('created_at'))
+    CatalogVersion = apps.get_model('config', 'CatalogVersion')
+    CatalogVersion.objects.bulk_create([CatalogVersion(name=name) for name in CATALOG_TABLES],
+                                       ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('config', '0012_order_composite_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CatalogVersion',
+            fields=[
+                ('name', models.CharField(max_length=30, primary_key=True, serialize=False)),
+                ('version', models.PositiveBigIntegerField(default=0)),
+                ('changed_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='building',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='service',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.RunPython(fill_updated_at, migrations.RunPython.noop),
+    ]
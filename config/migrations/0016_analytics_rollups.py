@@ -0,0 +1,46 @@
+# Generated by Django 6.0.1 on 2026-10-18 18:27
+
+import datetime
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('config', '0015_task_queue'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('building_id', models.PositiveIntegerField()),
+                ('service_id', models.PositiveIntegerField()),
+                ('orders_created', models.IntegerField(default=0)),
+                ('orders_done', models.IntegerField(default=0)),
+                ('completion_time', models.DurationField(default=datetime.timedelta)),
+                ('reviews', models.IntegerField(default=0)),
+                ('rating_sum', models.IntegerField(default=0)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['building_id', 'day'], name='daily_rollup_building_idx')],
+                'constraints': [models.UniqueConstraint(fields=('day', 'building_id', 'service_id'), name='daily_rollup_unique')],
+            },
+        ),
+        migrations.CreateModel(
+            name='HourlyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hour', models.DateTimeField()),
+                ('building_id', models.PositiveIntegerField()),
+                ('orders_created', models.IntegerField(default=0)),
+                ('orders_done', models.IntegerField(default=0)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['building_id', 'hour'], name='hourly_rollup_building_idx')],
+                'constraints': [models.UniqueConstraint(fields=('hour', 'building_id'), name='hourly_rollup_unique')],
+            },
+        ),
+    ]
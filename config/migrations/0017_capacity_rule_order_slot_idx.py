@@ -0,0 +1,45 @@
+# Generated by Django 6.0.1 on 2026-10-18 18:55
+
+import datetime
+import django.core.validators
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('config', '0016_analytics_rollups'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CapacityRule',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('weekdays', models.CharField(default='0123456', max_length=7, verbose_name='Жуманын күндөрү (0 - дүйшөмбү)')),
+                ('opens_at', models.TimeField(default=datetime.time(9, 0))),
+                ('closes_at', models.TimeField(default=datetime.time(18, 0))),
+                ('slot_minutes', models.PositiveSmallIntegerField(default=60, validators=[django.core.validators.MinValueValidator(5)])),
+                ('capacity', models.PositiveSmallIntegerField(default=1, verbose_name='Бир слоттогу заказдар')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['service', 'building', 'date', 'time'], name='order_slot_idx'),
+        ),
+        migrations.AddField(
+            model_name='capacityrule',
+            name='building',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='capacity_rules', to='config.building'),
+        ),
+        migrations.AddField(
+            model_name='capacityrule',
+            name='service',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='capacity_rules', to='config.service'),
+        ),
+        migrations.AddIndex(
+            model_name='capacityrule',
+            index=models.Index(fields=['service', 'building'], name='capacity_rule_target_idx'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 6.0.1 on 2026-10-18 21:10
+
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY
+from django.contrib.sessions.backends.cached_db import KEY_PREFIX
+from django.contrib.sessions.backends.db import SessionStore
+from django.core.cache import caches
+from django.db import migrations
+from django.utils import timezone
+
+OLD_BACKEND = 'django.contrib.auth.backends.ModelBackend'
+NEW_BACKEND = 'config.auth_cache.CachedModelBackend'
+
+
+def move_sessions(apps, schema_editor):
+    # Кэштен мурун ачылган сессияларда ModelBackend'дин жолу: ал AUTHENTICATION_BACKENDS'те жок - колдонуучу
+    # чыгып калбасын, жол CachedModelBackend'ке алмаштырылат (cached_db'нин кэштеги эски көчүрмөсү өчүрүлөт)
+    Session = apps.get_model('sessions', 'Session')
+    store = SessionStore()
+    changed = []
+    sessions = Session.objects.using(schema_editor.connection.alias).filter(expire_date__gt=timezone.now())
+    for session in sessions.iterator(chunk_size=2000):
+        data = store.decode(session.session_data)
+        if data.get(BACKEND_SESSION_KEY) == OLD_BACKEND:
+            data[BACKEND_SESSION_KEY] = NEW_BACKEND
+            session.session_data = store.encode(data)
+            changed.append(session)
+    Session.objects.using(schema_editor.connection.alias).bulk_update(changed, ['session_data'], batch_size=1000)
+    caches[settings.SESSION_CACHE_ALIAS].delete_many([KEY_PREFIX + session.session_key for session in changed])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('config', '0017_capacity_rule_order_slot_idx'),
+        ('sessions', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(move_sessions, migrations.RunPython.noop),
+    ]
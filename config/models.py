@@ -1,7 +1,9 @@
+from datetime import time, timedelta
+
 from django.db import models
 from django.contrib.auth.models import AbstractUser, Group, Permission
 from django.core.validators import MinValueValidator, MaxValueValidator
-from django.db.models import Avg # Орточо рейтинг үчүн кошулду
+from django.utils import timezone
 
 # ===================
 # КОЛДОНУУЧУЛАР
@@ -23,10 +25,25 @@ class User(AbstractUser):
     groups = models.ManyToManyField(Group, related_name='config_user_set', blank=True)
     user_permissions = models.ManyToManyField(Permission, related_name='config_user_permissions_set', blank=True)
 
+    class Meta(AbstractUser.Meta):
+        indexes = [models.Index(fields=['-created_at', '-id'], name='user_created_keyset_idx')]
+
     def __str__(self):
         full_name = f"{self.first_name} {self.last_name}".strip()
         return f"{full_name if full_name else self.username} ({self.role})"
 
+# ===================
+# КАТАЛОГ ВЕРСИЯЛАРЫ (ETag)
+# ===================
+class CatalogVersion(models.Model):
+    """Таблица өзгөргөн сайын версия көбөйөт (config/conditional.py) - ETag бир кичине сурам менен эсептелет."""
+    name = models.CharField(max_length=30, primary_key=True)
+    version = models.PositiveBigIntegerField(default=0)
+    changed_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"{self.name} v{self.version}"
+
 # ===================
 # КАТЕГОРИЯЛАР
 # ===================
@@ -34,6 +51,7 @@ class Category(models.Model):
     name = models.CharField(max_length=100, verbose_name="Категория аты")
     icon = models.CharField(max_length=50, help_text="FontAwesome классы", default="fa-tools")
     image = models.ImageField(upload_to='categories/', null=True, blank=True, verbose_name="Категория сүрөтү")
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         verbose_name = "Категория"
@@ -50,6 +68,10 @@ class Building(models.Model):
     address = models.TextField()
     image = models.ImageField(upload_to='buildings/', null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['-created_at', '-id'], name='building_created_keyset_idx')]
 
     def __str__(self):
         return self.name
@@ -65,18 +87,54 @@ class Service(models.Model):
     price = models.DecimalField(max_digits=10, decimal_places=2)
     image = models.ImageField(upload_to='services/', null=True, blank=True, verbose_name="Сервис сүрөтү")
     created_at = models.DateTimeField(auto_now_add=True)
+    # Рейтинг жаңыланганда да өзгөрөт (config/ratings.py)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    # Рейтингдин сакталган жыйынтыгы (Review сигналдары аркылуу жаңыланат, config/ratings.py)
+    rating_count = models.PositiveIntegerField(default=0, editable=False, verbose_name="Пикирлер саны")
+    rating_sum = models.PositiveIntegerField(default=0, editable=False)
+    rating_avg = models.FloatField(default=0.0, editable=False, verbose_name="Орточо рейтинг")
+    rating_1 = models.PositiveIntegerField(default=0, editable=False)
+    rating_2 = models.PositiveIntegerField(default=0, editable=False)
+    rating_3 = models.PositiveIntegerField(default=0, editable=False)
+    rating_4 = models.PositiveIntegerField(default=0, editable=False)
+    rating_5 = models.PositiveIntegerField(default=0, editable=False)
+
+    class Meta:
+        indexes = [models.Index(fields=['-created_at', '-id'], name='service_created_keyset_idx')]
 
     def __str__(self):
         return self.name
 
     def get_average_rating(self):
-        # aggregate функциясы базадан түз эсептейт, бул абдан ылдам иштейт
-        avg_rating = self.reviews.aggregate(Avg('rating'))['rating__avg']
-        return avg_rating if avg_rating is not None else 0.0
+        # Сакталган маани колдонулат - базага кошумча сурам жок
+        return self.rating_avg
+
+    @property
+    def rating_histogram(self):
+        return {star: getattr(self, f'rating_{star}') for star in range(1, 6)}
 
 # ===================
 # ЗАКАЗДАР
 # ===================
+def order_scope(user, prefix=''):
+    """Ролго жараша көрүнгөн заказдардын шарты: админ - баары, менеджер - өз имараты, колдонуучу - өзүнүкү.
+
+    prefix заказга байланышкан моделдер үчүн (мис. OrderHistory: 'order__').
+    """
+    if user.role == 'ADMIN' or user.is_staff:
+        return models.Q()
+    if user.role == 'MANAGER':
+        # managed_building_id - имарат объекти жүктөлбөйт (async view'лордо да коопсуз)
+        return models.Q(**{f'{prefix}building_id': user.managed_building_id})
+    return models.Q(**{f'{prefix}user': user})
+
+
+class OrderQuerySet(models.QuerySet):
+    def visible_to(self, user):
+        return self.filter(order_scope(user))
+
+
 class Order(models.Model):
     STATUS_CHOICES = [
         ('NEW', 'Ожидания'),
@@ -92,6 +150,21 @@ class Order(models.Model):
     comment = models.TextField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = OrderQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # API пагинациясы (created_at, id) боюнча курсор колдонот
+            models.Index(fields=['-created_at', '-id'], name='order_created_keyset_idx'),
+            # Ролго жараша сурамдар: менеджер - имарат (+ статус), колдонуучу - өзүнүн заказдары
+            # (id аягында - keyset пагинациянын (-created_at, -id) иретин сортсуз берет)
+            models.Index(fields=['building', 'status', '-created_at'], name='order_building_status_idx'),
+            models.Index(fields=['building', '-created_at', '-id'], name='order_building_created_idx'),
+            models.Index(fields=['user', '-created_at', '-id'], name='order_user_created_idx'),
+            # Бош слоттор: кызмат + имарат + күн аралыгы (config/scheduling.py), time - индекстен окулат
+            models.Index(fields=['service', 'building', 'date', 'time'], name='order_slot_idx'),
+        ]
+
     def __str__(self):
         return f"Заказ #{self.id}"
 
@@ -111,6 +184,7 @@ class Review(models.Model):
     class Meta:
         verbose_name = "Отзыв"
         verbose_name_plural = "Отзывдар"
+        indexes = [models.Index(fields=['service', '-created_at'], name='review_service_created_idx')]
 
     def __str__(self):
         return f"{self.user.username} - {self.service.name} ({self.rating}★)"
@@ -125,6 +199,13 @@ class OrderHistory(models.Model):
     changed_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
     change_date = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['-change_date', '-id'], name='history_changed_keyset_idx'),
+            # order_detail: заказдын тарыхы жаңысынан эскисине карай
+            models.Index(fields=['order', '-change_date'], name='history_order_changed_idx'),
+        ]
+
 class Client(models.Model):
     first_name = models.CharField(max_length=100)
     last_name = models.CharField(max_length=100)
@@ -132,4 +213,125 @@ class Client(models.Model):
     email = models.EmailField()
 
     def __str__(self):
-        return f"{self.first_name} {self.last_name} - {self.phone}"
\ No newline at end of file
+        return f"{self.first_name} {self.last_name} - {self.phone}"
+
+
+# ===================
+# СҮРӨТТӨРДҮН КӨЧҮРМӨЛӨРҮ (THUMBNAIL / WEBP / AVIF)
+# ===================
+class ImageDerivative(models.Model):
+    """Кичирейтилген көчүрмөнүн мазмундан алынган аты (config/images.py)."""
+    source = models.CharField(max_length=255)  # баштапкы файлдын storage'дагы аты
+    bucket = models.PositiveSmallIntegerField()  # суралган туурасы (IMAGE_DERIVATIVE_WIDTHS)
+    format = models.CharField(max_length=10)
+    name = models.CharField(max_length=255)
+    width = models.PositiveIntegerField()
+    height = models.PositiveIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['source', 'bucket', 'format'], name='image_derivative_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.source} {self.bucket}w {self.format}"
+
+# ===================
+# ФОНДОГУ ТАПШЫРМАЛАР (config/tasks.py)
+# ===================
+class Task(models.Model):
+    STATUS_CHOICES = [
+        ('PENDING', 'Күтүүдө'),
+        ('RUNNING', 'Аткарылууда'),
+        ('DONE', 'Бүттү'),
+        ('FAILED', 'Ката'),
+    ]
+    name = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict)
+    # Бир эле окуя эки жолу кошулбайт (мис. 'notify-status:<history_id>')
+    idempotency_key = models.CharField(max_length=200, unique=True, null=True, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='PENDING')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=5)
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Воркер: аткарыла турган тапшырмалар эң эскисинен баштап
+            models.Index(fields=['status', 'run_after'], name='task_status_run_after_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} #{self.pk} ({self.status})"
+
+# ===================
+# АНАЛИТИКА: ЖЫЙЫНТЫК ТАБЛИЦАЛАР (config/analytics.py)
+# ===================
+# building_id/service_id - FK эмес: жыйынтыктар булак таблицалардан өз алдынча, имарат өчүрүлсө да
+# тарыхый статистика калат. building_id=0 - имаратсыз заказдар (UNIQUE'те NULL бири-бирине барабар эмес).
+class DailyRollup(models.Model):
+    day = models.DateField()  # TIME_ZONE боюнча жергиликтүү күн
+    building_id = models.PositiveIntegerField()
+    service_id = models.PositiveIntegerField()
+    orders_created = models.IntegerField(default=0)
+    orders_done = models.IntegerField(default=0)  # ошол күнү DONE'го өткөн заказдар (OrderHistory)
+    completion_time = models.DurationField(default=timedelta)  # алардын түзүлгөндөн DONE'го чейинки суммасы
+    reviews = models.IntegerField(default=0)
+    rating_sum = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'building_id', 'service_id'], name='daily_rollup_unique'),
+        ]
+        indexes = [models.Index(fields=['building_id', 'day'], name='daily_rollup_building_idx')]
+
+    def __str__(self):
+        return f"{self.day} имарат {self.building_id} кызмат {self.service_id}"
+
+
+class HourlyRollup(models.Model):
+    hour = models.DateTimeField()  # сааттын башы
+    building_id = models.PositiveIntegerField()
+    orders_created = models.IntegerField(default=0)
+    orders_done = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['hour', 'building_id'], name='hourly_rollup_unique'),
+        ]
+        indexes = [models.Index(fields=['building_id', 'hour'], name='hourly_rollup_building_idx')]
+
+    def __str__(self):
+        return f"{self.hour:%Y-%m-%d %H}:00 имарат {self.building_id}"
+
+
+# ===================
+# ЖАЗЫЛУУ ЭРЕЖЕЛЕРИ (config/scheduling.py)
+# ===================
+class CapacityRule(models.Model):
+    """Кызмат/имарат боюнча иш убактысы жана бир слоттогу заказдардын чеги.
+
+    Эң так эреже колдонулат: кызмат + имарат, анан кызмат, анан имарат, болбосо settings.SCHEDULE_DEFAULT.
+    Ошол деңгээлдеги эрежелер жуманын күндөрү боюнча бөлүнөт; эч бири камтыбаган күн - дем алыш.
+    """
+    service = models.ForeignKey(Service, on_delete=models.CASCADE, null=True, blank=True,
+                                related_name='capacity_rules')
+    building = models.ForeignKey(Building, on_delete=models.CASCADE, null=True, blank=True,
+                                 related_name='capacity_rules')
+    weekdays = models.CharField(max_length=7, default='0123456', verbose_name="Жуманын күндөрү (0 - дүйшөмбү)")
+    opens_at = models.TimeField(default=time(9))
+    closes_at = models.TimeField(default=time(18))
+    slot_minutes = models.PositiveSmallIntegerField(default=60, validators=[MinValueValidator(5)])
+    capacity = models.PositiveSmallIntegerField(default=1, verbose_name="Бир слоттогу заказдар")
+
+    class Meta:
+        indexes = [models.Index(fields=['service', 'building'], name='capacity_rule_target_idx')]
+
+    def __str__(self):
+        return f"{self.service or '*'} / {self.building or '*'}: {self.weekdays} {self.opens_at}-{self.closes_at}"
+
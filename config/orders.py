@@ -0,0 +1,192 @@
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.core.mail import send_mail
+from django.db import transaction
+from django.db.models import Max
+
+from .analytics import RollupBatch, event_key
+from .caching import invalidate_scopes, order_scopes
+from .live import publish_created, publish_status
+from .metrics import ORDERS_CREATED, building_label, record_transition
+from .models import Order, OrderHistory, User
+from .scheduling import reserve, reserve_many
+from .tasks import enqueue, task
+from .transactions import immediate_write
+
+
+# ===================
+# ЗАКАЗДАРДЫ ЖАЗУУ
+# ===================
+@immediate_write
+def create_order_record(user, service, building, date=None, time=None, comment=''):
+    """Слот бош болсо заказ түзөт, болбосо SlotError. Дата/убакыт жок болсо - жакынкы бош слот."""
+    date, time = reserve(service.pk, building.pk if building else None, date, time)
+    return Order.objects.create(
+        user=user,
+        service=service,
+        building=building,
+        date=date,
+        time=time,
+        comment=comment,
+        status='NEW'
+    )
+
+
+def change_order_status(order, new_status, changed_by=None, record_history=True):
+    """Статусту өзгөртүп, керек болсо OrderHistory жазат. Эски статусту кайтарат."""
+    # Эски статус транзакциядан тышта алынат: кайталоодо order.status өзгөрүп калган болушу мүмкүн
+    old_status = order.status
+    _write_status(order, old_status, new_status, changed_by, record_history)
+    return old_status
+
+
+@immediate_write
+def _write_status(order, old_status, new_status, changed_by, record_history):
+    order.status = new_status
+    order.save()
+    if record_history:
+        OrderHistory.objects.create(order=order, old_status=old_status, new_status=new_status, changed_by=changed_by)
+
+
+# ===================
+# ТОПТОП ЖАЗУУ (/api/orders/bulk/)
+# ===================
+# bulk_create/update() сигнал жибербейт - сигналдардын иштери (кэш, аналитика, метрикалар, каттар) бул
+# жерде бүт топ үчүн бир жолу аткарылат.
+@immediate_write
+def bulk_create_orders(user, items):
+    """items: текшерилген сөздүктөр (service_id, building_id, date, time, comment). Заказдарды кайтарат.
+
+    Кайсы бир слот бош болбосо SlotConflicts - эч нерсе жазылбайт.
+    """
+    reserve_many(items)
+    orders = Order.objects.bulk_create([Order(user=user, status='NEW', **item) for item in items])
+    batch = RollupBatch()
+    scopes = set()
+    for order in orders:
+        batch.order(order.created_at, order.building_id, order.service_id)
+        scopes |= order_scopes(order.building_id, order.user_id)
+    if orders:
+        batch.enqueue(event_key('orders', f'{orders[0].pk}-{orders[-1].pk}', orders[0].created_at))
+    invalidate_scopes(scopes)
+    if orders:
+        ids = [order.pk for order in orders]
+        enqueue('orders.notify_new_orders', key=f'notify-new-orders:{ids[0]}-{ids[-1]}', order_ids=ids)
+        publish_created(ids)
+        created = Counter(building_label(order.building_id) for order in orders)
+        transaction.on_commit(lambda: [ORDERS_CREATED.inc(count, building=building)
+                                       for building, count in created.items()])
+    return orders
+
+
+@immediate_write
+def bulk_change_status(orders, new_statuses, changed_by=None):
+    """orders: жүктөлгөн заказдар, new_statuses: {order_id: статус}. Өзгөргөн заказдардын тизмесин кайтарат."""
+    changed = [order for order in orders if order.status != new_statuses[order.pk]]
+    if not changed:
+        return []
+    ids = [order.pk for order in changed]
+    # Мурунку статуска качан өткөнү (метрика үчүн) - жаңы тарых жазыла электе, бир сурам менен
+    entered = dict(OrderHistory.objects.filter(order_id__in=ids).values('order_id')
+                   .annotate(last=Max('change_date')).values_list('order_id', 'last'))
+
+    by_status = defaultdict(list)
+    for order in changed:
+        by_status[new_statuses[order.pk]].append(order.pk)
+    for status, status_ids in by_status.items():
+        Order.objects.filter(pk__in=status_ids).update(status=status)
+    history = OrderHistory.objects.bulk_create([
+        OrderHistory(order=order, old_status=order.status, new_status=new_statuses[order.pk], changed_by=changed_by)
+        for order in changed
+    ])
+
+    batch = RollupBatch()
+    scopes = set()
+    transitions = []
+    for order, entry in zip(changed, history):
+        if entry.new_status == 'DONE':
+            batch.completion(entry.change_date, order.created_at, order.building_id, order.service_id)
+        scopes |= order_scopes(order.building_id, order.user_id)
+        seconds = (entry.change_date - entered.get(order.pk, order.created_at)).total_seconds()
+        transitions.append((order.building_id, entry.old_status, entry.new_status, seconds))
+        order.status = entry.new_status
+    batch.enqueue(event_key('done', f'{history[0].pk}-{history[-1].pk}', history[0].change_date))
+    invalidate_scopes(scopes)
+    history_ids = [entry.pk for entry in history]
+    enqueue('orders.notify_status_changes', key=f'notify-statuses:{history_ids[0]}-{history_ids[-1]}',
+            history_ids=history_ids)
+    publish_status(history_ids)
+    transaction.on_commit(lambda: [record_transition(*transition) for transition in transitions])
+    return changed
+
+
+# ===================
+# ФОНДОГУ ТАПШЫРМАЛАР (сигналдар кезекке кошот, config/signals.py)
+# ===================
+def _manager_emails(building_id, exclude_user_id=None):
+    managers = User.objects.filter(role='MANAGER', managed_building_id=building_id).exclude(email='')
+    if exclude_user_id:
+        managers = managers.exclude(pk=exclude_user_id)
+    return list(managers.values_list('email', flat=True))
+
+
+@task(name='orders.notify_new_order')
+def notify_new_order(order_id):
+    """Имараттын менеджерлерине жаңы заказ жөнүндө кат."""
+    order = Order.objects.select_related('service', 'building', 'user').filter(pk=order_id).first()
+    if order is None or order.building_id is None:
+        return
+    recipients = _manager_emails(order.building_id)
+    if recipients:
+        send_mail(
+            f"Жаңы заказ #{order.id}: {order.service.name}",
+            f"{order.user.username} {order.building.name} имаратына {order.date} {order.time} үчүн заказ берди.",
+            settings.DEFAULT_FROM_EMAIL, recipients,
+        )
+
+
+@task(name='orders.notify_status_change')
+def notify_status_change(history_id):
+    """Статус өзгөргөндө менеджерлерге кат (өзгөрткөн адамдын өзүнө жиберилбейт)."""
+    history = OrderHistory.objects.select_related('order__service').filter(pk=history_id).first()
+    if history is None or history.order.building_id is None:
+        return
+    recipients = _manager_emails(history.order.building_id, exclude_user_id=history.changed_by_id)
+    if recipients:
+        send_mail(
+            f"Заказ #{history.order_id}: {history.old_status} → {history.new_status}",
+            f"{history.order.service.name} заказынын статусу {history.new_status} болду.",
+            settings.DEFAULT_FROM_EMAIL, recipients,
+        )
+
+
+@task(name='orders.notify_new_orders')
+def notify_new_orders(order_ids):
+    """Топтоп түзүлгөн заказдар: ар бир имараттын менеджерлерине бир кат."""
+    by_building = defaultdict(list)
+    for order in Order.objects.filter(pk__in=order_ids).exclude(building=None).select_related('service', 'building'):
+        by_building[order.building_id].append(order)
+    for building_id, orders in by_building.items():
+        recipients = _manager_emails(building_id)
+        if recipients:
+            lines = [f"#{order.id} {order.service.name} - {order.date} {order.time}" for order in orders]
+            send_mail(f"{orders[0].building.name}: {len(orders)} жаңы заказ", '\n'.join(lines),
+                      settings.DEFAULT_FROM_EMAIL, recipients)
+
+
+@task(name='orders.notify_status_changes')
+def notify_status_changes(history_ids):
+    """Топтоп статус өзгөрүүлөрү: ар бир имараттын менеджерлерине бир кат."""
+    by_building = defaultdict(list)
+    histories = (OrderHistory.objects.filter(pk__in=history_ids).exclude(order__building=None)
+                 .select_related('order__service'))
+    for history in histories:
+        by_building[history.order.building_id].append(history)
+    for building_id, histories in by_building.items():
+        recipients = _manager_emails(building_id, exclude_user_id=histories[0].changed_by_id)
+        if recipients:
+            lines = [f"#{history.order_id} {history.order.service.name}: {history.old_status} → {history.new_status}"
+                     for history in histories]
+            send_mail(f"{len(histories)} заказдын статусу өзгөрдү", '\n'.join(lines),
+                      settings.DEFAULT_FROM_EMAIL, recipients)
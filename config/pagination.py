@@ -0,0 +1,213 @@
+import base64
+import hashlib
+import json
+from functools import reduce
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+def query_params(request):
+    # DRF Request (query_params) же Django HttpRequest (GET, async view'лор)
+    return getattr(request, 'query_params', request.GET)
+
+
+# ===================
+# БОЛЖОЛДУУ САН (COUNT(*) ОРДУНА)
+# ===================
+def _count_key(queryset):
+    return 'api-count:' + hashlib.md5(str(queryset.query).encode()).hexdigest()
+
+
+def _reltuples(queryset):
+    connection = connections[queryset.db]
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE relname = %s", [queryset.model._meta.db_table])
+        row = cursor.fetchone()
+    return max(row[0], 0) if row else None
+
+
+def _use_reltuples(queryset):
+    return connections[queryset.db].vendor == 'postgresql' and not queryset.query.where
+
+
+def estimated_count(queryset):
+    """Жалпы сан кэштен алынат; PostgreSQL'де чыпкасыз таблица үчүн pg_class.reltuples колдонулат."""
+    queryset = queryset.order_by()
+    key = _count_key(queryset)
+    count = cache.get(key)
+    if count is None:
+        count = _reltuples(queryset) if _use_reltuples(queryset) else None
+        if count is None:
+            count = queryset.count()
+        cache.set(key, count, getattr(settings, 'API_COUNT_CACHE_TIMEOUT', 60))
+    return count
+
+
+async def aestimated_count(queryset):
+    queryset = queryset.order_by()
+    key = _count_key(queryset)
+    count = await cache.aget(key)
+    if count is None:
+        count = await sync_to_async(_reltuples)(queryset) if _use_reltuples(queryset) else None
+        if count is None:
+            count = await queryset.acount()
+        await cache.aset(key, count, getattr(settings, 'API_COUNT_CACHE_TIMEOUT', 60))
+    return count
+
+
+# ===================
+# KEYSET (CURSOR) ПАГИНАЦИЯ
+# ===================
+class KeysetPagination(BasePagination):
+    """(created_at, id) сыяктуу туруктуу ирет боюнча OFFSET'сиз пагинация.
+
+    View `keyset_ordering` (мис. ('-created_at', '-id')) аныктайт. get_keyset_ordering() None кайтарса
+    (мис. ылайыктуулук боюнча иреттелген издөө), биринчи бет гана кайтарылат.
+    """
+
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    count_query_param = 'count'
+    default_ordering = ('-id',)
+
+    def get_page_size(self, request):
+        page_size = settings.REST_FRAMEWORK.get('PAGE_SIZE') or 50
+        max_page_size = getattr(settings, 'API_MAX_PAGE_SIZE', 200)
+        try:
+            page_size = int(query_params(request).get(self.page_size_query_param, page_size))
+        except (TypeError, ValueError):
+            pass
+        return max(1, min(page_size, max_page_size))
+
+    def get_ordering(self, view):
+        if hasattr(view, 'get_keyset_ordering'):
+            return view.get_keyset_ordering()
+        return getattr(view, 'keyset_ordering', self.default_ordering)
+
+    # ----- курсор -----
+    def encode_cursor(self, direction, row):
+        values = [getattr(row, name.lstrip('-')) for name in self.ordering]
+        payload = json.dumps({'d': direction, 'v': [v.isoformat() if hasattr(v, 'isoformat') else v for v in values]})
+        cursor = base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+        return replace_query_param(self.base_url, self.cursor_query_param, cursor)
+
+    def decode_cursor(self, request, model):
+        encoded = query_params(request).get(self.cursor_query_param)
+        if not encoded:
+            return None, None
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded + '=' * (-len(encoded) % 4)))
+            direction, raw_values = payload['d'], payload['v']
+            if direction not in ('n', 'p') or len(raw_values) != len(self.ordering):
+                raise ValueError
+            values = [model._meta.get_field(name.lstrip('-')).to_python(value)
+                      for name, value in zip(self.ordering, raw_values)]
+        except Exception:
+            raise NotFound("Курсор туура эмес")
+        return direction, values
+
+    @staticmethod
+    def seek_filter(ordering, values):
+        """`ordering` боюнча `values` позициясынан кийинки саптар: (a < x) OR (a = x AND b < y) ..."""
+        clauses = []
+        for i, name in enumerate(ordering):
+            field = name.lstrip('-')
+            lookup = 'lt' if name.startswith('-') else 'gt'
+            equal = {prev.lstrip('-'): value for prev, value in zip(ordering[:i], values[:i])}
+            clauses.append(Q(**equal, **{f'{field}__{lookup}': values[i]}))
+        return reduce(lambda a, b: a | b, clauses)
+
+    @staticmethod
+    def reverse_ordering(ordering):
+        return tuple(name[1:] if name.startswith('-') else '-' + name for name in ordering)
+
+    # ----- BasePagination -----
+    def paginate_queryset(self, queryset, request, view=None):
+        page = self.prepare(queryset, request, view)
+        if self.count_requested:
+            self.count = estimated_count(queryset)
+        return self.finish(list(page))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """Async view'лор үчүн (config/async_views.py) - ошол эле логика, async ORM менен."""
+        page = self.prepare(queryset, request, view)
+        if self.count_requested:
+            self.count = await aestimated_count(queryset)
+        return self.finish([row async for row in page])
+
+    def prepare(self, queryset, request, view):
+        """Курсорду окуп, бет үчүн queryset'ти кайтарат (page_size + 1 сап - кийинки бет барбы)."""
+        self.request = request
+        params = query_params(request)
+        self.base_url = remove_query_param(request.build_absolute_uri(), self.cursor_query_param)
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(view)
+        self.count = None
+        self.count_requested = params.get(self.count_query_param) in ('1', 'true')
+        self.next_url = self.previous_url = None
+        self.direction = self.values = None
+
+        if self.ordering is None:
+            return queryset[:self.page_size]
+
+        # only() колдонулса, курсор үчүн керектүү талаалар да жүктөлүшү керек (ар бир сап үчүн кошумча сурам болбосун)
+        names, defer = queryset.query.deferred_loading
+        if names and not defer:
+            queryset = queryset.only(*names, *(name.lstrip('-') for name in self.ordering))
+
+        self.direction, self.values = self.decode_cursor(request, queryset.model)
+        if self.direction == 'p':
+            reverse = self.reverse_ordering(self.ordering)
+            queryset = queryset.filter(self.seek_filter(reverse, self.values)).order_by(*reverse)
+        else:
+            queryset = queryset.order_by(*self.ordering)
+            if self.values is not None:
+                queryset = queryset.filter(self.seek_filter(self.ordering, self.values))
+        return queryset[:self.page_size + 1]
+
+    def finish(self, rows):
+        if self.ordering is None:
+            return rows
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if self.direction == 'p':
+            rows.reverse()
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, self.values is not None
+
+        if rows and has_next:
+            self.next_url = self.encode_cursor('n', rows[-1])
+        if rows and has_previous:
+            self.previous_url = self.encode_cursor('p', rows[0])
+        return rows
+
+    def get_paginated_data(self, data):
+        payload = {'next': self.next_url, 'previous': self.previous_url}
+        if self.count is not None:
+            payload['count'] = self.count
+        payload['results'] = data
+        return payload
+
+    def get_paginated_response(self, data):
+        return Response(self.get_paginated_data(data))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'count': {'type': 'integer', 'description': "Болжолдуу сан (?count=1 болгондо гана)"},
+                'results': schema,
+            },
+        }
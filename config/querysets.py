@@ -0,0 +1,125 @@
+from functools import lru_cache
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from rest_framework import serializers
+
+
+# ===================
+# SERIALIZER'ДЕН QUERYSET ПЛАНЫН ЧЫГАРУУ
+# ===================
+class QuerySetPlan:
+    """select_related / prefetch_related / only() тизмелери - serializer талааларынан түзүлөт."""
+
+    def __init__(self):
+        self.select_related = []
+        self.prefetch_related = []
+        # Мамычалары белгисиз деңгээлдер (мис. @property окуган serializer) бул тизмеге кирбейт
+        self.only = []
+
+    def apply(self, queryset, restrict_columns=True):
+        if self.select_related:
+            queryset = queryset.select_related(*self.select_related)
+        if self.prefetch_related:
+            queryset = queryset.prefetch_related(*self.prefetch_related)
+        if restrict_columns and self.only:
+            queryset = queryset.only(*self.only)
+        return queryset
+
+
+def _model_field(model, name):
+    try:
+        return model._meta.get_field(name)
+    except FieldDoesNotExist:
+        return None
+
+
+def _collect(serializer, plan, prefix=''):
+    """Бир деңгээлдин талааларын карап, планга кошот. Мамычалар белгилүү болсо True кайтарат."""
+    model = serializer.Meta.model
+    columns, exact = [], True
+    for name, field in serializer.fields.items():
+        if field.write_only:
+            continue
+        if isinstance(field, serializers.SerializerMethodField):
+            # get_<name> методу адатта ошол эле аттуу мамычаны окуйт (get_old_status -> old_status)
+            model_field = _model_field(model, name)
+            if model_field is not None and model_field.concrete and not model_field.is_relation:
+                columns.append(name)
+            else:
+                exact = False
+            continue
+        if field.source == '*':
+            exact = False
+            continue
+        attr = field.source.split('.')[0]
+        model_field = _model_field(model, attr)
+
+        if isinstance(field, serializers.ListSerializer) or isinstance(field, serializers.ManyRelatedField):
+            # Көп байланыш: өзүнчө, оптималдаштырылган queryset менен бир сурам
+            child = getattr(field, 'child', None)
+            if isinstance(child, serializers.ModelSerializer):
+                related_model = child.Meta.model
+                plan.prefetch_related.append(
+                    Prefetch(prefix + attr, queryset=optimize_for_serializer(related_model._default_manager.all(),
+                                                                             type(child)))
+                )
+            else:
+                plan.prefetch_related.append(prefix + attr)
+            continue
+
+        if isinstance(field, serializers.BaseSerializer):
+            if model_field is not None and model_field.is_relation and (model_field.many_to_one or model_field.one_to_one):
+                plan.select_related.append(prefix + attr)
+                columns.append(attr)
+                nested = prefix + attr + '__'
+                if not _collect(field, plan, nested):
+                    # Ички деңгээлдин мамычалары белгисиз - байланыштагы модель толугу менен жүктөлөт
+                    plan.only = [path for path in plan.only if not path.startswith(nested)]
+                continue
+            exact = False
+            continue
+
+        if model_field is not None and model_field.concrete:
+            columns.append(attr)
+        else:
+            exact = False
+
+    if exact:
+        plan.only.extend(prefix + column for column in columns)
+    return exact
+
+
+@lru_cache(maxsize=None)
+def plan_for_serializer(serializer_class):
+    """Ар бир serializer классы үчүн план бир жолу эсептелет."""
+    plan = QuerySetPlan()
+    if not _collect(serializer_class(), plan):
+        # Негизги моделдин мамычалары белгисиз болсо, only() таптакыр колдонулбайт
+        plan.only = []
+    return plan
+
+
+def optimize_for_serializer(queryset, serializer_class, restrict_columns=True):
+    return plan_for_serializer(serializer_class).apply(queryset, restrict_columns=restrict_columns)
+
+
+# ===================
+# VIEWSET MIXIN
+# ===================
+class OptimizedQuerySetMixin:
+    """get_queryset() натыйжасын serializer'дин талааларына жараша оптималдаштырат.
+
+    only() окуу аракеттеринде гана колдонулат: жазууда модель толук жүктөлүшү керек.
+    """
+
+    optimized_actions = ('list', 'retrieve')
+
+    def optimize_queryset(self, queryset):
+        return optimize_for_serializer(
+            queryset, self.get_serializer_class(),
+            restrict_columns=getattr(self, 'action', None) in self.optimized_actions,
+        )
+
+    def get_queryset(self):
+        return self.optimize_queryset(super().get_queryset())
@@ -0,0 +1,105 @@
+from django.db import transaction
+from django.db.models import Case, Count, F, FloatField, Q, Sum, Value, When
+from django.db.models.functions import Cast
+from django.utils import timezone
+
+from .conditional import bump_catalog_version
+from .models import Service, Review
+
+RATING_FIELDS = ('rating_count', 'rating_sum', 'rating_avg',
+                 'rating_1', 'rating_2', 'rating_3', 'rating_4', 'rating_5')
+
+
+# ===================
+# ИНКРЕМЕНТТИК ЖАҢЫЛОО
+# ===================
+def apply_review(service_id, rating, sign=1):
+    """Бир пикирди (sign=1) кошот же (sign=-1) алып салат - бир UPDATE менен."""
+    if rating not in range(1, 6):
+        raise ValueError(f"Рейтинг 1-5 болушу керек: {rating!r}")
+    new_count = F('rating_count') + sign
+    new_sum = F('rating_sum') + sign * rating
+    Service.objects.filter(pk=service_id).update(
+        rating_count=new_count,
+        rating_sum=new_sum,
+        # UPDATE ичинде F() эски маанини көрөт, ошондуктан шарт ошого карата жазылат
+        rating_avg=Case(
+            When(rating_count__gt=-sign, then=Cast(new_sum, FloatField()) / Cast(new_count, FloatField())),
+            default=Value(0.0),
+            output_field=FloatField(),
+        ),
+        **{f'rating_{rating}': F(f'rating_{rating}') + sign},
+        # update() auto_now'ду жаңыртпайт - рейтинг API жообунун бир бөлүгү
+        updated_at=timezone.now(),
+    )
+
+
+def move_review(old, new):
+    """Пикир өзгөргөндө: old жана new - (service_id, rating) жуптары."""
+    if old == new:
+        return
+    with transaction.atomic():
+        if old is not None:
+            apply_review(*old, sign=-1)
+        if new is not None:
+            apply_review(*new, sign=1)
+        bump_catalog_version('service')
+
+
+# ===================
+# КАЙРА ЭСЕПТӨӨ ЖАНА ТЕКШЕРҮҮ
+# ===================
+def compute_summaries():
+    """Review таблицасынан ар бир кызмат үчүн так жыйынтыкты эсептейт."""
+    rows = Review.objects.values('service_id').annotate(
+        rating_count=Count('id'),
+        rating_sum=Sum('rating'),
+        **{f'rating_{star}': Count('id', filter=Q(rating=star)) for star in range(1, 6)},
+    )
+    summaries = {}
+    for row in rows:
+        service_id = row.pop('service_id')
+        row['rating_avg'] = row['rating_sum'] / row['rating_count']
+        summaries[service_id] = row
+    return summaries
+
+
+def _empty_summary():
+    summary = dict.fromkeys(RATING_FIELDS, 0)
+    summary['rating_avg'] = 0.0
+    return summary
+
+
+def find_drift(summaries=None):
+    """Сакталган маанилери туура эмес кызматтардын тизмесин кайтарат: [(service, expected), ...]."""
+    if summaries is None:
+        summaries = compute_summaries()
+    drifted = []
+    for service in Service.objects.only('id', *RATING_FIELDS).iterator(chunk_size=2000):
+        expected = summaries.get(service.id) or _empty_summary()
+        for field in RATING_FIELDS:
+            stored = getattr(service, field)
+            if field == 'rating_avg':
+                if abs(stored - expected[field]) > 1e-6:
+                    break
+            elif stored != expected[field]:
+                break
+        else:
+            continue
+        drifted.append((service, expected))
+    return drifted
+
+
+def rebuild_summaries(batch_size=500):
+    """Айырмасы бар кызматтарды оңдойт жана алардын санын кайтарат."""
+    drifted = find_drift()
+    to_update = []
+    for service, expected in drifted:
+        for field, value in expected.items():
+            setattr(service, field, value)
+        to_update.append(service)
+    with transaction.atomic():
+        Service.objects.bulk_update(to_update, RATING_FIELDS, batch_size=batch_size)
+        if to_update:
+            bump_catalog_version('service')
+    return len(to_update)
@@ -0,0 +1,222 @@
+from bisect import bisect_left, bisect_right, insort
+from collections import defaultdict, namedtuple
+from datetime import date, datetime, time, timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_time
+
+from .models import CapacityRule, Order, Service
+
+# ===================
+# БОШ СЛОТТОР ЖАНА ЖАЗЫЛУУ
+# ===================
+# Ар бир (кызмат, имарат) жубунун иш убактысы слотторго бөлүнөт (CapacityRule же SCHEDULE_DEFAULT).
+# Заказ өзүнүн date/time'ынан баштап бир слоттун узактыгын ээлейт; слоттун толгону ошол аралык менен
+# кесилишкен заказдар боюнча саналат (эски, слотко туура келбеген убакыттар да туура эсептелет).
+#
+# Бош слоттор: бир сурам (order_slot_idx индекси боюнча күн аралыгы) + күн боюнча иреттелген тизмелерде
+# bisect. Жазылуу immediate_write'тын ичинде: кызматтын сабы кулпуланат (PostgreSQL - SELECT ... FOR
+# UPDATE; SQLite'те жазуулар өзү эле кезек менен), анан слот кайра текшерилет - эки заказ бир орунду ала албайт.
+
+
+class SlotError(ValueError):
+    pass
+
+
+class SlotConflicts(SlotError):
+    """Топтоп түзүү: {позиция: ката}."""
+
+    def __init__(self, errors):
+        super().__init__(f"{len(errors)} заказдын слоту бош эмес")
+        self.errors = errors
+
+
+class DayRule(namedtuple('DayRule', 'opens closes slot capacity')):
+    """Мүнөттөр менен (түн ортосунан баштап)."""
+
+    def starts(self):
+        return range(self.opens, self.closes - self.slot + 1, self.slot)
+
+
+def _minutes(value):
+    return value.hour * 60 + value.minute
+
+
+def _time(minutes):
+    return time(minutes // 60, minutes % 60)
+
+
+class Schedule:
+    def __init__(self, rules):
+        self.by_weekday = {}
+        for rule in rules:
+            day_rule = DayRule(_minutes(rule.opens_at), _minutes(rule.closes_at), rule.slot_minutes, rule.capacity)
+            for weekday in rule.weekdays:
+                self.by_weekday.setdefault(int(weekday), day_rule)
+
+    def rule(self, day):
+        return self.by_weekday.get(day.weekday())
+
+
+def _default_rule():
+    default = settings.SCHEDULE_DEFAULT
+    return CapacityRule(weekdays=default['weekdays'], opens_at=parse_time(default['opens_at']),
+                        closes_at=parse_time(default['closes_at']), slot_minutes=default['slot_minutes'],
+                        capacity=default['capacity'])
+
+
+def load_schedule(service_id, building_id):
+    """Эң так деңгээлдин эрежелери: кызмат+имарат > кызмат > имарат > жалпы (экөө тең бош) > SCHEDULE_DEFAULT."""
+    rules = list(CapacityRule.objects.filter(Q(service_id=service_id) | Q(service=None),
+                                             Q(building_id=building_id) | Q(building=None)).order_by('pk'))
+    if not rules:
+        return Schedule([_default_rule()])
+
+    def level(rule):
+        return (rule.service_id is not None) * 2 + (rule.building_id is not None)
+
+    best = max(map(level, rules))
+    return Schedule([rule for rule in rules if level(rule) == best])
+
+
+class BookingIndex:
+    """Күн -> заказдардын башталыш мүнөттөрү (иреттелген). [start, end) слоту менен кесилишкен заказдар -
+    башталышы (start - узактык, end) аралыгында болгондор: эки bisect."""
+
+    def __init__(self, rows=()):
+        self.starts = defaultdict(list)
+        for day, start in rows:
+            self.starts[day].append(_minutes(start))
+        for starts in self.starts.values():
+            starts.sort()
+
+    def add(self, day, minute):
+        insort(self.starts[day], minute)
+
+    def overlapping(self, day, start, end, duration):
+        starts = self.starts.get(day)
+        if not starts:
+            return 0
+        return bisect_left(starts, end) - bisect_right(starts, start - duration)
+
+
+def load_index(service_id, building_id, first, last, exclude=None):
+    orders = Order.objects.filter(service_id=service_id, building_id=building_id, date__range=(first, last))
+    if exclude is not None:
+        orders = orders.exclude(pk=exclude)
+    return BookingIndex(orders.values_list('date', 'time'))
+
+
+def free_slots(service_id, building_id, after=None, count=10, days=None):
+    """`after`'ден (демейки - азыр) кийинки `count` бош слот: [{'date', 'time', 'free'}]."""
+    after = timezone.localtime(after)
+    days = days or settings.SCHEDULE_HORIZON_DAYS
+    first = after.date()
+    # Учурдагы мүнөт өтүп кеткен - андан кийинки слоттор гана
+    earliest = _minutes(after) + (1 if after.second or after.microsecond else 0)
+    schedule = load_schedule(service_id, building_id)
+    index = load_index(service_id, building_id, first, first + timedelta(days=days - 1))
+    slots = []
+    for offset in range(days):
+        day = first + timedelta(days=offset)
+        rule = schedule.rule(day)
+        if rule is None:
+            continue
+        for start in rule.starts():
+            if offset == 0 and start < earliest:
+                continue
+            free = rule.capacity - index.overlapping(day, start, start + rule.slot, rule.slot)
+            if free > 0:
+                slots.append({'date': day, 'time': _time(start), 'free': free})
+                if len(slots) >= count:
+                    return slots
+    return slots
+
+
+def check_slot(schedule, index, day, start):
+    if timezone.make_aware(datetime.combine(day, start)) <= timezone.now():
+        raise SlotError(f"{day} {start:%H:%M} - өтүп кеткен убакыт")
+    rule = schedule.rule(day)
+    if rule is None:
+        raise SlotError(f"{day} - иш күнү эмес")
+    minute = _minutes(start)
+    if start.second or minute not in rule.starts():
+        raise SlotError(f"{start:%H:%M} слоттун башы эмес: {_time(rule.opens):%H:%M}-{_time(rule.closes):%H:%M}, "
+                        f"{rule.slot} мүнөттөн")
+    if index.overlapping(day, minute, minute + rule.slot, rule.slot) >= rule.capacity:
+        raise SlotError(f"{day} {start:%H:%M} слоту бош эмес")
+
+
+def _parse(day, start):
+    try:
+        if isinstance(day, str):
+            day = parse_date(day)
+        if isinstance(start, str):
+            start = parse_time(start)
+    except ValueError:  # туура форматта, бирок мүмкүн эмес: 2026-13-01, 25:00
+        day = start = None
+    if not isinstance(day, date) or isinstance(day, datetime) or not isinstance(start, time):
+        raise SlotError("Дата же убакыт туура эмес")
+    return day, start
+
+
+def lock_services(service_ids):
+    # Дайыма бир иретте - эки транзакция бири-бирин күтүп калбасын
+    list(Service.objects.select_for_update().filter(pk__in=service_ids).order_by('pk').values_list('pk'))
+
+
+def reserve(service_id, building_id, day=None, start=None, exclude=None):
+    """immediate_write'тын ичинде чакырылат. Слот бош болсо (date, time) кайтарат, болбосо SlotError.
+
+    Убакыт берилбесе - берилген күндөгү (дата да жок болсо - жакынкы) бош слот. exclude - түзөтүлүп жаткан
+    заказ (өзүн санабайт).
+    """
+    lock_services([service_id])
+    if day and not start:
+        return _first_free_on(service_id, building_id, _parse(day, time())[0])
+    if not day or not start:
+        slots = free_slots(service_id, building_id, count=1)
+        if not slots:
+            raise SlotError(f"Жакынкы {settings.SCHEDULE_HORIZON_DAYS} күндө бош слот жок")
+        return slots[0]['date'], slots[0]['time']
+    day, start = _parse(day, start)
+    check_slot(load_schedule(service_id, building_id), load_index(service_id, building_id, day, day, exclude),
+               day, start)
+    return day, start
+
+
+def _first_free_on(service_id, building_id, day):
+    now = timezone.localtime()
+    if day < now.date():
+        raise SlotError(f"{day} - өтүп кеткен күн")
+    after = max(now, timezone.make_aware(datetime.combine(day, time())))
+    slots = free_slots(service_id, building_id, after=after, count=1, days=1)
+    if not slots:
+        raise SlotError(f"{day} күнү бош слот жок")
+    return slots[0]['date'], slots[0]['time']
+
+
+def reserve_many(items):
+    """Топтоп түзүү (immediate_write'тын ичинде). Топтун ичиндеги заказдар да саналат; бош эмес слоттор
+    болсо SlotConflicts({позиция: ката})."""
+    groups = defaultdict(list)
+    for position, item in enumerate(items):
+        groups[(item['service_id'], item['building_id'])].append(position)
+    lock_services({service_id for service_id, _ in groups})
+    errors = {}
+    for (service_id, building_id), positions in groups.items():
+        days = [items[position]['date'] for position in positions]
+        schedule = load_schedule(service_id, building_id)
+        index = load_index(service_id, building_id, min(days), max(days))
+        for position in positions:
+            item = items[position]
+            try:
+                check_slot(schedule, index, item['date'], item['time'])
+            except SlotError as exc:
+                errors[position] = str(exc)
+            else:
+                index.add(item['date'], _minutes(item['time']))
+    if errors:
+        raise SlotConflicts(errors)
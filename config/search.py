@@ -0,0 +1,170 @@
+import re
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import F, Q
+from django.utils.module_loading import import_string
+
+FTS_TABLE = 'config_service_fts'
+INSERT_SQL = f'INSERT INTO {FTS_TABLE} (rowid, name, description, category) VALUES (%s, %s, %s, %s)'
+
+# Кыргыз/орус сөздөрүнүн аягындагы мүчөлөр (-лар, -дын, -ы, -ом ...) издөөгө тоскоол болбошу үчүн
+# алар кесилип, калган уңгу префикс катары изделет (электриктердин -> электрик*).
+MIN_PREFIX = 4
+SUFFIXES = sorted(
+    # кыргыз: көптүк жана илик жөндөмөсү
+    "лар лер лор лөр дар дер дор дөр тар тер тор төр "
+    "нын нин нун нүн дын дин дун дүн тын тин тун түн "
+    # орус: зат атооч жана сын атооч жалгоолору
+    "ами ями ого его ому ему ов ев ей ам ям ах ях ом ем ой ый ий ая яя ое ые ие а я ы и у ю е о".split(),
+    key=len, reverse=True,
+)
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def tokenize(query):
+    return [token.lower() for token in TOKEN_RE.findall(query or '')]
+
+
+def stem_prefix(token):
+    # Кыргыз тилинде мүчөлөр катар келет (-тер + -дин), ошондуктан эки жолу кесебиз
+    for _ in range(2):
+        for suffix in SUFFIXES:
+            if token.endswith(suffix) and len(token) - len(suffix) >= MIN_PREFIX:
+                token = token[:-len(suffix)]
+                break
+        else:
+            break
+    return token
+
+
+# ===================
+# BACKEND'ДЕР
+# ===================
+class IcontainsSearchBackend:
+    """Эски LIKE жолу - индекс жок жерде (жана бенчмарк үчүн) колдонулат."""
+
+    def search(self, queryset, query):
+        for token in tokenize(query):
+            queryset = queryset.filter(
+                Q(name__icontains=token) | Q(description__icontains=token) | Q(category__name__icontains=token)
+            )
+        return queryset
+
+    def index_services(self, service_ids):
+        pass
+
+    def remove_services(self, service_ids):
+        pass
+
+    def rebuild(self):
+        return 0
+
+
+class SqliteFTSSearchBackend(IcontainsSearchBackend):
+    """SQLite FTS5 виртуалдык таблицасы (config_service_fts), rowid = Service.id."""
+
+    # bm25 салмактары: name, description, category
+    WEIGHTS = (10.0, 1.0, 4.0)
+
+    def build_match(self, query):
+        return ' AND '.join(f'"{stem_prefix(token)}"*' for token in tokenize(query))
+
+    def search(self, queryset, query):
+        match = self.build_match(query)
+        if not match:
+            return queryset
+        table = queryset.model._meta.db_table
+        weights = ', '.join(str(w) for w in self.WEIGHTS)
+        # FTS таблицасы JOIN менен кошулат: MATCH бир гана жолу аткарылат, bm25 ошол эле сканерден алынат
+        return queryset.extra(
+            select={'search_rank': f'bm25({FTS_TABLE}, {weights})'},
+            tables=[FTS_TABLE],
+            where=[f'{FTS_TABLE}.rowid = "{table}"."id"', f'{FTS_TABLE} MATCH %s'],
+            params=[match],
+        ).order_by('search_rank', 'id')
+
+    def _rows(self, service_ids=None):
+        from .models import Service
+        services = Service.objects.values_list('id', 'name', 'description', 'category__name')
+        if service_ids is not None:
+            services = services.filter(id__in=service_ids)
+        return ((pk, name, description, category or '') for pk, name, description, category in services.iterator())
+
+    def index_services(self, service_ids):
+        service_ids = list(service_ids)
+        if not service_ids:
+            return
+        self.remove_services(service_ids)
+        with connection.cursor() as cursor:
+            cursor.executemany(INSERT_SQL, list(self._rows(service_ids)))
+
+    def remove_services(self, service_ids):
+        service_ids = list(service_ids)
+        with connection.cursor() as cursor:
+            cursor.executemany(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [(pk,) for pk in service_ids])
+
+    def rebuild(self, batch_size=5000):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+            batch, total = [], 0
+            for row in self._rows():
+                batch.append(row)
+                if len(batch) >= batch_size:
+                    cursor.executemany(INSERT_SQL, batch)
+                    total += len(batch)
+                    batch = []
+            if batch:
+                cursor.executemany(INSERT_SQL, batch)
+                total += len(batch)
+            cursor.execute(f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('optimize')")
+        return total
+
+
+class PostgresSearchBackend(IcontainsSearchBackend):
+    """PostgreSQL tsvector. 'simple' конфигурациясы кыргыз/орус тексттерин өзгөртпөй сактайт."""
+
+    config = 'simple'
+
+    def search(self, queryset, query):
+        from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+
+        tokens = [stem_prefix(token) for token in tokenize(query)]
+        if not tokens:
+            return queryset
+        vector = (
+            SearchVector('name', weight='A', config=self.config)
+            + SearchVector('category__name', weight='B', config=self.config)
+            + SearchVector('description', weight='C', config=self.config)
+        )
+        search_query = SearchQuery(' & '.join(f'{token}:*' for token in tokens),
+                                   search_type='raw', config=self.config)
+        return queryset.annotate(
+            search_vector=vector, search_rank=SearchRank(vector, search_query)
+        ).filter(search_vector=search_query).order_by(F('search_rank').desc(), 'id')
+
+
+BACKENDS = {
+    'sqlite': SqliteFTSSearchBackend,
+    'postgresql': PostgresSearchBackend,
+}
+
+_backend = None
+
+
+def get_search_backend():
+    """settings.SERVICE_SEARCH_BACKEND же базанын түрүнө жараша backend тандалат."""
+    global _backend
+    if _backend is None:
+        path = getattr(settings, 'SERVICE_SEARCH_BACKEND', None)
+        backend_class = import_string(path) if path else BACKENDS.get(connection.vendor, IcontainsSearchBackend)
+        _backend = backend_class()
+    return _backend
+
+
+def search_services(queryset, query):
+    """home view жана ServiceViewSet колдонгон жалпы издөө функциясы."""
+    if not query or not query.strip():
+        return queryset
+    return get_search_backend().search(queryset, query)
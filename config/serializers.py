@@ -1,5 +1,96 @@
+from django.conf import settings
 from rest_framework import serializers
 from .models import User, Building, Service, Order, OrderHistory
+from .images import DerivativeIndex
+
+
+# ==========================================
+# СҮРӨТТӨРДҮН SRCSET'И
+# ==========================================
+class ImageSrcsetField(serializers.Field):
+    """{'avif': 'url 160w, url 320w, ...', 'webp': ...} - сүрөт жок болсо null."""
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault('source', 'image')
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        if not value:
+            return None
+        # Тизмеде SrcsetListSerializer бардык саптар үчүн бир сурам менен жүктөп коёт
+        index = self.context.get('derivative_index') or DerivativeIndex([value.name])
+        request = self.context.get('request')
+        return index.srcsets(value.name, request.build_absolute_uri if request else None)
+
+
+# ==========================================
+# КАРАПАЙЫМ ОКУУ ТАЛААЛАРЫ (config/fast_serializers.py аларды түз компиляциялайт)
+# ==========================================
+class DisplayField(serializers.Field):
+    """Коддун аталышы (мис. статус): labels'те жок болсо код өзү."""
+
+    def __init__(self, labels, **kwargs):
+        self.labels = labels
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        return self.labels.get(value, value)
+
+
+class FormatField(serializers.Field):
+    """Мамычанын мааниси шаблон аркылуу: FormatField('${}', source='price') -> "$500.00"."""
+
+    def __init__(self, template, **kwargs):
+        self.template = template
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        return self.template.format(value)
+
+
+class RatingHistogramField(serializers.ReadOnlyField):
+    """Service.rating_histogram; тез жолдо ошол эле dict rating_1..rating_5 мамычаларынан түзүлөт."""
+
+    columns = tuple(f'rating_{star}' for star in range(1, 6))
+
+    @staticmethod
+    def from_columns(*counts):
+        return dict(zip(range(1, 6), counts))
+
+
+def srcset_paths(serializer, prefix=()):
+    """ImageSrcsetField'терге жол: ('image',), ичкериде ('service', 'image') ж.б."""
+    for field in serializer.fields.values():
+        if isinstance(field, ImageSrcsetField):
+            yield prefix + (field.source,)
+        elif isinstance(field, serializers.Serializer):
+            yield from srcset_paths(field, prefix + (field.source,))
+
+
+def srcset_sources(serializer, items):
+    """Объекттердин бардык сүрөттөрүнүн аттары - DerivativeIndex'ти бир сурам менен жүктөө үчүн."""
+    paths = list(srcset_paths(serializer))
+    for item in items:
+        for path in paths:
+            value = item
+            for attr in path:
+                value = getattr(value, attr, None)
+                if value is None:
+                    break
+            if value:
+                yield value.name
+
+
+class SrcsetListSerializer(serializers.ListSerializer):
+    def to_representation(self, data):
+        items = list(data.all() if hasattr(data, 'all') else data)
+        # Async view индексти алдын ала (async ORM менен) жүктөп коёт
+        if 'derivative_index' not in self.context:
+            self.context['derivative_index'] = DerivativeIndex(srcset_sources(self.child, items))
+        return super().to_representation(items)
 
 
 # ==========================================
@@ -43,42 +134,52 @@ class UserSerializer(serializers.ModelSerializer):
 
 
 class BuildingSerializer(serializers.ModelSerializer):
+    image_srcset = ImageSrcsetField()
+
     class Meta:
         model = Building
         fields = '__all__'
+        list_serializer_class = SrcsetListSerializer
 
 
 class ServiceSerializer(serializers.ModelSerializer):
     # Бааны $ менен чыгаруучу талаа
-    price_display = serializers.SerializerMethodField()
+    price_display = FormatField('${}', source='price')
+    # Сакталган рейтинг жыйынтыгы (1-5 жылдызча боюнча бөлүштүрүү)
+    rating_histogram = RatingHistogramField()
+    image_srcset = ImageSrcsetField()
 
     class Meta:
         model = Service
         fields = '__all__'
-
-    def get_price_display(self, obj):
-        return f"${obj.price}"
+        list_serializer_class = SrcsetListSerializer
 
 
 class OrderSerializer(serializers.ModelSerializer):
     building = BuildingSerializer(read_only=True)
     user = UserSerializer(read_only=True)
     service = ServiceSerializer(read_only=True)
+    # Жазуу үчүн: окууда толук объекттер кайтарылат
+    service_id = serializers.PrimaryKeyRelatedField(source='service', queryset=Service.objects.all(), write_only=True,
+                                                    required=False)
+    building_id = serializers.PrimaryKeyRelatedField(source='building', queryset=Building.objects.all(),
+                                                     write_only=True, required=False, allow_null=True)
 
     class Meta:
         model = Order
-        fields = ('id', 'date', 'time', 'status', 'comment', 'created_at', 'user', 'service', 'building')
-
+        fields = ('id', 'date', 'time', 'status', 'comment', 'created_at', 'user', 'service', 'building',
+                  'service_id', 'building_id')
+        list_serializer_class = SrcsetListSerializer
+        # Бош болсо - жакынкы бош слот (config/scheduling.py)
+        extra_kwargs = {'date': {'required': False}, 'time': {'required': False}}
 
-class OrderHistorySerializer(serializers.ModelSerializer):
-    order = serializers.PrimaryKeyRelatedField(read_only=True)
-    old_status = serializers.SerializerMethodField()
-    new_status = serializers.SerializerMethodField()
+    def validate(self, attrs):
+        if self.instance is None and 'service' not in attrs:
+            raise serializers.ValidationError({'service_id': ["Бул талаа милдеттүү."]})
+        return attrs
 
-    class Meta:
-        model = OrderHistory
-        fields = ('id', 'order', 'old_status', 'new_status', 'change_date')
 
+class OrderHistorySerializer(serializers.ModelSerializer):
     STATUS_DISPLAY = {
         'NEW': 'Ожидания',
         'PENDING': 'Ожидания',
@@ -86,8 +187,37 @@ class OrderHistorySerializer(serializers.ModelSerializer):
         'DONE': 'Выполнено',
     }
 
-    def get_old_status(self, obj):
-        return self.STATUS_DISPLAY.get(obj.old_status, obj.old_status)
+    order = serializers.PrimaryKeyRelatedField(read_only=True)
+    old_status = DisplayField(STATUS_DISPLAY)
+    new_status = DisplayField(STATUS_DISPLAY)
 
-    def get_new_status(self, obj):
-        return self.STATUS_DISPLAY.get(obj.new_status, obj.new_status)
\ No newline at end of file
+    class Meta:
+        model = OrderHistory
+        fields = ('id', 'order', 'old_status', 'new_status', 'change_date')
+
+
+# ==========================================
+# БОШ СЛОТТОР (/api/services/<id>/slots/ параметрлери)
+# ==========================================
+class SlotQuerySerializer(serializers.Serializer):
+    # демейки: кызматтын имараты
+    building = serializers.PrimaryKeyRelatedField(queryset=Building.objects.all(), required=False)
+    date_from = serializers.DateField(required=False)
+    count = serializers.IntegerField(min_value=1, max_value=settings.SCHEDULE_MAX_SLOTS, default=10)
+
+
+# ==========================================
+# ТОПТОП ЗАКАЗДАР (/api/orders/bulk/)
+# ==========================================
+# FK'лар бул жерде текшерилбейт - view бардык id'лерди бир сурам менен текшерет
+class BulkOrderSerializer(serializers.Serializer):
+    service = serializers.IntegerField(min_value=1)
+    building = serializers.IntegerField(min_value=1, required=False, allow_null=True)  # демейки: кызматтын имараты
+    date = serializers.DateField()
+    time = serializers.TimeField()
+    comment = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+
+
+class BulkStatusSerializer(serializers.Serializer):
+    id = serializers.IntegerField(min_value=1)
+    status = serializers.ChoiceField(choices=Order.STATUS_CHOICES)
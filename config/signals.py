@@ -0,0 +1,319 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models import OuterRef, Subquery
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from .models import Building, Category, Service, Review, Order, OrderHistory, User
+from . import analytics, auth_cache
+from .caching import invalidate_catalog, invalidate_order
+from . import live
+from .conditional import bump_catalog_version
+from .metrics import ORDERS_CREATED, building_label, record_transition
+from .orders import notify_new_order, notify_status_change
+from .ratings import move_review
+from .search import get_search_backend
+
+
+# ===================
+# РЕЙТИНГ (Service.rating_*)
+# ===================
+@receiver(pre_save, sender=Review)
+def remember_review_rating(sender, instance, **kwargs):
+    # Түзөтүүдө эски бааны эстеп калабыз, кийин аны жыйынтыктан алып салуу үчүн
+    instance._rating_before = None
+    if instance.pk:
+        instance._rating_before = (
+            Review.objects.filter(pk=instance.pk).values_list('service_id', 'rating').first()
+        )
+
+
+@receiver(post_save, sender=Review)
+def review_saved(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    move_review(getattr(instance, '_rating_before', None), (instance.service_id, instance.rating))
+
+
+@receiver(post_delete, sender=Review)
+def review_deleted(sender, instance, **kwargs):
+    move_review((instance.service_id, instance.rating), None)
+
+
+# ===================
+# ИЗДӨӨ ИНДЕКСИ
+# ===================
+@receiver(post_save, sender=Service)
+def service_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        get_search_backend().index_services([instance.pk])
+
+
+@receiver(post_delete, sender=Service)
+def service_deleted(sender, instance, **kwargs):
+    get_search_backend().remove_services([instance.pk])
+
+
+@receiver(post_save, sender=Category)
+def category_saved(sender, instance, created=False, raw=False, **kwargs):
+    if not (created or raw):
+        get_search_backend().index_services(instance.services.values_list('id', flat=True))
+
+
+@receiver(pre_delete, sender=Category)
+def remember_category_services(sender, instance, **kwargs):
+    instance._service_ids = list(instance.services.values_list('id', flat=True))
+
+
+@receiver(post_delete, sender=Category)
+def category_deleted(sender, instance, **kwargs):
+    # SET_NULL сигналсыз UPDATE менен аткарылат, ошондуктан кызматтарды өзүбүз кайра индекстейбиз
+    get_search_backend().index_services(getattr(instance, '_service_ids', []))
+
+
+# ===================
+# DASHBOARD КЭШИ
+# ===================
+@receiver(pre_save, sender=Order)
+def remember_order_scope(sender, instance, **kwargs):
+    # Заказ башка имаратка/колдонуучуга өтсө, эски чөйрөнүн кэши да жаңырышы керек
+    instance._scope_before = instance._rollup_before = None
+    if instance.pk:
+        row = Order.objects.filter(pk=instance.pk).values_list('building_id', 'user_id', 'service_id').first()
+        if row:
+            instance._scope_before = row[:2]
+            instance._rollup_before = (row[0], row[2])
+
+
+@receiver(post_save, sender=Order)
+def order_saved(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    invalidate_order(instance.building_id, instance.user_id)
+    before = getattr(instance, '_scope_before', None)
+    if before and before != (instance.building_id, instance.user_id):
+        invalidate_order(*before)
+
+
+@receiver(post_delete, sender=Order)
+def order_deleted(sender, instance, **kwargs):
+    invalidate_order(instance.building_id, instance.user_id)
+
+
+@receiver(post_save, sender=OrderHistory)
+@receiver(post_delete, sender=OrderHistory)
+def order_history_changed(sender, instance, raw=False, **kwargs):
+    # update_order_status / order_edit тарыхты заказ менен бирге жазат; заказ объекти адатта кэште болот
+    if raw:
+        return
+    if OrderHistory.order.is_cached(instance):
+        invalidate_order(instance.order.building_id, instance.order.user_id)
+        return
+    scope = Order.objects.filter(pk=instance.order_id).values_list('building_id', 'user_id').first()
+    if scope:
+        invalidate_order(*scope)
+
+
+@receiver(post_save, sender=Building)
+@receiver(post_delete, sender=Building)
+@receiver(post_save, sender=Service)
+@receiver(post_delete, sender=Service)
+def catalog_changed(sender, instance, raw=False, **kwargs):
+    # Саптарда имарат/кызмат аталыштары бар; имарат өчүрүлсө заказдар сигналсыз SET_NULL болот
+    if not raw:
+        invalidate_catalog()
+
+
+# ===================
+# КАТАЛОГ ВЕРСИЯЛАРЫ (ETag)
+# ===================
+@receiver(post_save, sender=Building)
+@receiver(post_delete, sender=Building)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Service)
+@receiver(post_delete, sender=Service)
+def catalog_version_changed(sender, instance, raw=False, signal=None, **kwargs):
+    if raw:
+        return
+    names = [sender._meta.model_name]
+    if sender is Category and signal is post_delete:
+        # Кызматтардын category_id'си сигналсыз NULL болот
+        names.append('service')
+    bump_catalog_version(*names)
+
+
+# ===================
+# ФОНДОГУ ТАПШЫРМАЛАР
+# ===================
+# Кошумча иштер (каттар ж.б.) суроо-талаанын ичинде аткарылбайт - кезекке Task сабы катары кошулат
+@receiver(post_save, sender=Order)
+def enqueue_new_order_tasks(sender, instance, created=False, raw=False, **kwargs):
+    if created and not raw:
+        notify_new_order.enqueue(key=f'notify-new-order:{instance.pk}', order_id=instance.pk)
+
+
+@receiver(post_save, sender=OrderHistory)
+def enqueue_status_change_tasks(sender, instance, created=False, raw=False, **kwargs):
+    if created and not raw:
+        notify_status_change.enqueue(key=f'notify-status:{instance.pk}', history_id=instance.pk)
+
+
+# ===================
+# PROMETHEUS МЕТРИКАЛАРЫ
+# ===================
+# Окуялар болгон замат (commit'тен кийин) эсептелет - /metrics эч качан ORM'го барбайт
+@receiver(post_save, sender=Order)
+def count_created_order(sender, instance, created=False, raw=False, **kwargs):
+    if created and not raw and settings.METRICS_ENABLED:
+        building = building_label(instance.building_id)
+        transaction.on_commit(lambda: ORDERS_CREATED.inc(building=building))
+
+
+@receiver(post_save, sender=OrderHistory)
+def count_status_transition(sender, instance, created=False, raw=False, **kwargs):
+    if created and not raw and settings.METRICS_ENABLED:
+        # Сурам жазуу транзакциясынан (SQLite'те - жазуу кулпусунан) кийин аткарылат
+        transaction.on_commit(lambda: _record_transition(instance))
+
+
+def _record_transition(history):
+    # Мурунку статуска өткөн убакыт: заказдын мурунку тарых сабы, болбосо заказ түзүлгөн убакыт (бир сурам)
+    previous = (OrderHistory.objects.filter(order_id=OuterRef('pk'), id__lt=history.pk)
+                .order_by('-id').values('change_date')[:1])
+    row = (Order.objects.filter(pk=history.order_id)
+           .values_list('building_id', 'created_at', Subquery(previous)).first())
+    if row is None:
+        return
+    building_id, created_at, entered_at = row
+    seconds = (history.change_date - (entered_at or created_at)).total_seconds()
+    record_transition(building_id, history.old_status, history.new_status, seconds)
+
+
+# ===================
+# АНАЛИТИКА (DailyRollup / HourlyRollup)
+# ===================
+# Өзгөрүүлөр analytics.apply_rollups тапшырмасы катары кезекке кошулат (config/analytics.py)
+@receiver(post_save, sender=Order)
+def rollup_order_saved(sender, instance, created=False, raw=False, **kwargs):
+    if raw:
+        return
+    after = (instance.building_id, instance.service_id)
+    if created:
+        analytics.record_order(instance.created_at, *after,
+                               key=analytics.event_key('order', instance.pk, instance.created_at))
+        return
+    before = getattr(instance, '_rollup_before', None)
+    if before and before != after:
+        analytics.move_order(instance.pk, instance.created_at, before, after)
+
+
+@receiver(post_delete, sender=Order)
+def rollup_order_deleted(sender, instance, **kwargs):
+    # Заказдын DONE тарыхы каскад менен өчөт - ал rollup_history_deleted'те алынат
+    analytics.record_order(instance.created_at, instance.building_id, instance.service_id, sign=-1,
+                           key=analytics.event_key('order-deleted', instance.pk, instance.created_at))
+
+
+def _history_order(instance):
+    if OrderHistory.order.is_cached(instance):
+        order = instance.order
+        return order.created_at, order.building_id, order.service_id
+    return Order.objects.filter(pk=instance.order_id).values_list('created_at', 'building_id', 'service_id').first()
+
+
+@receiver(post_save, sender=OrderHistory)
+def rollup_history_saved(sender, instance, created=False, raw=False, **kwargs):
+    if created and not raw and instance.new_status == 'DONE':
+        row = _history_order(instance)
+        if row:
+            analytics.record_completion(instance.change_date, *row,
+                                        key=analytics.event_key('done', instance.pk, instance.change_date))
+
+
+@receiver(pre_delete, sender=OrderHistory)
+def rollup_history_deleted(sender, instance, **kwargs):
+    # pre_delete: каскадда заказ али өчө элек (Collector бардыгын бир транзакцияда аткарат)
+    if instance.new_status == 'DONE':
+        row = _history_order(instance)
+        if row:
+            analytics.record_completion(instance.change_date, *row, sign=-1,
+                                        key=analytics.event_key('done-deleted', instance.pk, instance.change_date))
+
+
+def _service_building(service_id):
+    return Service.objects.filter(pk=service_id).values_list('building_id', flat=True).first()
+
+
+@receiver(post_save, sender=Review)
+def rollup_review_saved(sender, instance, created=False, raw=False, **kwargs):
+    if raw:
+        return
+    before = None if created else getattr(instance, '_rating_before', None)
+    after = (instance.service_id, instance.rating)
+    if not created and (before is None or before == after):
+        return
+    batch = analytics.RollupBatch()
+    if before:
+        batch.review(instance.created_at, _service_building(before[0]), *before, sign=-1)
+    batch.review(instance.created_at, _service_building(instance.service_id), *after)
+    # Түзөтүүлөр бир нече жолу болушу мүмкүн - ачкыч түзүүдө гана
+    batch.enqueue(analytics.event_key('review', instance.pk, instance.created_at) if created else None)
+
+
+@receiver(pre_delete, sender=Review)
+def rollup_review_deleted(sender, instance, **kwargs):
+    # pre_delete: кызмат каскад менен өчүрүлсө да, анын имараты али окулат
+    analytics.record_review(instance.created_at, _service_building(instance.service_id),
+                            instance.service_id, instance.rating, sign=-1,
+                            key=analytics.event_key('review-deleted', instance.pk, instance.created_at))
+
+
+# ===================
+# ЖАНДУУ АГЫМ (/live/orders/)
+# ===================
+# Окуя commit'тен кийин курулат жана угуучу болгондо гана (config/live.py)
+@receiver(post_save, sender=Order)
+def publish_created_order(sender, instance, created=False, raw=False, **kwargs):
+    if created and not raw:
+        live.publish_created([instance.pk])
+
+
+@receiver(post_save, sender=OrderHistory)
+def publish_status_change(sender, instance, created=False, raw=False, **kwargs):
+    if created and not raw:
+        live.publish_status([instance.pk])
+
+
+@receiver(post_delete, sender=Order)
+def publish_deleted_order(sender, instance, **kwargs):
+    live.publish_deleted(instance.pk, instance.building_id, instance.user_id)
+
+
+# ===================
+# АУТЕНТИФИКАЦИЯ КЭШИ (config/auth_cache.py)
+# ===================
+# last_login ар бир киргенде жаңырат - кэштеги колдонуучуну эскиртпейт
+AUTH_IGNORED_FIELDS = frozenset({'last_login'})
+
+
+@receiver(post_save, sender=User)
+def invalidate_cached_user(sender, instance, update_fields=None, raw=False, **kwargs):
+    # Роль, managed_building, сырсөз (set_password -> save), is_active ж.б. - баары ушул жерден өтөт.
+    # Жаңы колдонуучу да: өчүрүлгөн колдонуучунун id'си кайра берилиши мүмкүн (SQLite)
+    if raw or (update_fields is not None and set(update_fields) <= AUTH_IGNORED_FIELDS):
+        return
+    auth_cache.invalidate('users', instance.pk)
+
+
+@receiver(post_delete, sender=User)
+def forget_deleted_user(sender, instance, **kwargs):
+    auth_cache.invalidate('users', instance.pk)
+
+
+@receiver(post_save, sender=Token)
+@receiver(post_delete, sender=Token)
+def invalidate_cached_token(sender, instance, raw=False, **kwargs):
+    if not raw:
+        auth_cache.invalidate('tokens', instance.key)
@@ -0,0 +1,613 @@
+import re
+from collections import namedtuple
+
+# ===================
+# TAILWIND (v3) УТИЛИТАЛАРЫНЫН ГЕНЕРАТОРУ
+# ===================
+# Шаблондордо колдонулган класстар гана CSS'ке айланат (purge): браузерде CDN компилятору иштебейт.
+# Tailwind'дин толук ишке ашырылышы эмес - долбоордун шаблондорунда кездешкен утилиталар жана
+# варианттар (hover/focus/active/group-hover, sm/md/lg). Тааныбаган класс өткөрүлүп жиберилет
+# (Bootstrap, өз класстар) - build_assets аларды -v 2 менен көрсөтөт.
+# Утилиталардын ирети Tailwind'дикиндей: вариантсыздар, анан hover/focus/..., анан экрандар боюнча.
+
+PALETTE = {
+    'slate': ('#f8fafc', '#f1f5f9', '#e2e8f0', '#cbd5e1', '#94a3b8', '#64748b', '#475569', '#334155', '#1e293b',
+              '#0f172a', '#020617'),
+    'gray': ('#f9fafb', '#f3f4f6', '#e5e7eb', '#d1d5db', '#9ca3af', '#6b7280', '#4b5563', '#374151', '#1f2937',
+             '#111827', '#030712'),
+    'red': ('#fef2f2', '#fee2e2', '#fecaca', '#fca5a5', '#f87171', '#ef4444', '#dc2626', '#b91c1c', '#991b1b',
+            '#7f1d1d', '#450a0a'),
+    'orange': ('#fff7ed', '#ffedd5', '#fed7aa', '#fdba74', '#fb923c', '#f97316', '#ea580c', '#c2410c', '#9a3412',
+               '#7c2d12', '#431407'),
+    'amber': ('#fffbeb', '#fef3c7', '#fde68a', '#fcd34d', '#fbbf24', '#f59e0b', '#d97706', '#b45309', '#92400e',
+              '#78350f', '#451a03'),
+    'yellow': ('#fefce8', '#fef9c3', '#fef08a', '#fde047', '#facc15', '#eab308', '#ca8a04', '#a16207', '#854d0e',
+               '#713f12', '#422006'),
+    'green': ('#f0fdf4', '#dcfce7', '#bbf7d0', '#86efac', '#4ade80', '#22c55e', '#16a34a', '#15803d', '#166534',
+              '#14532d', '#052e16'),
+    'emerald': ('#ecfdf5', '#d1fae5', '#a7f3d0', '#6ee7b7', '#34d399', '#10b981', '#059669', '#047857', '#065f46',
+                '#064e3b', '#022c22'),
+    'blue': ('#eff6ff', '#dbeafe', '#bfdbfe', '#93c5fd', '#60a5fa', '#3b82f6', '#2563eb', '#1d4ed8', '#1e40af',
+             '#1e3a8a', '#172554'),
+    'indigo': ('#eef2ff', '#e0e7ff', '#c7d2fe', '#a5b4fc', '#818cf8', '#6366f1', '#4f46e5', '#4338ca', '#3730a3',
+               '#312e81', '#1e1b4b'),
+    'purple': ('#faf5ff', '#f3e8ff', '#e9d5ff', '#d8b4fe', '#c084fc', '#a855f7', '#9333ea', '#7e22ce', '#6b21a8',
+               '#581c87', '#3b0764'),
+}
+SHADES = ('50', '100', '200', '300', '400', '500', '600', '700', '800', '900', '950')
+COLORS = {f'{name}-{shade}': value for name, values in PALETTE.items() for shade, value in zip(SHADES, values)}
+COLORS.update({'white': '#ffffff', 'black': '#000000', 'transparent': 'transparent', 'current': 'currentColor'})
+
+SCREENS = {'sm': 640, 'md': 768, 'lg': 1024, 'xl': 1280, '2xl': 1536}
+PSEUDO = {'hover': ':hover', 'focus': ':focus', 'active': ':active'}
+# Варианттардын ирети (Tailwind'дегидей): вариантсыз < hover < focus < active < group-hover
+VARIANTS = (None, 'hover', 'focus', 'active', 'group-hover')
+
+FONT_SIZES = {
+    'xs': ('0.75rem', '1rem'), 'sm': ('0.875rem', '1.25rem'), 'base': ('1rem', '1.5rem'),
+    'lg': ('1.125rem', '1.75rem'), 'xl': ('1.25rem', '1.75rem'), '2xl': ('1.5rem', '2rem'),
+    '3xl': ('1.875rem', '2.25rem'), '4xl': ('2.25rem', '2.5rem'), '5xl': ('3rem', '1'), '6xl': ('3.75rem', '1'),
+    '7xl': ('4.5rem', '1'),
+}
+FONT_WEIGHTS = {'thin': 100, 'light': 300, 'normal': 400, 'medium': 500, 'semibold': 600, 'bold': 700,
+                'extrabold': 800, 'black': 900}
+TRACKING = {'tighter': '-0.05em', 'tight': '-0.025em', 'normal': '0em', 'wide': '0.025em', 'wider': '0.05em',
+            'widest': '0.1em'}
+LEADING = {'none': '1', 'tight': '1.25', 'snug': '1.375', 'normal': '1.5', 'relaxed': '1.625', 'loose': '2'}
+RADII = {'none': '0px', 'sm': '0.125rem', '': '0.25rem', 'md': '0.375rem', 'lg': '0.5rem', 'xl': '0.75rem',
+         '2xl': '1rem', '3xl': '1.5rem', 'full': '9999px'}
+MAX_WIDTHS = {'xs': '20rem', 'sm': '24rem', 'md': '28rem', 'lg': '32rem', 'xl': '36rem', '2xl': '42rem',
+              '3xl': '48rem', '4xl': '56rem', '5xl': '64rem', '6xl': '72rem', '7xl': '80rem', 'full': '100%',
+              'none': 'none'}
+SHADOWS = {
+    'sm': ('0 1px 2px 0 rgb(0 0 0 / 0.05)', '0 1px 2px 0 var(--tw-shadow-color)'),
+    '': ('0 1px 3px 0 rgb(0 0 0 / 0.1), 0 1px 2px -1px rgb(0 0 0 / 0.1)',
+         '0 1px 3px 0 var(--tw-shadow-color), 0 1px 2px -1px var(--tw-shadow-color)'),
+    'md': ('0 4px 6px -1px rgb(0 0 0 / 0.1), 0 2px 4px -2px rgb(0 0 0 / 0.1)',
+           '0 4px 6px -1px var(--tw-shadow-color), 0 2px 4px -2px var(--tw-shadow-color)'),
+    'lg': ('0 10px 15px -3px rgb(0 0 0 / 0.1), 0 4px 6px -4px rgb(0 0 0 / 0.1)',
+           '0 10px 15px -3px var(--tw-shadow-color), 0 4px 6px -4px var(--tw-shadow-color)'),
+    'xl': ('0 20px 25px -5px rgb(0 0 0 / 0.1), 0 8px 10px -6px rgb(0 0 0 / 0.1)',
+           '0 20px 25px -5px var(--tw-shadow-color), 0 8px 10px -6px var(--tw-shadow-color)'),
+    '2xl': ('0 25px 50px -12px rgb(0 0 0 / 0.25)', '0 25px 50px -12px var(--tw-shadow-color)'),
+    'none': ('0 0 #0000', '0 0 #0000'),
+}
+BLUR = {'sm': '4px', '': '8px', 'md': '12px', 'lg': '16px', 'xl': '24px', '2xl': '40px', '3xl': '64px'}
+TRANSITIONS = {
+    '': 'color, background-color, border-color, text-decoration-color, fill, stroke, opacity, box-shadow, '
+        'transform, filter, backdrop-filter',
+    'all': 'all',
+    'colors': 'color, background-color, border-color, text-decoration-color, fill, stroke',
+    'opacity': 'opacity',
+    'shadow': 'box-shadow',
+    'transform': 'transform',
+}
+ANIMATIONS = {
+    'spin': ('spin 1s linear infinite', '@keyframes spin{to{transform:rotate(360deg)}}'),
+    'ping': ('ping 1s cubic-bezier(0, 0, 0.2, 1) infinite',
+             '@keyframes ping{75%,100%{transform:scale(2);opacity:0}}'),
+    'pulse': ('pulse 2s cubic-bezier(0.4, 0, 0.6, 1) infinite', '@keyframes pulse{50%{opacity:.5}}'),
+    'bounce': ('bounce 1s infinite',
+               '@keyframes bounce{0%,100%{transform:translateY(-25%);animation-timing-function:cubic-bezier(0.8,0,1,1)}'
+               '50%{transform:none;animation-timing-function:cubic-bezier(0,0,0.2,1)}}'),
+}
+DISPLAY = {'block': 'block', 'inline-block': 'inline-block', 'inline': 'inline', 'flex': 'flex',
+           'inline-flex': 'inline-flex', 'grid': 'grid', 'inline-grid': 'inline-grid', 'table': 'table',
+           'contents': 'contents', 'hidden': 'none'}
+TRANSFORM = ('translate(var(--tw-translate-x), var(--tw-translate-y)) rotate(var(--tw-rotate)) '
+             'scaleX(var(--tw-scale-x)) scaleY(var(--tw-scale-y))')
+CHILDREN = ' > :not([hidden]) ~ :not([hidden])'
+# Tailwind'дин демейки шкалалары - башкалары (мис. Bootstrap'тын w-100) класс эмес
+SPACING = {'0', '0.5', '1', '1.5', '2', '2.5', '3', '3.5', '4', '5', '6', '7', '8', '9', '10', '11', '12', '14', '16',
+           '20', '24', '28', '32', '36', '40', '44', '48', '52', '56', '60', '64', '72', '80', '96'}
+Z_INDEX = {'0', '10', '20', '30', '40', '50', 'auto'}
+OPACITY = {str(value) for value in range(0, 101, 5)}
+ROTATE = {'0', '1', '2', '3', '6', '12', '45', '90', '180'}
+SCALE = {'0', '50', '75', '90', '95', '100', '105', '110', '125', '150'}
+DURATION = {'0', '75', '100', '150', '200', '300', '500', '700', '1000'}
+COLUMNS = {str(value) for value in range(1, 13)}
+
+# Tailwind'дин preflight'ы (v3): браузерлердин демейки стилдери нөлдөлөт; утилиталар ушуга таянат
+PREFLIGHT = (
+    "*,::before,::after{box-sizing:border-box;border-width:0;border-style:solid;border-color:#e5e7eb}"
+    "::before,::after{--tw-content:''}"
+    "html,:host{line-height:1.5;-webkit-text-size-adjust:100%;-moz-tab-size:4;tab-size:4;font-family:ui-sans-serif,"
+    "system-ui,sans-serif,\"Apple Color Emoji\",\"Segoe UI Emoji\",\"Segoe UI Symbol\",\"Noto Color Emoji\";"
+    "font-feature-settings:normal;font-variation-settings:normal;-webkit-tap-highlight-color:transparent}"
+    "body{margin:0;line-height:inherit}"
+    "hr{height:0;color:inherit;border-top-width:1px}"
+    "abbr:where([title]){text-decoration:underline dotted}"
+    "h1,h2,h3,h4,h5,h6{font-size:inherit;font-weight:inherit}"
+    "a{color:inherit;text-decoration:inherit}"
+    "b,strong{font-weight:bolder}"
+    "code,kbd,samp,pre{font-family:ui-monospace,SFMono-Regular,Menlo,Monaco,Consolas,\"Liberation Mono\","
+    "\"Courier New\",monospace;font-size:1em}"
+    "small{font-size:80%}"
+    "sub,sup{font-size:75%;line-height:0;position:relative;vertical-align:baseline}sub{bottom:-0.25em}sup{top:-0.5em}"
+    "table{text-indent:0;border-color:inherit;border-collapse:collapse}"
+    "button,input,optgroup,select,textarea{font-family:inherit;font-feature-settings:inherit;"
+    "font-variation-settings:inherit;font-size:100%;font-weight:inherit;line-height:inherit;letter-spacing:inherit;"
+    "color:inherit;margin:0;padding:0}"
+    "button,select{text-transform:none}"
+    "button,input:where([type='button']),input:where([type='reset']),input:where([type='submit'])"
+    "{-webkit-appearance:button;background-color:transparent;background-image:none}"
+    ":-moz-focusring{outline:auto}:-moz-ui-invalid{box-shadow:none}progress{vertical-align:baseline}"
+    "::-webkit-inner-spin-button,::-webkit-outer-spin-button{height:auto}"
+    "[type='search']{-webkit-appearance:textfield;outline-offset:-2px}"
+    "::-webkit-search-decoration{-webkit-appearance:none}"
+    "::-webkit-file-upload-button{-webkit-appearance:button;font:inherit}"
+    "summary{display:list-item}"
+    "blockquote,dl,dd,h1,h2,h3,h4,h5,h6,hr,figure,p,pre{margin:0}fieldset{margin:0;padding:0}legend{padding:0}"
+    "ol,ul,menu{list-style:none;margin:0;padding:0}dialog{padding:0}textarea{resize:vertical}"
+    "input::placeholder,textarea::placeholder{opacity:1;color:#9ca3af}"
+    "button,[role=\"button\"]{cursor:pointer}:disabled{cursor:default}"
+    "img,svg,video,canvas,audio,iframe,embed,object{display:block;vertical-align:middle}"
+    "img,video{max-width:100%;height:auto}[hidden]{display:none}"
+    # transform/shadow/filter утилиталары колдонгон өзгөрмөлөрдүн демейки маанилери
+    "*,::before,::after{--tw-translate-x:0;--tw-translate-y:0;--tw-rotate:0;--tw-scale-x:1;--tw-scale-y:1;"
+    "--tw-ring-offset-shadow:0 0 #0000;--tw-ring-shadow:0 0 #0000;--tw-shadow:0 0 #0000;"
+    "--tw-shadow-colored:0 0 #0000}"
+)
+
+# rank - бир плагиндин ичиндеги ирет (p < px/py < pt/pr/pb/pl: кийинкиси жеңет)
+Rule = namedtuple('Rule', 'declarations children keyframes rank', defaults=('', '', 0))
+
+
+# ===================
+# МААНИЛЕР
+# ===================
+def _number(value):
+    return ('%f' % value).rstrip('0').rstrip('.')
+
+
+def spacing(key):
+    """0.25rem кадам: 4 -> 1rem, 1.5 -> 0.375rem, px -> 1px."""
+    if key == 'px':
+        return '1px'
+    if key in SPACING:
+        return '0px' if key == '0' else f'{_number(float(key) * 0.25)}rem'
+    return None
+
+
+def fraction(key):
+    match = re.fullmatch(r'(\d+)/(\d+)', key)
+    if match and int(match[2]):
+        return f'{_number(int(match[1]) / int(match[2]) * 100)}%'
+    return None
+
+
+def arbitrary(key):
+    # [500px], [#f8fafc], [80vh]: боштук жок жазылат, `_` - боштук
+    if key.startswith('[') and key.endswith(']') and len(key) > 2:
+        return key[1:-1].replace('_', ' ')
+    return None
+
+
+def color(key):
+    """bg-white/70 сыяктуу тунуктук менен. (маани, None) же None."""
+    key, _, alpha = key.partition('/')
+    value = COLORS.get(key) or arbitrary(key)
+    if value is None or (value[0] != '#' and value not in COLORS.values()):
+        return None
+    if not alpha:
+        return value
+    if not alpha.isdigit() or not value.startswith('#') or len(value) != 7:
+        return None
+    red, green, blue = (int(value[i:i + 2], 16) for i in (1, 3, 5))
+    return f'rgb({red} {green} {blue} / {_number(int(alpha) / 100)})'
+
+
+def length(key, negative=False, fractions=True, extra=None):
+    value = (extra or {}).get(key) or spacing(key) or (fraction(key) if fractions else None) or arbitrary(key)
+    if value is None:
+        return None
+    if negative:
+        return f'-{value}' if value not in ('0px', 'auto') else value
+    return value
+
+
+# ===================
+# ПЛАГИНДЕР (Tailwind'дин corePlugins иретинде)
+# ===================
+SIDES = {'': ('',), 'x': ('-left', '-right'), 'y': ('-top', '-bottom'), 's': ('-inline-start',),
+         'e': ('-inline-end',), 't': ('-top',), 'r': ('-right',), 'b': ('-bottom',), 'l': ('-left',)}
+SIDE_RANK = {side: rank for rank, side in enumerate(SIDES)}
+SIZE_WORDS = {'full': '100%', 'auto': 'auto', 'min': 'min-content', 'max': 'max-content', 'fit': 'fit-content'}
+
+
+def _box(prop, name, negative):
+    match = re.fullmatch(r'([xysetrbl]?)-(.+)', name)
+    if not match:
+        return None
+    value = length(match[2], negative, fractions=False, extra={'auto': 'auto'} if prop == 'margin' else None)
+    if value is None:
+        return None
+    return Rule(';'.join(f'{prop}{side}:{value}' for side in SIDES[match[1]]), rank=SIDE_RANK[match[1]])
+
+
+def margin(name, negative):
+    return _box('margin', name[1:], negative) if name.startswith('m') else None
+
+
+def padding(name, negative):
+    return _box('padding', name[1:], False) if name.startswith('p') and not negative else None
+
+
+def position(name, negative):
+    if name in ('static', 'fixed', 'absolute', 'relative', 'sticky') and not negative:
+        return Rule(f'position:{name}')
+    return None
+
+
+INSET = {'inset': ('inset',), 'inset-x': ('left', 'right'), 'inset-y': ('top', 'bottom'), 'top': ('top',),
+         'right': ('right',), 'bottom': ('bottom',), 'left': ('left',)}
+
+
+def inset(name, negative):
+    match = re.fullmatch(r'(inset|inset-x|inset-y|top|right|bottom|left)-(.+)', name)
+    if not match:
+        return None
+    value = length(match[2], negative, extra=SIZE_WORDS)
+    if value is None:
+        return None
+    props = INSET[match[1]]
+    return Rule(';'.join(f'{prop}:{value}' for prop in props), rank=list(INSET).index(match[1]))
+
+
+def z_index(name, negative):
+    match = re.fullmatch(r'z-(\d+|auto)', name)
+    if not match or match[1] not in Z_INDEX:
+        return None
+    return Rule(f'z-index:{"-" if negative else ""}{match[1]}')
+
+
+def simple(table):
+    def plugin(name, negative):
+        return None if negative or name not in table else Rule(table[name])
+    return plugin
+
+
+def sizing(prefix, prop, words):
+    def plugin(name, negative):
+        if negative or not name.startswith(prefix + '-'):
+            return None
+        key = name[len(prefix) + 1:]
+        value = words.get(key) or (spacing(key) if prefix in ('w', 'h') else None)
+        value = value or (fraction(key) if prefix in ('w', 'h') else None) or arbitrary(key)
+        return Rule(f'{prop}:{value}') if value else None
+    return plugin
+
+
+def translate(name, negative):
+    match = re.fullmatch(r'translate-([xy])-(.+)', name)
+    if not match:
+        return None
+    value = length(match[2], negative, extra={'full': '100%'})
+    return Rule(f'--tw-translate-{match[1]}:{value};transform:{TRANSFORM}') if value else None
+
+
+def rotate(name, negative):
+    match = re.fullmatch(r'rotate-(\d+)', name)
+    if match and match[1] not in ROTATE:
+        return None
+    return Rule(f'--tw-rotate:{"-" if negative else ""}{match[1]}deg;transform:{TRANSFORM}') if match else None
+
+
+def scale(name, negative):
+    match = re.fullmatch(r'scale(-[xy])?-(\d+)', name)
+    if not match or negative or match[2] not in SCALE:
+        return None
+    value = _number(int(match[2]) / 100)
+    axes = (match[1][1],) if match[1] else ('x', 'y')
+    return Rule(';'.join(f'--tw-scale-{axis}:{value}' for axis in axes) + f';transform:{TRANSFORM}')
+
+
+def animation(name, negative):
+    match = re.fullmatch(r'animate-(\w+)', name)
+    if not match or match[1] not in ANIMATIONS or negative:
+        return None
+    value, keyframes = ANIMATIONS[match[1]]
+    return Rule(f'animation:{value}', keyframes=keyframes)
+
+
+def grid_cols(name, negative):
+    match = re.fullmatch(r'grid-cols-(\d+|none)', name)
+    if not match or negative or match[1] not in COLUMNS | {'none'}:
+        return None
+    value = 'none' if match[1] == 'none' else f'repeat({match[1]}, minmax(0, 1fr))'
+    return Rule(f'grid-template-columns:{value}')
+
+
+def col_span(name, negative):
+    if name == 'col-span-full':
+        return Rule('grid-column:1 / -1')
+    match = re.fullmatch(r'col-span-(\d+)', name)
+    if not match or negative or match[1] not in COLUMNS:
+        return None
+    return Rule(f'grid-column:span {match[1]} / span {match[1]}')
+
+
+def gap(name, negative):
+    match = re.fullmatch(r'gap(-[xy])?-(.+)', name)
+    value = match and not negative and (spacing(match[2]) or arbitrary(match[2]))
+    if not value:
+        return None
+    prop = {'': 'gap', '-x': 'column-gap', '-y': 'row-gap'}[match[1] or '']
+    return Rule(f'{prop}:{value}')
+
+
+def space(name, negative):
+    match = re.fullmatch(r'space-([xy])-(.+)', name)
+    value = match and length(match[2], negative, fractions=False)
+    if not value:
+        return None
+    start, end = ('left', 'right') if match[1] == 'x' else ('top', 'bottom')
+    axis = match[1]
+    return Rule(f'--tw-space-{axis}-reverse:0;margin-{start}:calc({value} * calc(1 - var(--tw-space-{axis}-reverse)));'
+                f'margin-{end}:calc({value} * var(--tw-space-{axis}-reverse))', CHILDREN)
+
+
+def divide_width(name, negative):
+    match = re.fullmatch(r'divide-([xy])(?:-(\d+))?', name)
+    if not match or negative:
+        return None
+    width = f'{match[2] or 1}px'
+    start, end = ('left', 'right') if match[1] == 'x' else ('top', 'bottom')
+    axis = match[1]
+    return Rule(f'--tw-divide-{axis}-reverse:0;border-{start}-width:calc({width} * calc(1 - '
+                f'var(--tw-divide-{axis}-reverse)));border-{end}-width:calc({width} * var(--tw-divide-{axis}-reverse))',
+                CHILDREN)
+
+
+def color_plugin(prefix, prop, children=''):
+    def plugin(name, negative):
+        if negative or not name.startswith(prefix + '-'):
+            return None
+        value = color(name[len(prefix) + 1:])
+        return Rule(f'{prop}:{value}', children) if value else None
+    return plugin
+
+
+CORNERS = {None: ('',), 't': ('-top-left', '-top-right'), 'r': ('-top-right', '-bottom-right'),
+           'b': ('-bottom-right', '-bottom-left'), 'l': ('-top-left', '-bottom-left'), 'tl': ('-top-left',),
+           'tr': ('-top-right',), 'br': ('-bottom-right',), 'bl': ('-bottom-left',)}
+
+
+def rounded(name, negative):
+    match = re.fullmatch(r'rounded(?:-([trbl]|tl|tr|br|bl))?(?:-(.+))?', name)
+    if not match or negative:
+        return None
+    key = match[2] or ''
+    value = RADII.get(key) or arbitrary(key)
+    if value is None:
+        return None
+    return Rule(';'.join(f'border{corner}-radius:{value}' for corner in CORNERS[match[1]]),
+                rank=list(CORNERS).index(match[1]))
+
+
+def border_width(name, negative):
+    match = re.fullmatch(r'border(?:-([xytrbl]))?(?:-(\d+))?', name)
+    if not match or negative:
+        return None
+    side = match[1] or ''
+    return Rule(';'.join(f'border{edge}-width:{match[2] or 1}px' for edge in SIDES[side]), rank=SIDE_RANK[side])
+
+
+def font_size(name, negative):
+    if negative or not name.startswith('text-'):
+        return None
+    key = name[5:]
+    if key in FONT_SIZES:
+        size, line_height = FONT_SIZES[key]
+        return Rule(f'font-size:{size};line-height:{line_height}')
+    value = arbitrary(key)
+    return Rule(f'font-size:{value}') if value and value[0].isdigit() else None
+
+
+def prefixed(prefix, prop, table):
+    def plugin(name, negative):
+        if negative or not name.startswith(prefix + '-'):
+            return None
+        value = table.get(name[len(prefix) + 1:])
+        return Rule(f'{prop}:{value}') if value is not None else None
+    return plugin
+
+
+def opacity(name, negative):
+    match = re.fullmatch(r'opacity-(\d+)', name)
+    if not match or negative or match[1] not in OPACITY:
+        return None
+    return Rule(f'opacity:{_number(int(match[1]) / 100)}')
+
+
+def box_shadow(name, negative):
+    match = re.fullmatch(r'shadow(?:-(sm|md|lg|xl|2xl|none))?', name)
+    if not match or negative:
+        return None
+    value, colored = SHADOWS[match[1] or '']
+    return Rule(f'--tw-shadow:{value};--tw-shadow-colored:{colored};'
+                'box-shadow:var(--tw-ring-offset-shadow, 0 0 #0000), var(--tw-ring-shadow, 0 0 #0000), var(--tw-shadow)')
+
+
+def shadow_color(name, negative):
+    value = not negative and name.startswith('shadow-') and color(name[7:])
+    return Rule(f'--tw-shadow-color:{value};--tw-shadow:var(--tw-shadow-colored)') if value else None
+
+
+def backdrop_blur(name, negative):
+    match = re.fullmatch(r'backdrop-blur(?:-(.+))?', name)
+    if not match or negative or (match[1] or '') not in BLUR:
+        return None
+    value = f'blur({BLUR[match[1] or ""]})'
+    return Rule(f'--tw-backdrop-blur:{value};-webkit-backdrop-filter:var(--tw-backdrop-blur);'
+                f'backdrop-filter:var(--tw-backdrop-blur)')
+
+
+def transition(name, negative):
+    match = re.fullmatch(r'transition(?:-(\w+))?', name)
+    if not match or negative or (match[1] or '') not in TRANSITIONS:
+        return None
+    return Rule(f'transition-property:{TRANSITIONS[match[1] or ""]};'
+                'transition-timing-function:cubic-bezier(0.4, 0, 0.2, 1);transition-duration:150ms')
+
+
+def duration(name, negative):
+    match = re.fullmatch(r'duration-(\d+)', name)
+    if not match or negative or match[1] not in DURATION:
+        return None
+    return Rule(f'transition-duration:{match[1]}ms')
+
+
+PLUGINS = (
+    simple({'pointer-events-none': 'pointer-events:none', 'pointer-events-auto': 'pointer-events:auto'}),
+    simple({'visible': 'visibility:visible', 'invisible': 'visibility:hidden'}),
+    position,
+    inset,
+    z_index,
+    col_span,
+    margin,
+    simple({name: f'display:{value}' for name, value in DISPLAY.items()}),
+    sizing('h', 'height', dict(SIZE_WORDS, screen='100vh')),
+    sizing('min-h', 'min-height', {'0': '0px', 'full': '100%', 'screen': '100vh'}),
+    sizing('w', 'width', dict(SIZE_WORDS, screen='100vw')),
+    sizing('max-w', 'max-width', MAX_WIDTHS),
+    simple({'flex-1': 'flex:1 1 0%', 'flex-auto': 'flex:1 1 auto', 'flex-none': 'flex:none',
+            'shrink-0': 'flex-shrink:0', 'grow': 'flex-grow:1'}),
+    simple({'border-collapse': 'border-collapse:collapse', 'border-separate': 'border-collapse:separate'}),
+    translate,
+    rotate,
+    scale,
+    animation,
+    simple({'cursor-pointer': 'cursor:pointer', 'select-none': 'user-select:none'}),
+    simple({'appearance-none': 'appearance:none'}),
+    grid_cols,
+    simple({'flex-row': 'flex-direction:row', 'flex-col': 'flex-direction:column', 'flex-wrap': 'flex-wrap:wrap',
+            'flex-nowrap': 'flex-wrap:nowrap'}),
+    simple({f'items-{key}': f'align-items:{value}' for key, value in
+            (('start', 'flex-start'), ('end', 'flex-end'), ('center', 'center'), ('baseline', 'baseline'),
+             ('stretch', 'stretch'))}),
+    simple({f'justify-{key}': f'justify-content:{value}' for key, value in
+            (('start', 'flex-start'), ('end', 'flex-end'), ('center', 'center'), ('between', 'space-between'),
+             ('around', 'space-around'), ('evenly', 'space-evenly'))}),
+    gap,
+    space,
+    divide_width,
+    color_plugin('divide', 'border-color', CHILDREN),
+    simple({f'overflow-{axis}{value}': f'overflow{"-" if axis else ""}{axis.rstrip("-")}:{value}'
+            for axis in ('', 'x-', 'y-') for value in ('auto', 'hidden', 'visible', 'scroll')}),
+    simple({'truncate': 'overflow:hidden;text-overflow:ellipsis;white-space:nowrap'}),
+    simple({f'whitespace-{value}': f'white-space:{value}' for value in ('normal', 'nowrap', 'pre', 'pre-line',
+                                                                        'pre-wrap')}),
+    rounded,
+    border_width,
+    simple({f'border-{style}': f'border-style:{style}' for style in ('solid', 'dashed', 'dotted', 'double',
+                                                                      'none')}),
+    color_plugin('border', 'border-color'),
+    color_plugin('bg', 'background-color'),
+    simple({f'object-{fit}': f'object-fit:{fit}' for fit in ('contain', 'cover', 'fill', 'none')}),
+    padding,
+    simple({f'text-{align}': f'text-align:{align}' for align in ('left', 'center', 'right', 'justify')}),
+    font_size,
+    prefixed('font', 'font-weight', FONT_WEIGHTS),
+    simple({'uppercase': 'text-transform:uppercase', 'lowercase': 'text-transform:lowercase',
+            'capitalize': 'text-transform:capitalize', 'normal-case': 'text-transform:none'}),
+    simple({'italic': 'font-style:italic', 'not-italic': 'font-style:normal'}),
+    prefixed('leading', 'line-height', LEADING),
+    prefixed('tracking', 'letter-spacing', TRACKING),
+    color_plugin('text', 'color'),
+    simple({'underline': 'text-decoration-line:underline', 'line-through': 'text-decoration-line:line-through',
+            'no-underline': 'text-decoration-line:none'}),
+    opacity,
+    box_shadow,
+    shadow_color,
+    simple({'outline-none': 'outline:2px solid transparent;outline-offset:2px'}),
+    backdrop_blur,
+    transition,
+    duration,
+)
+
+
+# ===================
+# КЛАСС -> CSS
+# ===================
+Utility = namedtuple('Utility', 'sort_key css keyframes')
+_CANDIDATE_RE = re.compile(r'[^<>"\'`\s]*[^<>"\'`\s:]')
+
+
+def candidates(text):
+    """Tailwind'дей: файлдын бардык белгилери (класс атрибуттары гана эмес - JS саптары да)."""
+    # {% if %}bg-green-100{% endif %} - шаблон тегдери класстын бир бөлүгү эмес
+    return set(_CANDIDATE_RE.findall(re.sub(r'{%|%}|{{|}}|{#|#}', ' ', text)))
+
+
+def escape(name):
+    # CSS селекторунда класстын аты: тамга/сан/-/_ эмес белгилер экранизацияланат
+    return re.sub(r'[^\w-]', lambda match: '\\' + match[0], name)
+
+
+def _split(name):
+    parts, depth, current = [], 0, ''
+    for char in name:
+        if char == '[':
+            depth += 1
+        elif char == ']':
+            depth -= 1
+        if char == ':' and depth == 0:
+            parts.append(current)
+            current = ''
+        else:
+            current += char
+    return parts, current
+
+
+def utility(name):
+    """Бир класс -> Utility же None (Tailwind эмес)."""
+    variants, base = _split(name)
+    screen, variant = None, None
+    for part in variants:
+        if part in SCREENS and screen is None:
+            screen = part
+        elif part in VARIANTS[1:] and variant is None:
+            variant = part
+        else:
+            return None
+    negative = base.startswith('-')
+    if negative:
+        base = base[1:]
+    for order, plugin in enumerate(PLUGINS):
+        rule = plugin(base, negative)
+        if rule is not None:
+            break
+    else:
+        return None
+    selector = '.' + escape(name)
+    if variant == 'group-hover':
+        selector = f'.group:hover {selector}'
+    elif variant:
+        selector += PSEUDO[variant]
+    css = f'{selector}{rule.children}{{{rule.declarations}}}'
+    if screen:
+        css = f'@media (min-width: {SCREENS[screen]}px){{{css}}}'
+    sort_key = (SCREENS.get(screen, 0), VARIANTS.index(variant), order, rule.rank, name)
+    return Utility(sort_key, css, rule.keyframes)
+
+
+def container(screens=SCREENS):
+    return '.container{width:100%}' + ''.join(f'@media (min-width: {width}px){{.container{{max-width:{width}px}}}}'
+                                              for width in screens.values())
+
+
+def build(classes):
+    """(css, тааныбаган класстар). container жана keyframes'тер утилиталардан мурун."""
+    utilities, unknown = [], set()
+    for name in classes:
+        item = utility(name)
+        if item is None:
+            if name != 'container':
+                unknown.add(name)
+        else:
+            utilities.append(item)
+    utilities.sort()
+    keyframes = sorted({item.keyframes for item in utilities if item.keyframes})
+    css = (container() if 'container' in classes else '') + ''.join(item.css for item in utilities)
+    return ''.join(keyframes) + css, unknown
@@ -0,0 +1,151 @@
+import logging
+import random
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Task
+from .transactions import immediate_write
+
+logger = logging.getLogger(__name__)
+
+# ===================
+# ТАПШЫРМАЛАРДЫН РЕЕСТРИ
+# ===================
+# Тапшырма базадагы Task сабы катары сакталат (durable): суроо-талаанын транзакциясы менен бирге жазылат,
+# ошондуктан транзакция артка кайтса, тапшырма да жок болот. run_tasks воркери аларды аткарат.
+_registry = {}
+
+
+class UnknownTask(LookupError):
+    pass
+
+
+class TaskDefinition:
+    def __init__(self, func, name, max_attempts, backoff):
+        self.func = func
+        self.name = name
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+
+    def enqueue(self, key=None, delay=0, **payload):
+        return enqueue(self.name, key=key, delay=delay, **payload)
+
+
+def task(name=None, max_attempts=5, backoff=2.0):
+    """Функцияны тапшырма катары каттайт. Аргументтер JSON'го айлана турган болушу керек.
+
+    backoff: кайталоолордун ортосундагы базалык күтүү (секунд), ар бир аракетте эки эсе көбөйөт.
+    """
+    def decorator(func):
+        definition = TaskDefinition(func, name or f'{func.__module__}.{func.__name__}', max_attempts, backoff)
+        _registry[definition.name] = definition
+        return definition
+    return decorator
+
+
+def get_task(name):
+    try:
+        return _registry[name]
+    except KeyError:
+        raise UnknownTask(f"Белгисиз тапшырма: {name}")
+
+
+def enqueue(name, key=None, delay=0, **payload):
+    """Тапшырманы кезекке кошот. key бар болсо, ошол эле ачкыч менен экинчи жолу кошулбайт.
+
+    TASKS_EAGER=True болсо (тесттер), тапшырма ошол замат аткарылат жана ката түз чыгат.
+    """
+    definition = get_task(name)
+    if settings.TASKS_EAGER:
+        definition(**payload)
+        return None
+    task_obj = Task(name=name, payload=payload, idempotency_key=key, max_attempts=definition.max_attempts,
+                    run_after=timezone.now() + timedelta(seconds=delay))
+    # ON CONFLICT DO NOTHING: ошол эле ачкыч менен тапшырма бар болсо, бир сурам менен өткөрүлөт
+    Task.objects.bulk_create([task_obj], ignore_conflicts=True)
+    return task_obj
+
+
+# ===================
+# АТКАРУУ
+# ===================
+def due_tasks(limit):
+    """Аткарыла турган тапшырмалар: күтүүдөгүлөр жана воркери токтоп калган "аткарылууда" тапшырмалар."""
+    now = timezone.now()
+    stale = now - timedelta(seconds=settings.TASKS_LOCK_TIMEOUT)
+    return list(
+        Task.objects.filter(Q(status='PENDING', run_after__lte=now) | Q(status='RUNNING', locked_at__lt=stale))
+        .order_by('run_after', 'id').values_list('id', flat=True)[:limit]
+    )
+
+
+@immediate_write
+def claim(task_id):
+    """Тапшырманы ушул воркерге алат (compare-and-set) - эки воркер бир тапшырманы аткарбайт."""
+    now = timezone.now()
+    stale = now - timedelta(seconds=settings.TASKS_LOCK_TIMEOUT)
+    claimed = Task.objects.filter(
+        Q(status='PENDING') | Q(status='RUNNING', locked_at__lt=stale), pk=task_id,
+    ).update(status='RUNNING', locked_at=now)
+    return Task.objects.get(pk=task_id) if claimed else None
+
+
+@immediate_write
+def _finish(task_id, **fields):
+    Task.objects.filter(pk=task_id).update(**fields)
+
+
+def retry_delay(definition, attempts):
+    # Экспоненциалдык күтүү + кокустук: 2, 4, 8 ... секунд (backoff=2.0 болгондо)
+    return definition.backoff * (2 ** (attempts - 1)) * (1 + random.random() / 2)
+
+
+def run_task(task_obj):
+    """Бир тапшырманы аткарат; ийгиликсиз болсо кийинчерээк кайталанат же FAILED болот. Статусту кайтарат."""
+    attempts = task_obj.attempts + 1
+    try:
+        definition = get_task(task_obj.name)
+        with transaction.atomic():
+            definition(**task_obj.payload)
+    except Exception as exc:
+        error = ''.join(traceback.format_exception(exc))[-4000:]
+        if attempts >= task_obj.max_attempts or isinstance(exc, UnknownTask):
+            logger.error("Тапшырма %s #%s ката менен токтоду: %s", task_obj.name, task_obj.pk, exc)
+            _finish(task_obj.pk, status='FAILED', attempts=attempts, last_error=error, locked_at=None,
+                    finished_at=timezone.now())
+            return 'FAILED'
+        delay = retry_delay(get_task(task_obj.name), attempts)
+        _finish(task_obj.pk, status='PENDING', attempts=attempts, last_error=error, locked_at=None,
+                run_after=timezone.now() + timedelta(seconds=delay))
+        return 'PENDING'
+    _finish(task_obj.pk, status='DONE', attempts=attempts, locked_at=None, finished_at=timezone.now())
+    return 'DONE'
+
+
+def run_due_tasks(limit=100, executor=None):
+    """Кезектеги тапшырмаларды аткарат (executor берилсе, пул аркылуу). Аткарылгандардын санын кайтарат."""
+    def work(task_id):
+        try:
+            try:
+                task_obj = claim(task_id)
+            except Exception as exc:
+                # Мис. кулпу кайталоолордон кийин да бошободу: тапшырма PENDING бойдон, кийинки айлампада
+                logger.error("Тапшырма #%s алынган жок: %s", task_id, exc)
+                return None
+            return run_task(task_obj) if task_obj else None
+        finally:
+            # Пулдун агымдарында туташуулар CONN_MAX_AGE боюнча жабылат
+            if executor:
+                close_old_connections()
+
+    ids = due_tasks(limit)
+    results = executor.map(work, ids) if executor else map(work, ids)
+    return sum(1 for result in results if result is not None)
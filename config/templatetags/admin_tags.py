@@ -0,0 +1,78 @@
+import datetime
+
+from django import template
+from django.contrib.admin.templatetags.admin_list import date_hierarchy
+from django.contrib.admin.templatetags.base import InclusionAdminNode
+from django.db.models import DateTimeField, Max, Min
+from django.utils import formats, timezone
+from django.utils.text import capfirst
+from django.utils.translation import gettext as _
+
+register = template.Library()
+
+
+def _bounds(cl, field_name):
+    bounds = cl.queryset.aggregate(first=Min(field_name), last=Max(field_name))
+    if bounds['first'] is None:
+        return None, None
+    if isinstance(cl.model._meta.get_field(field_name), DateTimeField):
+        bounds = {key: timezone.localtime(value) if timezone.is_aware(value) else value
+                  for key, value in bounds.items()}
+    return bounds['first'], bounds['last']
+
+
+def bounded_date_hierarchy(cl):
+    """admin'дин date_hierarchy'си, бирок чоң таблицада (ModelAdmin.date_hierarchy_from_bounds) мезгилдер
+    DISTINCT date_trunc менен бүт таблицаны окубай, MIN/MAX'тан (индекс) түзүлөт. Бош ай/күн да көрүнүшү мүмкүн.
+    """
+    if not getattr(cl.model_admin, 'date_hierarchy_from_bounds', False):
+        return date_hierarchy(cl)
+    field_name = cl.date_hierarchy
+    year_field, month_field, day_field = (f'{field_name}__{part}' for part in ('year', 'month', 'day'))
+    year, month, day = (cl.params.get(name) for name in (year_field, month_field, day_field))
+    if day:
+        # Күн тандалган - Django'нун өзүнүкү сурамсыз
+        return date_hierarchy(cl)
+
+    def link(filters):
+        return cl.get_query_string(filters, [f'{field_name}__'])
+
+    first, last = _bounds(cl, field_name)
+    if not (year or month) and first is not None and first.year == last.year:
+        year = first.year
+        if first.month == last.month:
+            month = first.month
+    if first is None:
+        periods = []
+    elif year and month:
+        periods = [datetime.date(int(year), int(month), number) for number in range(first.day, last.day + 1)]
+    elif year:
+        periods = [datetime.date(int(year), number, 1) for number in range(first.month, last.month + 1)]
+    else:
+        periods = [datetime.date(number, 1, 1) for number in range(first.year, last.year + 1)]
+
+    if year and month:
+        return {
+            'show': True,
+            'back': {'link': link({year_field: year}), 'title': str(year)},
+            'choices': [{'link': link({year_field: year, month_field: month, day_field: period.day}),
+                         'title': capfirst(formats.date_format(period, 'MONTH_DAY_FORMAT'))} for period in periods],
+        }
+    if year:
+        return {
+            'show': True,
+            'back': {'link': link({}), 'title': _('All dates')},
+            'choices': [{'link': link({year_field: year, month_field: period.month}),
+                         'title': capfirst(formats.date_format(period, 'YEAR_MONTH_FORMAT'))} for period in periods],
+        }
+    return {
+        'show': True,
+        'back': None,
+        'choices': [{'link': link({year_field: str(period.year)}), 'title': str(period.year)} for period in periods],
+    }
+
+
+@register.tag(name='bounded_date_hierarchy')
+def bounded_date_hierarchy_tag(parser, token):
+    return InclusionAdminNode(parser, token, func=bounded_date_hierarchy, template_name='date_hierarchy.html',
+                              takes_context=False)
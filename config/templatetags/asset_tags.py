@@ -0,0 +1,17 @@
+from django import template
+from django.conf import settings
+from django.templatetags.static import static
+from django.utils.html import format_html
+
+from ..assets import BUNDLE
+
+register = template.Library()
+
+
+@register.simple_tag
+def stylesheets():
+    """Курулган бандл (build_assets) жана - иконкалар вендорго салына элек болсо - алардын CDN'и."""
+    links = format_html('<link rel="stylesheet" href="{}">', static(f'build/{BUNDLE}'))
+    if settings.ASSETS_ICONS_CDN:
+        links += format_html('<link rel="stylesheet" href="{}">', settings.ASSETS_ICONS_CDN)
+    return links
@@ -0,0 +1,27 @@
+from django import template
+from django.utils.html import format_html, format_html_join
+
+from ..images import FORMATS, DerivativeIndex, enabled_formats
+
+register = template.Library()
+
+
+@register.simple_tag
+def picture(image, derivatives=None, sizes='100vw', **attrs):
+    """<picture>: AVIF/WebP srcset + баштапкы сүрөт (эски браузерлер үчүн), lazy жүктөө менен.
+
+    {% picture service.image derivatives sizes="(min-width: 1024px) 25vw, 100vw" class="..." %}
+    """
+    if not image:
+        return ''
+    index = derivatives or DerivativeIndex([image.name])
+    sources = format_html_join(
+        '', '<source type="{}" srcset="{}" sizes="{}">',
+        ((FORMATS[fmt]['mime'], index.srcset(image.name, fmt), sizes) for fmt in enabled_formats()),
+    )
+    img_attrs = format_html_join('', ' {}="{}"', attrs.items())
+    # display: contents - <img> карточканын бийиктигин (h-full) түз алат
+    return format_html(
+        '<picture style="display: contents">{}<img src="{}" loading="lazy" decoding="async"{}></picture>',
+        sources, image.url, img_attrs,
+    )
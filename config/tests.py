@@ -1,3 +1,1603 @@
-from django.test import TestCase
+import asyncio
+import gzip
+import json
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, time as dt_time, timedelta
+from importlib import import_module
+import tempfile
+from io import BytesIO, StringIO
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.apps import apps as django_apps
+from django.core import mail
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import OperationalError, connection
+from django.db.models import F
+from django.core.files.base import ContentFile
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.templatetags.static import static
+from django.utils import timezone
+from rest_framework import serializers as rest_serializers
+
+from .models import User, Building, Category, Service, Order, OrderHistory, Review, ImageDerivative
+from .search import search_services
+from . import db_routers
+from .orders import change_order_status, create_order_record
+from .ratings import apply_review
+from .transactions import immediate_write
+from .caching import CATALOG_SCOPE, cache_key, cache_stats, get_cache, reset_cache_stats
+from .models import CapacityRule, DailyRollup, HourlyRollup, Task
+from .tasks import enqueue, run_due_tasks, task
+from .benchmarks import compare_results
+from .instrumentation import QueryCollector, _collector, reset_view_histograms
+from . import (analytics, assets, auth_cache, fast_serializers, live, metrics, scheduling, serializers, tailwind,
+               throttling)
+
+# Өндүрүштөгүдөй жалпы кэш (redis/file): колдонуучу LRU'су жана cached_db сессиялары күйүк
+SHARED_CACHE = {'AUTH_CACHE_TTL': 60, 'SESSION_ENGINE': 'django.contrib.sessions.backends.cached_db'}
+
+
+def make_service(**kwargs):
+    building = kwargs.pop('building', None) or Building.objects.create(name="Имарат", address="Бишкек")
+    defaults = {'name': "Электрик", 'description': "Зым оңдоо", 'price': 500}
+    defaults.update(kwargs)
+    return Service.objects.create(building=building, **defaults)
+
+
+# ===================
+# РЕЙТИНГ ЖЫЙЫНТЫГЫ
+# ===================
+class RatingSummaryTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='client', password='pass12345')
+        self.service = make_service()
+
+    def assertSummary(self, count, total, histogram):
+        self.service.refresh_from_db()
+        self.assertEqual(self.service.rating_count, count)
+        self.assertEqual(self.service.rating_sum, total)
+        self.assertEqual(self.service.rating_histogram, histogram)
+        self.assertAlmostEqual(self.service.get_average_rating(), total / count if count else 0.0)
+
+    def test_create_edit_delete(self):
+        first = Review.objects.create(service=self.service, user=self.user, rating=5, comment="Жакшы")
+        Review.objects.create(service=self.service, user=self.user, rating=2, comment="Жаман")
+        self.assertSummary(2, 7, {1: 0, 2: 1, 3: 0, 4: 0, 5: 1})
+
+        first.rating = 4
+        first.save()
+        self.assertSummary(2, 6, {1: 0, 2: 1, 3: 0, 4: 1, 5: 0})
+
+        first.delete()
+        self.assertSummary(1, 2, {1: 0, 2: 1, 3: 0, 4: 0, 5: 0})
+
+    def test_move_review_between_services(self):
+        other = make_service(building=self.service.building, name="Сантехник")
+        review = Review.objects.create(service=self.service, user=self.user, rating=3, comment="Орточо")
+        review.service = other
+        review.save()
+        self.assertSummary(0, 0, {1: 0, 2: 0, 3: 0, 4: 0, 5: 0})
+        other.refresh_from_db()
+        self.assertEqual((other.rating_count, other.rating_avg), (1, 3.0))
+
+    @override_settings(**SHARED_CACHE)
+    def test_home_does_not_aggregate_per_service(self):
+        for i in range(5):
+            service = make_service(building=self.service.building, name=f"Кызмат {i}")
+            Review.objects.create(service=service, user=self.user, rating=4, comment="Ок")
+        self.client.force_login(self.user)
+        with self.assertNumQueries(3):  # колдонуучу (кэшке), каталог версиясы (ETag), кызматтар; сессия - кэште
+            self.client.get('/')
+        with self.assertNumQueries(2):
+            self.client.get('/')
+
+    def test_out_of_range_rating_is_a_form_error(self):
+        self.client.force_login(self.user)
+        response = self.client.post(f'/service/{self.service.pk}/', {'rating': 7, 'comment': "Супер"})
+        self.assertEqual(response.status_code, 400)
+        self.assertContains(response, 'alert-danger', status_code=400)
+        self.assertFalse(Review.objects.exists())
+        self.assertSummary(0, 0, {1: 0, 2: 0, 3: 0, 4: 0, 5: 0})
+        with self.assertRaises(ValueError):
+            apply_review(self.service.pk, 7)
+
+        response = self.client.post(f'/service/{self.service.pk}/', {'rating': 4, 'comment': "Жакшы"})
+        self.assertRedirects(response, f'/service/{self.service.pk}/')
+        self.assertSummary(1, 4, {1: 0, 2: 0, 3: 0, 4: 1, 5: 0})
+
+    def test_rebuild_command_fixes_drift(self):
+        Review.objects.create(service=self.service, user=self.user, rating=5, comment="Жакшы")
+        Service.objects.filter(pk=self.service.pk).update(rating_count=10, rating_sum=1)
+        with self.assertRaises(CommandError):
+            call_command('rebuild_ratings', '--check', stdout=StringIO())
+        call_command('rebuild_ratings', stdout=StringIO())
+        call_command('rebuild_ratings', '--check', stdout=StringIO())
+        self.assertSummary(1, 5, {1: 0, 2: 0, 3: 0, 4: 0, 5: 1})
+
+
+# ===================
+# ИЗДӨӨ
+# ===================
+class ServiceSearchTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='client', password='pass12345')
+        self.category = Category.objects.create(name="Сантехника")
+        self.electric = make_service(name="Электрик кызматы", description="Розетка жана зым оңдоо")
+        self.plumber = make_service(building=self.electric.building, category=self.category,
+                                    name="Кран алмаштыруу", description="Түтүктөрдү оңдоо")
+
+    def search(self, query):
+        return list(search_services(Service.objects.all(), query).values_list('id', flat=True))
+
+    def test_prefix_and_suffix_tolerant_match(self):
+        self.assertEqual(self.search("электриктер"), [self.electric.id])
+        self.assertEqual(self.search("КРАН"), [self.plumber.id])
+
+    def test_ranks_name_above_description(self):
+        self.assertCountEqual(self.search("оңдоо"), [self.electric.id, self.plumber.id])
+        third = make_service(building=self.electric.building, name="Оңдоо устасы", description="Баары")
+        self.assertEqual(self.search("оңдоо")[0], third.id)
+
+    def test_index_follows_service_and_category_changes(self):
+        self.assertEqual(self.search("сантехника"), [self.plumber.id])
+        self.category.name = "Суу"
+        self.category.save()
+        self.assertEqual(self.search("сантехника"), [])
+        self.electric.name = "Сварщик"
+        self.electric.save()
+        self.assertEqual(self.search("сварщик"), [self.electric.id])
+        self.electric.delete()
+        self.assertEqual(self.search("сварщик"), [])
+
+    def test_api_search_filter(self):
+        self.client.force_login(self.user)
+        response = self.client.get('/api/services/', {'search': 'кран'})
+        self.assertEqual([item['id'] for item in response.json()['results']], [self.plumber.id])
+
+
+# ===================
+# API: СУРАМДАРДЫН САНЫ (N+1 КОРГООСУ)
+# ===================
+@override_settings(**SHARED_CACHE)
+class ListQueryCountTests(TestCase):
+    """Ар бир тизме endpoint'и саптардын санына карабай бирдей сандагы сурам аткарат."""
+
+    # endpoint -> күтүлгөн сурамдар (негизги SELECT; каталогдо + ETag версиясы). Сессия жана колдонуучу -
+    # кэштен (config/auth_cache.py)
+    ENDPOINTS = {
+        '/api/users/': 1,
+        '/api/managers/': 1,
+        '/api/clients/': 1,
+        '/api/buildings/': 2,
+        '/api/services/': 2,
+        '/api/orders/': 1,
+        '/api/orderhistories/': 1,
+    }
+
+    def setUp(self):
+        self.admin = User.objects.create_user(username='admin', password='pass12345', role='ADMIN')
+        self.building = Building.objects.create(name="Имарат", address="Бишкек")
+
+    def add_rows(self, count):
+        start = User.objects.count()
+        for i in range(start, start + count):
+            user = User.objects.create_user(username=f'user{i}', password='x', role='USER' if i % 2 else 'MANAGER')
+            service = make_service(building=self.building, name=f"Кызмат {i}")
+            order = Order.objects.create(user=user, service=service, building=self.building,
+                                         date='2026-01-01', time='10:00')
+            OrderHistory.objects.create(order=order, old_status='NEW', new_status='DONE', changed_by=user)
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(ctx)
+
+    def test_query_count_does_not_grow_with_rows(self):
+        self.client.force_login(self.admin)
+        self.client.get('/api/users/')  # колдонуучу кэшке түшөт
+        self.add_rows(2)
+        small = {url: self.count_queries(url) for url in self.ENDPOINTS}
+        self.add_rows(6)
+        large = {url: self.count_queries(url) for url in self.ENDPOINTS}
+        self.assertEqual(small, large)
+        self.assertEqual(large, self.ENDPOINTS)
+
+
+# ===================
+# API: KEYSET ПАГИНАЦИЯ
+# ===================
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(username='admin', password='pass12345', role='ADMIN')
+        building = Building.objects.create(name="Имарат", address="Бишкек")
+        service = make_service(building=building)
+        self.orders = [
+            Order.objects.create(user=self.admin, service=service, building=building, date='2026-01-01', time='10:00')
+            for _ in range(7)
+        ]
+        # Бирдей created_at - ирет id боюнча туруктуу болушу керек
+        Order.objects.filter(pk__in=[o.pk for o in self.orders[2:5]]).update(created_at=self.orders[2].created_at)
+        self.client.force_login(self.admin)
+
+    def test_walks_forward_and_back_without_gaps(self):
+        expected = list(Order.objects.order_by('-created_at', '-id').values_list('id', flat=True))
+        seen, pages, url = [], [], '/api/orders/?page_size=3'
+        while url:
+            data = self.client.get(url).json()
+            pages.append(data)
+            seen += [item['id'] for item in data['results']]
+            url = data['next']
+        self.assertEqual(seen, expected)
+        self.assertEqual(len(pages), 3)
+        self.assertIsNone(pages[0]['previous'])
+
+        back = self.client.get(pages[2]['previous']).json()
+        self.assertEqual(back['results'], pages[1]['results'])
+
+    def test_page_size_is_capped_and_count_is_optional(self):
+        with self.settings(API_MAX_PAGE_SIZE=4):
+            data = self.client.get('/api/orders/?page_size=100&count=1').json()
+        self.assertEqual(len(data['results']), 4)
+        self.assertEqual(data['count'], 7)
+        self.assertNotIn('count', self.client.get('/api/orders/').json())
+
+    def test_bad_cursor_is_404(self):
+        self.assertEqual(self.client.get('/api/orders/?cursor=xyz').status_code, 404)
+
+
+# ===================
+# ЭКСПОРТ
+# ===================
+class ExportTests(TestCase):
+    def setUp(self):
+        self.building = Building.objects.create(name="Имарат", address="Бишкек")
+        other = Building.objects.create(name="Башка", address="Ош")
+        service = make_service(building=self.building)
+        self.manager = User.objects.create_user(username='manager', password='x', role='MANAGER',
+                                                managed_building=self.building)
+        client = User.objects.create_user(username='client', password='x')
+        self.mine = Order.objects.create(user=client, service=service, building=self.building,
+                                         date='2026-01-01', time='10:00', status='DONE')
+        Order.objects.create(user=client, service=service, building=other, date='2026-01-01', time='10:00')
+        OrderHistory.objects.create(order=self.mine, old_status='NEW', new_status='DONE')
+
+    def read(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content).decode()
+
+    def test_csv_is_scoped_to_manager_building(self):
+        self.client.force_login(self.manager)
+        lines = self.read('/api/export/orders.csv').splitlines()
+        self.assertEqual(lines[0].split(',')[:3], ['id', 'created_at', 'date'])
+        self.assertEqual([line.split(',')[0] for line in lines[1:]], [str(self.mine.id)])
+
+    def test_ndjson_history_with_filters(self):
+        self.client.force_login(self.manager)
+        rows = [json.loads(line) for line in self.read('/api/export/history.ndjson?status=DONE').splitlines()]
+        self.assertEqual([(row['order_id'], row['new_status']) for row in rows], [(self.mine.id, 'DONE')])
+        self.assertEqual(self.read('/api/export/history.ndjson?date_to=2000-01-01'), '')
+
+    def test_unknown_format_is_rejected(self):
+        self.client.force_login(self.manager)
+        self.assertEqual(self.client.get('/api/export/orders.xml').status_code, 400)
+
+    def test_bad_filters_are_rejected(self):
+        self.client.force_login(self.manager)
+        for query in ('building=abc', 'date_from=2026-13-01', 'date_to=2026-02-30', 'date_from=yesterday'):
+            self.assertEqual(self.client.get(f'/api/export/orders.csv?{query}').status_code, 400, query)
+
+
+# ===================
+# ИНДЕКСТЕР
+# ===================
+class QueryPlanTests(TestCase):
+    def test_hot_queries_use_indexes(self):
+        call_command('check_query_plans', '--strict', stdout=StringIO())
+
+
+# ===================
+# РЕПЛИКА РОУТЕРИ
+# ===================
+class ReplicaRoutingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='client', password='pass12345')
+        self.client.force_login(self.user)
+
+    def read_flags(self, method, url, **kwargs):
+        """Сурам учурундагы ар бир ORM окуусу репликага багытталганбы - ошону жазып алат."""
+        flags = []
+
+        def spy(router, model, **hints):
+            flags.append(db_routers._use_replica.get())
+            return 'default'
+
+        with mock.patch.object(db_routers.PrimaryReplicaRouter, 'db_for_read', spy), \
+                mock.patch.object(db_routers, 'replica_configured', return_value=True):
+            getattr(self.client, method)(url, **kwargs)
+        return flags
+
+    def test_list_reads_from_replica(self):
+        self.assertTrue(any(self.read_flags('get', '/api/buildings/')))
+        self.assertFalse(any(self.read_flags('get', '/api/orders/')))
+
+    def test_reads_stick_to_primary_after_write(self):
+        self.read_flags('post', '/api/buildings/', data={'name': "Жаңы", 'address': "Ош"})
+        self.assertFalse(any(self.read_flags('get', '/api/buildings/')))
+        cache.clear()
+        self.assertTrue(any(self.read_flags('get', '/api/buildings/')))
+
+    def test_replica_requires_shared_pin_cache(self):
+        self.assertEqual(db_routers.check_pin_cache(None), [])
+        with mock.patch.object(db_routers, 'replica_configured', return_value=True):
+            self.assertEqual([error.id for error in db_routers.check_pin_cache(None)], ['config.E001'])
+            with tempfile.TemporaryDirectory() as directory, self.settings(CACHES={'default': {
+                    'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': directory}}):
+                self.assertEqual(db_routers.check_pin_cache(None), [])
+
+    def test_router_without_replica_uses_default(self):
+        with db_routers.replica_reads():
+            self.assertEqual(db_routers.PrimaryReplicaRouter().db_for_read(Service), 'default')
+
+
+# ===================
+# ЖАЗУУЛАРДЫ КАЙТАЛОО (SQLite кулпусу)
+# ===================
+class ImmediateWriteTests(TestCase):
+    def flaky(self, failures):
+        calls = []
+
+        @immediate_write
+        def write():
+            calls.append(1)
+            if len(calls) <= failures:
+                raise OperationalError("database is locked")
+            return len(calls)
+
+        return write, calls
+
+    @mock.patch('config.transactions.time.sleep')
+    def test_retries_lock_errors_then_gives_up(self, sleep):
+        write, calls = self.flaky(failures=2)
+        # TestCase өзү транзакция ачат - тышкы блок жок деп эсептейбиз
+        with mock.patch('config.transactions.connection', mock.Mock(in_atomic_block=False)):
+            self.assertEqual(write(), 3)
+            write, calls = self.flaky(failures=10)
+            with self.assertRaises(OperationalError):
+                write()
+        self.assertEqual(len(calls), 4)  # 1 + SQLITE_WRITE_RETRIES
+        write, calls = self.flaky(failures=1)
+        with self.assertRaises(OperationalError):
+            write()  # тышкы транзакциянын ичинде кайталанбайт
+
+    def test_status_change_writes_history(self):
+        building = Building.objects.create(name="Имарат", address="Бишкек")
+        user = User.objects.create_user(username='manager', password='x', role='MANAGER', managed_building=building)
+        order = create_order_record(user, make_service(building=building), building)
+        self.assertEqual(change_order_status(order, 'DONE', changed_by=user), 'NEW')
+        self.assertEqual(list(order.history_logs.values_list('old_status', 'new_status')), [('NEW', 'DONE')])
+
+
+# ===================
+# DASHBOARD КЭШИ
+# ===================
+class DashboardCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.building = Building.objects.create(name="Ала-Тоо", address="Бишкек")
+        self.other_building = Building.objects.create(name="Манас", address="Ош")
+        self.manager = User.objects.create_user(username='manager', password='x', role='MANAGER',
+                                                managed_building=self.building)
+        self.other_manager = User.objects.create_user(username='manager2', password='x', role='MANAGER',
+                                                      managed_building=self.other_building)
+        self.client_user = User.objects.create_user(username='client', password='x')
+        self.service = make_service(building=self.building)
+        self.order = Order.objects.create(user=self.client_user, service=self.service, building=self.building,
+                                          date='2026-01-01', time='10:00')
+
+    def get_dashboard(self, user):
+        self.client.force_login(user)
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.get('/dashboard/')
+
+    def test_repeat_request_is_served_from_cache(self):
+        self.get_dashboard(self.other_manager)  # башка имараттын кэшин жылытабыз
+        reset_cache_stats()
+        first = self.get_dashboard(self.manager)
+        self.assertContains(first, "Ала-Тоо")
+        with CaptureQueriesContext(connection) as queries:
+            second = self.get_dashboard(self.manager)
+        self.assertContains(second, f"#{self.order.id}<")
+        # Сессия жана колдонуучу гана окулат - заказдар таблицасына сурам жок
+        self.assertFalse([q for q in queries.captured_queries if 'config_order' in q['sql']])
+        self.assertEqual(cache_stats()['order_rows'], {'hits': 1, 'misses': 1, 'hit_ratio': 0.5})
+
+    def test_writes_invalidate_only_affected_buildings(self):
+        self.get_dashboard(self.manager)
+        self.get_dashboard(self.other_manager)
+        reset_cache_stats()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            change_order_status(self.order, 'IN_PROGRESS', changed_by=self.manager)
+        self.assertContains(self.get_dashboard(self.manager), "IN_PROGRESS")
+        self.get_dashboard(self.other_manager)
+        self.assertEqual(cache_stats()['order_rows'], {'hits': 1, 'misses': 1, 'hit_ratio': 0.5})
+
+        # Заказ башка имаратка өткөрүлсө, эки имараттын тең кэши жаңырат
+        with self.captureOnCommitCallbacks(execute=True):
+            self.order.building = self.other_building
+            self.order.save()
+        self.assertNotContains(self.get_dashboard(self.manager), f"#{self.order.id}<")
+        self.assertContains(self.get_dashboard(self.other_manager), f"#{self.order.id}<")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.order.delete()
+        self.assertNotContains(self.get_dashboard(self.other_manager), f"#{self.order.id}<")
+
+    def test_evicted_versions_never_revive_old_fragments(self):
+        self.get_dashboard(self.manager)
+        key = cache_key('order_rows', self.manager)
+        with self.captureOnCommitCallbacks(execute=True):
+            change_order_status(self.order, 'IN_PROGRESS', changed_by=self.manager)
+        # Версиялар кэштен чыгып кетти (MAX_ENTRIES), эски фрагмент калды
+        get_cache().delete_many([f'dashboard-ver:{scope}' for scope in (f'building:{self.building.pk}', CATALOG_SCOPE)])
+        self.assertTrue(get_cache().get(key))
+        self.assertNotEqual(cache_key('order_rows', self.manager), key)
+        self.assertContains(self.get_dashboard(self.manager), "IN_PROGRESS")
+
+    def test_building_rename_invalidates_rows(self):
+        self.get_dashboard(self.manager)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.building.name = "Жаңы Ала-Тоо"
+            self.building.save()
+        self.assertContains(self.get_dashboard(self.manager), "Жаңы Ала-Тоо")
+
+
+# ===================
+# ШАРТТУУ GET (ETag / Last-Modified)
+# ===================
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='client', password='pass12345')
+        self.service = make_service()
+        self.client.force_login(self.user)
+
+    def revalidate(self, url, response, **headers):
+        return self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'], **headers)
+
+    @override_settings(**SHARED_CACHE)
+    def test_api_list_returns_304_until_catalog_changes(self):
+        first = self.client.get('/api/services/')
+        self.assertEqual(first.status_code, 200)
+        self.assertIn('no-cache', first['Cache-Control'])
+        self.assertIn('Cookie', first['Vary'])
+        with self.assertNumQueries(1):  # версия гана - кызматтар окулбайт, колдонуучу жана сессия кэште
+            cached = self.revalidate('/api/services/', first)
+        self.assertEqual((cached.status_code, cached.content), (304, b''))
+
+        # Пикир рейтингди өзгөртөт - ETag да өзгөрөт
+        Review.objects.create(service=self.service, user=self.user, rating=4, comment="Жакшы")
+        changed = self.revalidate('/api/services/', first)
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed['ETag'], first['ETag'])
+
+        self.service.delete()
+        self.assertEqual(self.revalidate('/api/services/', changed).status_code, 200)
+
+    def test_html_pages_and_last_modified(self):
+        self.client.get('/buildings/')  # CSRF cookie коюлат - ETag ага көз каранды
+        first = self.client.get('/buildings/')
+        self.assertEqual(self.revalidate('/buildings/', first).status_code, 304)
+        self.assertEqual(self.client.get('/buildings/', HTTP_IF_MODIFIED_SINCE=first['Last-Modified']).status_code, 304)
+        Building.objects.create(name="Жаңы имарат", address="Ош")
+        self.assertEqual(self.revalidate('/buildings/', first).status_code, 200)
+
+        home = self.client.get('/')
+        Category.objects.create(name="Тазалоо")
+        self.assertEqual(self.revalidate('/', home).status_code, 200)
+
+    def test_token_clients_vary_on_authorization(self):
+        from rest_framework.authtoken.models import Token
+
+        self.client.logout()
+        token = Token.objects.create(user=self.user)
+        auth = {'HTTP_AUTHORIZATION': f'Token {token.key}'}
+        first = self.client.get('/api/buildings/', **auth)
+        self.assertIn('Authorization', first['Vary'])
+        self.assertEqual(self.revalidate('/api/buildings/', first, **auth).status_code, 304)
+
+
+# ===================
+# СҮРӨТТӨРДҮН КӨЧҮРМӨЛӨРҮ
+# ===================
+@override_settings(IMAGE_DERIVATIVE_FORMATS=('webp',), IMAGE_DERIVATIVE_WIDTHS=(160, 320))
+class ImageDerivativeTests(TestCase):
+    def setUp(self):
+        from PIL import Image
+
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media)
+        settings_override = override_settings(MEDIA_ROOT=media)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        buffer = BytesIO()
+        Image.new('RGB', (800, 400), 'orange').save(buffer, 'PNG')
+        self.service = make_service()
+        self.service.image.save('photo.png', ContentFile(buffer.getvalue()))
+        self.user = User.objects.create_user(username='client', password='pass12345')
+        self.client.force_login(self.user)
+
+    def test_lazy_generation_and_srcset(self):
+        home = self.client.get('/')
+        self.assertContains(home, '<source type="image/webp"')
+        lazy_url = f'/images/webp/320/{self.service.image.name}'
+        self.assertContains(home, f'{lazy_url} 320w')
+
+        response = self.client.get(lazy_url)
+        self.assertEqual(response.status_code, 302)
+        derivative = ImageDerivative.objects.get(source=self.service.image.name, bucket=320, format='webp')
+        self.assertEqual((derivative.width, derivative.height), (320, 160))
+        self.assertTrue(response['Location'].endswith(derivative.name))
+        self.assertEqual(self.client.get(lazy_url).status_code, 302)
+        self.assertEqual(ImageDerivative.objects.count(), 1)
+
+        # Даяр көчүрмө түз (мазмун аты менен), калганы lazy URL аркылуу
+        srcset = self.client.get('/api/services/').json()['results'][0]['image_srcset']['webp']
+        self.assertIn(f'{derivative.name} 320w', srcset)
+        self.assertIn('/images/webp/160/', srcset)
+        self.assertEqual(self.client.get('/images/webp/999/' + self.service.image.name).status_code, 404)
+
+    @override_settings(THROTTLE_RULES={'image_derivative': [('ip', 'token', '1/m')]})
+    def test_on_demand_generation_is_throttled(self):
+        lazy_url = f'/images/webp/{{}}/{self.service.image.name}'
+        self.assertEqual(self.client.get(lazy_url.format(320)).status_code, 302)
+        self.assertEqual(self.client.get(lazy_url.format(160)).status_code, 429)
+        self.assertEqual(ImageDerivative.objects.count(), 1)
+        self.assertEqual(self.client.get(lazy_url.format(320)).status_code, 302)  # даяр көчүрмө чектелбейт
+
+    def test_backfill_command(self):
+        with mock.patch('config.management.commands.build_image_derivatives.ProcessPoolExecutor',
+                        ThreadPoolExecutor):
+            call_command('build_image_derivatives', workers=2, stdout=StringIO())
+        self.assertEqual(sorted(ImageDerivative.objects.values_list('bucket', 'width')), [(160, 160), (320, 320)])
+
+
+# ===================
+# ФОНДОГУ ТАПШЫРМАЛАР
+# ===================
+flaky_calls = []
+
+
+@task(name='tests.flaky', max_attempts=2, backoff=0)
+def flaky_task(fail):
+    flaky_calls.append(fail)
+    if fail:
+        raise RuntimeError("ката")
+
+
+class TaskQueueTests(TestCase):
+    def setUp(self):
+        self.building = Building.objects.create(name="Имарат", address="Бишкек")
+        self.manager = User.objects.create_user(username='manager', password='x', role='MANAGER',
+                                                email='manager@example.com', managed_building=self.building)
+        self.client_user = User.objects.create_user(username='client', password='x')
+        self.service = make_service(building=self.building)
+
+    def test_order_changes_enqueue_notifications(self):
+        order = create_order_record(self.client_user, self.service, self.building)
+        change_order_status(order, 'IN_PROGRESS', changed_by=self.client_user)
+        # Суроо-талаанын ичинде кат жиберилбейт - кезекте эки тапшырма
+        self.assertEqual(mail.outbox, [])
+        self.assertEqual(sorted(Task.objects.values_list('name', flat=True)),
+                         ['analytics.apply_rollups', 'orders.notify_new_order', 'orders.notify_status_change'])
+        history = order.history_logs.get()
+        enqueue('orders.notify_status_change', key=f'notify-status:{history.pk}', history_id=history.pk)
+        self.assertEqual(Task.objects.count(), 3)  # ошол эле ачкыч - кайра кошулбайт
+
+        self.assertEqual(run_due_tasks(), 3)
+        self.assertEqual(set(Task.objects.values_list('status', flat=True)), {'DONE'})
+        self.assertEqual([message.to for message in mail.outbox], [['manager@example.com']] * 2)
+
+    def test_retries_with_backoff_then_fails(self):
+        flaky_calls.clear()
+        enqueue('tests.flaky', fail=True)
+        self.assertEqual(run_due_tasks(), 1)
+        task_obj = Task.objects.get()
+        self.assertEqual((task_obj.status, task_obj.attempts), ('PENDING', 1))
+        self.assertIn("RuntimeError", task_obj.last_error)
+        with self.assertLogs('config.tasks', 'ERROR'):
+            run_due_tasks()
+        task_obj.refresh_from_db()
+        self.assertEqual((task_obj.status, task_obj.attempts, len(flaky_calls)), ('FAILED', 2, 2))
+
+    def test_claim_error_skips_the_task(self):
+        enqueue('tests.flaky')
+        with mock.patch('config.tasks.claim', side_effect=OperationalError("database is locked")), \
+                ThreadPoolExecutor(2) as executor, self.assertLogs('config.tasks', 'ERROR'):
+            self.assertEqual(run_due_tasks(executor=executor), 0)
+        self.assertEqual(Task.objects.get().status, 'PENDING')
+        self.assertEqual(run_due_tasks(), 1)
+
+    @override_settings(TASKS_EAGER=True)
+    def test_eager_mode_runs_inline(self):
+        create_order_record(self.client_user, self.service, self.building)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertFalse(Task.objects.exists())
+        with self.assertRaises(RuntimeError):
+            enqueue('tests.flaky', fail=True)
+
+
+# ===================
+# ASYNC ОКУУ VIEW'ЛОРУ (ASGI)
+# ===================
+class AsyncReadViewTests(TestCase):
+    def setUp(self):
+        self.building = Building.objects.create(name="Ала-Тоо", address="Бишкек")
+        self.manager = User.objects.create_user(username='manager', password='x', role='MANAGER',
+                                                managed_building=self.building)
+        self.services = [make_service(building=self.building, name=f"Кызмат {i}") for i in range(3)]
+        for service in self.services:
+            Order.objects.create(user=self.manager, service=service, building=self.building,
+                                 date='2026-01-01', time='10:00')
+
+    def fetch(self, urlconf, url, **headers):
+        with override_settings(ROOT_URLCONF=urlconf):
+            return self.client.get(url, **headers)
+
+    def test_api_output_matches_sync_viewsets(self):
+        self.client.force_login(self.manager)
+        service_id = self.services[0].pk
+        for url in ('/api/services/?page_size=2', f'/api/services/{service_id}/', '/api/services/?search=кызмат',
+                    '/api/buildings/', f'/api/buildings/{self.building.pk}/', '/api/orders/?count=1',
+                    '/api/orders/?page_size=1&cursor=bad', '/api/orders/999/'):
+            sync = self.fetch('servic.urls', url)
+            cache.clear()
+            async_response = self.fetch('config.async_urls', url)
+            self.assertEqual((async_response.status_code, async_response.content), (sync.status_code, sync.content), url)
+
+        page = self.fetch('config.async_urls', '/api/orders/?page_size=2').json()
+        following = self.fetch('config.async_urls', page['next'])
+        self.assertEqual(len(page['results']) + len(following.json()['results']), 3)
+
+    def test_auth_and_html_views(self):
+        self.assertEqual(self.fetch('config.async_urls', '/api/orders/').status_code, 403)
+        self.assertEqual(self.fetch('config.async_urls', '/api/orders/', HTTP_AUTHORIZATION='Token nope').status_code,
+                         401)
+        self.assertEqual(self.fetch('config.async_urls', '/dashboard/').status_code, 302)
+
+        from rest_framework.authtoken.models import Token
+        token = Token.objects.create(user=self.manager)
+        response = self.fetch('config.async_urls', '/api/services/', HTTP_AUTHORIZATION=f'Token {token.key}')
+        self.assertEqual(len(response.json()['results']), 3)
+        self.assertEqual(self.fetch('config.async_urls', '/api/services/', HTTP_AUTHORIZATION=f'Token {token.key}',
+                                    HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+
+        self.client.force_login(self.manager)
+        self.assertContains(self.fetch('config.async_urls', '/dashboard/'), "Кызмат 2")
+        self.assertContains(self.fetch('config.async_urls', '/'), "Кызмат 1")
+        self.assertContains(self.fetch('config.async_urls', f'/service/{self.services[0].pk}/'), "Кызмат 0")
+
+    def test_middleware_chain_is_natively_async(self):
+        from django.core.handlers.asgi import ASGIHandler
+
+        # Бир да middleware sync'ке ыңгайлаштырылбайт (async view'лор бир агымдуу hop'тон өтпөйт)
+        with self.settings(DEBUG=True), self.assertNoLogs('django.request', 'DEBUG'):
+            ASGIHandler()
+
+
+# ===================
+# БЕНЧМАРК КУРАЛДАРЫ
+# ===================
+class PerfToolsTests(TestCase):
+    def test_seed_perf_builds_consistent_dataset(self):
+        call_command('seed_perf', orders=300, batch_size=100, verbosity=0)
+        self.assertEqual(Order.objects.count(), 300)
+        self.assertEqual(set(User.objects.values_list('role', flat=True)), {'ADMIN', 'MANAGER', 'USER'})
+        # Тарыхтагы өтүүлөрдүн саны заказдын статусуна дал келет
+        expected = sum({'NEW': 0, 'IN_PROGRESS': 1, 'DONE': 2}[status]
+                       for status in Order.objects.values_list('status', flat=True))
+        self.assertEqual(OrderHistory.objects.count(), expected)
+        self.assertFalse(OrderHistory.objects.exclude(changed_by__managed_building=F('order__building')).exists())
+        self.assertGreater(Order.objects.dates('created_at', 'month').count(), 1)
+        call_command('rebuild_ratings', check=True, stdout=StringIO())
+        with self.assertRaises(CommandError):
+            call_command('seed_perf', orders=10, verbosity=0)
+
+    @override_settings(**SHARED_CACHE)
+    def test_bench_records_results_and_compares_with_baseline(self):
+        call_command('seed_perf', orders=100, verbosity=0)
+        with tempfile.TemporaryDirectory() as tmp:
+            output = f'{tmp}/bench.json'
+            call_command('bench', modes=['client'], match='/api/services/', repeat=2, warmup=0,
+                         users=['perf-admin-0'], output=output, stdout=StringIO())
+            with open(output, encoding='utf-8') as handle:
+                report = json.load(handle)
+        result = report['results']['client ADMIN /api/services/']
+        self.assertEqual((result['status'], result['queries']), (200, 3))  # warmup=0: колдонуучу кэшке
+        self.assertEqual(report['meta']['rows']['Order'], 100)
+
+        slower = dict(result, p50_ms=result['p50_ms'] * 3 + 5, queries=result['queries'] + 1)
+        regressions = compare_results({'k': result}, {'k': slower})
+        self.assertEqual([metric for _, metric, _, _ in regressions], ['p50_ms', 'queries'])
+        self.assertEqual(compare_results({'k': result}, {'k': result}), [])
+
+
+# ===================
+# ИНСТРУМЕНТАЦИЯ (Server-Timing, жай сурамдар)
+# ===================
+@override_settings(**SHARED_CACHE)
+class InstrumentationTests(TestCase):
+    def setUp(self):
+        reset_view_histograms()
+        self.building = Building.objects.create(name="Имарат", address="Бишкек")
+        for i in range(3):
+            make_service(building=self.building, name=f"Кызмат {i}")
+        self.staff = User.objects.create_user(username='staff', password='x', role='ADMIN', is_staff=True)
+        self.client.force_login(self.staff)
+
+    def test_off_by_default(self):
+        self.assertNotIn('Server-Timing', self.client.get('/api/services/'))
+
+    @override_settings(INSTRUMENTATION_SAMPLE_RATE=1, INSTRUMENTATION_SLOW_MS=0)
+    def test_server_timing_slow_log_and_histograms(self):
+        with self.assertLogs('config.instrumentation', 'WARNING') as logs:
+            response = self.client.get('/api/services/')
+        # колдонуучу (кэшке биринчи жолу), каталог версиясы, кызматтар; сессия - cached_db
+        self.assertRegex(response['Server-Timing'], r'^total;dur=[\d.]+, db;dur=[\d.]+;desc="3 queries"$')
+        entry = json.loads(logs.records[0].getMessage())
+        self.assertEqual((entry['view'], entry['status'], entry['queries']), ('service-list', 200, 3))
+        self.assertTrue(any('config_service' in item['sql'] for item in entry['top_sql']))
+
+        with self.assertLogs('config.instrumentation', 'WARNING'):
+            stats = self.client.get('/api/instrumentation/').json()
+        self.assertEqual(stats['service-list']['count'], 1)
+        self.assertEqual(stats['service-list']['mean_queries'], 3)
+        self.assertEqual(stats['service-list']['buckets']['+Inf'], 1)
+
+        other = User.objects.create_user(username='user', password='x')
+        self.client.force_login(other)
+        with self.assertLogs('config.instrumentation', 'WARNING'):
+            self.assertEqual(self.client.get('/api/instrumentation/').status_code, 403)
+
+    def test_collector_detects_repeated_sql(self):
+        collector = QueryCollector()
+        token = _collector.set(collector)
+        try:
+            for service in Service.objects.all():
+                Building.objects.get(pk=service.building_id)  # N+1
+        finally:
+            _collector.reset(token)
+        self.assertEqual((collector.count, collector.duplicates), (4, 2))
+        self.assertEqual(collector.top(1)[0]['count'], 3)
+
+
+# ===================
+# PROMETHEUS МЕТРИКАЛАРЫ
+# ===================
+def metric_value(text, sample):
+    for line in text.splitlines():
+        if line.startswith(sample + ' '):
+            return float(line.rsplit(' ', 1)[1])
+    return 0.0
+
+
+@override_settings(METRICS_TOKEN='secret')
+class MetricsTests(TestCase):
+    def setUp(self):
+        self.building = Building.objects.create(name="Имарат", address="Бишкек")
+        self.service = make_service(building=self.building)
+        self.user = User.objects.create_user(username='user', password='x')
+
+    def scrape(self):
+        with self.assertNumQueries(0):
+            response = self.client.get('/metrics', headers={'Authorization': 'Bearer secret'})
+        self.assertEqual(response['Content-Type'], 'text/plain; version=0.0.4; charset=utf-8')
+        return response.content.decode()
+
+    def test_orders_and_transitions_from_history_events(self):
+        b = self.building.pk
+        before = self.scrape()
+        with self.captureOnCommitCallbacks(execute=True):
+            order = create_order_record(self.user, self.service, self.building)
+        order.created_at -= timedelta(hours=2)
+        Order.objects.filter(pk=order.pk).update(created_at=order.created_at)
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with CaptureQueriesContext(connection) as writes:
+                change_order_status(order, 'IN_PROGRESS', self.user)
+        # Статустагы убакыт жазуу транзакциясынан кийин гана окулат
+        self.assertFalse([query for query in writes.captured_queries if 'config_orderhistory' in query['sql']
+                          and query['sql'].startswith('SELECT')])
+        self.assertTrue(callbacks)
+        text = self.scrape()
+
+        def delta(sample):
+            return metric_value(text, sample) - metric_value(before, sample)
+
+        self.assertEqual(delta(f'orders_created_total{{building="{b}"}}'), 1)
+        self.assertEqual(delta(f'order_status_transitions_total{{building="{b}",from="NEW",to="IN_PROGRESS"}}'), 1)
+        # NEW статусунда ~2 саат: 1 сааттан чоң, 4 сааттан кичине чакага түшөт
+        self.assertEqual(delta(f'order_time_in_status_seconds_bucket{{building="{b}",status="NEW",le="3600"}}'), 0)
+        self.assertEqual(delta(f'order_time_in_status_seconds_bucket{{building="{b}",status="NEW",le="14400"}}'), 1)
+        self.assertIn('# TYPE order_time_in_status_seconds histogram', text)
+
+    def test_request_metrics(self):
+        self.client.force_login(self.user)
+        before = self.scrape()
+        self.client.get('/api/services/')
+        text = self.scrape()
+        sample = 'http_requests_total{view="service-list",method="GET",status="200"}'
+        self.assertEqual(metric_value(text, sample) - metric_value(before, sample), 1)
+        self.assertGreater(metric_value(text, 'db_queries_total{view="service-list"}'),
+                           metric_value(before, 'db_queries_total{view="service-list"}'))
+
+    def test_token(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+        self.assertEqual(self.client.get('/metrics', headers={'Authorization': 'Bearer wrong'}).status_code, 403)
+        self.assertEqual(metrics.check_metrics_token(None), [])
+        # Токенсиз - DEBUG'та гана ачык; өндүрүштө deploy текшерүүсү эскертет
+        with self.settings(METRICS_TOKEN=None):
+            self.assertEqual(self.client.get('/metrics').status_code, 403)
+            self.assertEqual([error.id for error in metrics.check_metrics_token(None)], ['config.W003'])
+            with self.settings(DEBUG=True):
+                self.assertEqual(self.client.get('/metrics').status_code, 200)
+
+    def test_process_files_are_summed(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        key = metrics.ORDERS_CREATED.key('orders_created_total', ('7',))
+        for pid, amount in ((101, 2), (102, 3)):
+            storage = metrics.MmapValues(f'{directory}/{pid}.db')
+            storage.add(key, amount)
+            for i in range(2000):  # файл баштапкы өлчөмдөн чоңоёт
+                storage.add(metrics.ORDERS_CREATED.key('orders_created_total', (f'{pid}-{i}',)), 1)
+        with override_settings(METRICS_DIR=directory):
+            text = metrics.exposition()
+        self.assertEqual(metric_value(text, 'orders_created_total{building="7"}'), 5)
+        self.assertEqual(dict(metrics.MmapValues(f'{directory}/101.db').items())[key], 2)
+
+
+# ===================
+# АНАЛИТИКА (ЖЫЙЫНТЫК ТАБЛИЦАЛАР)
+# ===================
+class AnalyticsRollupTests(TestCase):
+    start = datetime(2026, 3, 1, 9, 15, tzinfo=timezone.get_fixed_timezone(360))
+
+    def setUp(self):
+        self.buildings = [Building.objects.create(name=f"Имарат {i}", address="Бишкек") for i in range(2)]
+        self.services = [make_service(building=building, name=f"Кызмат {i}")
+                         for i, building in enumerate(self.buildings * 2)]
+        self.user = User.objects.create_user(username='user', password='x')
+        self.admin = User.objects.create_user(username='boss', password='x', role='ADMIN')
+        self.manager = User.objects.create_user(username='manager', password='x', role='MANAGER',
+                                                managed_building=self.buildings[0])
+
+    def at(self, hours):
+        return mock.patch('django.utils.timezone.now', return_value=self.start + timedelta(hours=hours))
+
+    def make_activity(self):
+        """Сигналдар аркылуу: түзүү, статус, көчүрүү, өчүрүү, пикирлер - бир нече күнгө жана саатка."""
+        orders = []
+        for i in range(12):
+            with self.at(i * 7):
+                service = self.services[i % 4]
+                orders.append(create_order_record(self.user, service, service.building))
+        for i, order in enumerate(orders[:8]):
+            with self.at(i * 7 + 3):
+                change_order_status(order, 'IN_PROGRESS', self.manager)
+            with self.at(i * 7 + 30):
+                change_order_status(order, 'DONE', self.manager)
+        # Имараты жана кызматы өзгөргөн заказ (DONE тарыхы да көчөт), өчүрүлгөн заказ
+        moved = orders[1]
+        moved.building, moved.service = self.buildings[0], self.services[2]
+        moved.save()
+        orders[2].delete()
+        for i in range(6):
+            with self.at(i * 11):
+                review = Review.objects.create(service=self.services[i % 4], user=self.user, rating=1 + i % 5,
+                                               comment="ok")
+        review.rating, review.service = 5, self.services[0]
+        review.save()
+        Review.objects.filter(pk=Review.objects.order_by('pk').first().pk).first().delete()
+        self.services[3].delete()  # заказдары жана пикирлери каскад менен өчөт
+        run_due_tasks(limit=1000)  # жыйынтыктар воркерде жазылат
+
+    def test_incremental_rollups_match_brute_force(self):
+        self.make_activity()
+        start, end = date(2026, 2, 28), date(2026, 3, 10)
+        daily, hourly = analytics.compute_rollups(start, end)
+        self.assertEqual(analytics.stored_rollups(start, end), (daily, hourly))
+        self.assertGreater(len({day for day, _, _ in daily}), 3)
+        self.assertEqual(sum(row['orders_created'] for row in daily.values()), 8)
+        self.assertEqual(analytics.drift(start, end), [])
+
+    def test_rebuild_command_repairs_drift(self):
+        self.make_activity()
+        expected = analytics.stored_rollups(date(2026, 2, 28), date(2026, 3, 10))
+        DailyRollup.objects.filter(day=date(2026, 3, 1)).update(orders_created=F('orders_created') + 5)
+        HourlyRollup.objects.all()[:1].get().delete()
+        with self.assertRaises(CommandError):
+            call_command('rebuild_rollups', check=True, stdout=StringIO())
+        call_command('rebuild_rollups', workers=1, partition_days=2, stdout=StringIO())
+        self.assertEqual(analytics.stored_rollups(date(2026, 2, 28), date(2026, 3, 10)), expected)
+        call_command('rebuild_rollups', check=True, stdout=StringIO())
+
+    def test_report_reads_only_rollups_and_is_scoped(self):
+        self.make_activity()
+        url = '/api/analytics/?date_from=2026-03-01&date_to=2026-03-09'
+        self.client.force_login(self.admin)
+        with CaptureQueriesContext(connection) as queries:
+            data = self.client.get(url).json()
+        sql = ' '.join(query['sql'] for query in queries)
+        for table in ('config_order"', 'config_orderhistory', 'config_review'):
+            self.assertNotIn(table, sql)
+        daily, _ = analytics.compute_rollups(date(2026, 3, 1), date(2026, 3, 10))
+        done = sum(row['orders_done'] for row in daily.values())
+        self.assertEqual(sum(row['orders_done'] for row in data['series']), done)
+        self.assertEqual({row['id'] for row in data['buildings']}, {building.pk for building in self.buildings})
+
+        self.client.force_login(self.manager)
+        data = self.client.get(url + f'&building={self.buildings[1].pk}').json()
+        self.assertEqual([row['id'] for row in data['buildings']], [self.buildings[0].pk])
+        self.assertEqual(self.client.get(url + '&period=hour').status_code, 200)
+        self.assertEqual(self.client.get('/api/analytics/?period=week').status_code, 400)
+        for day in ('2026-13-01', '2026-02-30'):
+            self.assertEqual(self.client.get(f'/api/analytics/?date_from={day}').status_code, 400)
+            # HTML бет ката билдирүүсү менен демейки мезгилди көрсөтөт
+            self.assertContains(self.client.get(f'/analytics/?date_to={day}'), "Дата туура эмес")
+        self.assertEqual(self.client.get('/analytics/').status_code, 200)
+
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.get(url).status_code, 403)
+        self.assertEqual(self.client.get('/analytics/').status_code, 403)
+
+
+# ===================
+# ТОПТОП ЖАЗУУ
+# ===================
+class BulkOrderTests(TestCase):
+    url = '/api/orders/bulk/'
+
+    def setUp(self):
+        self.buildings = [Building.objects.create(name=f"Имарат {i}", address="Бишкек") for i in range(2)]
+        self.services = [make_service(building=building) for building in self.buildings]
+        self.user = User.objects.create_user(username='user', password='x')
+        self.other = User.objects.create_user(username='other', password='x')
+        self.manager = User.objects.create_user(username='manager', password='x', role='MANAGER',
+                                                email='manager@example.com', managed_building=self.buildings[0])
+
+    def post(self, items, method='post'):
+        return getattr(self.client, method)(self.url, json.dumps(items), content_type='application/json')
+
+    def items(self, count):
+        # Ар бир элемент өз слотунда: кызмат (i % 2) x күн (i // 18) x саат (9:00-17:00)
+        first = timezone.localdate() + timedelta(days=1)
+        return [{'service': self.services[i % 2].pk, 'date': str(first + timedelta(days=i // 18)),
+                 'time': f'{9 + i // 2 % 9}:00', 'comment': f"#{i}"} for i in range(count)]
+
+    @override_settings(TASKS_EAGER=True)
+    def test_bulk_create_batches_side_effects(self):
+        self.client.force_login(self.user)
+        with self.captureOnCommitCallbacks(execute=True), CaptureQueriesContext(connection) as queries:
+            response = self.post(self.items(200))
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.json()['created']), 200)
+        # Сурамдардын саны элементтердин санына көз каранды эмес
+        self.assertLess(len(queries), 40)
+        self.assertEqual(Order.objects.filter(user=self.user, building=self.buildings[0]).count(), 100)
+        today = timezone.localdate()
+        self.assertEqual(analytics.stored_rollups(today, today + timedelta(days=1)),
+                         analytics.compute_rollups(today, today + timedelta(days=1)))
+        self.assertEqual(len(mail.outbox), 1)  # бир имараттын менеджерине бир кат
+
+    def test_bulk_create_reports_item_errors_and_writes_nothing(self):
+        self.client.force_login(self.user)
+        items = self.items(3)
+        items[1]['service'] = 999999
+        items[2]['date'] = 'эртең'
+        response = self.post(items)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([error['index'] for error in response.json()['errors']], [1, 2])
+        self.assertFalse(Order.objects.exists())
+        self.assertEqual(self.post([]).status_code, 400)
+        with override_settings(ORDERS_BULK_MAX=2):
+            self.assertEqual(self.post(self.items(3)).status_code, 400)
+
+    def test_bulk_status_is_scoped_and_writes_history(self):
+        self.client.force_login(self.user)
+        self.post(self.items(4))
+        foreign = create_order_record(self.other, self.services[0], self.buildings[0])
+        mine = list(Order.objects.filter(user=self.user).order_by('pk'))
+
+        # Башка колдонуучунун заказы көрүнбөйт - эч нерсе өзгөрбөйт
+        response = self.post([{'id': mine[0].pk, 'status': 'DONE'}, {'id': foreign.pk, 'status': 'DONE'}], 'patch')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['errors'][0]['index'], 1)
+        self.assertFalse(OrderHistory.objects.exists())
+
+        # Менеджер өз имаратынын заказдарын гана өзгөртөт
+        self.client.force_login(self.manager)
+        response = self.post([{'id': mine[1].pk, 'status': 'DONE'}], 'patch')
+        self.assertEqual(response.status_code, 400)
+        items = [{'id': order.pk, 'status': 'IN_PROGRESS'} for order in (mine[0], mine[2], foreign)]
+        items.append({'id': foreign.pk, 'status': 'DONE'})
+        self.assertEqual(self.post(items, 'patch').json()['errors'][0]['index'], 3)  # кайталанган id
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.post(items[:3], 'patch')
+        self.assertEqual(response.json(), {'updated': sorted([mine[0].pk, mine[2].pk, foreign.pk]), 'unchanged': []})
+        response = self.post([{'id': mine[0].pk, 'status': 'IN_PROGRESS'}], 'patch')
+        self.assertEqual(response.json(), {'updated': [], 'unchanged': [mine[0].pk]})
+        history = OrderHistory.objects.filter(order=mine[0]).get()
+        self.assertEqual((history.old_status, history.new_status), ('NEW', 'IN_PROGRESS'))
+        self.assertEqual(history.changed_by, self.manager)
+        self.assertEqual(Order.objects.filter(status='IN_PROGRESS').count(), 3)
+
+
+# ===================
+# ЖАНДУУ АГЫМ (SSE)
+# ===================
+def sse_events(body):
+    """text/event-stream'ден (id, event, data) - тесттер үчүн жөнөкөй талдоо."""
+    events = []
+    for block in body.strip().split('\n\n'):
+        fields = dict(line.split(': ', 1) for line in block.split('\n') if not line.startswith(':'))
+        if 'event' in fields:
+            events.append((fields.get('id'), fields['event'], json.loads(fields['data'])))
+    return events
+
+
+class LiveFeedTests(TestCase):
+    url = '/live/orders/'
+
+    def setUp(self):
+        self.buildings = [Building.objects.create(name=f"Имарат {i}", address="Бишкек") for i in range(2)]
+        self.services = [make_service(building=building) for building in self.buildings]
+        self.user = User.objects.create_user(username='user', password='x')
+        self.manager = User.objects.create_user(username='manager', password='x', role='MANAGER',
+                                                managed_building=self.buildings[0])
+
+    def make_orders(self):
+        return [create_order_record(self.user, service, service.building) for service in self.services]
+
+    def test_replay_is_scoped_and_resumes_from_last_event_id(self):
+        self.make_orders()
+        cursor = live.current_cursor()
+        mine, other = self.make_orders()
+        change_order_status(mine, 'IN_PROGRESS', self.manager)
+        change_order_status(other, 'DONE', self.manager)
+
+        self.client.force_login(self.manager)
+        events = sse_events(self.client.get(self.url, {'cursor': str(cursor)}).content.decode())
+        self.assertEqual([(event['kind'], event['order_id']) for _, _, event in events],
+                         [('created', mine.pk), ('status', mine.pk)])
+        self.assertIn(f'data-order-id="{mine.pk}"', events[1][2]['html'])
+        self.assertEqual(events[1][2]['status'], 'IN_PROGRESS')
+        # EventSource кайра туташканда акыркы id'ни жиберет - эч нерсе кайталанбайт
+        response = self.client.get(self.url, {'cursor': str(cursor)}, headers={'Last-Event-ID': events[-1][0]})
+        self.assertEqual(sse_events(response.content.decode()), [])
+
+        self.client.force_login(self.user)
+        events = sse_events(self.client.get(self.url, {'cursor': str(cursor)}).content.decode())
+        self.assertEqual(len(events), 4)
+        with override_settings(LIVE_REPLAY_LIMIT=3):
+            events = sse_events(self.client.get(self.url, {'cursor': str(cursor)}).content.decode())
+        self.assertEqual([event for _, event, _ in events], ['reset'])
+
+        self.client.logout()
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+    def test_writes_publish_after_commit_only_when_listening(self):
+        with mock.patch.object(live.LocalBroker, 'publish') as publish, self.captureOnCommitCallbacks(execute=True):
+            self.make_orders()
+        publish.assert_not_called()
+
+        published = []
+        with mock.patch.object(live.LocalBroker, 'listening', return_value=True), \
+                mock.patch.object(live.LocalBroker, 'publish', side_effect=published.append):
+            with self.captureOnCommitCallbacks(execute=True):
+                order = create_order_record(self.user, self.services[0], self.buildings[0])
+                change_order_status(order, 'DONE', self.manager)
+            with self.captureOnCommitCallbacks(execute=True):
+                order.delete()
+        self.assertEqual([event['kind'] for event in published], ['created', 'status', 'deleted'])
+
+    async def test_stream_delivers_scoped_events_once(self):
+        orders = await sync_to_async(self.make_orders)()
+        cursor = await sync_to_async(live.current_cursor)()
+        await self.async_client.aforce_login(self.manager)
+        response = await self.async_client.get(self.url, headers={'Last-Event-ID': str(cursor)})
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        stream = aiter(response.streaming_content)
+        self.assertIn(f'id: {cursor}', (await anext(stream)).decode())  # жазылуу даяр
+
+        events = await sync_to_async(live.created_events)(Order.objects.filter(pk__in=[o.pk for o in orders]))
+        broker = live.get_broker()
+        broker.publish(events[1])  # башка имарат
+        broker.publish(events[0])  # курсордон мурунку - кайталанбайт
+        broker.publish(dict(events[0], kind='status', history_id=cursor.history + 1, status='DONE'))
+        chunk = (await anext(stream)).decode()
+        (event_id, name, event), = sse_events(chunk)
+        self.assertEqual((name, event['order_id'], event['status']), ('order', orders[0].pk, 'DONE'))
+        self.assertEqual(event_id, f'{cursor.history + 1}.{cursor.order}')
+        # Клиент ажыраганда ASGI handler агымды токтотот - жазылуу өчөт
+        pending = asyncio.ensure_future(anext(stream))
+        await asyncio.sleep(0.01)
+        pending.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await pending
+        self.assertFalse(broker.listening())
+
+
+# ===================
+# ЧЕКТӨӨ (THROTTLING)
+# ===================
+@override_settings(THROTTLE_BACKEND='memory')
+class ThrottleTests(TestCase):
+    def test_algorithms_report_exact_wait(self):
+        bucket = throttling.TokenBucket(3, 60)
+        state, waits = None, []
+        for _ in range(4):
+            state, wait = bucket.consume(state, 1000.0)
+            waits.append(wait)
+        self.assertEqual(waits[:3], [0.0, 0.0, 0.0])
+        self.assertAlmostEqual(waits[3], 20.0)
+        self.assertEqual(bucket.consume(state, 1020.0)[1], 0.0)
+
+        window = throttling.SlidingWindow(2, 60)
+        state = None
+        for now in (60.0, 61.0):
+            state, wait = window.consume(state, now)
+            self.assertEqual(wait, 0.0)
+        state, wait = window.consume(state, 90.0)
+        self.assertAlmostEqual(wait, 30.0 + 30.0)  # терезенин аягына чейин + мурунку терезенин жарымы
+        self.assertGreater(window.consume(state, 90.0 + wait - 1)[1], 0.0)
+        self.assertEqual(window.consume(state, 90.0 + wait)[1], 0.0)
+
+    def test_shared_backends_count_across_workers(self):
+        with tempfile.TemporaryDirectory() as directory:
+            for make in (lambda: throttling.FileBackend(f'{directory}/throttle.db', slots=64),
+                         lambda: throttling.SQLiteBackend(f'{directory}/throttle.sqlite3')):
+                # Эки "воркер" бир файлды бөлүшөт
+                first, second = make(), make()
+                algorithm = throttling.SlidingWindow(5, 3600)
+                allowed = [not backend.update('ip:1', algorithm, 100.0) for backend in (first, second) * 4]
+                self.assertEqual(allowed.count(True), 5)
+                self.assertFalse(first.update('ip:2', algorithm, 100.0))
+                # Ачкычтар көп болсо эскилери алмаштырылат, файл өспөйт
+                for i in range(200):
+                    first.update(f'ip:{i}', algorithm, 200.0)
+
+    def test_rejected_request_consumes_no_quota(self):
+        with tempfile.TemporaryDirectory() as directory:
+            for backend in (throttling.MemoryBackend(), throttling.FileBackend(f'{directory}/throttle.db', slots=64),
+                            throttling.SQLiteBackend(f'{directory}/throttle.sqlite3')):
+                per_ip, shared = throttling.SlidingWindow(2, 3600), throttling.TokenBucket(3, 60)
+                allowed = [not backend.update_many([('ip:a', per_ip), ('global', shared)], 100.0)
+                           for _ in range(10)]
+                self.assertEqual(allowed.count(True), 2)
+                # Бөгөттөлгөн IP'нин 8 сурамы global чакадан алган жок
+                self.assertEqual(backend.update_many([('ip:b', per_ip), ('global', shared)], 100.0), 0.0)
+
+    @override_settings(THROTTLE_RULES={'register': [('ip', 'sliding', '5/h'), ('global', 'token', '6/m')]})
+    def test_blocked_ip_does_not_lock_out_others(self):
+        data = {'password': 'Secret-pass-123', 'email': 'new@example.com'}
+        statuses = [self.client.post('/api/register/', dict(data, username=f'a{i}')).status_code for i in range(20)]
+        self.assertEqual(statuses.count(429), 15)
+        response = self.client.post('/api/register/', dict(data, username='b'), REMOTE_ADDR='10.0.0.2')
+        self.assertNotEqual(response.status_code, 429)
+
+    @override_settings(THROTTLE_RULES={'register': [('ip', 'sliding', '2/h')], 'login': [('ip', 'token', '1/m')],
+                                       'create_order': [('user', 'token', '1/m')]})
+    def test_drf_and_django_views_return_retry_after(self):
+        data = {'username': 'new', 'password': 'Secret-pass-123', 'email': 'new@example.com'}
+        for i in range(2):
+            response = self.client.post('/api/register/', dict(data, username=f'new{i}'))
+            self.assertNotEqual(response.status_code, 429)
+        response = self.client.post('/api/register/', dict(data, username='new3'))
+        self.assertEqual(response.status_code, 429)
+        self.assertGreater(int(response['Retry-After']), 0)
+        self.assertFalse(User.objects.filter(username='new3').exists())
+        # Башка IP чектелбейт
+        response = self.client.post('/api/register/', dict(data, username='new4'), REMOTE_ADDR='10.0.0.2')
+        self.assertNotEqual(response.status_code, 429)
+
+        self.client.post('/login/', {'username': 'x', 'password': 'y'})
+        response = self.client.post('/login/', {'username': 'x', 'password': 'y'})
+        self.assertEqual((response.status_code, response['Retry-After']), (429, '60'))
+        self.assertEqual(self.client.get('/login/').status_code, 200)
+
+        # create_order колдонуучу боюнча: башка колдонуучу чектелбейт
+        service = make_service()
+        form = {'service': service.pk, 'building': service.building_id,
+                'date': str(timezone.localdate() + timedelta(days=1))}
+        for username, time in (('a', '10:00'), ('b', '11:00')):
+            self.client.force_login(User.objects.create_user(username=username, password='x'))
+            self.assertEqual(self.client.post('/create_order/', dict(form, time=time)).status_code, 302)
+        self.assertEqual(self.client.post('/create_order/', form).status_code, 429)
+        self.assertEqual(Order.objects.count(), 2)
+        self.assertIn('throttled_requests_total{scope="create_order"}', metrics.exposition())
+
+
+
+# ===================
+# БОШ СЛОТТОР
+# ===================
+class SchedulingTests(TestCase):
+    monday = date(2026, 3, 2)
+
+    def setUp(self):
+        self.service = make_service()
+        self.building = self.service.building
+        self.user = User.objects.create_user(username='user', password='x')
+
+    def book(self, day, hour, minute=0):
+        return Order.objects.create(user=self.user, service=self.service, building=self.building, date=day,
+                                    time=dt_time(hour, minute))
+
+    def test_most_specific_rules_and_overlaps(self):
+        CapacityRule.objects.create(weekdays='0123456', capacity=5)
+        CapacityRule.objects.create(building=self.building, weekdays='01', opens_at=dt_time(10), closes_at=dt_time(12))
+        schedule = scheduling.load_schedule(self.service.pk, self.building.pk)
+        self.assertEqual(schedule.rule(self.monday), (600, 720, 60, 1))
+        self.assertIsNone(schedule.rule(self.monday + timedelta(days=2)))  # имарат деңгээлинде - дем алыш
+
+        CapacityRule.objects.create(service=self.service, building=self.building, weekdays='0',
+                                    closes_at=dt_time(11), slot_minutes=30, capacity=2)
+        self.book(self.monday, 9)
+        self.book(self.monday, 9)
+        self.book(self.monday, 9, 40)  # эски, слотко туура келбеген убакыт: 9:30 жана 10:00 слотторун ээлейт
+        after = timezone.make_aware(datetime.combine(self.monday, datetime.min.time()))
+        slots = scheduling.free_slots(self.service.pk, self.building.pk, after=after, count=10, days=2)
+        self.assertEqual([(slot['time'], slot['free']) for slot in slots],
+                         [(dt_time(9, 30), 1), (dt_time(10), 1), (dt_time(10, 30), 2)])
+
+    def test_reserve_rejects_taken_and_off_grid_slots(self):
+        day = str(timezone.localdate() + timedelta(days=7))
+        first = create_order_record(self.user, self.service, self.building, day, '10:00')
+        for start in ('10:00', '10:30', '20:00'):
+            with self.assertRaises(scheduling.SlotError):
+                create_order_record(self.user, self.service, self.building, day, start)
+        # Түзөтүлүп жаткан заказ өзүн бөгөттөбөйт
+        self.assertEqual(scheduling.reserve(self.service.pk, self.building.pk, first.date, first.time,
+                                            exclude=first.pk), (first.date, first.time))
+        # Дата/убакыт жок - жакынкы бош слот
+        order = create_order_record(self.user, self.service, self.building)
+        self.assertGreater(timezone.make_aware(datetime.combine(order.date, order.time)), timezone.now())
+        self.assertEqual(Order.objects.count(), 2)
+
+    def test_reserve_rejects_past_slots(self):
+        now = timezone.localtime()
+        for day, start in ((date(2020, 1, 6), dt_time(10)), (now.date(), dt_time(now.hour))):
+            with self.assertRaisesMessage(scheduling.SlotError, "өтүп кеткен убакыт"):
+                scheduling.reserve(self.service.pk, self.building.pk, day, start)
+        self.client.force_login(self.user)
+        data = {'service_id': self.service.pk, 'date': '2020-01-06', 'time': '10:00'}
+        response = self.client.post('/api/orders/', data)
+        self.assertEqual((response.status_code, list(response.json())), (400, ['time']))
+        self.assertFalse(Order.objects.exists())
+
+    def test_reserve_validates_and_honours_the_given_day(self):
+        for day, start in (('2026-13-01', '10:00'), ('2026-03-02', '25:00')):
+            with self.assertRaises(scheduling.SlotError):
+                scheduling.reserve(self.service.pk, self.building.pk, day, start)
+        # Убакыт жок - берилген күндүн биринчи бош слоту
+        day = timezone.localdate() + timedelta(days=7)
+        self.book(day, 9)
+        self.assertEqual(scheduling.reserve(self.service.pk, self.building.pk, str(day)), (day, dt_time(10)))
+        with self.assertRaises(scheduling.SlotError):
+            scheduling.reserve(self.service.pk, self.building.pk, timezone.localdate() - timedelta(days=1))
+
+        self.client.force_login(self.user)
+        response = self.client.get(f'/api/services/{self.service.pk}/slots/', {'building': 999999})
+        self.assertEqual((response.status_code, list(response.json())), (400, ['building']))
+
+    def test_api_slots_and_reservations(self):
+        self.client.force_login(self.user)
+        day = timezone.localdate() + timedelta(days=7)
+        response = self.client.get(f'/api/services/{self.service.pk}/slots/', {'date_from': day, 'count': 3})
+        self.assertEqual(response.json(), {
+            'service': self.service.pk, 'building': self.building.pk,
+            'slots': [{'date': str(day), 'time': f'{hour:02}:00', 'free': 1} for hour in (9, 10, 11)],
+        })
+
+        data = {'service_id': self.service.pk, 'date': str(day), 'time': '09:00'}
+        response = self.client.post('/api/orders/', data)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Order.objects.get().building, self.building)  # демейки: кызматтын имараты
+        response = self.client.post('/api/orders/', data)
+        self.assertEqual((response.status_code, list(response.json())), (400, ['time']))
+        other = self.book(day, 10)
+        response = self.client.patch(f'/api/orders/{other.pk}/', {'time': '09:00'}, content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.client.get(f'/api/services/{self.service.pk}/slots/',
+                                         {'date_from': day, 'count': 1}).json()['slots'][0]['time'], '11:00')
+
+        items = [{'service': self.service.pk, 'date': str(day), 'time': '12:00'}] * 2
+        response = self.client.post('/api/orders/bulk/', json.dumps(items), content_type='application/json')
+        self.assertEqual([error['index'] for error in response.json()['errors']], [1])
+        self.assertEqual(Order.objects.count(), 2)
+
+
+# ===================
+# СТАТИКАЛЫК АКТИВДЕР
+# ===================
+class AssetTests(TestCase):
+    def test_committed_bundle_matches_templates(self):
+        call_command('build_assets', check=True)
+        with override_settings(ASSETS_BASE_CSS=self.write('base.css', '.x{color:red}')):
+            with self.assertRaises(CommandError):
+                call_command('build_assets', check=True)
+
+    def write(self, name, text):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = f'{directory}/{name}'
+        with open(path, 'w') as target:
+            target.write(text)
+        return path
+
+    def test_utilities_variants_and_icon_purge(self):
+        css, unknown = tailwind.build({'p-8', 'pt-2', 'hover:bg-white/70', 'md:-translate-y-1/2', 'w-[500px]',
+                                       'group-hover:rotate-12', 'w-100', 'btn-primary'})
+        self.assertEqual(unknown, {'w-100', 'btn-primary'})
+        self.assertIn('.hover\\:bg-white\\/70:hover{background-color:rgb(255 255 255 / 0.7)}', css)
+        self.assertIn('.group:hover .group-hover\\:rotate-12{--tw-rotate:12deg;', css)
+        self.assertIn('.w-\\[500px\\]{width:500px}', css)
+        # Ирет: pt p'дан кийин (жеңет), вариантсыздар варианттардан, экрандар баарынан кийин
+        self.assertLess(css.index('.p-8{'), css.index('.pt-2{'))
+        self.assertLess(css.index('.pt-2{'), css.index('.hover\\:'))
+        self.assertTrue(css.endswith('@media (min-width: 768px){.md\\:-translate-y-1\\/2{--tw-translate-y:-50%;'
+                                     'transform:' + tailwind.TRANSFORM + '}}'))
+
+        fontawesome = """
+            @font-face { font-family: "Font Awesome 6 Free"; src: url(../webfonts/fa-solid-900.woff2); }
+            @font-face { font-family: "Font Awesome 6 Brands"; src: url(../webfonts/fa-brands-400.woff2); }
+            @keyframes fa-spin { to { transform: rotate(360deg) } }
+            .fa, .fa-solid { font-weight: 900 }
+            .fa-spin { animation-name: fa-spin }
+            .fa-bolt:before, .fa-zap:before { content: "\\f0e7" }
+            .fa-user:before { content: "\\f007" }
+            .sr-only { position: absolute }
+        """
+        purged = assets.purge_icons(fontawesome, {'fa', 'fa-solid', 'fa-bolt'})
+        self.assertIn('fa-solid-900', purged)
+        self.assertNotIn('fa-brands-400', purged)
+        self.assertIn('.fa-bolt:before{content:"\\f0e7"}', purged)
+        self.assertNotIn('fa-zap', purged)
+        self.assertNotIn('fa-user', purged)
+        self.assertNotIn('@keyframes', purged)
+        self.assertIn('.sr-only', purged)
+
+    def test_collectstatic_output_is_served_compressed_and_cached(self):
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root)
+        with override_settings(STATIC_ROOT=root):
+            call_command('collectstatic', interactive=False, verbosity=0, ignore_patterns=['admin', 'rest_framework'])
+            url = static('build/app.css')
+            self.assertRegex(url, r'^/static/build/app\.[0-9a-f]{12}\.css$')
+            self.assertIn(url, self.client.get('/login/').content.decode())
+
+            response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip, deflate')
+            self.assertEqual(response['Content-Encoding'], 'gzip')
+            self.assertEqual(response['Cache-Control'], 'public, max-age=31536000, immutable')
+            self.assertEqual(response['Vary'], 'Accept-Encoding')
+            body = gzip.decompress(b''.join(response.streaming_content)).decode()
+            with open(f'{root}/build/app.css') as source:
+                self.assertEqual(body, source.read())
+            response.close()
+
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'], HTTP_ACCEPT_ENCODING='gzip')
+            self.assertEqual(response.status_code, 304)
+            # Хэшсиз ат кыска кэш менен, кысууну колдобогон клиентке - кысылбаган
+            response = self.client.get('/static/build/app.css', HTTP_ACCEPT_ENCODING='gzip;q=0')
+            self.assertEqual((response.has_header('Content-Encoding'), response['Cache-Control']),
+                             (False, 'public, max-age=60'))
+            response.close()
+
+
+# ===================
+# АУТЕНТИФИКАЦИЯ КЭШИ
+# ===================
+@override_settings(**SHARED_CACHE)
+class AuthCacheTests(TestCase):
+    def setUp(self):
+        from rest_framework.authtoken.models import Token
+
+        self.building = Building.objects.create(name="Имарат", address="Бишкек")
+        service = make_service(building=self.building)
+        self.user = User.objects.create_user(username='worker', password='pass12345')
+        owner = User.objects.create_user(username='owner', password='x')
+        Order.objects.create(user=owner, service=service, building=self.building, date='2026-01-01', time='10:00')
+        self.token = Token.objects.create(user=self.user)
+        self.auth = {'HTTP_AUTHORIZATION': f'Token {self.token.key}'}
+
+    def orders(self, **headers):
+        response = self.client.get('/api/orders/', **headers)
+        return response.status_code, len(response.json()['results']) if response.status_code == 200 else None
+
+    def test_locmem_stamps_are_flagged(self):
+        self.assertEqual([error.id for error in auth_cache.check_stamp_cache(None)], ['config.W001'])
+        with self.settings(AUTH_CACHE_TTL=0):
+            self.assertEqual(auth_cache.check_stamp_cache(None), [])
+        self.assertEqual([error.id for error in auth_cache.check_session_cache(None)], ['config.W002'])
+        with self.settings(SESSION_ENGINE='django.contrib.sessions.backends.db'):
+            self.assertEqual(auth_cache.check_session_cache(None), [])
+
+    def test_token_lookup_is_cached_until_role_or_token_changes(self):
+        self.assertEqual(self.orders(**self.auth), (200, 0))
+        with self.assertNumQueries(1):  # заказдар гана - токен жана колдонуучу кэштен
+            self.assertEqual(self.orders(**self.auth), (200, 0))
+
+        self.user.role, self.user.managed_building = 'MANAGER', self.building
+        self.user.save()
+        self.assertEqual(self.orders(**self.auth), (200, 1))
+
+        self.token.delete()
+        self.assertEqual(self.orders(**self.auth), (403, None))
+
+    def test_session_user_is_cached_and_password_change_logs_out(self):
+        self.client.force_login(self.user)
+        self.assertEqual(self.orders(), (200, 0))
+        with self.assertNumQueries(1):
+            self.assertEqual(self.orders(), (200, 0))
+        # last_login гана өзгөрсө кэш сакталат
+        self.user.last_login = timezone.now()
+        self.user.save(update_fields=['last_login'])
+        with self.assertNumQueries(1):
+            self.orders()
+
+        self.user.set_password('new-pass-123')
+        self.user.save()
+        self.assertEqual(self.orders(), (403, None))
+
+    def test_sessions_from_model_backend_are_moved_to_cached_backend(self):
+        # Кэштен мурда ачылган сессия: сессияда ModelBackend'дин жолу, ал AUTHENTICATION_BACKENDS'те жок
+        self.client.force_login(self.user, backend='django.contrib.auth.backends.ModelBackend')
+        self.assertEqual(self.orders()[0], 403)
+        migration = import_module('config.migrations.0018_session_backend_path')
+        migration.move_sessions(django_apps, connection.schema_editor())
+        self.assertEqual(self.orders(), (200, 0))
+
+    def test_stamp_from_another_worker_and_lru_limits(self):
+        self.orders(**self.auth)
+        # Башка воркер роль өзгөрттү: анын LRU'су биздикине жетпейт, белги жалпы кэште
+        User.objects.filter(pk=self.user.pk).update(role='ADMIN')
+        auth_cache._publish(auth_cache._stamp_key('users', self.user.pk))
+        self.assertEqual(self.orders(**self.auth), (200, 1))
+        with override_settings(AUTH_CACHE_TTL=0), self.assertNumQueries(2):
+            self.orders(**self.auth)
+
+        lru = auth_cache.LRUCache(maxsize=2, ttl=60)
+        for key in 'abc':
+            lru.set(key, key)
+        self.assertEqual((lru.get('a'), lru.get('c'), len(lru)), (None, 'c', 2))
+        with mock.patch('config.auth_cache.time.monotonic', return_value=10 ** 9):
+            self.assertIsNone(lru.get('c'))
+
+
+# ===================
+# АДМИНКА
+# ===================
+class AdminTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(username='root', email='root@example.com', password='x',
+                                                   role='ADMIN')
+        self.building = Building.objects.create(name="Имарат", address="Бишкек")
+        self.service = make_service(building=self.building)
+        self.client.force_login(self.admin)
+
+    def add_orders(self, count):
+        for _ in range(count):
+            user = User.objects.create_user(username=f'client{User.objects.count()}', password='x')
+            order = Order.objects.create(user=user, service=self.service, building=self.building,
+                                         date='2026-01-01', time='10:00')
+            OrderHistory.objects.create(order=order, old_status='NEW', new_status='NEW', changed_by=user)
+            Review.objects.create(service=self.service, user=user, rating=4, comment="Ок")
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(self.client.get(url).status_code, 200)
+        return len(ctx)
+
+    @override_settings(API_COUNT_CACHE_TIMEOUT=0)  # болжолдуу сан ар бир жолу кайра эсептелет
+    def test_changelists_do_not_grow_with_rows(self):
+        urls = ['/admin/config/order/', '/admin/config/orderhistory/', '/admin/config/review/',
+                f'/admin/config/order/?status__exact=NEW&building__id__exact={self.building.pk}']
+        self.client.get('/admin/')  # колдонуучу кэшке түшөт
+        self.add_orders(2)
+        small = [self.count_queries(url) for url in urls]
+        self.add_orders(6)
+        self.assertEqual([self.count_queries(url) for url in urls], small)
+        # Бардык заказдар бир күндө - date_hierarchy MIN/MAX'тан ошол күнгө түшөт
+        day = timezone.localdate(Order.objects.first().created_at)
+        self.assertContains(self.client.get(urls[0]), f'created_at__day={day.day}')
+
+    def test_status_action_writes_history_in_batch(self):
+        self.add_orders(3)
+        orders = list(Order.objects.order_by('pk'))
+        Order.objects.filter(pk=orders[0].pk).update(status='DONE')
+        with self.settings(ORDERS_BULK_MAX=1):
+            response = self.client.post('/admin/config/order/', {
+                'action': 'mark_done', '_selected_action': [order.pk for order in orders]})
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(set(Order.objects.values_list('status', flat=True)), {'DONE'})
+        history = OrderHistory.objects.filter(new_status='DONE')
+        self.assertEqual(sorted(history.values_list('order_id', flat=True)), [orders[1].pk, orders[2].pk])
+        self.assertEqual(set(history.values_list('old_status', 'changed_by')), {('NEW', self.admin.pk)})
+
+
+# ===================
+# ТЕЗ СЕРИАЛИЗАЦИЯ
+# ===================
+class FastSerializerTests(TestCase):
+    """Компиляцияланган тизмелер жана orjson - DRF'тин кадимки жолу менен байт-байтына бирдей."""
+
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media)
+        settings_override = override_settings(MEDIA_ROOT=media)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.admin = User.objects.create_user(username='admin', password='x', role='ADMIN', first_name="Айбек",
+                                              email='admin@example.com', phone='+996 555')
+        building = Building.objects.create(name="Имарат\u2028«Ала-Тоо»", address="Бишкек")
+        building.image.save('building.png', ContentFile(b'png'))
+        category = Category.objects.create(name="Үй")
+        services = [make_service(building=building, category=category, name="Электрик", price='1234.50'),
+                    make_service(name="Сантехник", description="Түтүк\u2029оңдоо")]
+        services[0].image.save('service.png', ContentFile(b'png'))
+        ImageDerivative.objects.create(source=services[0].image.name, bucket=320, format='webp',
+                                       name='derivatives/service-320.webp', width=320, height=160)
+        Review.objects.create(service=services[0], user=self.admin, rating=4, comment="Жакшы")
+        for number in range(5):
+            order = Order.objects.create(user=self.admin, service=services[number % 2],
+                                         building=building if number % 2 else None, date='2026-01-01',
+                                         time='10:00', comment=f"Комментарий {number}\u2028")
+            change_order_status(order, 'IN_PROGRESS', changed_by=self.admin)
+        self.client.force_login(self.admin)
+
+    def get(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response.content
+
+    def test_lists_match_drf_output(self):
+        urls = ['/api/users/', '/api/buildings/', '/api/services/', '/api/services/?search=электрик',
+                '/api/orders/?page_size=2', '/api/orderhistories/?page_size=3']
+        for url in urls:
+            while url:
+                fast = self.get(url)
+                with self.settings(API_FAST_SERIALIZERS=False), mock.patch('config.fast_serializers.orjson', None):
+                    self.assertEqual(fast, self.get(url), url)
+                url = json.loads(fast).get('next')
+
+        self.assertIn(b'\\u2028', self.get('/api/orders/'))
+        self.assertEqual(len(json.loads(self.get('/api/services/?search=электрик'))['results']), 1)
+        services = json.loads(self.get('/api/services/'))['results']
+        self.assertEqual({service['price_display'] for service in services}, {'$1234.50', '$500.00'})
+        self.assertIn('/derivatives/service-320.webp 320w', services[-1]['image_srcset']['webp'])
+        history = json.loads(self.get('/api/orderhistories/'))['results'][0]
+        self.assertEqual((history['old_status'], history['new_status']), ('Ожидания', 'В процессе'))
+
+    def test_unsupported_serializer_uses_drf(self):
+        class MethodSerializer(serializers.UserSerializer):
+            label = rest_serializers.SerializerMethodField()
+
+            class Meta(serializers.UserSerializer.Meta):
+                fields = ('id', 'label')
+
+            def get_label(self, obj):
+                return obj.username
+
+        self.assertIsNone(fast_serializers.compile_serializer(MethodSerializer))
+        self.assertIsNotNone(fast_serializers.compile_serializer(serializers.OrderSerializer))
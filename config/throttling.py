@@ -0,0 +1,397 @@
+import fcntl
+import hashlib
+import math
+import mmap
+import os
+import sqlite3
+import struct
+import threading
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.http import HttpResponse
+from django.utils.module_loading import import_string
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.throttling import BaseThrottle
+
+from .metrics import THROTTLED
+
+# ===================
+# ЧЕКТӨӨ (THROTTLING)
+# ===================
+# settings.THROTTLE_RULES: {аймак: [(ачкыч, алгоритм, чек), ...]} - мис. ('ip', 'sliding', '5/h').
+#   ачкыч: ip | user (кирбеген колдонуучу - ip) | global (аймактын бардык сурамдары бирге)
+#   алгоритм: token (token bucket - чекке чейин топтоп, анан бир калыпта) | sliding (жылма терезе)
+# Бир эрежеси чектесе - 429 жана Retry-After (эң узак күтүү). Четке кагылган сурам эч бир эрежеден
+# квота албайт: бир IP'нин ашыкча сурамдары global эрежени түгөтүп, башкаларды бөгөттөбөйт.
+#
+# Эсептегичтер THROTTLE_BACKEND'де: memory - процесстин ичинде (dev, тесттер), file - mmap файл (бир
+# сервердеги бардык gunicorn воркерлери, бир текшерүү - бир нече микросекунд), sqlite - өзүнчө файл,
+# redis - бир нече сервер. Эч бири Django'нун базасына барбайт.
+
+UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_rate(rate):
+    """'10/m' -> (10, 60)."""
+    count, _, unit = rate.partition('/')
+    return int(count), UNITS[unit[:1]]
+
+
+class Algorithm:
+    """peek(абал, убакыт) -> (жаңыланган абал, күтүү) квота албайт; take(абал) - уруксат болсо бирди алат."""
+
+    def consume(self, state, now):
+        state, wait = self.peek(state, now)
+        return (state if wait else self.take(state)), wait
+
+
+class TokenBucket(Algorithm):
+    """Чака `limit` токенге чейин толот, `period` ичинде `limit` токен кошулат. Абал: (токендер, убакыт, -)."""
+
+    def __init__(self, limit, period):
+        self.capacity = limit
+        self.per_second = limit / period
+        self.ttl = period
+
+    def peek(self, state, now):
+        tokens, last, _ = state or (self.capacity, now, 0.0)
+        tokens = min(self.capacity, tokens + max(now - last, 0.0) * self.per_second)
+        return (tokens, now, 0.0), (0.0 if tokens >= 1 else (1 - tokens) / self.per_second)
+
+    @staticmethod
+    def take(state):
+        tokens, now, _ = state
+        return tokens - 1, now, 0.0
+
+
+class SlidingWindow(Algorithm):
+    """Жылма терезе, эки туруктуу терезе менен болжолдонот: мурунку терезенин саны убакытка жараша
+    азаят. Абал: (терезенин башы, мурунку терезенин саны, учурдагы терезенин саны)."""
+
+    def __init__(self, limit, period):
+        self.limit = limit
+        self.period = period
+        self.ttl = 2 * period
+
+    def peek(self, state, now):
+        start = now - now % self.period
+        window, previous, current = state or (start, 0.0, 0.0)
+        if window != start:
+            previous = current if start - window == self.period else 0.0
+            window, current = start, 0.0
+        elapsed = now - start
+        if previous * (1 - elapsed / self.period) + current + 1 <= self.limit:
+            return (window, previous, current), 0.0
+        if current + 1 <= self.limit:
+            # Мурунку терезенин салмагы жетишерлик азайганга чейин
+            return (window, previous, current), self.period * (1 - (self.limit - current - 1) / previous) - elapsed
+        # Учурдагы терезе толду: кийинки терезеде ал "мурунку" болуп азаят
+        return (window, previous, current), (self.period - elapsed) + self.period * (1 - (self.limit - 1) / current)
+
+    @staticmethod
+    def take(state):
+        window, previous, current = state
+        return window, previous, current + 1
+
+
+def _settle(peeked):
+    """peeked: [(абал, күтүү, алгоритм)] -> (жазыла турган абалдар же None, эң узак күтүү). Бардык эрежелер
+    уруксат берсе гана ар биринен квота алынат, болбосо эч нерсе жазылбайт."""
+    wait = max((item[1] for item in peeked), default=0.0)
+    if wait:
+        return None, wait
+    return [algorithm.take(state) for state, _, algorithm in peeked], 0.0
+
+
+ALGORITHMS = {'token': TokenBucket, 'sliding': SlidingWindow}
+
+
+class Rule:
+    def __init__(self, key, algorithm, rate):
+        if key not in ('ip', 'user', 'global') or algorithm not in ALGORITHMS:
+            raise ImproperlyConfigured(f"THROTTLE_RULES: туура эмес эреже {(key, algorithm, rate)}")
+        self.key = key
+        self.algorithm = ALGORITHMS[algorithm](*parse_rate(rate))
+
+    def identity(self, request):
+        if self.key == 'global':
+            return '*'
+        user = getattr(request, 'user', None)
+        if self.key == 'user' and user is not None and user.is_authenticated:
+            return f'u{user.pk}'
+        return client_ip(request)
+
+
+def client_ip(request):
+    # THROTTLE_NUM_PROXIES: алдыдагы ишенимдүү прокси саны (DRF'тин NUM_PROXIES'индей)
+    proxies = settings.THROTTLE_NUM_PROXIES
+    forwarded = request.META.get('HTTP_X_FORWARDED_FOR')
+    if proxies and forwarded:
+        addresses = [address.strip() for address in forwarded.split(',')]
+        return addresses[-min(proxies, len(addresses))]
+    return request.META.get('REMOTE_ADDR', '')
+
+
+# ===================
+# BACKEND'ДЕР
+# ===================
+# update_many([(ачкыч, алгоритм), ...], убакыт) - бардык ачкычтардын абалын атомдук түрдө окуп, баары уруксат
+# берсе гана жазат; эң узак күтүү секундун кайтарат (0 - уруксат). update(ачкыч, алгоритм, убакыт) - бир ачкыч.
+class BaseBackend:
+    def update(self, key, algorithm, now):
+        return self.update_many([(key, algorithm)], now)
+
+
+class MemoryBackend(BaseBackend):
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.states = {}
+
+    def update_many(self, entries, now):
+        with self.lock:
+            peeked = []
+            for key, algorithm in entries:
+                expires, state = self.states.get(key, (0.0, None))
+                peeked.append((*algorithm.peek(state if expires > now else None, now), algorithm))
+            states, wait = _settle(peeked)
+            for (key, algorithm), state in zip(entries, states or ()):
+                self.states[key] = (now + algorithm.ttl, state)
+            if len(self.states) > 100_000:
+                self.states = {key: value for key, value in self.states.items() if value[0] > now}
+        return wait
+
+    def reset(self):
+        with self.lock:
+            self.states.clear()
+
+
+class FileBackend(BaseBackend):
+    """mmap'телген хэш-таблица: [8 слоттон турган топтор][слот: хэш, мөөнөт, абалдын 3 float'у].
+
+    Ачкыч өз тобунда издейт (бош же мөөнөтү өткөн слот, болбосо эң эскиси алмаштырылат). Процесстер
+    ортосунда топтун байттары fcntl менен кулпуланат, процесстин ичинде - threading.Lock.
+    """
+
+    slot = struct.Struct('Qdddd')
+    group_size = 8
+
+    def __init__(self, path=None, slots=None):
+        self.path = path or settings.THROTTLE_FILE
+        self.groups = (slots or settings.THROTTLE_FILE_SLOTS) // self.group_size
+        self.pid = None
+
+    def _open(self):
+        # fork'тон кийин ар бир воркер файлды өзү ачат (fcntl кулпулары процесске таандык)
+        self.lock = threading.Lock()
+        self.file = open(self.path, 'a+b')
+        size = self.groups * self.group_size * self.slot.size
+        if os.fstat(self.file.fileno()).st_size < size:
+            self.file.truncate(size)
+        self.map = mmap.mmap(self.file.fileno(), size)
+        self.pid = os.getpid()
+
+    def update_many(self, entries, now):
+        if self.pid != os.getpid():
+            self._open()
+        group_bytes = self.group_size * self.slot.size
+        digests = [int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), 'little') or 1
+                   for key, _ in entries]
+        starts = [digest % self.groups * group_bytes for digest in digests]
+        # Топтор бир иретте кулпуланат - эки процесс бири-бирин күтүп калбайт
+        groups = sorted(set(starts))
+        with self.lock:
+            for start in groups:
+                fcntl.lockf(self.file, fcntl.LOCK_EX, group_bytes, start)
+            try:
+                positions, peeked = [], []
+                for (_, algorithm), digest, start in zip(entries, digests, starts):
+                    position, state = self._find(start, digest, now, positions)
+                    positions.append(position)
+                    peeked.append((*algorithm.peek(state, now), algorithm))
+                states, wait = _settle(peeked)
+                for position, digest, (_, algorithm), state in zip(positions, digests, entries, states or ()):
+                    self.slot.pack_into(self.map, position, digest, now + algorithm.ttl, *state)
+            finally:
+                for start in groups:
+                    fcntl.lockf(self.file, fcntl.LOCK_UN, group_bytes, start)
+        return wait
+
+    def _find(self, start, digest, now, taken=()):
+        victim, victim_expires = start, math.inf
+        for position in range(start, start + self.group_size * self.slot.size, self.slot.size):
+            stored, expires, *state = self.slot.unpack_from(self.map, position)
+            if stored == digest:
+                return position, (state if expires > now else None)
+            if expires < victim_expires and position not in taken:
+                victim, victim_expires = position, expires
+        return victim, None
+
+    def reset(self):
+        if self.pid != os.getpid():
+            self._open()
+        with self.lock:
+            self.map[:] = bytes(len(self.map))
+
+
+class SQLiteBackend(BaseBackend):
+    """Өзүнчө SQLite файлы (WAL, synchronous=OFF): бир нече сервер бир дискти бөлүшсө же mmap болбосо."""
+
+    def __init__(self, path=None):
+        self.path = path or settings.THROTTLE_SQLITE
+        self.local = threading.local()
+
+    def connection(self):
+        connection = getattr(self.local, 'connection', None)
+        if connection is None or self.local.pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=OFF')
+            connection.execute('CREATE TABLE IF NOT EXISTS throttle '
+                               '(key TEXT PRIMARY KEY, expires REAL, a REAL, b REAL, c REAL) WITHOUT ROWID')
+            self.local.connection, self.local.pid, self.local.writes = connection, os.getpid(), 0
+        return connection
+
+    def update_many(self, entries, now):
+        connection = self.connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            peeked = []
+            for key, algorithm in entries:
+                row = connection.execute('SELECT expires, a, b, c FROM throttle WHERE key = ?', (key,)).fetchone()
+                peeked.append((*algorithm.peek(row[1:] if row and row[0] > now else None, now), algorithm))
+            states, wait = _settle(peeked)
+            for (key, algorithm), state in zip(entries, states or ()):
+                connection.execute('INSERT OR REPLACE INTO throttle VALUES (?, ?, ?, ?, ?)',
+                                   (key, now + algorithm.ttl, *state))
+            self.local.writes += 1
+            if self.local.writes % 10_000 == 0:
+                connection.execute('DELETE FROM throttle WHERE expires < ?', (now,))
+            connection.execute('COMMIT')
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        return wait
+
+    def reset(self):
+        self.connection().execute('DELETE FROM throttle')
+
+
+class RedisBackend(BaseBackend):
+    """Бир нече сервер: WATCH/MULTI менен оптимисттик окуу-жазуу (redis пакети керек)."""
+
+    def __init__(self):
+        try:
+            import redis
+        except ImportError as exc:
+            raise ImproperlyConfigured("THROTTLE_BACKEND=redis үчүн `redis` пакети керек") from exc
+        self.redis = redis
+        self.client = redis.Redis.from_url(settings.THROTTLE_REDIS_URL)
+
+    def update_many(self, entries, now):
+        keys = [f'throttle:{key}' for key, _ in entries]
+        with self.client.pipeline() as pipe:
+            while True:
+                try:
+                    pipe.watch(*keys)
+                    peeked = [(*algorithm.peek(tuple(map(float, stored.split(b','))) if stored else None, now),
+                               algorithm) for stored, (_, algorithm) in zip(pipe.mget(keys), entries)]
+                    states, wait = _settle(peeked)
+                    if wait:
+                        pipe.unwatch()
+                        return wait
+                    pipe.multi()
+                    for key, (_, algorithm), state in zip(keys, entries, states):
+                        pipe.set(key, ','.join(map(repr, state)), px=int(algorithm.ttl * 1000))
+                    pipe.execute()
+                    return wait
+                except self.redis.WatchError:
+                    continue
+
+    def reset(self):
+        for key in self.client.scan_iter('throttle:*'):
+            self.client.delete(key)
+
+
+BACKENDS = {'memory': MemoryBackend, 'file': FileBackend, 'sqlite': SQLiteBackend, 'redis': RedisBackend}
+_state = {'backend': None, 'rules': {}}
+
+
+@receiver(setting_changed)
+def _reset_state(setting, **kwargs):
+    if setting.startswith('THROTTLE_'):
+        _state['backend'], _state['rules'] = None, {}
+
+
+def get_backend():
+    """settings.THROTTLE_BACKEND: memory | file | sqlite | redis | класстын толук жолу."""
+    if _state['backend'] is None:
+        path = settings.THROTTLE_BACKEND
+        _state['backend'] = (BACKENDS.get(path) or import_string(path))()
+    return _state['backend']
+
+
+def rules(scope):
+    compiled = _state['rules'].get(scope)
+    if compiled is None:
+        compiled = _state['rules'][scope] = [Rule(*rule) for rule in settings.THROTTLE_RULES.get(scope, ())]
+    return compiled
+
+
+def check(request, scope):
+    """Аймактын бардык эрежелери. Күтүү секундун кайтарат (0 - уруксат)."""
+    if not settings.THROTTLE_ENABLED:
+        return 0.0
+    entries = [(f'{scope}:{index}:{rule.identity(request)}', rule.algorithm)
+               for index, rule in enumerate(rules(scope))]
+    wait = get_backend().update_many(entries, time.time()) if entries else 0.0
+    if wait:
+        THROTTLED.inc(scope=scope)
+    return wait
+
+
+def retry_after(wait):
+    return max(1, math.ceil(wait))
+
+
+# ===================
+# КОЛДОНУУ
+# ===================
+def throttle(scope, methods=('POST',)):
+    """Кадимки Django view'лору үчүн: `methods` сурамдары чектелет, ашса - 429 + Retry-After."""
+    def decorator(view):
+        @wraps(view)
+        def inner(request, *args, **kwargs):
+            if request.method in methods:
+                wait = check(request, scope)
+                if wait:
+                    return throttled_response(wait)
+            return view(request, *args, **kwargs)
+        return inner
+    return decorator
+
+
+def throttled_response(wait):
+    response = HttpResponse("Өтө көп сурам. Бир аздан кийин кайталаңыз.", status=429,
+                            content_type='text/plain; charset=utf-8')
+    response['Retry-After'] = str(retry_after(wait))
+    return response
+
+
+class ScopedThrottle(BaseThrottle):
+    """DRF үчүн: аймак view'дун `throttle_scope`'унан, окуу (GET/HEAD/OPTIONS) сурамдары чектелбейт.
+    Retry-After'ди DRF wait()'тен өзү коёт."""
+
+    def allow_request(self, request, view):
+        self.delay = 0.0
+        if request.method in SAFE_METHODS:
+            return True
+        self.delay = check(request, view.throttle_scope)
+        return not self.delay
+
+    def wait(self):
+        return retry_after(self.delay)
@@ -0,0 +1,38 @@
+import random
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.db import OperationalError, connection, transaction
+
+
+def is_lock_error(exc):
+    message = str(exc).lower()
+    return 'database is locked' in message or 'database table is locked' in message or 'busy' in message
+
+
+def immediate_write(func):
+    """Жазууну бир транзакцияда аткарат; SQLite "database is locked" болсо чектелген жолу кайталайт.
+
+    SQLite профилинде (SQLITE_PERFORMANCE) транзакциялар BEGIN IMMEDIATE менен ачылат: жазуу кулпусу
+    башында эле алынат, ошондуктан окуудан жазууга өтүүдөгү кулпу чатагы болбойт. Кайталоо тышкы
+    транзакциянын ичинде болбойт - аны тышкы блок өзү чечет.
+    """
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        # Тышкы транзакциянын ичинде кайталоо жок (ал жакта жарым-жартылай жазуулар калышы мүмкүн)
+        retries = 0 if connection.in_atomic_block else getattr(settings, 'SQLITE_WRITE_RETRIES', 3)
+        attempt = 0
+        while True:
+            try:
+                with transaction.atomic():
+                    return func(*args, **kwargs)
+            except OperationalError as exc:
+                if attempt >= retries or not is_lock_error(exc):
+                    raise
+                attempt += 1
+                # Экспоненциалдык күтүү + кокустук (бир убакта кайталоолор кагылышпасын)
+                time.sleep(0.05 * (2 ** (attempt - 1)) * (1 + random.random()))
+
+    return wrapper
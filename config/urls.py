@@ -6,6 +6,8 @@ from .views import (
     home, service_detail, signup, RegisterView
 )
 from . import views
+from .live import order_events
+from .throttling import throttle
 from django.contrib.auth import views as auth_views
 from django.conf import settings
 from django.conf.urls.static import static
@@ -38,7 +40,7 @@ urlpatterns = [
     # ===================
     # АВТОРИЗАЦИЯ (HTML)
     # ===================
-    path('login/', auth_views.LoginView.as_view(template_name='login.html'), name='login'),
+    path('login/', throttle('login')(auth_views.LoginView.as_view(template_name='login.html')), name='login'),
     path('logout/', auth_views.LogoutView.as_view(next_page='login'), name='logout'),
     path('signup/', views.signup, name='signup'),
 
@@ -48,6 +50,7 @@ urlpatterns = [
     path('dashboard/', views.dashboard, name='dashboard'),
     path('clients/', views.clients_view, name='clients'),
     path('buildings/', views.buildings_view, name='buildings'),
+    path('analytics/', views.analytics_dashboard, name='analytics_dashboard'),
     path('create_order/', views.create_order, name='create_order'),
     path('clients/add/', views.client_create, name='client_create'),
     path('client/<int:pk>/', views.client_detail, name='client_detail'),
@@ -56,12 +59,18 @@ urlpatterns = [
     path('order/<int:pk>/delete/', views.order_delete, name='order_delete'),
     path('order/<int:pk>/edit/', views.order_edit, name='order_edit'),
     path('order/<int:pk>/status/<str:status>/', views.update_order_status, name='update_status'),
+    path('images/<str:fmt>/<int:width>/<path:source>', views.image_derivative, name='image_derivative'),
+    path('live/orders/', order_events, name='order_events'),  # SSE: dashboard'дун жандуу жаңыруусу
 
     # ===================
     # API ИНТЕРФЕЙС
     # ===================
     path('api/', api_root, name='api-root'),
     path('api/register/', RegisterView.as_view(), name='register'),
+    path('api/export/<str:dataset>.<str:fmt>', views.export_data, name='export'),
+    path('api/cache-stats/', views.dashboard_cache_stats, name='cache-stats'),
+    path('api/instrumentation/', views.instrumentation_stats, name='instrumentation'),
+    path('api/analytics/', views.analytics_report, name='analytics'),
     path('api/', include(router.urls)),
 
     # ===================
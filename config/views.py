@@ -1,13 +1,22 @@
-from django.db.models import Q, Avg  # Avg кошулду - орточо рейтинг үчүн
+from datetime import datetime
+
+from django.conf import settings
 from django.contrib.auth.decorators import login_required
 from rest_framework import viewsets, permissions, generics
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.reverse import reverse
 from rest_framework.permissions import AllowAny
-from rest_framework.exceptions import PermissionDenied
+from rest_framework.exceptions import PermissionDenied, ValidationError
 
+from django.http import Http404, StreamingHttpResponse
+from django.core.exceptions import PermissionDenied as DjangoPermissionDenied, SuspiciousFileOperation
+from django.core.files.storage import default_storage
+from PIL import Image
 from django.shortcuts import render, redirect, get_object_or_404
+from django.template.loader import render_to_string
+from django.utils import timezone
+from django.utils.safestring import mark_safe
 from django.contrib import messages
 from django import forms
 from django.contrib.auth.forms import UserCreationForm
@@ -17,8 +26,24 @@ from django.contrib.auth import login
 from .models import User, Building, Service, Order, OrderHistory, Client, Category, Review
 from .serializers import (
     UserSerializer, BuildingSerializer, ServiceSerializer,
-    OrderSerializer, OrderHistorySerializer, RegisterSerializer
+    OrderSerializer, OrderHistorySerializer, RegisterSerializer, BulkOrderSerializer, BulkStatusSerializer,
+    SlotQuerySerializer
 )
+from .search import search_services
+from .querysets import OptimizedQuerySetMixin
+from .fast_serializers import FastListMixin
+from .db_routers import ReplicaReadMixin
+from .orders import bulk_change_status, bulk_create_orders, create_order_record, change_order_status
+from .scheduling import SlotConflicts, SlotError, free_slots, reserve
+from .transactions import immediate_write
+from .conditional import ConditionalGetMixin, catalog_condition
+from .caching import cached_for_user, dashboard_orders, cache_stats
+from .instrumentation import view_histograms
+from .live import current_cursor
+from .throttling import ScopedThrottle, check, throttle, throttled_response
+from .images import DerivativeIndex, enabled_formats, find_derivative, get_or_create_derivative, is_source, widths
+from .exports import ExportError, FORMATS as EXPORT_FORMATS, export_queryset, iter_export
+from .analytics import REPORT_PARAMS, ReportError, can_view_reports, report, report_params
 
 
 # ===================
@@ -28,6 +53,8 @@ class RegisterView(generics.CreateAPIView):
     queryset = User.objects.all()
     permission_classes = (AllowAny,)
     serializer_class = RegisterSerializer
+    throttle_classes = [ScopedThrottle]
+    throttle_scope = 'register'
 
 
 # ===================
@@ -39,6 +66,7 @@ class SignUpForm(UserCreationForm):
         fields = ['username', 'first_name', 'last_name', 'email']
 
 
+@throttle('register')
 def signup(request):
     if request.method == 'POST':
         form = SignUpForm(request.POST)
@@ -72,34 +100,35 @@ class ReviewForm(forms.ModelForm):
 # HTML VIEWS
 # ===================
 @login_required
+@catalog_condition('category', 'service')
 def home(request):
     categories = Category.objects.all()
-    # .prefetch_related('reviews') кошуу базага болгон сурамды азайтат жана маалыматты тез алат
-    services = Service.objects.all().prefetch_related('reviews')
+    # Рейтинг Service.rating_* талааларында сакталат, ошондуктан пикирлерди жүктөөнүн кереги жок
+    services = Service.objects.all()
 
     search_query = request.GET.get('search')
     if search_query:
-        services = services.filter(Q(name__icontains=search_query) | Q(description__icontains=search_query))
+        # FTS индекси аркылуу издөө, натыйжа ылайыктуулугу боюнча иреттелет
+        services = search_services(services, search_query)
 
     category_id = request.GET.get('category')
     if category_id:
         services = services.filter(category_id=category_id)
 
-    return render(request, 'home.html', {'categories': categories, 'services': services})
+    services = list(services)
+    # Бардык карточкалардын srcset'и бир сурам менен
+    derivatives = DerivativeIndex(service.image.name for service in services)
+    return render(request, 'home.html', {'categories': categories, 'services': services, 'derivatives': derivatives})
 
 
 @login_required
 def update_order_status(request, pk, status):
     order = get_object_or_404(Order, pk=pk)
     if request.user.role == 'MANAGER' and order.building == request.user.managed_building:
-        old_status = order.status
-        order.status = status
-        order.save()
-        OrderHistory.objects.create(order=order, old_status=old_status, new_status=status, changed_by=request.user)
+        change_order_status(order, status, changed_by=request.user)
         messages.success(request, f"Заказ статусу {status} деп өзгөртүлдү!")
     elif request.user.role == 'ADMIN':
-        order.status = status
-        order.save()
+        change_order_status(order, status, record_history=False)
         messages.success(request, "Админ катары статус өзгөртүлдү!")
     else:
         messages.error(request, "Сизге бул аракетке уруксат жок!")
@@ -110,33 +139,32 @@ def update_order_status(request, pk, status):
 # ЖАҢЫЛАНГАН SERVICE_DETAIL (Пикир калтыруу логикасы менен)
 # ---------------------------------------------------------
 @login_required
+@throttle('review')
 def service_detail(request, pk):
     # Кызматты базадан издөө
     service = get_object_or_404(Service, pk=pk)
     # Ушул кызматка тиешелүү пикирлерди алуу
-    reviews = service.reviews.all().order_by('-created_at')
+    reviews = service.reviews.select_related('user').order_by('-created_at')
 
+    form = None
     if request.method == "POST":
-        # Формадан маалыматты алуу
-        rating = request.POST.get('rating')
-        comment = request.POST.get('comment')
-
-        if rating and comment:
+        # Форма рейтингди (1-5) жана пикирди текшерет
+        form = ReviewForm(request.POST)
+        if form.is_valid():
             # Маалыматты базага сактоо
-            Review.objects.create(
-                service=service,
-                user=request.user,
-                rating=int(rating),
-                comment=comment
-            )
+            review = form.save(commit=False)
+            review.service = service
+            review.user = request.user
+            review.save()
             messages.success(request, "Пикириңиз ийгиликтүү кошулду!")
             return redirect('service_detail', pk=service.id)
 
     # reviews маалыматын контекстке кошууну унутпа!
     return render(request, 'service_detail.html', {
         'service': service,
-        'reviews': reviews  # Мына ушул жер маанилүү!
-    })
+        'reviews': reviews,  # Мына ушул жер маанилүү!
+        'form': form,
+    }, status=400 if form is not None else 200)
 
 
 @login_required
@@ -167,14 +195,15 @@ def client_create(request):
 
 @login_required
 def dashboard(request):
+    # Таблицанын саптары имарат/роль боюнча кэштелет; заказ өзгөргөндө сигналдар кэшти жаңыртат
     user = request.user
-    if user.role == 'ADMIN':
-        orders = Order.objects.all()
-    elif user.role == 'MANAGER':
-        orders = Order.objects.filter(building=user.managed_building)
-    else:
-        orders = Order.objects.filter(user=user)
-    return render(request, 'orders.html', {'orders': orders})
+    # Саптар менен бирге SSE курсору кэштелет (config/live.py) - ал саптардан мурун алынат, ортодо
+    # жазылганы агым аркылуу кайра келет (кайталоо зыянсыз)
+    cursor, order_rows = cached_for_user(
+        'order_rows', user,
+        lambda: (str(current_cursor()), render_to_string('order_rows.html', {'orders': dashboard_orders(user)})),
+    )
+    return render(request, 'orders.html', {'order_rows': mark_safe(order_rows), 'live_cursor': cursor})
 
 
 @login_required
@@ -202,18 +231,32 @@ def order_edit(request, pk):
     if request.method == "POST":
         form = OrderForm(request.POST, instance=order)
         if form.is_valid():
-            updated_order = form.save()
-            if old_status != updated_order.status:
-                OrderHistory.objects.create(order=updated_order, old_status=old_status, new_status=updated_order.status,
-                                            changed_by=request.user)
-            messages.success(request, "Заказ ийгиликтүү жаңыланды!")
-            return redirect('order_detail', pk=order.id)
+            try:
+                updated_order = save_order_form(form)
+            except SlotError as exc:
+                form.add_error(None, str(exc))
+            else:
+                if old_status != updated_order.status:
+                    OrderHistory.objects.create(order=updated_order, old_status=old_status,
+                                                new_status=updated_order.status, changed_by=request.user)
+                messages.success(request, "Заказ ийгиликтүү жаңыланды!")
+                return redirect('order_detail', pk=order.id)
     else:
         form = OrderForm(instance=order)
     return render(request, 'order_form.html', {'form': form, 'order': order})
 
 
+@immediate_write
+def save_order_form(form):
+    # Кызмат же имарат өзгөрсө - заказ башка слотко өтөт, ал бош болушу керек
+    order = form.instance
+    if {'service', 'building'} & set(form.changed_data):
+        reserve(order.service_id, order.building_id, order.date, order.time, exclude=order.pk)
+    return form.save()
+
+
 @login_required
+@throttle('create_order')
 def create_order(request):
     services = Service.objects.all()
     buildings = Building.objects.all()
@@ -222,30 +265,66 @@ def create_order(request):
         service_id = request.POST.get('service')
         building_id = request.POST.get('building')
         comment = request.POST.get('comment', '')
-        from django.utils import timezone
-        now = timezone.now()
-        Order.objects.create(
-            user=request.user,
-            service=get_object_or_404(Service, id=service_id),
-            building=get_object_or_404(Building, id=building_id),
-            date=request.POST.get('date') or now.date(),
-            time=request.POST.get('time') or now.time(),
-            comment=comment,
-            status='NEW'
-        )
+        try:
+            create_order_record(
+                user=request.user,
+                service=get_object_or_404(Service, id=service_id),
+                building=get_object_or_404(Building, id=building_id),
+                date=request.POST.get('date'),
+                time=request.POST.get('time'),
+                comment=comment,
+            )
+        except SlotError as exc:
+            messages.error(request, str(exc))
+            return render(request, 'create_order.html',
+                          {'services': services, 'buildings': buildings, 'selected_service_id': service_id})
         messages.success(request, "Жаңы заказ ийгиликтүү түзүлдү!")
         return redirect('dashboard')
     return render(request, 'create_order.html',
                   {'services': services, 'buildings': buildings, 'selected_service_id': selected_service_id})
 
 
+@login_required
+def analytics_dashboard(request):
+    # DailyRollup/HourlyRollup гана окулат (config/analytics.py)
+    if not can_view_reports(request.user):
+        raise DjangoPermissionDenied
+    try:
+        params = report_params(request.user, **{name: request.GET.get(name) for name in REPORT_PARAMS})
+    except ReportError as exc:
+        messages.error(request, str(exc))
+        params = report_params(request.user)
+    data = report(**params)
+    peak = max([row['orders_created'] for row in data['series']], default=0)
+    for row in data['series']:
+        row['width'] = round(100 * row['orders_created'] / peak) if peak else 0
+    return render(request, 'analytics.html', {'report': data, 'params': params})
+
+
 @login_required
 def clients_view(request):
     clients = Client.objects.all()
     return render(request, 'clients.html', {'clients': clients})
 
 
+def image_derivative(request, fmt, width, source):
+    """srcset'теги даяр эмес көчүрмө: биринчи сурамда түзүлүп, мазмун аты менен файлга жиберилет."""
+    if fmt not in enabled_formats() or width not in widths() or not is_source(source):
+        raise Http404
+    if find_derivative(source, width, fmt) is None:
+        # Түзүү кымбат (Pillow) жана кирүүсүз: IP боюнча чектелет, даяр көчүрмөгө багыттоо чектелбейт
+        wait = check(request, 'image_derivative')
+        if wait:
+            return throttled_response(wait)
+    try:
+        derivative = get_or_create_derivative(source, width, fmt)
+    except (OSError, SuspiciousFileOperation, Image.DecompressionBombError):
+        raise Http404
+    return redirect(default_storage.url(derivative.name))
+
+
 @login_required
+@catalog_condition('building')
 def buildings_view(request):
     buildings = Building.objects.all()
     return render(request, 'buildings.html', {'buildings': buildings})
@@ -268,61 +347,255 @@ def api_root(request, format=None):
     })
 
 
+# ===================
+# 3. ЭКСПОРТ (CSV / NDJSON АГЫМЫ)
+# ===================
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def export_data(request, dataset, fmt):
+    """/api/export/orders.csv, /api/export/history.ndjson - ?building=&status=&date_from=&date_to="""
+    params = request.query_params
+    try:
+        queryset, columns = export_queryset(
+            dataset, user=request.user, building=params.get('building'), status=params.get('status'),
+            date_from=params.get('date_from'), date_to=params.get('date_to'),
+        )
+        stream = iter_export(fmt, queryset, columns)
+    except ExportError as exc:
+        raise ValidationError(str(exc))
+    response = StreamingHttpResponse(stream, content_type=EXPORT_FORMATS[fmt])
+    response['Content-Disposition'] = f'attachment; filename="{dataset}.{fmt}"'
+    return response
+
+
+# ===================
+# 4. АНАЛИТИКА (алдын ала эсептелген жыйынтыктар)
+# ===================
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def analytics_report(request):
+    """/api/analytics/?period=day|hour&date_from=&date_to=&building= - админ баарын, менеджер өз имаратын көрөт."""
+    if not can_view_reports(request.user):
+        raise PermissionDenied("Отчёттор админ жана менеджерлер үчүн")
+    try:
+        params = report_params(request.user, **{name: request.query_params.get(name) for name in REPORT_PARAMS})
+    except ReportError as exc:
+        raise ValidationError(str(exc))
+    return Response(report(**params))
+
+
+# ===================
+# 5. КЭШ СТАТИСТИКАСЫ
+# ===================
+@api_view(['GET'])
+@permission_classes([permissions.IsAdminUser])
+def dashboard_cache_stats(request):
+    """Dashboard кэшинин hit/miss эсептегичтери - кэштин өлчөмүн жана TTL'ди тандоо үчүн."""
+    return Response(cache_stats())
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAdminUser])
+def instrumentation_stats(request):
+    """View боюнча кечигүү гистограммалары жана SQL саны (үлгүгө түшкөн сурамдар, бардык процесстер)."""
+    return Response(view_histograms())
+
+
 # ===================
 # API VIEWSETS
 # ===================
-class UserViewSet(viewsets.ModelViewSet):
+# OptimizedQuerySetMixin: select_related/prefetch_related/only() serializer талааларынан түзүлөт (N+1 жок)
+# FastListMixin: JSON тизмелер модель объекттерисиз, компиляцияланган serializer менен (config/fast_serializers.py)
+class UserViewSet(FastListMixin, OptimizedQuerySetMixin, viewsets.ModelViewSet):
     queryset = User.objects.all()
     serializer_class = UserSerializer
     permission_classes = [permissions.IsAuthenticated]
+    keyset_ordering = ('-created_at', '-id')
 
 
 class ManagerViewSet(UserViewSet):
-    def get_queryset(self):
-        return User.objects.filter(role='MANAGER')
+    queryset = User.objects.filter(role='MANAGER')
 
 
 class ClientViewSet(UserViewSet):
-    def get_queryset(self):
-        return User.objects.filter(role='USER')
+    queryset = User.objects.filter(role='USER')
 
 
-class BuildingViewSet(viewsets.ModelViewSet):
+# ConditionalGetMixin: каталог өзгөрбөсө ETag/Last-Modified боюнча 304 кайтарылат
+class BuildingViewSet(ConditionalGetMixin, ReplicaReadMixin, FastListMixin, OptimizedQuerySetMixin,
+                      viewsets.ModelViewSet):
     queryset = Building.objects.all()
     serializer_class = BuildingSerializer
     permission_classes = [permissions.IsAuthenticated]
+    keyset_ordering = ('-created_at', '-id')
+    catalog_tables = ('building',)
 
 
-class ServiceViewSet(viewsets.ModelViewSet):
+class ServiceViewSet(ConditionalGetMixin, ReplicaReadMixin, FastListMixin, OptimizedQuerySetMixin,
+                     viewsets.ModelViewSet):
     queryset = Service.objects.all()
     serializer_class = ServiceSerializer
     permission_classes = [permissions.IsAuthenticated]
+    keyset_ordering = ('-created_at', '-id')
+    catalog_tables = ('service',)
 
-
-class OrderViewSet(viewsets.ModelViewSet):
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action == 'list':
+            queryset = search_services(queryset, self.request.query_params.get('search'))
+        return queryset
+
+    def get_keyset_ordering(self):
+        # Издөө натыйжалары ылайыктуулук боюнча иреттелет - курсор жок, биринчи бет гана
+        if self.request.query_params.get('search', '').strip():
+            return None
+        return self.keyset_ordering
+
+    @action(detail=True, methods=['get'])
+    def slots(self, request, pk=None):
+        """Жакынкы бош слоттор: ?building= (демейки - кызматтын имараты), ?date_from=, ?count=."""
+        service = self.get_object()
+        query = SlotQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        params = query.validated_data
+        building_id = params['building'].pk if 'building' in params else service.building_id
+        after = None
+        if 'date_from' in params:
+            after = max(timezone.now(), timezone.make_aware(datetime.combine(params['date_from'], datetime.min.time())))
+        slots = free_slots(service.pk, building_id, after=after, count=params['count'])
+        return Response({
+            'service': service.pk,
+            'building': building_id,
+            'slots': [{'date': slot['date'].isoformat(), 'time': f"{slot['time']:%H:%M}", 'free': slot['free']}
+                      for slot in slots],
+        })
+
+
+class OrderViewSet(FastListMixin, OptimizedQuerySetMixin, viewsets.ModelViewSet):
     serializer_class = OrderSerializer
     permission_classes = [permissions.IsAuthenticated]
+    throttle_classes = [ScopedThrottle]  # жазуулар гана
+    throttle_scope = 'order_write'
+    keyset_ordering = ('-created_at', '-id')
 
     def get_queryset(self):
-        user = self.request.user
-        if user.role == 'ADMIN' or user.is_staff:
-            return Order.objects.all()
-        if user.role == 'MANAGER':
-            return Order.objects.filter(building=user.managed_building)
-        return Order.objects.filter(user=user)
+        return self.optimize_queryset(Order.objects.visible_to(self.request.user))
 
     def perform_create(self, serializer):
-        serializer.save(user=self.request.user, status='NEW')
+        self.save_in_slot(serializer)
 
     def perform_update(self, serializer):
-        instance = self.get_object()
-        old_status = instance.status
-        new_order = serializer.save()
+        # serializer.instance get_object() аркылуу жаңы эле жүктөлгөн - кайра окуунун кереги жок
+        self.save_with_history(serializer, serializer.instance.status)
+
+    def reserve_slot(self, serializer):
+        """Жаңы заказ же слоту (кызмат/имарат/дата/убакыт) өзгөргөн заказ: слот кулпу астында текшерилет."""
+        data, order = serializer.validated_data, serializer.instance
+        if order is not None and all(data.get(name, getattr(order, name)) == getattr(order, name)
+                                     for name in ('service', 'building', 'date', 'time')):
+            return {}
+        service = data.get('service') or order.service
+        building = data['building'] if 'building' in data else (order and order.building)
+        if building is None and order is None:
+            building = service.building  # демейки: кызматтын имараты
+        try:
+            day, start = reserve(service.pk, building.pk if building else None, data.get('date', order and order.date),
+                                 data.get('time', order and order.time), exclude=order and order.pk)
+        except SlotError as exc:
+            raise ValidationError({'time': [str(exc)]})
+        return {'building': building, 'date': day, 'time': start}
+
+    @immediate_write
+    def save_in_slot(self, serializer):
+        serializer.save(user=self.request.user, status='NEW', **self.reserve_slot(serializer))
+
+    @immediate_write
+    def save_with_history(self, serializer, old_status):
+        new_order = serializer.save(**self.reserve_slot(serializer))
         if old_status != new_order.status:
             OrderHistory.objects.create(order=new_order, old_status=old_status, new_status=new_order.status)
 
-
-class OrderHistoryViewSet(viewsets.ReadOnlyModelViewSet):
+    @action(detail=False, methods=['post', 'patch'], url_path='bulk')
+    def bulk(self, request):
+        """POST: заказдардын тизмеси түзүлөт. PATCH: [{"id", "status"}] - статустар өзгөрөт.
+
+        Бардыгы бир транзакцияда: бир да элемент туура эмес болсо, эч нерсе жазылбайт жана
+        {"errors": [{"index", "errors"}]} кайтарылат.
+        """
+        items = request.data
+        if not isinstance(items, list) or not items:
+            raise ValidationError("Бош эмес тизме күтүлөт")
+        if len(items) > settings.ORDERS_BULK_MAX:
+            raise ValidationError(f"Бир сурамда эң көп {settings.ORDERS_BULK_MAX} элемент")
+        if request.method == 'POST':
+            return self.bulk_create(items)
+        return self.bulk_update_status(items)
+
+    def bulk_create(self, items):
+        rows, errors = validate_items(BulkOrderSerializer, items)
+        service_ids = {row['service'] for row in rows.values()}
+        building_ids = {row['building'] for row in rows.values() if row.get('building')}
+        services = dict(Service.objects.filter(pk__in=service_ids).values_list('id', 'building_id'))
+        buildings = set(Building.objects.filter(pk__in=building_ids).values_list('id', flat=True))
+        orders, indexes = [], []
+        for index, row in rows.items():
+            if row['service'] not in services:
+                errors[index] = {'service': [f"Кызмат табылган жок: {row['service']}"]}
+            elif row.get('building') and row['building'] not in buildings:
+                errors[index] = {'building': [f"Имарат табылган жок: {row['building']}"]}
+            else:
+                building_id = row.get('building') or services[row['service']]
+                orders.append({'service_id': row['service'], 'building_id': building_id, 'date': row['date'],
+                               'time': row['time'], 'comment': row.get('comment')})
+                indexes.append(index)
+        if errors:
+            return bulk_errors(errors)
+        try:
+            created = bulk_create_orders(self.request.user, orders)
+        except SlotConflicts as exc:
+            return bulk_errors({indexes[position]: {'time': [error]} for position, error in exc.errors.items()})
+        return Response({'created': [order.pk for order in created]}, status=201)
+
+    def bulk_update_status(self, items):
+        rows, errors = validate_items(BulkStatusSerializer, items)
+        # Ролго жараша: OrderViewSet'тегидей көрүнгөн заказдар гана (бир сурам)
+        orders = (Order.objects.visible_to(self.request.user)
+                  .only('id', 'status', 'user_id', 'building_id', 'service_id', 'created_at')
+                  .in_bulk([row['id'] for row in rows.values()]))
+        statuses = {}
+        for index, row in rows.items():
+            if row['id'] not in orders:
+                errors[index] = {'id': [f"Заказ табылган жок: {row['id']}"]}
+            elif row['id'] in statuses:
+                errors[index] = {'id': [f"Заказ тизмеде кайталанды: {row['id']}"]}
+            else:
+                statuses[row['id']] = row['status']
+        if errors:
+            return bulk_errors(errors)
+        changed = bulk_change_status([orders[pk] for pk in statuses], statuses, changed_by=self.request.user)
+        changed_ids = {order.pk for order in changed}
+        return Response({'updated': sorted(changed_ids), 'unchanged': sorted(set(statuses) - changed_ids)})
+
+
+def validate_items(serializer_class, items):
+    """({индекс: validated_data}, {индекс: каталар}) - ар бир элемент өзүнчө текшерилет."""
+    # Бир эле serializer: талаалар ар бир элемент үчүн кайра көчүрүлбөйт (is_valid() аны ар дайым жасайт)
+    serializer = serializer_class()
+    rows, errors = {}, {}
+    for index, item in enumerate(items):
+        try:
+            rows[index] = serializer.run_validation(item)
+        except ValidationError as exc:
+            errors[index] = exc.detail
+    return rows, errors
+
+
+def bulk_errors(errors):
+    return Response({'errors': [{'index': index, 'errors': errors[index]} for index in sorted(errors)]}, status=400)
+
+
+class OrderHistoryViewSet(ReplicaReadMixin, FastListMixin, OptimizedQuerySetMixin, viewsets.ReadOnlyModelViewSet):
     queryset = OrderHistory.objects.all()
     serializer_class = OrderHistorySerializer
-    permission_classes = [permissions.IsAuthenticated]
\ No newline at end of file
+    permission_classes = [permissions.IsAuthenticated]
+    keyset_ordering = ('-change_date', '-id')
\ No newline at end of file
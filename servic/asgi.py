@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'servic.settings')
+# Каталог жана заказдардын окуу жолдору async view'лор аркылуу (config/async_views.py)
+os.environ.setdefault('ASYNC_READ_VIEWS', '1')
 
 application = get_asgi_application()
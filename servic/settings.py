@@ -27,16 +27,22 @@ INSTALLED_APPS = [
 
 # 4. ОРТОНКУ КАТМАРЛАР (MIDDLEWARE)
 MIDDLEWARE = [
+    'config.instrumentation.QueryInstrumentationMiddleware',  # эң сыртта - бүт сурамдын убактысы
+    'config.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'config.assets.StaticFilesMiddleware',  # /static/: хэштелген, алдын ала кысылган файлдар (config/assets.py)
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'config.db_routers.ReplicaPinMiddleware',
 ]
 
-ROOT_URLCONF = 'servic.urls'
+# ASGI (servic/asgi.py) окуу жолдорун async view'лорго бурат (config/async_urls.py)
+ASYNC_READ_VIEWS = os.environ.get('ASYNC_READ_VIEWS') == '1'
+ROOT_URLCONF = 'config.async_urls' if ASYNC_READ_VIEWS else 'servic.urls'
 
 # 5. ШАБЛОНДОР (TEMPLATES)
 TEMPLATES = [
@@ -58,15 +64,181 @@ TEMPLATES = [
 WSGI_APPLICATION = 'servic.wsgi.application'
 
 # 6. БАЗА (DATABASE)
+# Айлана-чөйрө өзгөрмөлөрү аркылуу: DB_ENGINE=sqlite|postgresql, DB_NAME, DB_USER, DB_PASSWORD, DB_HOST, DB_PORT.
+# Реплика үчүн ошол эле өзгөрмөлөр DB_REPLICA_ префикси менен (мис. DB_REPLICA_HOST же SQLite үчүн DB_REPLICA_NAME).
+# Локалдуу текшерүү: DB_REPLICA_NAME=db_replica.sqlite3 python manage.py migrate --database replica,
+# андан соң db.sqlite3 файлын көчүрүп "репликацияны" туурайбыз.
+
+# SQLite'тин бир түйүндүү прод режими (SQLITE_PERFORMANCE=1): WAL - окуулар жазууну бөгөттөбөйт,
+# PRAGMA'лар ар бир туташууда коюлат.
+SQLITE_PERFORMANCE_OPTIONS = {
+    'init_command': (
+        'PRAGMA journal_mode=WAL;'
+        'PRAGMA synchronous=NORMAL;'
+        f"PRAGMA mmap_size={os.environ.get('SQLITE_MMAP_SIZE', str(256 * 1024 * 1024))};"
+        f"PRAGMA cache_size=-{os.environ.get('SQLITE_CACHE_KB', '65536')};"
+        'PRAGMA temp_store=MEMORY;'
+    ),
+    # busy_timeout (секунд): кулпу бошогуча күтөт
+    'timeout': float(os.environ.get('SQLITE_BUSY_TIMEOUT', '5')),
+    # atomic() блоктору BEGIN IMMEDIATE менен ачылат (config.transactions.immediate_write)
+    'transaction_mode': 'IMMEDIATE',
+}
+
+
+def database_from_env(prefix, default_name):
+    engine = os.environ.get(f'{prefix}ENGINE', os.environ.get('DB_ENGINE', 'sqlite'))
+    if engine == 'sqlite':
+        config = {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get(f'{prefix}NAME', default_name),
+        }
+        if os.environ.get('SQLITE_PERFORMANCE') == '1':
+            config['OPTIONS'] = dict(SQLITE_PERFORMANCE_OPTIONS)
+        return config
+    config = {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': os.environ.get(f'{prefix}NAME', os.environ.get('DB_NAME', 'servic')),
+        'USER': os.environ.get(f'{prefix}USER', os.environ.get('DB_USER', 'servic')),
+        'PASSWORD': os.environ.get(f'{prefix}PASSWORD', os.environ.get('DB_PASSWORD', '')),
+        'HOST': os.environ.get(f'{prefix}HOST', os.environ.get('DB_HOST', 'localhost')),
+        'PORT': os.environ.get(f'{prefix}PORT', os.environ.get('DB_PORT', '5432')),
+        'OPTIONS': {},
+    }
+    pool_size = int(os.environ.get('DB_POOL_MAX_SIZE', '0'))
+    if pool_size:
+        # psycopg pool: ар бир воркер процессинде даяр туташуулар (CONN_MAX_AGE менен бирге колдонулбайт)
+        config['OPTIONS']['pool'] = {
+            'min_size': int(os.environ.get('DB_POOL_MIN_SIZE', '2')),
+            'max_size': pool_size,
+            'timeout': float(os.environ.get('DB_POOL_TIMEOUT', '10')),
+        }
+    else:
+        # Туруктуу туташуулар: ар бир сурамда кайра туташуунун баасы жок
+        config['CONN_MAX_AGE'] = int(os.environ.get('DB_CONN_MAX_AGE', '60'))
+        config['CONN_HEALTH_CHECKS'] = True
+    return config
+
+
 DATABASES = {
+    'default': database_from_env('DB_', BASE_DIR / 'db.sqlite3'),
+}
+if os.environ.get('DB_REPLICA_HOST') or os.environ.get('DB_REPLICA_NAME'):
+    DATABASES['replica'] = database_from_env('DB_REPLICA_', BASE_DIR / 'db_replica.sqlite3')
+    # Тесттерде реплика негизги базанын күзгүсү болот
+    DATABASES['replica']['TEST'] = {'MIRROR': 'default'}
+
+# Окуу гана аракеттерин (list/retrieve) репликага, жазууларды негизги базага жиберет
+DATABASE_ROUTERS = ['config.db_routers.PrimaryReplicaRouter']
+# POST/PUT/DELETE'тен кийин колдонуучунун окуулары ушунча секунд негизги базадан болот (read-your-writes)
+# Бекитүү демейки кэште - реплика менен жалпы кэш керек (CACHE_BACKEND=redis же file; config.E001)
+DATABASE_REPLICA_PIN_SECONDS = int(os.environ.get('DB_REPLICA_PIN_SECONDS', '5'))
+# "database is locked" болгондо жазуу канча жолу кайталанат
+SQLITE_WRITE_RETRIES = int(os.environ.get('SQLITE_WRITE_RETRIES', '3'))
+
+# КЭШ: CACHE_BACKEND=locmem (демейки) | file | redis | толук класс жолу (мис. django_redis.cache.RedisCache)
+# locmem бир процесстин ичинде гана - бир нече воркерде file же redis колдонуңуз
+CACHE_BACKENDS = {
+    'locmem': ('django.core.cache.backends.locmem.LocMemCache', 'servic'),
+    'file': ('django.core.cache.backends.filebased.FileBasedCache', str(BASE_DIR / 'cache')),
+    'redis': ('django.core.cache.backends.redis.RedisCache', 'redis://127.0.0.1:6379/1'),
+}
+_cache_backend = os.environ.get('CACHE_BACKEND', 'locmem')
+_cache_class, _cache_location = CACHE_BACKENDS.get(_cache_backend, (_cache_backend, ''))
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-    }
+        'BACKEND': _cache_class,
+        'LOCATION': os.environ.get('CACHE_LOCATION', _cache_location),
+        'TIMEOUT': int(os.environ.get('CACHE_TIMEOUT', '300')),
+    },
+}
+# Сессиялар: cached_db - окуу кэштен, жазуу кэшке жана базага (кэш тазаланса да сессия жоголбойт). locmem'де
+# демейки db: башка воркердин кэшинде чыгып кеткен (logout, cycle_key) сессия CACHE_TIMEOUT бою иштей бермек.
+# signed_cookies - серверде эч нерсе жок, бирок сессияны серверден жокко чыгарууга болбойт.
+SESSION_ENGINE = os.environ.get('SESSION_ENGINE', 'django.contrib.sessions.backends.'
+                                + ('db' if _cache_backend == 'locmem' else 'cached_db'))
+
+# Колдонуучу жана токен -> колдонуучу кэши (config/auth_cache.py): процесстин ичиндеги LRU
+# Өзгөрүү "белгилери" AUTH_CACHE_ALIAS кэшинде - бир нече воркерде жалпы болушу керек (file/redis). locmem ар
+# бир процесстин өзүнүкү: жокко чыгарылган токен башка воркерлерде TTL бою иштей бермек, ошондуктан демейки 0.
+AUTH_CACHE_TTL = int(os.environ.get('AUTH_CACHE_TTL', '0' if _cache_backend == 'locmem' else '60'))  # 0 - өчүк
+AUTH_CACHE_SIZE = 10000
+AUTH_CACHE_ALIAS = 'default'  # None - белгисиз, TTL гана
+
+# Dashboard фрагменттери жана сурам натыйжалары (config/caching.py)
+DASHBOARD_CACHE_ALIAS = 'default'
+DASHBOARD_CACHE_TIMEOUT = int(os.environ.get('DASHBOARD_CACHE_TIMEOUT', '600'))
+
+# /api/orders/bulk/ - бир сурамдагы элементтердин чеги
+ORDERS_BULK_MAX = int(os.environ.get('ORDERS_BULK_MAX', '1000'))
+
+# ЖАНДУУ АГЫМ (config/live.py, /live/orders/): заказдар панели SSE аркылуу жаңырат
+# LIVE_BROKER=local - процесстин ичинде (бир воркер); бир нече воркерде redis (же класстын толук жолу)
+LIVE_BROKER = os.environ.get('LIVE_BROKER', 'local')
+LIVE_REDIS_URL = os.environ.get('LIVE_REDIS_URL', 'redis://127.0.0.1:6379/2')
+LIVE_REDIS_CHANNEL = 'live:orders'
+LIVE_STREAM_SECONDS = int(os.environ.get('LIVE_STREAM_SECONDS', '300'))  # ASGI агымы ушунча ачык турат
+LIVE_HEARTBEAT_SECONDS = 15
+LIVE_RETRY_MS = 1000  # ASGI: агым жабылгандан кийин кайра туташуу
+LIVE_POLL_RETRY_MS = int(os.environ.get('LIVE_POLL_RETRY_MS', '5000'))  # WSGI: агым жок, курсор менен сурап турат
+LIVE_REPLAY_LIMIT = 500  # мындан көп өткөрүлгөн окуя болсо - бет толугу менен жаңыртылат
+LIVE_QUEUE_SIZE = 1000  # бир агымдын кезеги; толсо агым кайра туташат
+
+# ЖАЗЫЛУУ СЛОТТОРУ (config/scheduling.py): CapacityRule жок кызмат/имарат үчүн демейки эреже
+SCHEDULE_DEFAULT = {'weekdays': '0123456', 'opens_at': '09:00', 'closes_at': '18:00', 'slot_minutes': 60, 'capacity': 1}
+SCHEDULE_HORIZON_DAYS = 62  # бош слот ушунча күн алдыга изделет
+SCHEDULE_MAX_SLOTS = 100  # /api/services/<id>/slots/?count= чеги
+
+# ЧЕКТӨӨ (config/throttling.py): {аймак: [(ip|user|global, token|sliding, 'N/s|m|h|d')]}
+# THROTTLE_BACKEND=memory - процесстин ичинде; бир сервердеги бир нече воркерде file (mmap), бир нече
+# серверде redis. sqlite - өзүнчө файл (mmap'тен жайыраак, бирок дагы эле Django'нун базасы эмес).
+THROTTLE_ENABLED = os.environ.get('THROTTLE_ENABLED', '1') == '1'
+THROTTLE_BACKEND = os.environ.get('THROTTLE_BACKEND', 'memory')
+THROTTLE_FILE = os.environ.get('THROTTLE_FILE', str(BASE_DIR / 'throttle.db'))
+THROTTLE_FILE_SLOTS = 1 << 16  # 65536 ачкыч, 2.5 МБ
+THROTTLE_SQLITE = os.environ.get('THROTTLE_SQLITE', str(BASE_DIR / 'throttle.sqlite3'))
+THROTTLE_REDIS_URL = os.environ.get('THROTTLE_REDIS_URL', 'redis://127.0.0.1:6379/3')
+THROTTLE_NUM_PROXIES = int(os.environ.get('THROTTLE_NUM_PROXIES', '0'))  # X-Forwarded-For'го ишенүү
+THROTTLE_RULES = {
+    # Каттоо - пароль хэши кымбат: бир IP'ден саатына 5, бардыгы болуп мүнөтүнө 30
+    'register': [('ip', 'sliding', '5/h'), ('global', 'token', '30/m')],
+    'login': [('ip', 'token', '10/m'), ('ip', 'sliding', '50/h')],
+    'create_order': [('user', 'token', '20/m')],
+    'review': [('user', 'sliding', '10/h')],
+    'order_write': [('user', 'token', '120/m')],  # /api/orders/ POST/PUT/PATCH/DELETE, bulk
+    'image_derivative': [('ip', 'token', '30/m')],  # /images/: даяр эмес көчүрмөнү түзүү гана (Pillow)
 }
 
+# ФОНДОГУ ТАПШЫРМАЛАР (config/tasks.py, `manage.py run_tasks` воркери)
+TASKS_EAGER = os.environ.get('TASKS_EAGER') == '1'  # тапшырмалар кезексиз, ошол замат аткарылат
+TASKS_LOCK_TIMEOUT = int(os.environ.get('TASKS_LOCK_TIMEOUT', '300'))  # токтоп калган воркердин тапшырмасы кайра алынат
+
+# ИНСТРУМЕНТАЦИЯ (config/instrumentation.py): SQL саны/убактысы, Server-Timing, жай сурамдардын логу
+# INSTRUMENTATION_SAMPLE_RATE=0 - өчүк (бир салыштыруу гана), 1 - ар бир сурам, 0.05 - 5%
+INSTRUMENTATION_SAMPLE_RATE = float(os.environ.get('INSTRUMENTATION_SAMPLE_RATE', '0'))
+INSTRUMENTATION_SLOW_MS = float(os.environ.get('INSTRUMENTATION_SLOW_MS', '500'))
+INSTRUMENTATION_TOP_SQL = 5  # жай сурамдын логундагы эң кымбат SQL саны
+INSTRUMENTATION_FLUSH_SECONDS = 10  # процесстеги гистограммалар кэшке ушунча секундда бир кошулат
+INSTRUMENTATION_CACHE_ALIAS = 'default'
+
+# PROMETHEUS (config/metrics.py, /metrics): эсептегичтер жана гистограммалар
+# Бир нече воркер болсо METRICS_DIR коюлат - ар бир процесс өз mmap файлына жазат, /metrics баарын кошот.
+# Каталог деплой/кайра иштетүүдө тазаланышы керек (эски pid файлдары калбасын).
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', '1') == '1'
+METRICS_DIR = os.environ.get('PROMETHEUS_MULTIPROC_DIR') or None
+# `Authorization: Bearer <token>` талап кылынат; коюлбаса /metrics DEBUG'та гана ачык (config.W003)
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN') or None
+
+# КАТТАР (менеджерлерге билдирүүлөр)
+EMAIL_BACKEND = os.environ.get('EMAIL_BACKEND', 'django.core.mail.backends.console.EmailBackend')
+DEFAULT_FROM_EMAIL = os.environ.get('DEFAULT_FROM_EMAIL', 'noreply@service.kg')
+
 # 7. КОЛДОНУУЧУНУН МОДЕЛИ
 AUTH_USER_MODEL = 'config.User'
+# Сессиядагы колдонуучу ар бир сурамда базадан эмес, LRU'дан (config/auth_cache.py). Backend'дин жолу сессияга
+# жазылат: мурда ачылган сессиялардагы ModelBackend'дин жолу 0018_session_backend_path миграциясы менен
+# CachedModelBackend'ке алмаштырылат (ModelBackend бул жерде экинчи жолу тизмеленбейт).
+AUTHENTICATION_BACKENDS = ['config.auth_cache.CachedModelBackend']
 
 # 8. ПАРОЛЬ ВАЛИДАЦИЯСЫ
 AUTH_PASSWORD_VALIDATORS = [
@@ -86,21 +258,55 @@ USE_TZ = True
 STATIC_URL = 'static/'
 STATICFILES_DIRS = [BASE_DIR / 'static']
 STATIC_ROOT = BASE_DIR / 'staticfiles'
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    # collectstatic: хэштелген аттар (staticfiles.json) + .gz/.br көчүрмөлөр
+    'staticfiles': {'BACKEND': 'config.assets.CompressedManifestStaticFilesStorage'},
+}
+
+# АКТИВДЕР (config/assets.py): шаблон өзгөргөндө `build_assets` (static/build/app.css), деплойдо `collectstatic`
+ASSETS_TEMPLATE_DIRS = [BASE_DIR / 'config' / 'templates']  # Tailwind класстары ушул жерден изделет
+ASSETS_BASE_CSS = BASE_DIR / 'static' / 'css' / 'base.css'
+ASSETS_BUILD_DIR = BASE_DIR / 'static' / 'build'
+ASSETS_VENDOR_DIR = BASE_DIR / 'static' / 'vendor'
+# Font Awesome static/vendor/fontawesome'го салынганча иконкалар CDN'ден
+ASSETS_ICONS_CDN = (None if (ASSETS_VENDOR_DIR / 'fontawesome').is_dir()
+                    else 'https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.4.0/css/all.min.css')
+ASSETS_SERVE = os.environ.get('ASSETS_SERVE', '1') == '1'  # 0 - статиканы nginx/CDN берет
+ASSETS_MAX_AGE = 365 * 24 * 3600  # хэштелген файлдар өзгөрбөйт
+ASSETS_MAX_AGE_UNHASHED = 60
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Сүрөттөрдүн кичирейтилген көчүрмөлөрү (config/images.py): srcset тууралары жана форматтары
+IMAGE_DERIVATIVE_WIDTHS = (160, 320, 480, 640, 960, 1280)
+IMAGE_DERIVATIVE_FORMATS = ('avif', 'webp')  # Pillow колдобогону өткөрүлүп жиберилет
+IMAGE_DERIVATIVE_QUALITY = 75
+
 # 11. DJANGO REST FRAMEWORK ЖӨНДӨӨЛӨРҮ
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'rest_framework.authentication.SessionAuthentication',
-        'rest_framework.authentication.TokenAuthentication',
+        'config.auth_cache.CachedTokenAuthentication',  # TokenAuthentication + LRU (config/auth_cache.py)
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',  # Swagger схемасы
+    # Keyset (cursor) пагинация: ?cursor=..., ?page_size=..., ?count=1
+    'DEFAULT_PAGINATION_CLASS': 'config.pagination.KeysetPagination',
+    'PAGE_SIZE': 50,
+    # JSONRenderer'дин натыйжасы orjson менен (config/fast_serializers.py)
+    'DEFAULT_RENDERER_CLASSES': [
+        'config.fast_serializers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
 }
+API_MAX_PAGE_SIZE = 200
+# Тизмелер (list) компиляцияланган serializer менен: values_list -> dict, JSON ошол эле (config/fast_serializers.py)
+API_FAST_SERIALIZERS = os.environ.get('API_FAST_SERIALIZERS', '1') == '1'
+API_COUNT_CACHE_TIMEOUT = 60  # ?count=1 үчүн болжолдуу сан канча секунд кэште турат
 
 # 12. SWAGGER (DRF SPECTACULAR) ЖӨНДӨӨЛӨРҮ
 SPECTACULAR_SETTINGS = {
@@ -1,8 +1,11 @@
 from django.contrib import admin
 from django.urls import path, include
 
+from config.metrics import metrics_view
+
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('metrics', metrics_view, name='metrics'),  # Prometheus (ORM'го тийбейт)
     path('', include('config.urls')),       # HTML интерфейс
     path('api/', include('config.api_urls')),  # API интерфейс
 ]